@@ -0,0 +1,11 @@
+"""
+    벤치마크 패키지
+
+    - synthetic : 결정적(seed 고정) 합성 OHLCV 데이터 생성 + 임시 SQLite DB 구성
+    - scenarios : 시간 측정 시나리오 (데이터 로드, 지표 계산, 전략, 백테스트 루프, 웹훅 등)
+    - run       : CLI 실행기 (결과를 JSON으로 저장하고 이전 결과와 비교)
+
+    사용 예
+        python -m benchmark.run --out data/bench/latest.json
+        python -m benchmark.run --compare data/bench/baseline.json --out data/bench/latest.json
+"""
@@ -0,0 +1,265 @@
+"""
+    벤치마크 실행기
+
+    python -m benchmark.run [--only data strategy.MACD] [--repeat 5] [--out result.json] [--compare baseline.json]
+
+    - 합성 데이터로 임시 DB를 만들고, 임시 작업 디렉토리에서 시나리오를 실행합니다.
+      (상태 파일, 웹훅 로그 등이 저장소의 data/ 폴더에 쌓이지 않음)
+    - 결과는 JSON으로 저장되며, --compare로 이전 결과와 중앙값(median) 기준으로 비교합니다.
+    - 외부 API / 네트워크 호출 없이 실행됩니다.
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+##############################################################################################
+# 측정
+##############################################################################################
+@contextlib.contextmanager
+def _quiet(enabled=True):
+    """전략 / 데이터 모듈의 print, 로그 출력을 숨김"""
+    if not enabled:
+        yield
+        return
+    previous_disable = logging.root.manager.disable
+    logging.disable(logging.CRITICAL)
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        logging.disable(previous_disable)
+
+def summarize(times, ops):
+    times = np.asarray(times, dtype=np.float64)
+    median = float(np.median(times))
+    return {
+        'n': int(len(times)),
+        'times': [float(t) for t in times],
+        'min': float(times.min()),
+        'mean': float(times.mean()),
+        'median': median,
+        'p95': float(np.percentile(times, 95)),
+        'ops': ops,
+        'ops_per_sec': ops / median if median > 0 else None,
+    }
+
+def run_scenario(name, info, ctx, repeat=5, warmup=1, quiet=True):
+    """
+    시나리오 하나를 실행하고 결과 dict를 반환합니다.
+    준비 단계는 측정하지 않고, warmup 실행 후 repeat번 측정합니다.
+    """
+    from benchmark.scenarios import SkipScenario
+
+    result = {'group': info['group'], 'doc': info['doc']}
+    try:
+        with _quiet(quiet):
+            func, ops = info['func'](ctx)
+            for _ in range(warmup):
+                func()
+
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                func()
+                times.append(time.perf_counter() - start)
+
+        result.update(status="ok", **summarize(times, ops))
+
+    except SkipScenario as e:
+        result.update(status="skipped", reason=str(e))
+    except Exception as e:
+        result.update(status="error", error=f"{type(e).__name__}: {e}")
+
+    return result
+
+
+##############################################################################################
+# 비교
+##############################################################################################
+def compare_results(current, baseline, threshold=0.10):
+    """
+    두 실행 결과를 시나리오별 median으로 비교합니다.
+
+    Returns:
+        list[dict]: name, baseline, current, ratio, verdict(regression / improvement / same)
+    """
+    rows = []
+    for name, cur in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None or cur.get('status') != "ok" or base.get('status') != "ok":
+            continue
+
+        ratio = cur['median'] / base['median'] if base['median'] > 0 else float('inf')
+        if ratio > 1 + threshold:
+            verdict = "regression"
+        elif ratio < 1 - threshold:
+            verdict = "improvement"
+        else:
+            verdict = "same"
+        rows.append({'name': name, 'baseline': base['median'], 'current': cur['median'],
+                     'ratio': ratio, 'verdict': verdict})
+    return rows
+
+def print_results(results, out=sys.stdout):
+    print(f"{'scenario':<48} {'status':<8} {'median(ms)':>11} {'p95(ms)':>10} {'ops/s':>12}", file=out)
+    print("-" * 93, file=out)
+    for name, res in results.items():
+        if res['status'] == "ok":
+            ops_per_sec = f"{res['ops_per_sec']:.1f}" if res['ops_per_sec'] else "-"
+            print(f"{name:<48} {'ok':<8} {res['median'] * 1000:>11.2f} {res['p95'] * 1000:>10.2f} {ops_per_sec:>12}", file=out)
+        else:
+            reason = res.get('reason') or res.get('error', '')
+            print(f"{name:<48} {res['status']:<8} {reason}", file=out)
+
+def print_comparison(rows, out=sys.stdout):
+    print(f"{'scenario':<48} {'base(ms)':>10} {'cur(ms)':>10} {'ratio':>7}  verdict", file=out)
+    print("-" * 93, file=out)
+    for row in rows:
+        print(f"{row['name']:<48} {row['baseline'] * 1000:>10.2f} {row['current'] * 1000:>10.2f} "
+              f"{row['ratio']:>7.2f}  {row['verdict']}", file=out)
+
+
+##############################################################################################
+# 실행
+##############################################################################################
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+def _select(scenarios, only):
+    if not only:
+        return dict(scenarios)
+    return {name: info for name, info in scenarios.items()
+            if any(name == key or name.startswith(key + ".") or info['group'] == key for key in only)}
+
+def run_benchmarks(only=None, repeat=5, warmup=1, n_tickers=5, years=3, start_year=2021,
+                   seed=42, quiet=True, progress=sys.stdout):
+    """
+    선택한 시나리오들을 실행하고 결과 dict(meta + results)를 반환합니다.
+    작업 디렉토리를 임시 폴더로 바꿔서 실행하고, 끝나면 원래대로 되돌립니다.
+    """
+    workdir = tempfile.mkdtemp(prefix="autotrader_bench_work_")
+    original_cwd = os.getcwd()
+    os.chdir(workdir)
+
+    try:
+        with _quiet(quiet):
+            from benchmark import synthetic
+            from benchmark.scenarios import SCENARIOS
+            market = synthetic.generate_market(n_tickers=n_tickers, start_year=start_year, years=years, seed=seed)
+
+        selected = _select(SCENARIOS, only)
+        results = {}
+
+        with _quiet(quiet), synthetic.temporary_database(market) as market:
+            ticker = market['tickers'][0]
+            frame = market['prices'][ticker]
+            ctx = {
+                'market': market,
+                'ticker': ticker,
+                'frame': frame,
+                'dates': frame['date'].tolist(),
+            }
+
+            for name, info in selected.items():
+                print(f"[bench] {name} ...", file=progress, flush=True)
+                results[name] = run_scenario(name, info, ctx, repeat=repeat, warmup=warmup, quiet=quiet)
+
+    finally:
+        os.chdir(original_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'numpy': np.__version__,
+            'pandas': __import__('pandas').__version__,
+            'config': {
+                'repeat': repeat, 'warmup': warmup, 'n_tickers': n_tickers,
+                'years': years, 'start_year': start_year, 'seed': seed, 'only': only,
+            },
+        },
+        'results': results,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="auto-trader 벤치마크")
+    parser.add_argument("--only", nargs="*", help="실행할 시나리오 이름 / 접두사 / 그룹 (예: data strategy.MACD)")
+    parser.add_argument("--repeat", type=int, default=5, help="시나리오당 측정 횟수")
+    parser.add_argument("--warmup", type=int, default=1, help="측정 전 예열 실행 횟수")
+    parser.add_argument("--tickers", type=int, default=5, help="합성 종목 수")
+    parser.add_argument("--years", type=int, default=3, help="합성 데이터 기간 (년)")
+    parser.add_argument("--start-year", type=int, default=2021, help="합성 데이터 시작 연도")
+    parser.add_argument("--seed", type=int, default=42, help="합성 데이터 seed")
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 경로")
+    parser.add_argument("--threshold", type=float, default=0.10, help="회귀로 판단할 median 증가 비율")
+    parser.add_argument("--fail-on-regression", action="store_true", help="회귀가 있으면 종료 코드 1")
+    parser.add_argument("--list", action="store_true", help="시나리오 목록만 출력")
+    parser.add_argument("--verbose", action="store_true", help="모듈의 print 출력을 숨기지 않음")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        from benchmark.scenarios import SCENARIOS
+        for name, info in SCENARIOS.items():
+            print(f"{name:<48} {info['doc']}")
+        return 0
+
+    # 상대 경로는 실행 위치 기준 (실행 중에는 임시 디렉토리로 이동하므로 미리 절대 경로로 변환)
+    out_path = os.path.abspath(args.out) if args.out else None
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+
+    report = run_benchmarks(
+        only=args.only, repeat=args.repeat, warmup=args.warmup,
+        n_tickers=args.tickers, years=args.years, start_year=args.start_year,
+        seed=args.seed, quiet=not args.verbose,
+    )
+    print()
+    print_results(report['results'])
+
+    if out_path:
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n결과가 저장되었습니다: {out_path}")
+
+    if compare_path:
+        with open(compare_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare_results(report, baseline, threshold=args.threshold)
+        print(f"\n비교 대상: {compare_path} (commit {baseline.get('meta', {}).get('git_commit')})")
+        print_comparison(rows)
+
+        if args.fail_on_regression and any(row['verdict'] == "regression" for row in rows):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,401 @@
+"""
+    벤치마크 시나리오
+
+    시나리오 함수는 벤치마크 컨텍스트(ctx)를 받아서 (측정할 함수, 1회 실행당 처리 개수)를 반환합니다.
+    - 준비 작업(데이터 생성, 지표 계산 등)은 시나리오 함수 안에서 끝내고, 반환한 함수는 측정 대상만 실행합니다.
+    - 선택적 의존성(pykrx, flask 등)이 없으면 SkipScenario를 발생시켜 결과에 skipped로 기록합니다.
+
+    ctx
+        market   : synthetic.temporary_database()가 반환한 시장 데이터 (tickers, trading_days, prices, db_path)
+        ticker   : 단일 종목 시나리오에 사용할 종목 코드
+        frame    : ticker의 일봉 데이터프레임
+        dates    : ticker의 거래일 리스트 (YYYYMMDD)
+"""
+
+from strategy.strategy import TradingSignal
+
+SCENARIOS = {}
+
+
+class SkipScenario(Exception):
+    """선택적 의존성이 없는 등의 이유로 시나리오를 건너뛸 때 사용"""
+    pass
+
+
+def scenario(name, group):
+    """시나리오 등록 데코레이터"""
+    def decorator(func):
+        SCENARIOS[name] = {'func': func, 'group': group, 'doc': (func.__doc__ or "").strip()}
+        return func
+    return decorator
+
+def _require(module_name):
+    try:
+        return __import__(module_name, fromlist=['_'])
+    except ImportError as e:
+        raise SkipScenario(f"{module_name} import 실패: {e}")
+
+def load_strategies():
+    """
+    전략 레지스트리를 반환합니다.
+    core.trader는 데이터 수집 모듈(pykrx 등)까지 불러오므로, 실패하면 전략 모듈만 직접 불러옵니다.
+    """
+    try:
+        from core.trader import STRATEGIES
+        return STRATEGIES
+    except ImportError:
+        from strategy import ma_strategy, macd_strategy, squeeze_momentum_strategy, rsi_strategy, pine_style_strategy
+        return {
+            "MA":               ma_strategy.MA_strategy,
+            "MACD":             macd_strategy.MACD_strategy,
+            "SqueezeMomentum":  squeeze_momentum_strategy.SqueezeMomentum_strategy,
+            "RSI":              rsi_strategy.RSI_strategy,
+            "PineStyle":        pine_style_strategy.PineStyle_strategy,
+        }
+
+def make_signals(ticker, frame, every=10):
+    """
+    orderer 벤치마크용 신호열 (every일마다 매수/매도를 번갈아 내고 나머지는 HOLD)
+    전략 계산과 분리해서 주문 처리 비용만 측정하기 위해 사용합니다.
+    """
+    signals = []
+    for i, row in enumerate(frame[['date', 'close']].itertuples(index=False)):
+        date, close = str(row.date), int(row.close)
+        if i % every == 0:
+            if (i // every) % 2 == 0:
+                signals.append(TradingSignal.create_buy_signal(ticker, date, close, position_size=0.3))
+            else:
+                signals.append(TradingSignal.create_sell_signal(ticker, date, close, position_size=1.0))
+        else:
+            signals.append(TradingSignal.create_hold_signal(ticker, date, close))
+    return signals
+
+
+##############################################################################################
+# 데이터 로드
+##############################################################################################
+@scenario("data.load_existing_data_from_db", "data")
+def bench_load_existing_data(ctx):
+    """db_manager.load_existing_data_from_db: 한 종목 전체 기간 조회"""
+    from module.common import db_manager
+
+    ticker, dates = ctx['ticker'], ctx['dates']
+
+    def run():
+        return db_manager.load_existing_data_from_db(ticker, dates[0], dates[-1])
+    return run, len(dates)
+
+@scenario("data.get_itempricechart_2", "data")
+def bench_get_itempricechart_2(ctx):
+    """stock_data_manager.get_itempricechart_2: DB에 모든 날짜가 있는 경우 (API 호출 없음)"""
+    stock_data_manager = _require("module.stock_data_manager")
+
+    ticker, dates = ctx['ticker'], ctx['dates']
+    # 앞뒤로 여유를 둬서, 범위 밖 거래일을 찾으러 외부 API를 호출하지 않도록 함
+    start_date, end_date = dates[5], dates[-5]
+
+    def run():
+        return stock_data_manager.get_itempricechart_2(ticker=ticker, start_date=start_date, end_date=end_date)
+    return run, len(dates) - 9
+
+
+@scenario("screener.screen", "screener")
+def bench_screener(ctx):
+    """screener.screen: 전 종목 최근 120봉 로드 + 지표 / 재무 조건 스캔"""
+    from module import screener
+
+    filters = ["bars >= 60", ("close", ">", "sma_20"), "rsi_14 < 70", "market_cap > 0"]
+
+    def run():
+        return screener.screen(filters=filters, sort_by="return_20", limit=20, bars=120)
+    return run, len(ctx['market']['tickers'])
+
+
+##############################################################################################
+# 웹소켓 메시지 파싱
+##############################################################################################
+WS_MESSAGES = 200
+
+def _ws_messages(ctx):
+    """H0STASP0(국내주식 호가) 형식의 합성 메시지 (1건 / 3건 레코드 섞어서)"""
+    stock_data_manager_ws = _require("module.stock_data_manager_ws")
+
+    _, columns = stock_data_manager_ws.asking_price_krx("1", ctx['ticker'])
+    text_columns = {"MKSC_SHRN_ISCD": ctx['ticker'], "BSOP_HOUR": "090001", "HOUR_CLS_CODE": "0",
+                    "ANTC_CNTG_VRSS_SIGN": "2", "STCK_DEAL_CLS_CODE": "0", "ANTC_CNTG_PRDY_CTRT": "1.25"}
+    close = ctx['frame']['close'].to_numpy()
+
+    messages = []
+    for i in range(WS_MESSAGES):
+        count = 3 if i % 4 == 0 else 1
+        records = []
+        for j in range(count):
+            price = int(close[(i + j) % len(close)])
+            records.append("^".join(text_columns.get(col, str(price + k)) for k, col in enumerate(columns)))
+        messages.append(f"0|H0STASP0|{count:03d}|{'^'.join(records)}")
+    return messages, {"H0STASP0": {"columns": columns, "encrypt": "N", "key": None, "iv": None}}
+
+@scenario("ws.parse.records", "ws")
+def bench_ws_parse_records(ctx):
+    """KISMessageParser.parse: 실시간 호가 메시지 -> 타입 변환된 레코드 튜플"""
+    from module.kis_ws_parser import KISMessageParser
+
+    messages, data_map = _ws_messages(ctx)
+    parser = KISMessageParser(data_map)
+
+    def run():
+        for raw in messages:
+            parser.parse(raw)
+    return run, len(messages)
+
+@scenario("ws.parse.dataframe", "ws")
+def bench_ws_parse_dataframe(ctx):
+    """KISMessageParser.parse_dataframe: 실시간 호가 메시지 -> DataFrame (opt-in 경로)"""
+    from module.kis_ws_parser import KISMessageParser
+
+    messages, data_map = _ws_messages(ctx)
+    parser = KISMessageParser(data_map)
+
+    def run():
+        for raw in messages:
+            parser.parse_dataframe(raw)
+    return run, len(messages)
+
+@scenario("ws.parse.upbit", "ws")
+def bench_ws_parse_upbit(ctx):
+    """UpbitMessageParser.parse: 업비트 체결 / 호가 메시지(JSON 바이너리) -> 레코드 튜플"""
+    import json
+    import numpy as np
+    from benchmark.upbit_stand_in import UpbitStandIn
+    from module.upbit_ws import UpbitMessageParser
+
+    stand_in = UpbitStandIn()
+    rng = np.random.default_rng(42)
+    close = ctx['frame']['close'].to_numpy()
+    base = 1_700_000_000_000
+
+    messages = []
+    for i in range(WS_MESSAGES):
+        price = float(close[i % len(close)])
+        if i % 2:
+            message = stand_in.orderbook("KRW-BTC", price, base + i * 100, rng)
+        else:
+            message = stand_in.trade("KRW-BTC", price, 0.01, base + i * 100, i)
+        messages.append(json.dumps(message).encode("utf-8"))
+    parser = UpbitMessageParser()
+
+    def run():
+        for raw in messages:
+            parser.parse(raw)
+    return run, len(messages)
+
+
+##############################################################################################
+# 지표 계산 / 전략
+##############################################################################################
+def _register_strategy_scenarios(strategy_name):
+    @scenario(f"indicator.{strategy_name}.set_data", "indicator")
+    def bench_set_data(ctx):
+        strategy_class = load_strategies()[strategy_name]
+        ticker, frame = ctx['ticker'], ctx['frame']
+
+        def run():
+            strategy_class().set_data(ticker, frame.copy())
+        return run, len(frame)
+    bench_set_data.__doc__ = f"{strategy_name}.set_data: 지표 계산"
+    SCENARIOS[f"indicator.{strategy_name}.set_data"]['doc'] = bench_set_data.__doc__
+
+    @scenario(f"strategy.{strategy_name}.run", "strategy")
+    def bench_run(ctx):
+        strategy = load_strategies()[strategy_name]()
+        strategy.set_data(ctx['ticker'], ctx['frame'].copy())
+        dates = ctx['dates']
+
+        def run():
+            strategy.reset_state()
+            for date in dates:
+                strategy.run(target_time=date)
+        return run, len(dates)
+    bench_run.__doc__ = f"{strategy_name}.run: 전체 기간 신호 생성 (지표 계산 제외)"
+    SCENARIOS[f"strategy.{strategy_name}.run"]['doc'] = bench_run.__doc__
+
+    @scenario(f"strategy.{strategy_name}.run_batch", "strategy")
+    def bench_run_batch(ctx):
+        strategy = load_strategies()[strategy_name]()
+        strategy.set_data(ctx['ticker'], ctx['frame'].copy())
+        dates = ctx['dates']
+
+        def run():
+            strategy.reset_state()
+            strategy.run_batch(dates)
+        return run, len(dates)
+    bench_run_batch.__doc__ = f"{strategy_name}.run_batch: 전체 기간 신호를 한 번에 생성 (지표 계산 제외)"
+    SCENARIOS[f"strategy.{strategy_name}.run_batch"]['doc'] = bench_run_batch.__doc__
+
+for _strategy_name in ("MA", "MACD", "SqueezeMomentum", "RSI", "PineStyle"):
+    _register_strategy_scenarios(_strategy_name)
+
+
+##############################################################################################
+# 주문 / 백테스트 루프
+##############################################################################################
+@scenario("orderer.BackTest_Orderer.place_order", "orderer")
+def bench_backtest_orderer(ctx):
+    """BackTest_Orderer.place_order: dict 상태 기반 주문 처리"""
+    from module import stock_orderer
+
+    signals = make_signals(ctx['ticker'], ctx['frame'])
+
+    def run():
+        orderer = stock_orderer.BackTest_Orderer()
+        for signal in signals:
+            orderer.place_order(order_info=signal)
+    return run, len(signals)
+
+@scenario("orderer.Columnar_BackTest_Orderer.place_order", "orderer")
+def bench_columnar_orderer(ctx):
+    """Columnar_BackTest_Orderer.place_order: 컬럼 리스트 기반 주문 처리"""
+    from module import stock_orderer
+
+    signals = make_signals(ctx['ticker'], ctx['frame'])
+
+    def run():
+        orderer = stock_orderer.Columnar_BackTest_Orderer()
+        for signal in signals:
+            orderer.place_order(order_info=signal)
+    return run, len(signals)
+
+@scenario("orderer.Columnar_BackTest_Orderer.place_orders", "orderer")
+def bench_columnar_orderer_batch(ctx):
+    """Columnar_BackTest_Orderer.place_orders: SignalFrame 배치 주문 처리"""
+    from module import stock_orderer
+    from strategy.strategy import SignalFrame
+
+    signal_frame = SignalFrame.from_signals(make_signals(ctx['ticker'], ctx['frame']))
+
+    def run():
+        orderer = stock_orderer.Columnar_BackTest_Orderer()
+        orderer.place_orders(signal_frame)
+    return run, len(signal_frame)
+
+@scenario("backtest.MACD.loop", "backtest")
+def bench_backtest_loop(ctx):
+    """전략 run + 주문 처리를 합친 백테스트 루프 (MACD, 지표 계산 제외)"""
+    from module import stock_orderer
+
+    strategy = load_strategies()["MACD"]()
+    strategy.set_data(ctx['ticker'], ctx['frame'].copy())
+    dates = ctx['dates']
+
+    def run():
+        strategy.reset_state()
+        orderer = stock_orderer.Columnar_BackTest_Orderer()
+        for date in dates:
+            orderer.place_order(order_info=strategy.run(target_time=date))
+    return run, len(dates)
+
+
+##############################################################################################
+# 웹훅
+##############################################################################################
+WEBHOOK_BATCH = 50
+
+def _webhook_payload(action):
+    return {
+        "strategy": {"name": "bench", "settings": {"source": "[B]", "parameters": "20, 20, 1.5, 14, 5, 2"}},
+        "instrument": {"ticker": "BTC"},
+        "order": {"action": action, "quantity": "1"},
+        "position": {"new_size": "0"},
+    }
+
+@scenario("webhook.ta_signal_test", "webhook")
+def bench_webhook_test(ctx):
+    """POST /ta-signal-test: JSON 파싱 + 파일 로그 (Flask test client)"""
+    server = _require("core.server")
+    client = server.app.test_client()
+    payload = _webhook_payload("buy")
+
+    def run():
+        for _ in range(WEBHOOK_BATCH):
+            client.post("/ta-signal-test", json=payload)
+    return run, WEBHOOK_BATCH
+
+@scenario("webhook.ta_signal_hold", "webhook")
+def bench_webhook_hold(ctx):
+    """POST /ta-signal (action=hold): 주문 없이 요청 처리 경로만 측정 (네트워크 호출 없음)"""
+    server = _require("core.server")
+    client = server.app.test_client()
+    payload = _webhook_payload("hold")
+
+    def run():
+        for _ in range(WEBHOOK_BATCH):
+            client.post("/ta-signal", json=payload)
+    return run, WEBHOOK_BATCH
+
+
+##############################################################################################
+# quantylab
+##############################################################################################
+@scenario("quantylab.agent_step", "quantylab")
+def bench_quantylab_agent(ctx):
+    """quantylab Environment + Agent: 탐험(exploration) 행동으로 한 에피소드 진행 (신경망 제외)"""
+    np = _require("numpy")
+    pd = _require("pandas")
+    environment = _require("quantylab.environment")
+    agent_module = _require("quantylab.agent")
+
+    # Environment는 위치(PRICE_IDX)로 종가를 읽으므로 컬럼 이름 없이 값만 넘김
+    chart_data = pd.DataFrame(ctx['frame'][['date', 'open', 'high', 'low', 'close', 'volume']].to_numpy())
+    env = environment.Environment(chart_data)
+    agent = agent_module.Agent(env, 10_000_000, 100_000, 1_000_000)
+
+    def run():
+        np.random.seed(0)   # 탐험 행동을 실행마다 같게
+        env.reset()
+        agent.set_balance(10_000_000)
+        agent.reset()
+        while env.observe() is not None:
+            action, confidence, _ = agent.decide_action(None, None, 1.0)
+            agent.act(action, confidence)
+    return run, len(chart_data)
+
+class _NoVisualizer:
+    """학습 시나리오에서 가시화(matplotlib)를 측정에서 빼기 위한 빈 가시화 모듈"""
+    def clear(self, xlim):
+        pass
+
+@scenario("quantylab.train_epoch", "quantylab")
+def bench_quantylab_train_epoch(ctx):
+    """quantylab DQNLearner 한 에포크: 샘플 생성 + 가치 신경망 예측 + 행동 + 에포크 끝 학습(fit) (가시화 제외)"""
+    np = _require("numpy")
+    pd = _require("pandas")
+    learners = _require("quantylab.learners")      # tensorflow / keras 필요
+    data_manager = _require("quantylab.data_manager")
+
+    frame = ctx['frame'][data_manager.COLUMNS_CHART_DATA].reset_index(drop=True)
+    training_data = data_manager.preprocess(frame.astype('float64'))[data_manager.COLUMNS_TRAINING_DATA_V1]
+    training_data = training_data.replace([np.inf, -np.inf], 0).fillna(0)
+    chart_data = pd.DataFrame(frame.to_numpy())
+
+    learner = learners.DQNLearner(
+        rl_method='dqn', stock_code=ctx['ticker'], chart_data=chart_data, training_data=training_data,
+        min_trading_price=100_000, max_trading_price=1_000_000, net='dnn', num_steps=1,
+        num_epoches=1, balance=10_000_000, start_epsilon=0.5, reuse_models=False,
+    )
+    learner.visualizer = _NoVisualizer()
+
+    def run():
+        # ReinforcementLearner.run()의 에포크 한 번 (진행 표시 / 로그 / 그림 저장 제외)
+        np.random.seed(0)
+        learner.reset()
+        while learner.build_sample() is not None:
+            sample = [learner.sample]
+            pred_value = learner.value_network.predict(sample)
+            action, confidence, exploration = learner.agent.decide_action(pred_value, None, learner.start_epsilon)
+            reward = learner.agent.act(action, confidence)
+            learner.memory_sample.append(sample)
+            learner.memory_action.append(action)
+            learner.memory_reward.append(reward)
+            learner.memory_value.append(pred_value)
+        learner.fit()
+    return run, len(training_data)
@@ -0,0 +1,226 @@
+"""
+    합성(synthetic) 시장 데이터 생성기
+
+    - 같은 (seed, ticker, 기간, regime 설정)이면 항상 같은 데이터가 만들어집니다. (벤치마크 재현성)
+    - 가격은 기하 브라운 운동(GBM)으로 만들고, 일정 구간마다 변동성 regime을 바꿉니다.
+    - 생성한 데이터는 db_manager의 저장 함수로 임시 SQLite DB에 넣어,
+      get_itempricechart_2 등 실제 로드 경로를 API 호출 없이 그대로 실행할 수 있게 합니다.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from module.common import db_manager
+
+TRADING_DAYS_PER_YEAR = 252
+
+# regime 이름 -> (연간 기대수익률, 연간 변동성)
+REGIMES = {
+    "calm":     (0.08, 0.12),
+    "normal":   (0.05, 0.25),
+    "volatile": (0.00, 0.45),
+    "crash":    (-0.60, 0.70),
+}
+
+DEFAULT_REGIMES = ("calm", "normal", "volatile", "normal")
+API_NAME = "itemchartprice_history"
+
+
+##############################################################################################
+# 날짜 / 종목
+##############################################################################################
+def make_tickers(n_tickers, prefix="9"):
+    """실제 종목과 겹치지 않는 6자리 숫자 티커 리스트 (국가 코드는 KR로 판별됨)"""
+    return [f"{prefix}{i:05d}" for i in range(n_tickers)]
+
+def make_trading_days(start_year, years):
+    """start_year부터 years년 동안의 평일(월~금) 리스트 (datetime)"""
+    start = datetime(start_year, 1, 1)
+    end = datetime(start_year + years - 1, 12, 31)
+    return [d.to_pydatetime() for d in pd.bdate_range(start, end)]
+
+def _ticker_seed(seed, ticker):
+    # 종목마다 다른 난수열을 쓰되, 실행할 때마다 같아야 하므로 hash() 대신 crc32 사용
+    return (seed + zlib.crc32(ticker.encode("utf-8"))) % (2 ** 32)
+
+
+##############################################################################################
+# 가격 데이터 생성
+##############################################################################################
+def generate_ohlcv(ticker, trading_days, seed=42, regimes=DEFAULT_REGIMES,
+                   regime_length=60, start_price=None):
+    """
+    한 종목의 일봉 OHLCV 데이터를 생성합니다.
+
+    Args:
+        ticker (str): 종목 코드
+        trading_days (list[datetime]): 거래일 리스트
+        seed (int): 기본 seed (종목 코드와 섞여서 종목마다 다른 경로가 만들어짐)
+        regimes (list[str]): 순환할 regime 이름 리스트 (REGIMES 참고)
+        regime_length (int): regime 하나가 유지되는 평균 거래일 수
+        start_price (int): 시작 가격 (None이면 seed로 결정)
+
+    Returns:
+        pd.DataFrame: date(YYYYMMDD), open, high, low, close, volume, amount
+    """
+    for name in regimes:
+        if name not in REGIMES:
+            raise ValueError(f"Unknown regime: {name}")
+
+    rng = np.random.default_rng(_ticker_seed(seed, ticker))
+    n = len(trading_days)
+    dt = 1.0 / TRADING_DAYS_PER_YEAR
+
+    # 구간별 regime 배정 (구간 길이는 regime_length 근처에서 흔들림)
+    mu = np.empty(n)
+    sigma = np.empty(n)
+    pos = 0
+    regime_idx = int(rng.integers(len(regimes)))
+    while pos < n:
+        length = max(5, int(rng.normal(regime_length, regime_length * 0.25)))
+        drift, vol = REGIMES[regimes[regime_idx % len(regimes)]]
+        mu[pos:pos + length] = drift
+        sigma[pos:pos + length] = vol
+        pos += length
+        regime_idx += 1
+
+    # 종가: GBM
+    z = rng.standard_normal(n)
+    log_returns = (mu - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * z
+    if start_price is None:
+        start_price = int(rng.integers(5, 200)) * 1000
+    close = start_price * np.exp(np.cumsum(log_returns))
+
+    # 시가: 전일 종가에서 갭, 고가/저가: 시가와 종가 바깥으로 일중 변동폭만큼
+    daily_sigma = sigma * np.sqrt(dt)
+    prev_close = np.concatenate(([start_price], close[:-1]))
+    open_ = prev_close * np.exp(rng.normal(0.0, 0.3, n) * daily_sigma)
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0.0, 0.5, n)) * daily_sigma)
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0.0, 0.5, n)) * daily_sigma)
+
+    # 거래량: 가격 변동이 클수록 많아짐
+    base_volume = rng.integers(50_000, 2_000_000)
+    volume = (base_volume * rng.lognormal(0.0, 0.4, n) * (1 + 20 * np.abs(log_returns))).astype(np.int64)
+
+    close = np.round(close).astype(np.int64)
+    dataFrame = pd.DataFrame({
+        'date': [d.strftime("%Y%m%d") for d in trading_days],
+        'open': np.round(open_).astype(np.int64),
+        'high': np.round(high).astype(np.int64),
+        'low': np.round(low).astype(np.int64),
+        'close': close,
+        'volume': volume,
+    })
+    dataFrame['amount'] = dataFrame['close'] * dataFrame['volume']
+    return dataFrame
+
+def generate_market(tickers=None, n_tickers=5, start_year=2022, years=3, seed=42,
+                    regimes=DEFAULT_REGIMES, regime_length=60):
+    """
+    여러 종목의 합성 데이터를 생성합니다.
+
+    Returns:
+        dict: {'tickers': [...], 'trading_days': [...], 'prices': {ticker: DataFrame}}
+    """
+    tickers = tickers or make_tickers(n_tickers)
+    trading_days = make_trading_days(start_year, years)
+
+    prices = {
+        ticker: generate_ohlcv(ticker, trading_days, seed=seed, regimes=regimes, regime_length=regime_length)
+        for ticker in tickers
+    }
+    return {'tickers': tickers, 'trading_days': trading_days, 'prices': prices}
+
+def generate_ticker_info(market, seed=42):
+    """ticker_info 테이블 형식의 합성 종목 정보 (마지막 거래일 기준)"""
+    rng = np.random.default_rng(seed)
+    last_day = market['trading_days'][-1].strftime("%Y%m%d")
+
+    rows = []
+    for i, ticker in enumerate(market['tickers']):
+        close_price = float(market['prices'][ticker]['close'].iloc[-1])
+        shares = int(rng.integers(1_000_000, 500_000_000))
+        eps = float(close_price / rng.uniform(5, 40))
+        bps = float(close_price / rng.uniform(0.3, 3.0))
+        dps = float(eps * rng.uniform(0.0, 0.5))
+        rows.append({
+            'ticker': ticker,
+            'name': f"합성종목{i:03d}",
+            'market': "KOSPI" if i % 2 == 0 else "KOSDAQ",
+            'market_cap': close_price * shares,
+            'shares': shares,
+            'close_price': close_price,
+            'bps': bps,
+            'per': close_price / eps,
+            'pbr': close_price / bps,
+            'eps': eps,
+            'dividend_yield': dps / close_price * 100,
+            'dps': dps,
+            'sector': "synthetic",
+            'trading_date': last_day,
+        })
+    return pd.DataFrame(rows)
+
+
+##############################################################################################
+# 임시 DB
+##############################################################################################
+def populate_database(market, country_code="KR"):
+    """
+    현재 db_manager.DB_PATH에 합성 데이터를 저장합니다.
+    - trading_days : 연도별 거래일
+    - stock_price_data : 종목별 일봉 (get_itempricechart_2가 읽는 api_name으로 저장)
+    - ticker_info : 종목 정보
+    """
+    db_manager._init_database()
+
+    by_year = {}
+    for day in market['trading_days']:
+        by_year.setdefault(str(day.year), []).append(day)
+    for year, days in by_year.items():
+        db_manager.save_trading_days_to_db(days, year, country_code)
+
+    for ticker, dataFrame in market['prices'].items():
+        db_manager.save_data_to_db(dataFrame, ticker, country_code, 'D', API_NAME)
+
+    db_manager.save_ticker_info_to_db(generate_ticker_info(market))
+
+def _clear_trading_day_cache():
+    # stock_data_manager는 pykrx/yfinance가 필요하므로, 이미 로드된 경우에만 캐시를 비움
+    stock_data_manager = sys.modules.get("module.stock_data_manager")
+    if stock_data_manager is not None:
+        stock_data_manager._TRADING_DAY_CACHE.clear()
+
+@contextmanager
+def temporary_database(market=None, **market_kwargs):
+    """
+    합성 데이터가 들어있는 임시 SQLite DB를 만들고, 블록 안에서는 db_manager가 이 DB를 사용하도록 합니다.
+    블록이 끝나면 원래 DB 경로로 되돌리고 임시 파일을 삭제합니다.
+
+    with temporary_database(n_tickers=3, years=2) as market:
+        df = stock_data_manager.get_itempricechart_2(ticker=market['tickers'][0], ...)
+    """
+    if market is None:
+        market = generate_market(**market_kwargs)
+
+    temp_dir = tempfile.mkdtemp(prefix="autotrader_bench_")
+    original_db_path = db_manager.DB_PATH
+    db_manager.DB_PATH = os.path.join(temp_dir, "stock_data.db")
+    _clear_trading_day_cache()
+
+    try:
+        populate_database(market)
+        market = dict(market, db_path=db_manager.DB_PATH)
+        yield market
+    finally:
+        db_manager.DB_PATH = original_db_path
+        _clear_trading_day_cache()
+        shutil.rmtree(temp_dir, ignore_errors=True)
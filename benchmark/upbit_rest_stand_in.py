@@ -0,0 +1,272 @@
+"""
+    업비트 REST API 대용 로컬 서버 (웹훅 서버 부하 테스트)
+
+    python -m benchmark.upbit_rest_stand_in [--port 8766] [--latency-ms 30] [--markets 50]
+
+    - GET  /v1/market/all : KRW 마켓 목록 (KRW-BTC, KRW-ETH, KRW-XRP + 합성 마켓)
+    - GET  /v1/accounts   : 잔고 (주문하면 바로 체결된 것으로 반영, avg_buy_price는 실제 매수 금액 기준)
+    - GET  /v1/ticker     : 현재가 (markets=KRW-BTC,KRW-ETH)
+    - POST /v1/orders     : 시장가 주문 (201, 응답 형식은 업비트와 같은 필드만, identifier를 주면 기억)
+    - GET  /v1/order      : identifier로 주문 조회 (없으면 404)
+    - GET  /stats         : 받은 요청 수 / 429 수 / 같은 마켓 주문이 겹친 수(overlaps)
+    응답마다 Remaining-Req 헤더를 주고, 그룹별 초당 한도(upbit_client.REQUEST_LIMITS)를 넘으면 429
+    주문은 latency_ms 동안 처리 중으로 두므로, 같은 마켓 주문이 동시에 들어오면 overlaps가 올라감
+
+    웹훅 서버는 UPBIT_API_URL=http://127.0.0.1:<port> 로 연결합니다 (benchmark.webhook_load --spawn 참고).
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from module.upbit_client import REQUEST_LIMITS, request_group
+
+from benchmark.upbit_stand_in import BASE_PRICES
+
+
+class UpbitRestStandIn:
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=30, markets=50, krw=100_000_000.0, limits=None):
+        """
+        :param port: 0이면 빈 포트 자동 선택 (url 속성으로 확인)
+        :param latency_ms: 요청마다 응답 전 대기 시간 (업비트 왕복 시간 흉내)
+        :param markets: 마켓 수 (BASE_PRICES + 합성 마켓)
+        :param krw: 시작 원화 잔고
+        :param limits: 그룹별 초당 요청 수 (기본 REQUEST_LIMITS, None이 아닌 빈 dict면 제한 없음)
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency_ms / 1000
+        self.limits = REQUEST_LIMITS if limits is None else limits
+
+        self.prices = dict(BASE_PRICES)
+        for i in range(max(markets - len(self.prices), 0)):
+            self.prices[f"KRW-C{i:03d}"] = 1000.0 + i
+        self.assets = {"KRW": krw}
+        self.costs = {}                     # 화폐 -> 보유 수량의 매수 금액 (avg_buy_price = costs / assets)
+
+        self._sent = defaultdict(deque)     # 그룹 -> 최근 1초 요청 시각
+        self._in_flight = set()             # 처리 중인 주문 마켓
+        self._identifiers = {}              # identifier -> 주문
+        self._lock = threading.Lock()
+        self.server = None
+
+        self.requests = defaultdict(int)
+        self.orders = 0
+        self.overlaps = 0
+        self.rate_limited = 0
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    ##########################################################################################
+    # 요청 처리
+    ##########################################################################################
+    def _admit(self, group):
+        """
+        Returns:
+            tuple: (허용 여부, 이번 초 남은 요청 수)
+        """
+        limit = self.limits.get(group, self.limits.get("default"))
+        if limit is None:
+            return True, 999
+        now = time.monotonic()
+        with self._lock:
+            sent = self._sent[group]
+            while sent and sent[0] <= now - 1.0:
+                sent.popleft()
+            if len(sent) >= limit:
+                self.rate_limited += 1
+                return False, 0
+            sent.append(now)
+            return True, limit - len(sent)
+
+    def handle(self, method, path, query, body):
+        """
+        Returns:
+            tuple: (상태 코드, 응답 JSON)
+        """
+        if path == "/stats":
+            return 200, self.stats()
+        if path == "/v1/market/all":
+            return 200, [
+                {"market": market, "korean_name": market[4:], "english_name": market[4:]} for market in self.prices
+            ]
+        if path == "/v1/ticker":
+            codes = query.get("markets", [""])[0].split(",")
+            if any(code not in self.prices for code in codes):
+                return 404, {"error": {"name": "404", "message": "Code not found"}}
+            return 200, [{"market": code, "trade_price": self.prices[code]} for code in codes]
+        if path == "/v1/accounts":
+            with self._lock:
+                return 200, [
+                    {"currency": currency, "balance": str(balance), "locked": "0",
+                     "avg_buy_price": str(self.costs.get(currency, 0.0) / balance if balance else 0.0),
+                     "unit_currency": "KRW"} for currency, balance in self.assets.items()
+                ]
+        if path == "/v1/orders" and method == "POST":
+            return self._order(body)
+        if path == "/v1/order":
+            with self._lock:
+                order = self._identifiers.get(query.get("identifier", [""])[0])
+            if order is None:
+                return 404, {"error": {"name": "order_not_found", "message": "주문을 찾지 못함"}}
+            return 200, order
+        return 404, {"error": {"name": "not_found", "message": path}}
+
+    def _order(self, params):
+        market, side = params.get("market"), params.get("side")
+        if market not in self.prices:
+            return 400, {"error": {"name": "invalid_market", "message": market}}
+
+        with self._lock:
+            self.orders += 1
+            if market in self._in_flight:
+                self.overlaps += 1
+            self._in_flight.add(market)
+        try:
+            time.sleep(self.latency)
+            price, currency = self.prices[market], market[4:]
+            with self._lock:
+                if side == "bid":
+                    funds = float(params.get("price") or 0)
+                    if funds > self.assets["KRW"]:
+                        return 400, {"error": {"name": "insufficient_funds_bid", "message": "잔고 부족"}}
+                    self.assets["KRW"] -= funds
+                    self.assets[currency] = self.assets.get(currency, 0.0) + funds / price
+                    self.costs[currency] = self.costs.get(currency, 0.0) + funds
+                    order = {"price": str(funds), "locked": str(funds), "volume": None}
+                else:
+                    volume = float(params.get("volume") or 0)
+                    if volume > self.assets.get(currency, 0.0) + 1e-12:
+                        return 400, {"error": {"name": "insufficient_funds_ask", "message": "잔고 부족"}}
+                    held = self.assets.get(currency, 0.0)
+                    if held > 0:
+                        self.costs[currency] = self.costs.get(currency, 0.0) * max(held - volume, 0.0) / held
+                    self.assets[currency] = held - volume
+                    self.assets["KRW"] += volume * price
+                    order = {"price": None, "locked": str(volume), "volume": str(volume)}
+            order = {
+                "uuid": uuid.uuid4().hex, "side": side, "ord_type": params.get("ord_type"),
+                "market": market, "state": "wait", "reserved_fee": "0", "created_at": time.strftime("%Y-%m-%dT%H:%M:%S+09:00"),
+                **order,
+            }
+            if params.get("identifier"):
+                with self._lock:
+                    self._identifiers[params["identifier"]] = {**order, "identifier": params["identifier"]}
+            return 201, order
+        finally:
+            with self._lock:
+                self._in_flight.discard(market)
+
+    def set_price(self, market, price):
+        """현재가 바꾸기 (이미 산 코인의 avg_buy_price는 그대로)"""
+        with self._lock:
+            self.prices[market] = float(price)
+
+    def set_holding(self, currency, balance, avg_buy_price):
+        """보유 코인 직접 넣기 (평균 매수가와 현재가가 다른 상황 테스트)"""
+        with self._lock:
+            self.assets[currency] = float(balance)
+            self.costs[currency] = float(balance) * float(avg_buy_price)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests": dict(self.requests),
+                "orders": self.orders,
+                "overlaps": self.overlaps,
+                "rate_limited": self.rate_limited,
+                "assets": dict(self.assets),
+            }
+
+    ##########################################################################################
+    # HTTP 서버
+    ##########################################################################################
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _serve(self, method):
+                parsed = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+                group = request_group(method, parsed.path)
+                if parsed.path != "/stats":
+                    with stand_in._lock:
+                        stand_in.requests[parsed.path] += 1
+                    allowed, remaining = stand_in._admit(group)
+                    if not allowed:
+                        self._reply(429, {"error": {"name": "too_many_requests"}}, group, remaining)
+                        return
+                    if parsed.path != "/v1/orders":
+                        time.sleep(stand_in.latency)
+                else:
+                    remaining = None
+                status, payload = stand_in.handle(method, parsed.path, parse_qs(parsed.query), body)
+                self._reply(status, payload, group, remaining)
+
+            def _reply(self, status, payload, group, remaining):
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                if remaining is not None:
+                    self.send_header("Remaining-Req", f"group={group}; min=1800; sec={remaining}")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """백그라운드 스레드에서 서버 시작"""
+        self.server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, name="upbit-rest-stand-in", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="업비트 REST API 대용 로컬 서버")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=30, help="요청마다 응답 전 대기 시간 (ms)")
+    parser.add_argument("--markets", type=int, default=50, help="마켓 수")
+    parser.add_argument("--no-limits", action="store_true", help="요청 수 제한(429) 끄기")
+    args = parser.parse_args()
+
+    stand_in = UpbitRestStandIn(port=args.port, latency_ms=args.latency_ms, markets=args.markets,
+                                limits={} if args.no_limits else None).start()
+    print(f"업비트 REST 대용 서버: {stand_in.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stand_in.stop()
+
+
+if __name__ == "__main__":
+    main()
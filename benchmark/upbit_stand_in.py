@@ -0,0 +1,179 @@
+"""
+    업비트 웹소켓 대용 로컬 서버 (테스트 / 벤치마크)
+
+    python -m benchmark.upbit_stand_in [--port 8765] [--rate 200] [--time-step-ms 500]
+
+    - 업비트 형식 구독 메시지를 받으면 구독한 타입 x 마켓의 합성 시세를 DEFAULT 포맷 JSON 바이너리 프레임으로 보냄
+    - 새 구독 메시지는 이전 구독을 대체 (업비트와 같음)
+    - 가격은 마켓별 랜덤워크 (seed가 같으면 같은 값)
+    - time_step_ms를 주면 메시지마다 시각을 그만큼 진행 (실제 시간을 기다리지 않고 분봉을 완성시킬 때)
+    - drop_after를 주면 연결마다 그만큼 보낸 뒤 연결을 끊음 (재접속 테스트)
+
+    module.upbit_ws.UpbitWebSocket(url=stand_in.url)로 연결합니다.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+import websockets
+
+BASE_PRICES = {"KRW-BTC": 90_000_000.0, "KRW-ETH": 4_000_000.0, "KRW-XRP": 800.0}
+
+
+class UpbitStandIn:
+    def __init__(self, host="127.0.0.1", port=0, rate=200, seed=42, time_step_ms=None, start_time_ms=None,
+                 drop_after=None, levels=15):
+        """
+        :param port: 0이면 빈 포트 자동 선택 (url 속성으로 확인)
+        :param rate: 연결당 초당 메시지 수 (0이면 쉬지 않고 보냄)
+        :param time_step_ms: 메시지마다 진행할 시각 (None이면 실제 시각)
+        :param start_time_ms: time_step_ms를 쓸 때 시작 시각 (기본 현재)
+        :param drop_after: 연결마다 이만큼 보낸 뒤 연결을 끊음
+        """
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.seed = seed
+        self.time_step_ms = time_step_ms
+        self.start_time_ms = start_time_ms
+        self.drop_after = drop_after
+        self.levels = levels
+
+        self.server = None
+        self.connections = 0
+        self.sent = 0
+        self.subscribe_messages = []        # 받은 구독 메시지 (테스트 확인용)
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    ##########################################################################################
+    # 합성 시세
+    ##########################################################################################
+    def trade(self, code, price, volume, timestamp, seq):
+        return {
+            "type": "trade", "code": code, "timestamp": timestamp,
+            "trade_date": time.strftime("%Y-%m-%d", time.gmtime(timestamp / 1000)),
+            "trade_time": time.strftime("%H:%M:%S", time.gmtime(timestamp / 1000)),
+            "trade_timestamp": timestamp, "trade_price": price, "trade_volume": volume,
+            "ask_bid": "BID" if seq % 2 else "ASK", "prev_closing_price": BASE_PRICES.get(code, 10_000.0),
+            "change": "RISE", "change_price": 0.0, "sequential_id": seq, "stream_type": "REALTIME",
+        }
+
+    def orderbook(self, code, price, timestamp, rng):
+        tick = max(price * 0.0005, 1.0)
+        units = [{
+            "ask_price": round(price + tick * (i + 1), 2), "bid_price": round(price - tick * (i + 1), 2),
+            "ask_size": float(rng.uniform(0.01, 2)), "bid_size": float(rng.uniform(0.01, 2)),
+        } for i in range(self.levels)]
+        return {
+            "type": "orderbook", "code": code, "timestamp": timestamp,
+            "total_ask_size": sum(u["ask_size"] for u in units), "total_bid_size": sum(u["bid_size"] for u in units),
+            "orderbook_units": units, "stream_type": "REALTIME",
+        }
+
+    def ticker(self, code, price, timestamp):
+        base = BASE_PRICES.get(code, 10_000.0)
+        return {
+            "type": "ticker", "code": code, "trade_timestamp": timestamp, "timestamp": timestamp,
+            "trade_price": price, "opening_price": base, "high_price": max(base, price), "low_price": min(base, price),
+            "prev_closing_price": base, "signed_change_rate": price / base - 1,
+            "acc_trade_volume": 0.0, "acc_trade_price": 0.0, "acc_trade_volume_24h": 0.0, "acc_trade_price_24h": 0.0,
+            "stream_type": "REALTIME",
+        }
+
+    ##########################################################################################
+    # 서버
+    ##########################################################################################
+    async def _stream(self, conn, subscription):
+        """subscription: [(타입, 마켓), ...] 을 돌아가며 전송"""
+        rng = np.random.default_rng(self.seed)
+        prices = {code: BASE_PRICES.get(code, 10_000.0) for _, code in subscription}
+        clock = self.start_time_ms or int(time.time() * 1000)
+        interval = 1 / self.rate if self.rate else 0
+        sent = 0
+
+        while True:
+            for msg_type, code in subscription:
+                if self.time_step_ms is None:
+                    timestamp = int(time.time() * 1000)
+                else:
+                    clock += self.time_step_ms
+                    timestamp = clock
+                prices[code] = round(prices[code] * float(np.exp(rng.normal(0, 0.001))), 2)
+
+                if msg_type == "trade":
+                    message = self.trade(code, prices[code], float(rng.uniform(0.001, 1)), timestamp, sent)
+                elif msg_type == "orderbook":
+                    message = self.orderbook(code, prices[code], timestamp, rng)
+                else:
+                    message = self.ticker(code, prices[code], timestamp)
+
+                await conn.send(json.dumps(message).encode("utf-8"))
+                sent += 1
+                self.sent += 1
+                if self.drop_after is not None and sent >= self.drop_after:
+                    await conn.close()
+                    return
+                await asyncio.sleep(interval)
+
+    async def _handler(self, conn):
+        self.connections += 1
+        stream = None
+        try:
+            async for raw in conn:
+                request = json.loads(raw)
+                self.subscribe_messages.append(request)
+                subscription = [(item["type"], code) for item in request if "type" in item for code in item["codes"]]
+                if stream is not None:
+                    stream.cancel()
+                if subscription:
+                    stream = asyncio.create_task(self._stream(conn, subscription))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            if stream is not None:
+                stream.cancel()
+
+    async def start(self):
+        self.server = await websockets.serve(self._handler, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+
+async def _serve(args):
+    async with UpbitStandIn(port=args.port, rate=args.rate, seed=args.seed, time_step_ms=args.time_step_ms) as stand_in:
+        print(f"업비트 웹소켓 대용 서버: {stand_in.url}")
+        await asyncio.Future()
+
+def main():
+    parser = argparse.ArgumentParser(description="업비트 웹소켓 대용 로컬 서버")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=200, help="연결당 초당 메시지 수 (0이면 최대 속도)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--time-step-ms", type=int, default=None, help="메시지마다 진행할 시각 (ms)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
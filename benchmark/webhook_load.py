@@ -0,0 +1,200 @@
+"""
+    웹훅 서버 부하 테스트
+
+    python -m benchmark.webhook_load --spawn [--workers 4] [--signals 400] [--concurrency 32] [--mode fast]
+    python -m benchmark.webhook_load --url http://127.0.0.1:5000 [--signals 400] [--concurrency 32]
+
+    - --spawn : 업비트 REST 대용 서버(upbit_rest_stand_in)를 띄우고, 임시 작업 디렉토리에서 웹훅 서버를
+                SERVER_WORKERS=--workers, UPBIT_API_URL=<대용 서버>로 실행한 뒤 부하를 보냄 (끝나면 모두 종료)
+    - --url   : 이미 떠 있는 웹훅 서버로 보냄 (업비트 대용 서버 통계는 --stand-in으로)
+    - 신호는 --markets 마켓에 매수 / 매도를 번갈아 보내고, --duplicates 비율만큼 같은 Idempotency-Key로 다시 보냄
+    - 결과: 상태 코드별 수, 응답 시간 p50 / p95 / p99, 초당 처리 수, 응답한 워커 수,
+            업비트 대용 서버 요청 수 / 429 / 같은 마켓 주문 겹침(overlaps, 0이어야 함)
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmark.upbit_rest_stand_in import UpbitRestStandIn
+
+
+def make_signal(ticker, action, key):
+    return {
+        "strategy": {"name": "load-test"},
+        "instrument": {"ticker": ticker},
+        "order": {"action": action, "quantity": "1"},
+        "position": {"new_size": "0"},
+        "idempotency_key": key,
+    }
+
+def make_signals(n, markets, duplicates, seed=42):
+    """[(payload, 중복 여부)], 마켓마다 매수 / 매도 번갈아"""
+    rng = random.Random(seed)
+    sides = {market: "sell" for market in markets}
+    signals = []
+    for i in range(n):
+        if signals and rng.random() < duplicates:
+            signals.append((signals[rng.randrange(len(signals))][0], True))
+            continue
+        market = rng.choice(markets)
+        sides[market] = "buy" if sides[market] == "sell" else "sell"
+        signals.append((make_signal(market, sides[market], f"load-{seed}-{i}"), False))
+    return signals
+
+
+##############################################################################################
+# 부하
+##############################################################################################
+def run_load(url, signals, concurrency):
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+
+    def send(item):
+        payload, _ = item
+        start = time.perf_counter()
+        try:
+            response = session.post(f"{url}/ta-signal", json=payload, timeout=60)
+            status = response.status_code
+        except requests.RequestException:
+            status = "error"
+        return status, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(send, signals))
+    elapsed = time.perf_counter() - start
+
+    times = np.array([t for _, t in results]) * 1000
+    return {
+        "signals": len(signals),
+        "duplicates_sent": sum(1 for _, duplicate in signals if duplicate),
+        "status": dict(Counter(str(status) for status, _ in results)),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(signals) / elapsed, 1),
+        "latency_ms": {
+            "p50": round(float(np.percentile(times, 50)), 1),
+            "p95": round(float(np.percentile(times, 95)), 1),
+            "p99": round(float(np.percentile(times, 99)), 1),
+            "max": round(float(times.max()), 1),
+        },
+    }
+
+def worker_pids(url, samples=50):
+    """/metrics를 여러 번 호출해서 응답한 워커 프로세스 수 확인"""
+    pids = set()
+    for _ in range(samples):
+        try:
+            pids.add(requests.get(f"{url}/metrics", timeout=5).json()["worker"]["pid"])
+        except (requests.RequestException, KeyError, ValueError):
+            pass
+    return sorted(pids)
+
+def wait_pending(stand_in_url, expected, timeout=60):
+    """빠른 응답 모드: 업비트 대용 서버가 받은 주문 수가 더 늘지 않을 때까지 대기"""
+    deadline = time.monotonic() + timeout
+    last, stable = -1, 0
+    while time.monotonic() < deadline:
+        orders = requests.get(f"{stand_in_url}/stats", timeout=5).json()["orders"]
+        stable = stable + 1 if orders == last else 0
+        if orders >= expected or stable >= 10:
+            return
+        last = orders
+        time.sleep(0.2)
+
+
+##############################################################################################
+# 서버 실행
+##############################################################################################
+def spawn_server(workdir, port, workers, stand_in_url, mode):
+    os.makedirs(os.path.join(workdir, "private"), exist_ok=True)
+    with open(os.path.join(workdir, "private", "keys.json"), "w") as f:
+        json.dump({"COIN": [{"APP_KEY": "load-test", "APP_SECRET": "load-test-secret-" + "0" * 32}]}, f)
+
+    env = dict(os.environ, UPBIT_API_URL=stand_in_url, SERVER_WORKERS=str(workers), WEBHOOK_MODE=mode,
+               PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    code = f"from core import server; server.run_server(host='127.0.0.1', port={port})"
+    process = subprocess.Popen([sys.executable, "-c", code], cwd=workdir, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"웹훅 서버 종료됨 (코드 {process.returncode}), 로그: {workdir}/logs")
+        try:
+            if requests.get(f"{url}/health", timeout=1).status_code == 200:
+                return process, url
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("웹훅 서버가 30초 안에 뜨지 않았습니다")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="웹훅 서버 부하 테스트")
+    parser.add_argument("--url", help="이미 떠 있는 웹훅 서버 주소")
+    parser.add_argument("--stand-in", help="--url을 쓸 때 업비트 REST 대용 서버 주소 (통계 출력용)")
+    parser.add_argument("--spawn", action="store_true", help="업비트 대용 서버와 웹훅 서버를 띄워서 테스트")
+    parser.add_argument("--workers", type=int, default=4, help="--spawn: 웹훅 서버 워커 프로세스 수")
+    parser.add_argument("--port", type=int, default=5055, help="--spawn: 웹훅 서버 포트")
+    parser.add_argument("--mode", choices=["sync", "fast"], default="sync", help="--spawn: WEBHOOK_MODE")
+    parser.add_argument("--latency-ms", type=float, default=30, help="--spawn: 업비트 대용 서버 응답 지연 (ms)")
+    parser.add_argument("--signals", type=int, default=400, help="보낼 신호 수")
+    parser.add_argument("--concurrency", type=int, default=32, help="동시에 보내는 요청 수")
+    parser.add_argument("--markets", default="BTC,ETH,XRP,C000,C001,C002,C003,C004", help="신호를 보낼 티커")
+    parser.add_argument("--duplicates", type=float, default=0.1, help="같은 Idempotency-Key로 다시 보낼 비율")
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    if not args.spawn and not args.url:
+        parser.error("--url 또는 --spawn이 필요합니다")
+
+    signals = make_signals(args.signals, args.markets.split(","), args.duplicates)
+    stand_in, process = None, None
+    with tempfile.TemporaryDirectory(prefix="webhook-load-") as workdir:
+        try:
+            if args.spawn:
+                stand_in = UpbitRestStandIn(latency_ms=args.latency_ms).start()
+                process, url = spawn_server(workdir, args.port, args.workers, stand_in.url, args.mode)
+                stand_in_url = stand_in.url
+            else:
+                url, stand_in_url = args.url.rstrip("/"), args.stand_in
+
+            result = run_load(url, signals, args.concurrency)
+            result["workers_seen"] = len(worker_pids(url))
+            if stand_in_url:
+                if args.mode == "fast":
+                    wait_pending(stand_in_url, sum(1 for _, duplicate in signals if not duplicate))
+                upbit = requests.get(f"{stand_in_url}/stats", timeout=5).json()
+                result["upbit"] = {k: upbit[k] for k in ("requests", "orders", "overlaps", "rate_limited")}
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=60)
+            if stand_in is not None:
+                stand_in.stop()
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
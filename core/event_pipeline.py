@@ -0,0 +1,317 @@
+"""
+    실시간 이벤트 파이프라인 (asyncio)
+
+    웹소켓 수신 루프에서 전략 / 주문까지 바로 실행하면 느린 처리가 수신을 막아서 연결이 끊깁니다.
+    수신 -> 시세 처리 -> 전략 -> 주문을 큐로 나누고, 수신 쪽은 절대 기다리지 않도록 합니다.
+
+        [웹소켓 수신] --on_result--> market 큐 --(on_market)--> strategy 큐 --(on_strategy)--> order 큐 --(on_order)-->
+            put_nowait (안 기다림)     워커 1개 (순서 유지)        워커 N개 (executor)           워커 1개 (스레드)
+
+    큐 정책 (가득 찼거나 같은 키가 이미 대기 중일 때)
+        coalesce    : 같은 키의 대기 중 이벤트를 최신 값으로 교체 (호가처럼 최신 값만 의미 있는 데이터)
+        drop_oldest : 가장 오래된 이벤트를 버리고 넣음 (기본)
+        drop_newest : 새 이벤트를 버림
+    order 큐는 주문을 버리면 안 되므로 가득 차면 전략 워커가 기다림 (수신 루프까지는 전파되지 않음)
+
+    콜백
+        on_market(event)   : 시세 이벤트 처리 (틱 저장 / 봉 집계 등, 가볍게). 전략 작업 (key, job) 리스트 반환
+        on_strategy(job)   : 전략 계산. 주문 리스트 반환. 스레드 풀 또는 strategy_executor(ProcessPoolExecutor 등)에서 실행
+                             -> 프로세스 풀을 쓰려면 on_strategy와 job이 pickle 가능해야 함 (모듈 최상위 함수)
+        on_order(order)    : 주문 실행 (REST 호출 등 블로킹이므로 스레드에서 실행)
+
+    stats()로 큐 깊이 / 최대 깊이 / 버림 / 병합 / 처리 수를 확인합니다.
+    대기 시간은 metrics span (pipeline.<큐>.wait)으로도 기록됩니다.
+
+    tracer(latency.Tracer)를 주면 시세 이벤트마다 수신(submit) 시각부터 trace를 만들어 단계(market / strategy / order_submit)를 기록하고,
+    주문 실행이 끝나면 finish 합니다. 주문까지 가지 않은 이벤트 / 병합으로 밀려난 이벤트는 기록하지 않습니다.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+from module.common import latency, metrics
+
+POLICIES = ("coalesce", "drop_oldest", "drop_newest")
+
+
+##############################################################################################
+# 큐
+##############################################################################################
+class EventQueue:
+    """
+    수신 루프용 비동기 큐 (put_nowait는 절대 기다리지 않음)
+    coalesce 이벤트는 키별로 최신 값 하나만 대기
+    """
+    def __init__(self, name, maxsize=10_000, policy="drop_oldest"):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}")
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = policy
+
+        self._items = deque()        # (key, event, 넣은 시각), coalesce 항목은 event 자리에 None
+        self._pending = {}           # coalesce key -> 최신 event
+        self._ready = asyncio.Event()
+
+        self.max_depth = 0
+        self.put_count = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.processed = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def put_nowait(self, event, key=None, policy=None):
+        """
+        Returns:
+            bool: 큐에 들어갔는지 (병합된 경우도 True)
+        """
+        policy = policy or self.policy
+        self.put_count += 1
+
+        if policy == "coalesce" and key is not None:
+            if key in self._pending:
+                self._pending[key] = event
+                self.coalesced += 1
+                return True
+
+        if len(self._items) >= self.maxsize:
+            if policy == "drop_newest":
+                self.dropped += 1
+                return False
+            old_key, old_event, _ = self._items.popleft()
+            if old_event is None:
+                self._pending.pop(old_key, None)
+            self.dropped += 1
+
+        if policy == "coalesce" and key is not None:
+            self._pending[key] = event
+            self._items.append((key, None, time.perf_counter()))
+        else:
+            self._items.append((key, event, time.perf_counter()))
+
+        self.max_depth = max(self.max_depth, len(self._items))
+        self._ready.set()
+        return True
+
+    async def get(self):
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+
+        key, event, put_time = self._items.popleft()
+        if event is None:
+            event = self._pending.pop(key)
+        metrics.record(f"pipeline.{self.name}.wait", time.perf_counter() - put_time)
+        self.processed += 1
+        return event
+
+    def stats(self):
+        return {
+            'depth': len(self._items),
+            'max_depth': self.max_depth,
+            'maxsize': self.maxsize,
+            'put': self.put_count,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+        }
+
+
+class OrderQueue:
+    """주문 큐: 버리지 않고, 가득 차면 put()이 기다림"""
+    def __init__(self, name="order", maxsize=1_000):
+        self.name = name
+        self._queue = asyncio.Queue(maxsize=maxsize)
+        self.max_depth = 0
+        self.processed = 0
+        self.blocked = 0
+
+    def __len__(self):
+        return self._queue.qsize()
+
+    async def put(self, order):
+        if self._queue.full():
+            self.blocked += 1
+        await self._queue.put((order, time.perf_counter()))
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    async def get(self):
+        order, put_time = await self._queue.get()
+        metrics.record(f"pipeline.{self.name}.wait", time.perf_counter() - put_time)
+        self.processed += 1
+        return order
+
+    def task_done(self):
+        self._queue.task_done()
+
+    def stats(self):
+        return {
+            'depth': self._queue.qsize(),
+            'max_depth': self.max_depth,
+            'maxsize': self._queue.maxsize,
+            'processed': self.processed,
+            'blocked': self.blocked,
+        }
+
+
+##############################################################################################
+# 파이프라인
+##############################################################################################
+class EventPipeline:
+    def __init__(self, on_market, on_strategy=None, on_order=None,
+                 market_queue_size=10_000, strategy_queue_size=1_000, order_queue_size=1_000,
+                 policies=None, default_policy="drop_oldest",
+                 strategy_workers=2, strategy_executor=None, order_executor=None, tracer=None):
+        """
+        :param policies: tr_id -> 큐 정책 (예: {"H0STASP0": "coalesce"}), 없으면 default_policy
+        :param strategy_workers: 전략 워커 수
+        :param strategy_executor: 전략 계산을 실행할 executor (None이면 기본 스레드 풀, CPU를 많이 쓰면 ProcessPoolExecutor)
+        :param order_executor: 주문 실행 executor (None이면 기본 스레드 풀)
+        :param tracer: 수신 -> 주문 지연 시간 추적 (latency.Tracer, None이면 추적하지 않음)
+        """
+        self.on_market = on_market
+        self.on_strategy = on_strategy
+        self.on_order = on_order
+        self.policies = policies or {}
+        self.strategy_workers = strategy_workers
+        self.strategy_executor = strategy_executor
+        self.order_executor = order_executor
+        self.tracer = tracer
+
+        self.market_queue = EventQueue("market", market_queue_size, default_policy)
+        # 전략 작업은 종목별로 최신 작업만 의미 있음 (밀리면 지난 봉 평가는 건너뜀)
+        self.strategy_queue = EventQueue("strategy", strategy_queue_size, "coalesce")
+        self.order_queue = OrderQueue("order", order_queue_size)
+
+        self.errors = 0
+        self._busy = 0              # 큐에서 꺼내서 처리 중인 이벤트 수
+        self._tasks = []
+
+    ##########################################################################################
+    # 입력 (웹소켓 수신 루프에서 호출, 기다리지 않음)
+    ##########################################################################################
+    def on_result(self, ws, tr_id, result, data_info):
+        """KISWebSocket on_result 콜백 형식"""
+        if not result:
+            return
+        self.submit(tr_id, result, data_info)
+
+    def submit(self, tr_id, records, data_info=None, key=None):
+        """
+        시세 이벤트 넣기
+        coalesce 정책이면 key(기본 tr_id + 첫 레코드의 종목코드)별 최신 이벤트만 남김
+        """
+        policy = self.policies.get(tr_id)
+        if policy == "coalesce" and key is None and records:
+            key = (tr_id, records[0][0])
+        trace = self.tracer.start(tr_id=tr_id) if self.tracer is not None else latency.NOOP_TRACE
+        return self.market_queue.put_nowait(((tr_id, records, data_info), trace), key=key, policy=policy)
+
+    def submit_job(self, key, job, trace=latency.NOOP_TRACE):
+        """전략 작업 바로 넣기 (시세 워커를 거치지 않고 만든 작업, 같은 이벤트 루프에서 호출)"""
+        return self.strategy_queue.put_nowait((job, trace), key=key)
+
+    ##########################################################################################
+    # 워커
+    ##########################################################################################
+    async def _market_worker(self):
+        while True:
+            event, trace = await self.market_queue.get()
+            self._busy += 1
+            try:
+                with metrics.span("pipeline.market.handle"), trace.stage("market"):
+                    jobs = list(self.on_market(event) or ())
+                if not jobs:
+                    trace.discard()
+                for i, (key, job) in enumerate(jobs):
+                    self.strategy_queue.put_nowait((job, trace if i == 0 else trace.fork()), key=key)
+            except Exception as e:
+                trace.discard()
+                self.errors += 1
+                print(f"[파이프라인] 시세 처리 실패: {e}")
+            finally:
+                self._busy -= 1
+
+    async def _strategy_worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job, trace = await self.strategy_queue.get()
+            self._busy += 1
+            try:
+                with metrics.span("pipeline.strategy.handle"), trace.stage("strategy"):
+                    orders = list(await loop.run_in_executor(self.strategy_executor, self.on_strategy, job) or ())
+                if not orders:
+                    trace.discard()
+                for i, order in enumerate(orders):
+                    await self.order_queue.put((order, trace if i == 0 else trace.fork()))
+            except Exception as e:
+                trace.discard()
+                self.errors += 1
+                print(f"[파이프라인] 전략 처리 실패: {e}")
+            finally:
+                self._busy -= 1
+
+    async def _order_worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            order, trace = await self.order_queue.get()
+            self._busy += 1
+            if getattr(order, "ticker", None) is not None:
+                trace.attrs["ticker"] = order.ticker
+            try:
+                with metrics.span("pipeline.order.handle"), trace.stage("order_submit"):
+                    await loop.run_in_executor(self.order_executor, self.on_order, order)
+                trace.finish("ok")
+            except Exception as e:
+                trace.finish("error")
+                self.errors += 1
+                print(f"[파이프라인] 주문 처리 실패: {e}")
+            finally:
+                self._busy -= 1
+                self.order_queue.task_done()
+
+    ##########################################################################################
+    # 실행
+    ##########################################################################################
+    async def start(self):
+        """워커 시작 (실행 중인 이벤트 루프 안에서 호출)"""
+        if self._tasks:
+            return
+        self._tasks.append(asyncio.create_task(self._market_worker()))
+        if self.on_strategy is not None:
+            self._tasks += [asyncio.create_task(self._strategy_worker()) for _ in range(self.strategy_workers)]
+        if self.on_order is not None:
+            self._tasks.append(asyncio.create_task(self._order_worker()))
+
+    async def drain(self, timeout=5.0):
+        """대기 중인 이벤트를 처리할 때까지 기다림 (종료 전)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.pending() == 0:
+                return True
+            await asyncio.sleep(0.01)
+        return False
+
+    def pending(self):
+        """큐에 남았거나 처리 중인 이벤트 수"""
+        return len(self.market_queue) + len(self.strategy_queue) + len(self.order_queue) + self._busy
+
+    async def stop(self, drain=True):
+        if drain:
+            await self.drain()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self):
+        return {
+            'market': self.market_queue.stats(),
+            'strategy': self.strategy_queue.stats(),
+            'order': self.order_queue.stats(),
+            'busy': self._busy,
+            'errors': self.errors,
+        }
@@ -9,35 +9,63 @@ Environment variables (optional):
 - SSL_CERT_FILE: path to TLS certificate (PEM)
 - SSL_KEY_FILE: path to TLS private key (PEM)
 - USE_ADHOC_SSL: "1" to try Flask's adhoc cert (requires 'cryptography')
+- WEBHOOK_MODE: "fast" to journal signals and answer 202 immediately (orders run in the background)
+- SIGNAL_JOURNAL / SIGNAL_IDEMPOTENCY_TTL / SIGNAL_JOURNAL_FSYNC: fast mode journal path, duplicate window (s) for explicit Idempotency-Key values, fsync per write
+- SIGNAL_MAX_REPLAY_AGE: seconds after which an unfinished journaled signal is marked expired instead of replayed on restart (default 60)
+- UPBIT_PRICE_TTL: seconds a cached quote stays fresh (default 2)
+- UPBIT_PRICE_STREAM: comma separated markets whose quotes are kept fresh from the Upbit websocket
+- PORTFOLIO_RECONCILE_INTERVAL: seconds between /v1/accounts reconciliations of the in-memory portfolio (default 300)
+- UPBIT_PRIVATE_STREAM: "1" to update the portfolio from the private myOrder / myAsset websocket
+- UPBIT_API_URL: Upbit REST base URL (default https://api.upbit.com, point at benchmark.upbit_rest_stand_in for load tests)
+- SERVER_WORKERS: number of worker processes; above 1 runs under gunicorn with shared state (default 1, Flask server)
+- SERVER_THREADS: request threads per gunicorn worker (default 8)
+- SERVER_STATE_DB: SQLite file shared by the workers (default data/server_state.db)
+- UPBIT_MARKET_CACHE: market list snapshot, used at startup without calling Upbit (default data/upbit_markets.json)
+- UPBIT_MARKET_REFRESH: seconds between background market list refreshes (default 21600)
+- SIGNAL_LOG_DIR: received signal log folder, buffered JSONL + SQLite index (default data/signals/log)
+- SIGNAL_LOG_FLUSH_INTERVAL / SIGNAL_LOG_FSYNC: seconds between background writes, fsync policy none / batch / always
 """
 
 from __future__ import annotations
 
+import contextvars
+import functools
 import json
 import logging
 import os
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict
-import jwt
 import uuid
-import requests
-import hashlib
-from urllib.parse import urlencode, unquote
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
+
+from module import market_catalog, portfolio, price_service, signal_journal, signal_queue, upbit_client
+from module.common import latency, metrics, shared_state
 
 
 log = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+# 웹훅 수신 -> 주문 응답 지연 시간 추적 (data/latency/webhook_YYYYMMDD.jsonl)
+WEBHOOK_TRACER = latency.get_tracer("webhook")
+
 # 업비트 API 키 (전역 변수)
 ACCESS_KEY = ''
 SECRET_KEY = ''
 
-# 마켓 정보 캐시 (서버 시작 시 한 번만 로드)
-MARKET_INFO_CACHE = {}
+# 업비트 REST 클라이언트 (연결 재사용 + 요청 수 제한) / 주문 실행 서비스 (같은 마켓은 순서대로, 다른 마켓은 동시에)
+UPBIT = upbit_client.UpbitClient(base_url=os.getenv("UPBIT_API_URL", upbit_client.BASE_URL))
+ORDER_SERVICE = upbit_client.OrderService(workers=int(os.getenv("UPBIT_ORDER_WORKERS", "4")))
+ORDER_TIMEOUT = float(os.getenv("UPBIT_ORDER_TIMEOUT", "20"))	# 웹훅 응답 전 주문 결과를 기다리는 최대 시간 (초)
+
+# 워커 프로세스 간 공유 상태 (멀티 워커 모드에서만, enable_shared_state)
+SHARED = None
+BOOT_ID = uuid.uuid4().hex	# 이번 실행 id (fork한 워커는 같은 값, 끝나지 않은 신호 복구 시 이전 실행과 구분)
 
 # 매매 전략 설정
 MAX_POSITION_RATIO = 0.2  # 각 종목 최대 비중 (20%)
@@ -56,115 +84,108 @@ def read_upbit_keys():
 	except Exception as e:
 		log.error("업비트 API 키 로드 실패: %s", e)
 
-def load_upbit_markets():
-	"""업비트 마켓 정보를 로드하고 캐시에 저장"""
-	global MARKET_INFO_CACHE
+def fetch_upbit_markets():
+	"""업비트 마켓 목록 조회 (/v1/market/all 응답 그대로, 실패하면 None)"""
 	try:
-		url = "https://api.upbit.com/v1/market/all?is_details=true"
+		url = "/v1/market/all?is_details=true"
 		headers = {"accept": "application/json"}
 		
-		response = requests.get(url, headers=headers)
+		response = UPBIT.get(url, headers=headers)
 		if response.status_code == 200:
-			markets = response.json()
-			
-			# 심볼별로 마켓 정보를 매핑
-			for market in markets:
-				market_code = market['market']  # 예: KRW-BTC
-				if market_code.startswith('KRW-'):
-					symbol = market_code.replace('KRW-', '')  # BTC
-					MARKET_INFO_CACHE[symbol.upper()] = {
-						'market': market_code,
-						'korean_name': market.get('korean_name', ''),
-						'english_name': market.get('english_name', '')
-					}
-			
-			log.info("업비트 마켓 정보 로드 완료: %d개 마켓", len(MARKET_INFO_CACHE))
-			return True
+			return response.json()
 		else:
 			log.error("마켓 정보 로드 실패: %s", response.text)
-			return False
+			return None
 	except Exception as e:
 		log.error("마켓 정보 로드 중 오류: %s", e)
-		return False
+		return None
+
+# 마켓 목록 (시작 시 스냅샷 파일을 바로 읽고, UPBIT_MARKET_REFRESH초마다 백그라운드에서 갱신)
+MARKETS = market_catalog.MarketCatalog(
+	fetch=fetch_upbit_markets,
+	path=os.getenv("UPBIT_MARKET_CACHE", os.path.join("data", "upbit_markets.json")),
+	refresh_interval=float(os.getenv("UPBIT_MARKET_REFRESH", str(6 * 3600))),
+)
+
+def load_upbit_markets():
+	"""업비트에서 마켓 정보를 다시 받아 색인 / 스냅샷 갱신"""
+	if MARKETS.refresh():
+		log.info("업비트 마켓 정보 로드 완료: %d개 마켓", len(MARKETS.symbols()))
+		return True
+	return False
 
+@latency.staged("market_lookup")
 def find_market_by_ticker(ticker):
-	"""티커 심볼로 업비트 마켓 코드 찾기"""
-	ticker_upper = ticker.upper()
+	"""티커 심볼로 업비트 마켓 코드 찾기 (BTC, BTCKRW, KRW-BTC, 한글 / 영문 이름)"""
+	market = MARKETS.resolve(ticker)
+	if market is not None:
+		return market
 	
-	# 이미 KRW- 형태인 경우
-	if ticker_upper.startswith('KRW-'):
-		return ticker_upper
+	# 마켓 목록이 없으면 KRW- 형태는 그대로 사용
+	if not MARKETS.loaded and ticker.upper().startswith('KRW-'):
+		return ticker.upper()
 	
-	# BTCKRW, ETHKRW 형태를 KRW-BTC, KRW-ETH로 변환
-	if ticker_upper.endswith('KRW'):
-		base_symbol = ticker_upper.replace('KRW', '')
-		converted_market = f'KRW-{base_symbol}'
-		log.info("티커 %s -> %s 형태로 변환", ticker, converted_market)
-		
-		# 변환된 마켓이 실제로 존재하는지 확인
-		if base_symbol in MARKET_INFO_CACHE:
-			market_info = MARKET_INFO_CACHE[base_symbol]
-			log.info("티커 %s -> 마켓 %s (%s)", ticker, market_info['market'], market_info['korean_name'])
-			return market_info['market']
-		else:
-			log.warning("변환된 티커 '%s'에 해당하는 업비트 마켓을 찾을 수 없습니다.", base_symbol)
-			return None
-	
-	# 기본 티커 형태 (BTC, ETH 등)
-	if ticker_upper in MARKET_INFO_CACHE:
-		market_info = MARKET_INFO_CACHE[ticker_upper]
-		log.info("티커 %s -> 마켓 %s (%s)", ticker, market_info['market'], market_info['korean_name'])
-		return market_info['market']
-	
-	# 찾지 못한 경우
 	log.warning("티커 '%s'에 해당하는 업비트 마켓을 찾을 수 없습니다.", ticker)
-	log.info("지원 가능한 티커: %s", list(MARKET_INFO_CACHE.keys())[:10])  # 처음 10개만 표시
 	return None
 
 def get_available_tickers():
 	"""사용 가능한 티커 목록 반환"""
-	return list(MARKET_INFO_CACHE.keys())
+	return MARKETS.symbols()
 
 def make_upbit_token(query_params=None):
 	"""업비트 JWT 토큰 생성"""
 	try:
-		payload = {
-			'access_key': ACCESS_KEY,
-			'nonce': str(uuid.uuid4()),
-		}
-		
-		if query_params:
-			query_string = unquote(urlencode(query_params, doseq=True)).encode("utf-8")
-			m = hashlib.sha512()
-			m.update(query_string)
-			query_hash = m.hexdigest()
-			payload['query_hash'] = query_hash
-			payload['query_hash_alg'] = 'SHA512'
-		
-		# PyJWT 2.0+ 호환성을 위한 수정
-		jwt_token = jwt.encode(payload, SECRET_KEY, algorithm='HS256')
-		
-		# PyJWT 2.0+에서는 문자열을 반환하므로 추가 처리 불필요
-		if isinstance(jwt_token, bytes):
-			jwt_token = jwt_token.decode('utf-8')
-			
-		return f'Bearer {jwt_token}'
+		return upbit_client.make_token(ACCESS_KEY, SECRET_KEY, query_params)
 	except Exception as e:
 		log.error("JWT 토큰 생성 중 오류: %s", e)
 		return None
 
+def has_upbit_keys():
+	"""업비트 API 키가 로드됐는지 (read_upbit_keys)"""
+	return bool(ACCESS_KEY and SECRET_KEY)
+
+# 신호 하나를 처리하는 동안 같이 쓰는 잔고 (account_snapshot 블록 안에서만)
+_ACCOUNT_SNAPSHOT = contextvars.ContextVar("account_snapshot", default=None)
+
+@contextmanager
+def account_snapshot():
+	"""with 블록 안의 get_upbit_balances()는 처음 조회한 잔고를 같이 씀 (매수 / 매도 흐름 하나에 잔고 조회 한 번)"""
+	token = _ACCOUNT_SNAPSHOT.set({})
+	try:
+		yield
+	finally:
+		_ACCOUNT_SNAPSHOT.reset(token)
+
+def with_account_snapshot(func):
+	@functools.wraps(func)
+	def wrapper(*args, **kwargs):
+		with account_snapshot():
+			return func(*args, **kwargs)
+	return wrapper
+
 def get_upbit_balances():
+	"""업비트 잔고 (포트폴리오 미러, account_snapshot 안이면 그 안에서 처음 가져온 값)"""
+	snapshot = _ACCOUNT_SNAPSHOT.get()
+	if snapshot is not None and "balances" in snapshot:
+		return snapshot["balances"]
+	sync_portfolio_version()
+	balances = PORTFOLIO.balances() if PORTFOLIO.ensure_fresh() else None
+	if snapshot is not None and balances is not None:
+		snapshot["balances"] = balances
+	return balances
+
+@metrics.timed("upbit.get_balances")
+@latency.staged("balance_check")
+def fetch_upbit_balances():
 	"""업비트 잔고 조회"""
 	try:
-		url = 'https://api.upbit.com/v1/accounts'
-		token = make_upbit_token()
-		if not token:
-			log.error("JWT 토큰 생성 실패")
+		url = '/v1/accounts'
+		if not has_upbit_keys():
+			log.error("잔고 조회 실패: 업비트 API 키가 없습니다.")
 			return None
-			
-		headers = {'Authorization': token}
-		
-		response = requests.get(url, headers=headers)
+
+		# 재시도 시 nonce가 달라야 하므로 요청마다 토큰 생성
+		response = UPBIT.get(url, headers=lambda: {'Authorization': make_upbit_token()})
 		if response.status_code == 200:
 			return response.json()
 		else:
@@ -174,29 +195,116 @@ def get_upbit_balances():
 		log.error("잔고 조회 중 오류: %s", e)
 		return None
 
-def get_current_price(market):
-	"""특정 마켓의 현재가 조회"""
+# 잔고 미러: 처음 한 번 조회 후 주문 응답 / 내 주문·자산 스트림으로 갱신, PORTFOLIO_RECONCILE_INTERVAL초마다 재조회
+PORTFOLIO = portfolio.PortfolioMirror(
+	fetch_balances=fetch_upbit_balances,
+	reconcile_interval=float(os.getenv("PORTFOLIO_RECONCILE_INTERVAL", "300")),
+)
+
+# 멀티 워커: 주문할 때마다 공유 카운터를 올리고, 다른 워커가 올린 것을 보면 미러를 재조회
+_PORTFOLIO_VERSION = 0
+
+def sync_portfolio_version():
+	"""다른 워커가 주문했으면 (공유 카운터가 바뀌었으면) 다음 조회에서 재조회"""
+	global _PORTFOLIO_VERSION
+	if SHARED is None:
+		return
+	version = SHARED.counter("portfolio")
+	if version != _PORTFOLIO_VERSION:
+		_PORTFOLIO_VERSION = version
+		PORTFOLIO.mark_stale()
+
+def bump_portfolio_version():
+	"""이 워커의 주문을 다른 워커에 알림 (주문 응답은 이 워커 미러에 이미 반영)"""
+	global _PORTFOLIO_VERSION
+	if SHARED is None:
+		return
+	version = SHARED.bump("portfolio")
+	if version == _PORTFOLIO_VERSION + 1:
+		_PORTFOLIO_VERSION = version
+
+def start_portfolio_stream():
+	"""업비트 내 주문 / 자산 웹소켓으로 PORTFOLIO 갱신 (백그라운드 스레드)"""
+	from module import upbit_ws
+
+	uws = upbit_ws.UpbitWebSocket(
+		url=upbit_ws.PRIVATE_URL,
+		auth=lambda: {'Authorization': make_upbit_token()},
+		on_connect=PORTFOLIO.on_connect,
+		on_disconnect=PORTFOLIO.on_disconnect,
+	)
+	uws.subscribe(upbit_ws.MY_ORDER, [])
+	uws.subscribe(upbit_ws.MY_ASSET, [])
+	threading.Thread(target=uws.start, args=(PORTFOLIO.on_result,), name="upbit-private-stream", daemon=True).start()
+	log.info("내 주문 / 자산 스트림 시작")
+	return uws
+
+@metrics.timed("upbit.get_prices")
+@latency.staged("price_lookup")
+def fetch_prices(markets):
+	"""여러 마켓 현재가를 한 번에 조회 (PriceService fetch)"""
 	try:
-		url = "https://api.upbit.com/v1/ticker"
-		params = {"markets": market}
+		url = "/v1/ticker"
+		params = {"markets": ",".join(markets)}
 		
-		response = requests.get(url, params=params)
+		response = UPBIT.get(url, params=params)
 		if response.status_code == 200:
-			data = response.json()
-			return data[0]['trade_price'] if data else None
+			return {item['market']: item['trade_price'] for item in response.json()}
 		else:
 			log.error("현재가 조회 실패: %s", response.text)
-			return None
+			return {}
 	except Exception as e:
 		log.error("현재가 조회 중 오류: %s", e)
-		return None
+		return {}
+
+# 현재가 캐시 (UPBIT_PRICE_TTL초, 필요한 마켓을 모아서 한 번에 조회)
+PRICES = price_service.PriceService(fetch=fetch_prices, ttl=float(os.getenv("UPBIT_PRICE_TTL", "2")))
+
+def start_price_stream(markets):
+	"""업비트 웹소켓 현재가를 PRICES 캐시에 계속 반영 (백그라운드 스레드)
 
-def calculate_total_balance():
-	"""전체 보유 자산 계산 (KRW 기준)"""
+	구독한 마켓은 TTL 안에 계속 갱신되므로 REST 조회 없이 캐시에서 바로 나감 (스트림이 끊기면 TTL 후 REST로 조회)
+	"""
+	from module import upbit_ws
+
+	uws = upbit_ws.UpbitWebSocket()
+	uws.subscribe(upbit_ws.TICKER, markets)
+	threading.Thread(target=uws.start, args=(PRICES.on_result,), name="upbit-price-stream", daemon=True).start()
+	log.info("현재가 스트림 시작: %s", markets)
+	return uws
+
+@metrics.timed("upbit.get_current_price")
+def get_current_price(market):
+	"""특정 마켓의 현재가 (캐시, 없거나 오래됐으면 조회)"""
+	return PRICES.get_price(market)
+
+def valuation_prices(balances):
+	"""보유 코인 평가 가격 (현재가)
+
+	스트림 / 캐시 가격이 UPBIT_PRICE_TTL 안이면 그대로, 없거나 오래된 마켓만 모아서 /v1/ticker 한 번에 조회 (PRICES)
+	평균 매수가로 대신하지 않음 (오른 포지션을 작게 평가해서 MAX_POSITION_RATIO를 넘게 살 수 있음)
+
+	Returns:
+		tuple: ({마켓: 가격}, 현재가를 받지 못한 보유 마켓 리스트)
+	"""
+	# 원화 마켓이 없는 코인(에어드랍 등)이 섞이면 묶음 조회 전체가 실패하므로 아는 마켓만 조회 (평가에서도 빠짐)
+	markets = [f"KRW-{b['currency']}" for b in balances if b['currency'] != 'KRW' and float(b['balance']) > 0]
+	if MARKETS.loaded:
+		markets = [m for m in markets if MARKETS.info(m[4:]) is not None]
+	prices = PRICES.get_prices(markets) if markets else {}
+	return prices, [m for m in markets if not prices.get(m)]
+
+def calculate_total_balance(balances=None, prices=None):
+	"""전체 보유 자산 계산 (KRW 기준, 코인은 valuation_prices로 평가)"""
 	try:
-		balances = get_upbit_balances()
+		if balances is None:
+			balances = get_upbit_balances()
 		if not balances:
 			return 0
+		if prices is None:
+			prices, missing = valuation_prices(balances)
+			if missing:
+				log.warning("현재가를 받지 못한 보유 코인은 평가에서 빠짐: %s", missing)
 		
 		total_krw = 0
 		
@@ -208,8 +316,7 @@ def calculate_total_balance():
 				total_krw += balance_amount
 			else:
 				# 다른 코인의 경우 KRW 가격으로 환산
-				market = f'KRW-{currency}'
-				current_price = get_current_price(market)
+				current_price = prices.get(f'KRW-{currency}')
 				if current_price:
 					total_krw += balance_amount * current_price
 		
@@ -218,10 +325,12 @@ def calculate_total_balance():
 		log.error("전체 잔고 계산 중 오류: %s", e)
 		return 0
 
-def place_upbit_order(market, side, volume=None, price=None, ord_type='market'):
-	"""업비트 주문 실행"""
+@metrics.timed("upbit.place_order")
+@latency.staged("order_submit")
+def place_upbit_order(market, side, volume=None, price=None, ord_type='market', identifier=None):
+	"""업비트 주문 실행 (identifier: 주문에 붙이는 고유 id, find_upbit_order로 다시 조회 가능)"""
 	try:
-		url = 'https://api.upbit.com/v1/orders'
+		url = '/v1/orders'
 		
 		params = {
 			'market': market,
@@ -238,20 +347,22 @@ def place_upbit_order(market, side, volume=None, price=None, ord_type='market'):
 			params['ord_type'] = 'market'
 			if volume:
 				params['volume'] = str(volume)
+		if identifier:
+			params['identifier'] = identifier
 		
 		log.info("주문 파라미터: %s", params)
 		
-		token = make_upbit_token(params)
-		if not token:
-			log.error("JWT 토큰 생성 실패 - 주문 취소")
+		if not has_upbit_keys():
+			log.error("업비트 API 키가 없습니다 - 주문 취소")
 			return None
-			
-		headers = {'Authorization': token}
-		
-		response = requests.post(url, json=params, headers=headers)
+
+		response = UPBIT.post(url, json=params, headers=lambda: {'Authorization': make_upbit_token(params)})
 		if response.status_code == 201:
-			log.info("주문 성공: %s", response.json())
-			return response.json()
+			order = response.json()
+			log.info("주문 성공: %s", order)
+			PORTFOLIO.apply_order(order)
+			bump_portfolio_version()
+			return order
 		else:
 			log.error("주문 실패: %s", response.text)
 			return None
@@ -259,7 +370,24 @@ def place_upbit_order(market, side, volume=None, price=None, ord_type='market'):
 		log.error("주문 실행 중 오류: %s", e)
 		return None
 
-def execute_buy_signal(ticker):
+@metrics.timed("upbit.find_order")
+def find_upbit_order(identifier):
+	"""identifier로 접수된 주문 조회
+
+	Returns:
+		dict | None: 주문 (없으면 None). 조회 자체가 실패하면 예외 (주문이 있는지 모르는 상태)
+	"""
+	params = {'identifier': identifier}
+	response = UPBIT.get('/v1/order', params=params, headers=lambda: {'Authorization': make_upbit_token(params)})
+	if response.status_code == 200:
+		return response.json()
+	if response.status_code == 404:
+		return None
+	raise RuntimeError(f"주문 조회 실패: {response.status_code} {response.text}")
+
+@metrics.timed("webhook.execute_buy_signal")
+@with_account_snapshot
+def execute_buy_signal(ticker, identifier=None):
 	"""매수 신호 실행 - 해당 종목이 전체 자산의 20%를 넘지 않도록 매수"""
 	try:
 		# 티커로 정확한 마켓 코드 찾기
@@ -271,15 +399,20 @@ def execute_buy_signal(ticker):
 		# 코인 심볼 추출
 		coin_symbol = market.replace('KRW-', '')
 		
-		# 전체 자산 계산
-		total_balance = calculate_total_balance()
+		# 전체 자산 계산 (보유 코인 현재가는 캐시 / 스트림, 없거나 오래된 것만 한 번에 조회)
+		balances = get_upbit_balances()
+		prices, missing = valuation_prices(balances) if balances else ({}, [])
+		if missing:
+			# 평가하지 못한 코인이 있으면 비중을 알 수 없으므로 매수하지 않음
+			log.error("매수 취소: 현재가를 받지 못한 보유 코인 %s", missing)
+			return False
+		total_balance = calculate_total_balance(balances, prices)
 		target_percentage = MAX_POSITION_RATIO  # 설정된 최대 비중 사용
 		target_amount = total_balance * target_percentage
 		
 		log.info("전체 자산: %s원, 목표 비중: %s%% (%s원)", total_balance, target_percentage*100, target_amount)
 		
 		# 현재 해당 코인 보유량 확인
-		balances = get_upbit_balances()
 		current_coin_balance = 0
 		current_coin_value = 0
 		
@@ -291,12 +424,12 @@ def execute_buy_signal(ticker):
 		
 		# 현재 코인 가치 계산
 		if current_coin_balance > 0:
-			current_price = get_current_price(market)
+			current_price = prices.get(market)
 			if current_price:
 				current_coin_value = current_coin_balance * current_price
 				log.info("현재 %s 보유량: %s개, 가치: %s원", coin_symbol, current_coin_balance, current_coin_value)
 			else:
-				log.error("현재가 조회 실패")
+				log.error("%s 현재가를 받지 못했습니다", market)
 				return False
 		else:
 			log.info("현재 %s 보유량: 0개", coin_symbol)
@@ -323,7 +456,7 @@ def execute_buy_signal(ticker):
 				current_coin_value, target_amount, buy_amount)
 		
 		# 시장가 매수 주문 (업비트에서는 ord_type='price' 사용)
-		result = place_upbit_order(market, 'bid', price=buy_amount)
+		result = place_upbit_order(market, 'bid', price=buy_amount, identifier=identifier)
 		
 		if result:
 			log.info("매수 주문 성공 - 마켓: %s, 금액: %s원", market, buy_amount)
@@ -338,7 +471,9 @@ def execute_buy_signal(ticker):
 		log.error("매수 신호 실행 중 오류: %s", e)
 		return False
 
-def execute_sell_signal(ticker):
+@metrics.timed("webhook.execute_sell_signal")
+@with_account_snapshot
+def execute_sell_signal(ticker, identifier=None):
 	"""매도 신호 실행 - 해당 코인 전량 매도"""
 	try:
 		# 티커로 정확한 마켓 코드 찾기
@@ -378,7 +513,7 @@ def execute_sell_signal(ticker):
 		log.info("매도 신호 처리 - 티커: %s, 마켓: %s, 수량: %s", ticker, market, coin_balance)
 		
 		# 시장가 매도 주문 (업비트에서는 ord_type='market' 사용)
-		result = place_upbit_order(market, 'ask', volume=coin_balance)
+		result = place_upbit_order(market, 'ask', volume=coin_balance, identifier=identifier)
 		
 		if result:
 			log.info("매도 주문 성공 - 마켓: %s, 수량: %s", market, coin_balance)
@@ -390,47 +525,126 @@ def execute_sell_signal(ticker):
 		log.error("매도 신호 실행 중 오류: %s", e)
 		return False
 
+def execute_signal(ticker, action, identifier=None, recovered=False):
+	"""매수 / 매도 신호 실행
+
+	recovered: 재시작 후 다시 실행하는 신호. 이전 실행에서 주문이 이미 접수됐을 수 있으므로
+	identifier로 주문을 먼저 조회하고, 있으면 다시 주문하지 않음 (조회가 실패하면 주문하지 않고 예외)
+	"""
+	if recovered and identifier:
+		order = find_upbit_order(identifier)
+		if order is not None:
+			log.warning("이미 접수된 주문이 있어 다시 주문하지 않습니다: %s %s (%s)", ticker, action, order.get('uuid'))
+			PORTFOLIO.mark_stale()
+			return True
+	func = execute_buy_signal if action == "buy" else execute_sell_signal
+	return func(ticker, identifier=identifier)
+
+def submit_signal(ticker, action, callback=None, identifier=None, recovered=False):
+	"""매매 신호를 주문 서비스에 넣음 (같은 마켓은 순서대로, 다른 마켓은 동시에 실행)
+
+	Returns:
+		Future: execute_signal 결과 (bool)
+	"""
+	func = functools.partial(execute_signal, action=action, identifier=identifier, recovered=recovered)
+	market = find_market_by_ticker(ticker) or ticker.upper()
+	return ORDER_SERVICE.submit(market, run_market_locked, market, func, ticker, callback=callback)
+
+def run_market_locked(market, func, ticker):
+	"""멀티 워커 모드면 마켓 잠금을 잡고 실행 (다른 워커 프로세스의 같은 마켓 주문과 겹치지 않게)"""
+	if SHARED is None:
+		return func(ticker)
+	with latency.stage("market_lock"):
+		fd = SHARED.acquire(f"market-{market}")
+	try:
+		return func(ticker)
+	finally:
+		SHARED.release(fd)
+
+# 빠른 응답 모드 (WEBHOOK_MODE=fast): 신호를 저널에 기록하고 202로 바로 응답, 주문은 주문 서비스에서 실행
+FAST_ACK = os.getenv("WEBHOOK_MODE", "sync").lower() == "fast"
+
+def dispatch_signal(signal, callback):
+	"""빠른 응답 모드 신호 실행 (signal id를 업비트 주문 identifier로 사용)"""
+	return submit_signal(
+		signal["ticker"], signal["action"], callback=callback,
+		identifier=signal["id"], recovered=signal.get("recovered", False),
+	)
+
+def _make_signal_queue(store=None):
+	return signal_queue.SignalQueue(
+		dispatch=dispatch_signal,
+		journal_path=os.getenv("SIGNAL_JOURNAL", os.path.join("data", "signals", "journal.jsonl")),
+		idempotency_ttl=float(os.getenv("SIGNAL_IDEMPOTENCY_TTL", "600")),
+		fsync=os.getenv("SIGNAL_JOURNAL_FSYNC") == "1",
+		store=store,
+		boot=BOOT_ID,
+		max_replay_age=float(os.getenv("SIGNAL_MAX_REPLAY_AGE", "60")),
+	)
+
+SIGNALS = _make_signal_queue()
+
+def enable_shared_state(path=None):
+	"""멀티 워커 모드: 중복 제거 키 / 신호 상태 / 포트폴리오 버전 / 마켓 잠금을 SQLite로 공유"""
+	global SHARED, SIGNALS
+	SHARED = shared_state.SharedState(path or os.getenv("SERVER_STATE_DB", os.path.join("data", "server_state.db")))
+	SIGNALS = _make_signal_queue(store=SHARED)
+	return SHARED
+
+def enqueue_signal(payload: Dict[str, Any]):
+	"""빠른 응답 모드: 신호 확인 -> 저널 기록 -> 202 + signal id (주문 결과는 /signals/<id>로 확인)
+
+	중복 제거 키: Idempotency-Key 헤더 또는 payload의 idempotency_key (없으면 중복 제거하지 않음,
+	TradingView 알림 본문에는 시각이 없어서 같은 본문이 실제로 다시 오는 신호일 수 있음)
+	"""
+	ticker = payload.get("instrument", {}).get("ticker", "")
+	action = payload.get("order", {}).get("action", "").lower()
+	if not ticker:
+		return jsonify({"status": "error", "message": "Missing ticker"}), 400
+	if not action:
+		return jsonify({"status": "error", "message": "Missing action"}), 400
+	if action not in ("buy", "sell"):
+		return jsonify({"status": "ok", "message": f"Unknown action: {action}"}), 200
+
+	key = request.headers.get("Idempotency-Key") or payload.get("idempotency_key") or None
+	signal_id, duplicate = SIGNALS.submit(ticker, action, payload, key=key)
+	if duplicate:
+		return jsonify({"status": "duplicate", "signal_id": signal_id}), 200
+	return jsonify({"status": "accepted", "signal_id": signal_id}), 202
+
+# 받은 신호 기록 (버퍼에 넣고 백그라운드에서 JSONL로 기록, 티커 / 시각 색인, 재생은 python -m module.signal_journal)
+SIGNAL_LOG = signal_journal.SignalJournal(
+	directory=os.getenv("SIGNAL_LOG_DIR", os.path.join("data", "signals", "log")),
+	flush_interval=float(os.getenv("SIGNAL_LOG_FLUSH_INTERVAL", "1")),
+	fsync=os.getenv("SIGNAL_LOG_FSYNC", "none"),
+)
+
+@latency.staged("signal_log")
 def log_ta_signal_to_file(data: Dict[str, Any] | str, endpoint: str = "ta-signal") -> None:
-	"""Log TradingView signal data to appropriate file based on endpoint.
+	"""Record a TradingView signal in the signal journal (buffered, written in the background).
 	
 	Args:
 		data: Either JSON dict or string data from TradingView webhook
-		endpoint: The endpoint name to determine the log file (ta-signal or ta-signal-test)
+		endpoint: The endpoint that received the signal (ta-signal or ta-signal-test)
 	"""
 	try:
-		# Create data directory if it doesn't exist
-		data_dir = Path("data")
-		data_dir.mkdir(exist_ok=True)
-		
-		
-		# Create log file path based on endpoint
-		log_file = data_dir / (endpoint + ".txt")
-
-		# Get current timestamp
-		timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-		
-		# Format the log entry
-		if isinstance(data, dict):
-			# JSON data - parse key fields
-			strategy_name = data.get("strategy", {}).get("name", "Unknown")
-			ticker = data.get("instrument", {}).get("ticker", "Unknown")
-			action = data.get("order", {}).get("action", "Unknown")
-			quantity = data.get("order", {}).get("quantity", "Unknown")
-			position_size = data.get("position", {}).get("new_size", "Unknown")
-			
-			log_entry = f"[{timestamp}] JSON | Strategy: {strategy_name} | Ticker: {ticker} | Action: {action} | Qty: {quantity} | Position: {position_size} | Raw: {json.dumps(data, ensure_ascii=False)}"
-		else:
-			# Plain text data
-			log_entry = f"[{timestamp}] TEXT | Data: {data}"
-		
-		# Append to file
-		with open(log_file, "a", encoding="utf-8") as f:
-			f.write(log_entry + "\n")
-			
-		log.info("Signal logged to %s", log_file)
-		
+		# 지연 시간 로그와 맞춰볼 수 있도록 trace id 기록
+		SIGNAL_LOG.append(signal_journal.make_record(data, endpoint, trace=latency.current().id))
 	except Exception as e:
-		log.error("Failed to log signal to file: %s", e)
+		log.error("Failed to log signal: %s", e)
+
+def traced(endpoint):
+	"""웹훅 처리 전체를 trace로 기록 (응답 상태 코드를 status로, 핸들러가 응답을 만든 시점을 response로)"""
+	def decorator(func):
+		@functools.wraps(func)
+		def wrapper(*args, **kwargs):
+			with WEBHOOK_TRACER.trace(endpoint=endpoint) as trace:
+				result = func(*args, **kwargs)
+				trace.mark("response")
+				trace.attrs["status"] = str(result[1]) if isinstance(result, tuple) else "200"
+				return result
+		return wrapper
+	return decorator
 
 """
 메세지 형태.
@@ -456,6 +670,7 @@ def log_ta_signal_to_file(data: Dict[str, Any] | str, endpoint: str = "ta-signal
 
 """
 @app.route("/ta-signal-test", methods=["POST"])
+@metrics.timed("webhook.ta_signal_test")
 def ta_signal_test():
 	"""Receive TradingView webhook payload and log it to file.
 
@@ -473,12 +688,10 @@ def ta_signal_test():
 		# Log to console
 		if payload is not None:
 			log.info("[TA-TEST] JSON payload: %s", json.dumps(payload, ensure_ascii=False))
-			print("[TA-TEST] JSON payload:", json.dumps(payload, ensure_ascii=False))
 			# Log to file
 			log_ta_signal_to_file(payload, "ta-signal-test")
 		else:
 			log.info("[TA-TEST] Text payload: %s", text_body)
-			print("[TA-TEST] Text payload:", text_body)
 			# Log to file
 			log_ta_signal_to_file(text_body or "", "ta-signal-test")
 
@@ -508,21 +721,30 @@ curl -X POST http://localhost:5000/ta-signal \
   }'
 """
 @app.route("/ta-signal", methods=["POST"])
+@metrics.timed("webhook.ta_signal")
+@traced("ta-signal")
 def ta_signal():
 	"""TradingView에서 웹훅을 받아 업비트 매매 신호 실행"""
 	try:
 		payload: Dict[str, Any] | None = None
 		text_body: str | None = None
 
-		if request.is_json:
-			payload = request.get_json(silent=True)
-		else:
-			text_body = request.get_data(as_text=True)
+		trace = latency.current()
+		with trace.stage("receive"):
+			request.get_data(cache=True)		# 본문 수신 (아래 파싱은 캐시된 본문 사용)
+		with trace.stage("parse"):
+			if request.is_json:
+				payload = request.get_json(silent=True)
+			else:
+				text_body = request.get_data(as_text=True)
+
+		if FAST_ACK and payload is not None:
+			log_ta_signal_to_file(payload, "ta-signal")
+			return enqueue_signal(payload)
 
 		# 로그 출력
 		if payload is not None:
 			log.info("[TA] JSON payload: %s", json.dumps(payload, ensure_ascii=False))
-			print("[TA] JSON payload:", json.dumps(payload, ensure_ascii=False))
 			
 			# 파일에 로그 저장
 			log_ta_signal_to_file(payload, "ta-signal")
@@ -531,6 +753,7 @@ def ta_signal():
 			try:
 				ticker = payload.get("instrument", {}).get("ticker", "")
 				action = payload.get("order", {}).get("action", "").lower()
+				trace.attrs.update(ticker=ticker, action=action)
 				
 				if not ticker:
 					log.warning("티커 정보가 없습니다.")
@@ -542,19 +765,18 @@ def ta_signal():
 				
 				log.info("매매 신호 처리: 티커=%s, 액션=%s", ticker, action)
 				
-				if action == "buy":
-					success = execute_buy_signal(ticker)
-					if success:
-						return jsonify({"status": "ok", "message": f"Buy order executed for {ticker}"}), 200
-					else:
-						return jsonify({"status": "error", "message": f"Buy order failed for {ticker}"}), 500
-				
-				elif action == "sell":
-					success = execute_sell_signal(ticker)
+				if action in ("buy", "sell"):
+					label = action.capitalize()
+					try:
+						success = submit_signal(ticker, action).result(timeout=ORDER_TIMEOUT)
+					except FutureTimeoutError:
+						# 주문은 대기열에서 계속 처리됨
+						log.warning("주문 결과 대기 시간 초과 (%s초): 티커=%s, 액션=%s", ORDER_TIMEOUT, ticker, action)
+						return jsonify({"status": "accepted", "message": f"{label} order queued for {ticker}"}), 202
 					if success:
-						return jsonify({"status": "ok", "message": f"Sell order executed for {ticker}"}), 200
+						return jsonify({"status": "ok", "message": f"{label} order executed for {ticker}"}), 200
 					else:
-						return jsonify({"status": "error", "message": f"Sell order failed for {ticker}"}), 500
+						return jsonify({"status": "error", "message": f"{label} order failed for {ticker}"}), 500
 				
 				else:
 					log.warning("알 수 없는 액션: %s", action)
@@ -566,7 +788,6 @@ def ta_signal():
 			
 		else:
 			log.info("[TA] Text payload: %s", text_body)
-			print("[TA] Text payload:", text_body)
 			# 파일에 로그 저장
 			log_ta_signal_to_file(text_body or "", "ta-signal")
 
@@ -576,14 +797,99 @@ def ta_signal():
 		return jsonify({"status": "error", "message": str(e)}), 500
 
 
+@app.route("/signals/<signal_id>", methods=["GET"])
+def get_signal_status(signal_id):
+	"""빠른 응답 모드로 받은 신호의 처리 상태 (queued / done / failed / error)"""
+	signal = SIGNALS.status(signal_id)
+	if signal is None:
+		return jsonify({"status": "error", "message": f"Unknown signal id: {signal_id}"}), 404
+	return jsonify({"status": "ok", "signal": signal}), 200
+
+@app.route("/signal-log", methods=["GET"])
+def get_signal_log():
+	"""받은 신호 조회 (색인 사용)
+
+	?ticker=BTC&action=buy&since=2025-01-01&until=2025-01-02 13:00:00&limit=100 (limit 기본 100)
+	"""
+	try:
+		records = SIGNAL_LOG.query(
+			ticker=request.args.get("ticker"),
+			action=request.args.get("action"),
+			endpoint=request.args.get("endpoint"),
+			since=request.args.get("since"),
+			until=request.args.get("until"),
+			limit=request.args.get("limit", 100, type=int),
+		)
+		return jsonify({"status": "ok", "count": len(records), "signals": records}), 200
+	except ValueError as e:
+		return jsonify({"status": "error", "message": str(e)}), 400
+	except Exception as e:
+		log.error("신호 기록 조회 중 오류: %s", e)
+		return jsonify({"status": "error", "message": str(e)}), 500
+
 @app.route("/health", methods=["GET"])  # simple liveness probe
 def health():
 	return jsonify({"status": "up"}), 200
 
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+	"""구간별 실행 시간 통계 (AUTOTRADER_METRICS=1 일 때 수집)
+
+	?format=prometheus 이면 Prometheus text 형식, 아니면 JSON.
+	?prefix=webhook. 처럼 span 이름 접두사로 필터링할 수 있음.
+	"""
+	try:
+		if request.args.get("format") == "prometheus":
+			return Response(metrics.to_prometheus(), mimetype="text/plain; version=0.0.4")
+
+		return jsonify({
+			"status": "ok",
+			"enabled": metrics.is_enabled(),
+			"spans": metrics.snapshot(request.args.get("prefix")),
+			"upbit": UPBIT.stats(),
+			"orders": ORDER_SERVICE.stats(),
+			"signals": SIGNALS.stats(),
+			"prices": PRICES.stats(),
+			"portfolio": PORTFOLIO.stats(),
+			"signal_log": SIGNAL_LOG.stats(),
+			"markets": MARKETS.stats(),
+			"worker": {"pid": os.getpid(), "shared": SHARED.path if SHARED is not None else None},
+		}), 200
+	except Exception as e:
+		log.error("metrics 조회 중 오류: %s", e)
+		return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route("/latency", methods=["GET"])
+def get_latency():
+	"""신호 수신 -> 주문 응답 단계별 지연 시간 히스토그램 (µs)
+
+	?format=prometheus 이면 Prometheus histogram 형식, 아니면 JSON.
+	?tracer=webhook 처럼 추적 대상으로 필터링 (webhook / live / crypto).
+	?recent=20 이면 최근 trace 레코드도 함께 반환.
+	"""
+	try:
+		if request.args.get("format") == "prometheus":
+			return Response(latency.to_prometheus(), mimetype="text/plain; version=0.0.4")
+
+		name = request.args.get("tracer")
+		res = {
+			"status": "ok",
+			"enabled": latency.ENABLED,
+			"tracers": latency.snapshot(name),
+		}
+		recent = request.args.get("recent", type=int)
+		if recent:
+			res["recent"] = {n: latency.recent(n, recent) for n in res["tracers"]}
+		return jsonify(res), 200
+	except Exception as e:
+		log.error("latency 조회 중 오류: %s", e)
+		return jsonify({"status": "error", "message": str(e)}), 500
+
 @app.route("/test-balance", methods=["GET"])
 def test_balance():
-	"""업비트 잔고 조회 테스트"""
+	"""업비트 잔고 조회 테스트 (미러를 /v1/accounts로 다시 맞춘 뒤 조회)"""
 	try:
+		PORTFOLIO.reconcile()
 		balances = get_upbit_balances()
 		total_balance = calculate_total_balance()
 		
@@ -608,11 +914,13 @@ def get_markets():
 						'ETC', 'ATOM', 'BAT', 'ENJ', 'KNC', 'MANA', 'SAND', 'AXS', 'CHZ', 'FLOW']
 		
 		for ticker in major_tickers:
-			if ticker in MARKET_INFO_CACHE:
-				market_details[ticker] = MARKET_INFO_CACHE[ticker]
+			info = MARKETS.info(ticker)
+			if info is not None:
+				market_details[ticker] = info
 		
 		return jsonify({
 			"status": "ok",
+			"fetched_at": MARKETS.fetched_at,
 			"total_markets": len(available_tickers),
 			"all_tickers": sorted(available_tickers),
 			"major_markets": market_details
@@ -669,15 +977,8 @@ def _get_ssl_context():
 	return None
 
 
-def run_server(host: str = "0.0.0.0", port: int = 5000, debug: bool = False) -> None:
-	"""Run the webhook server.
-
-	Args:
-		host: Bind address. Defaults to 0.0.0.0
-		port: Port to listen on. Defaults to 5000
-		debug: Flask debug mode.
-	"""
-	# 로깅 설정 개선 - 파일과 콘솔 모두에 로그 출력
+def _setup_logging() -> None:
+	"""로깅 설정 - 파일과 콘솔 모두에 로그 출력"""
 	if not logging.getLogger().handlers:
 		# 로그 디렉토리 생성
 		log_dir = Path("logs")
@@ -688,7 +989,7 @@ def run_server(host: str = "0.0.0.0", port: int = 5000, debug: bool = False) ->
 		
 		# 로깅 포맷 설정
 		formatter = logging.Formatter(
-			'%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+			'%(asctime)s - %(process)d - %(name)s - %(levelname)s - %(message)s'
 		)
 		
 		# 파일 핸들러 (로그 파일에 저장)
@@ -709,24 +1010,133 @@ def run_server(host: str = "0.0.0.0", port: int = 5000, debug: bool = False) ->
 		
 		log.info("로깅이 설정되었습니다. 로그 파일: %s", log_file)
 
+def _load_markets() -> None:
+	"""스냅샷이 있으면 바로 사용 (업비트 조회 없음), 없으면 조회"""
+	if MARKETS.load_or_fetch():
+		log.info("마켓 정보 로드 완료 (%s, %.0f초 전). 지원 가능한 티커 수: %d",
+				MARKETS.source, MARKETS.age(), len(MARKETS.symbols()))
+	else:
+		log.warning("마켓 정보 로드 실패. 티커 매칭이 제한될 수 있습니다.")
+
+def init_worker() -> None:
+	"""요청을 처리하는 프로세스 하나의 준비 (스트림 시작, 끝나지 않은 신호 복구)
+
+	단일 프로세스 모드는 run_server에서, 멀티 워커 모드는 gunicorn post_fork에서 워커마다 호출
+	"""
+	# 마켓 목록 갱신 (UPBIT_MARKET_REFRESH초마다, 스냅샷이 오래됐으면 바로)
+	MARKETS.start()
+
+	# 현재가 스트림 (UPBIT_PRICE_STREAM=KRW-BTC,KRW-ETH)
+	stream_markets = [m.strip().upper() for m in os.getenv("UPBIT_PRICE_STREAM", "").split(",") if m.strip()]
+	if stream_markets:
+		start_price_stream(stream_markets)
+
+	# 내 주문 / 자산 스트림 (UPBIT_PRIVATE_STREAM=1), 없으면 주문 후 다음 신호에서 잔고 재조회
+	if os.getenv("UPBIT_PRIVATE_STREAM") == "1":
+		start_portfolio_stream()
+
+	if FAST_ACK:
+		# 지난 실행에서 끝나지 않은 신호 다시 실행 (멀티 워커면 한 워커만 가져감)
+		log.info("빠른 응답 모드 (WEBHOOK_MODE=fast), 저널: %s", SHARED.path if SHARED is not None else SIGNALS.journal_path)
+		recovered = SIGNALS.recover()
+		if recovered:
+			log.warning("끝나지 않은 신호 %d개를 다시 실행합니다.", recovered)
+
+def run_server(host: str = "0.0.0.0", port: int = 5000, debug: bool = False, workers: int | None = None) -> None:
+	"""Run the webhook server.
+
+	Args:
+		host: Bind address. Defaults to 0.0.0.0
+		port: Port to listen on. Defaults to 5000
+		debug: Flask debug mode.
+		workers: Worker processes (defaults to SERVER_WORKERS or 1). Above 1 runs run_production.
+	"""
+	_setup_logging()
+
+	if workers is None:
+		workers = int(os.getenv("SERVER_WORKERS", "1"))
+	if workers > 1 and not debug:
+		run_production(host, port, workers)
+		return
+
 	# 업비트 API 키 로드
 	read_upbit_keys()
 	
 	# 업비트 마켓 정보 로드
-	log.info("업비트 마켓 정보를 로드 중입니다...")
-	if load_upbit_markets():
-		log.info("마켓 정보 로드 완료. 지원 가능한 티커 수: %d", len(MARKET_INFO_CACHE))
-	else:
-		log.warning("마켓 정보 로드 실패. 티커 매칭이 제한될 수 있습니다.")
+	_load_markets()
+	init_worker()
 
 	ssl_context = _get_ssl_context()
 	scheme = "HTTPS" if ssl_context else "HTTP"
 	log.info("Starting %s server on %s:%s", scheme, host, port)
 	print(f"Starting {scheme} server on {host}:{port}")
 
-	# Note: For production, consider a WSGI server (gunicorn, waitress) behind a reverse proxy.
 	app.run(host=host, port=port, debug=debug, ssl_context=ssl_context, use_reloader=False)
 
+def run_production(host: str = "0.0.0.0", port: int = 5000, workers: int = 4, threads: int | None = None) -> None:
+	"""gunicorn 멀티 워커로 실행 (gthread, 워커마다 요청 스레드 threads개)
+
+	마스터가 API 키 / 마켓 정보를 한 번 읽고 공유 상태(SERVER_STATE_DB)를 만든 뒤 워커를 fork 합니다.
+	워커끼리는 중복 제거 키 / 신호 상태 / 포트폴리오 버전을 SQLite로, 마켓 목록은 스냅샷 파일로 공유하고,
+	같은 마켓의 주문은 파일 잠금으로 한 워커씩 실행합니다. 업비트 요청 수 한도는 워커 수로 나눠 가집니다.
+	"""
+	try:
+		from gunicorn.app.base import BaseApplication
+	except ImportError:
+		log.error("gunicorn이 설치되어 있지 않습니다 (pip install gunicorn). 단일 프로세스로 실행합니다.")
+		run_server(host, port, workers=1)
+		return
+
+	threads = threads or int(os.getenv("SERVER_THREADS", "8"))
+
+	# fork 전에 마스터에서 한 번만
+	read_upbit_keys()
+	enable_shared_state()
+	_load_markets()
+	UPBIT.close()
+
+	def post_fork(server, worker):
+		# 부모의 SQLite 연결 / HTTP 연결 풀을 쓰지 않도록 새로 만듦
+		SHARED.reopen()
+		UPBIT.reset(share=workers)
+		init_worker()
+
+	def worker_exit(server, worker):
+		# 진행 중인 주문이 끝날 때까지 기다림
+		ORDER_SERVICE.shutdown(wait=True)
+		SIGNALS.close()
+		SIGNAL_LOG.close()
+
+	options = {
+		"bind": f"{host}:{port}",
+		"workers": workers,
+		"worker_class": "gthread",
+		"threads": threads,
+		"timeout": int(ORDER_TIMEOUT) + 30,
+		"graceful_timeout": int(ORDER_TIMEOUT) + 10,
+		"post_fork": post_fork,
+		"worker_exit": worker_exit,
+	}
+	ssl_context = _get_ssl_context()
+	if isinstance(ssl_context, tuple):
+		options["certfile"], options["keyfile"] = ssl_context
+	elif ssl_context == "adhoc":
+		log.warning("gunicorn은 adhoc 인증서를 지원하지 않습니다. HTTP로 실행합니다.")
+		ssl_context = None
+
+	class _Application(BaseApplication):
+		def load_config(self):
+			for key, value in options.items():
+				self.cfg.set(key, value)
+
+		def load(self):
+			return app
+
+	scheme = "HTTPS" if ssl_context else "HTTP"
+	log.info("Starting %s server on %s:%s (gunicorn, workers=%d, threads=%d)", scheme, host, port, workers, threads)
+	print(f"Starting {scheme} server on {host}:{port} (workers={workers})")
+	_Application().run()
+
 
-__all__ = ["run_server", "app"]
+__all__ = ["run_server", "run_production", "app"]
 
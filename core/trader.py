@@ -7,20 +7,32 @@
     - orderer : 실제 주문을 실행하는 모듈.
 """
 
+import asyncio
 import logging
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 from module import stock_data_manager, stock_data_manager_ws
-from module import stock_orderer, token_manager
+from module import stock_orderer, token_manager, screener, tick_store, bar_aggregator, ws_subscription_manager
+from module import gap_backfill
+from core import event_pipeline
+from module.common import backtest_store, frame_schema, latency
 from strategy.strategy import SignalType
 from strategy import    \
     ma_strategy, \
     macd_strategy, \
     squeeze_momentum_strategy, \
-    rsi_strategy
+    rsi_strategy, \
+    pine_style_strategy
 
 from strategy.sub import \
-    stop_loss_strategy
+    sub_strategy, \
+    stop_loss_strategy, \
+    take_profit_strategy, \
+    trailing_stop_strategy, \
+    cooldown_strategy, \
+    max_position_strategy
 
 STATE_DATA_DIR = "data/state"
 
@@ -32,11 +44,16 @@ STRATEGIES = {
     "MACD":             macd_strategy.MACD_strategy,
     "SqueezeMomentum":  squeeze_momentum_strategy.SqueezeMomentum_strategy,
     "RSI":              rsi_strategy.RSI_strategy,
+    "PineStyle":        pine_style_strategy.PineStyle_strategy,
     # 다른 전략들을 여기에 추가할 수 있습니다.
 }
 
 SUB_STRATEGIES = {
     "StopLoss":        stop_loss_strategy.StopLoss_strategy,
+    "TakeProfit":      take_profit_strategy.TakeProfit_strategy,
+    "TrailingStop":    trailing_stop_strategy.TrailingStop_strategy,
+    "Cooldown":        cooldown_strategy.Cooldown_strategy,
+    "MaxPosition":     max_position_strategy.MaxPosition_strategy,
 }
 
 class I_Trader:
@@ -116,7 +133,18 @@ class Live_Trader(I_Trader):
     def __init__(self, **kwargs):
         super().__init__(type="live", **kwargs)
 
-        self.kws = token_manager.KISWebSocket(api_url="/tryitout")
+        """
+            웹소켓 구독. 세션당 등록 수 제한이 있어서 ws_indexes의 키별 연결에 종목을 나눠 담음.
+            (기본: keys.json의 invest_type 키 전부)
+            연결이 끊기면 지터 백오프로 재접속하고 구독을 다시 등록, 끊긴 구간의 봉은 REST로 보충 (_on_ws_connect)
+        """
+        self.kws = ws_subscription_manager.SubscriptionManager(
+            api_url="/tryitout",
+            invest_type=kwargs.get('invest_type', "VPS"),
+            indexes=kwargs.get('ws_indexes', None),
+            max_retries=kwargs.get('ws_max_retries', None),
+            on_connect=self._on_ws_connect,
+        )
 
         """
             -> 현재 계좌 정보 업데이트.
@@ -126,26 +154,258 @@ class Live_Trader(I_Trader):
 
         """
             사용할 티커 정보 저장.
+            - tickers를 직접 넘기거나, screen_filters를 넘기면 refresh_tickers()로 스크리너 결과를 사용.
         """
+        self.tickers = list(kwargs.get('tickers', []))
+        self.screen_params = {
+            'filters': kwargs.get('screen_filters', []),
+            'sort_by': kwargs.get('screen_sort_by', None),
+            'limit': kwargs.get('screen_limit', 20),
+        }
 
         """ 
             ticker에 맞춰서 데이터 불러와서 저장해두기.
             REST API
         """
 
+        """
+            실시간 체결 / 호가 저장소. 종목 x tr_id별로 최근 tick_capacity개 레코드를 링버퍼에 보관.
+            전략은 self.tick_store.window() / latest() / order_book()으로 조회.
+        """
+        self.tick_store = tick_store.TickStore(capacity=kwargs.get('tick_capacity', 1024))
+
+        """
+            체결 틱 -> 봉 집계 (기본 1분봉). 완성 봉은 bar_writer가 모아서 DB에 배치 저장.
+            전략은 self.bar_aggregator.history(ticker, spec)를 set_data에 넘겨서 분봉으로 실행.
+        """
+        self.bar_aggregator = bar_aggregator.BarAggregator(specs=kwargs.get('bar_specs', ("1m",)))
+        self.bar_writer = bar_aggregator.BarWriter()
+        self.bar_aggregator.subscribe(self.bar_writer.add)
+        self.gap_backfiller = gap_backfill.GapBackfiller(
+            self.bar_aggregator, invest_type=kwargs.get('invest_type', "VPS"),
+        )
+        self._backfill_tasks = set()
+
+        """
+            이벤트 파이프라인 설정 (run_async)
+            - strategy_bar: 전략을 실행할 봉 종류 (bar_specs 중 하나, 기본 첫 번째)
+            - strategy_workers: 전략 워커 수, strategy_processes > 0 이면 전략 계산을 프로세스 풀에서 실행
+              (프로세스 풀이면 종목 상태는 워커 프로세스마다 따로 유지되므로, 포지션 상태를 쓰는 전략은 스레드 워커 권장)
+            - strategy_window: 전략 지표를 계산할 최근 봉 수 (종목별 전략 인스턴스는 StrategyBook이 유지)
+        """
+        self.strategy_bar = kwargs.get('strategy_bar', next(iter(self.bar_aggregator.specs), None))
+        self.strategy_workers = kwargs.get('strategy_workers', 2)
+        self.strategy_book = StrategyBook(self.strategy, window=kwargs.get('strategy_window', 200)) if self.strategy else None
+        processes = kwargs.get('strategy_processes', 0)
+        self.strategy_executor = ProcessPoolExecutor(max_workers=processes) if processes else None
+        self.pipeline = None
+        self._completed_bars = []
+        self.bar_aggregator.subscribe(self._on_bar)
+
         pass
 
+    def _on_bar(self, bar):
+        """완성 봉 모아두기 (on_market_event에서 전략 작업으로 변환)"""
+        self._completed_bars.append(bar)
+
+    def _on_ws_connect(self, kws, reconnected):
+        """
+            재접속 시 (구독 재등록 전) 그 연결의 체결 구독 종목을 보충 중으로 두고, 끊긴 구간 보충 작업 시작.
+            보충이 끝난 종목부터 모아둔 체결 이벤트를 다시 처리.
+        """
+        if not reconnected:
+            return
+        tickers = kws.open_map.get(stock_data_manager_ws.ccnl_krx.__name__, {}).get("items", [])
+        if not tickers:
+            return
+        self.gap_backfiller.begin(tickers)
+        task = asyncio.create_task(self.gap_backfiller.backfill(
+            tickers, kws.disconnected_at, kws.connected_at, replay=self._replay_market_event,
+        ))
+        self._backfill_tasks.add(task)
+        task.add_done_callback(self._backfill_tasks.discard)
+
+    def _replay_market_event(self, event):
+        """보충 중에 모아둔 시세 이벤트 처리 (파이프라인 시세 워커와 같은 이벤트 루프)"""
+        jobs = self.on_market_event(event)
+        if self.pipeline is not None:
+            for key, job in jobs:
+                self.pipeline.submit_job(key, job)
+
+    def refresh_tickers(self, **screen_params):
+        """
+            1. stock finding: 스크리너로 관심 종목을 다시 찾음.
+            screen_params가 없으면 생성 시 넘긴 screen_* 설정 사용. 조건이 하나도 없으면 기존 목록 유지.
+        """
+        params = {**self.screen_params, **screen_params}
+        if not params.get('filters'):
+            return self.tickers
+
+        result = screener.screen(**params)
+        self.tickers = result['ticker'].tolist()
+        logger.info(f"Screened tickers: {self.tickers}")
+        return self.tickers
+
     def run(self):
-        self.kws.start(on_result=self.on_result)
+        self.refresh_tickers()
+        if self.tickers:
+            # 실시간 체결가 / 호가 구독
+            self.kws.subscribe(request=stock_data_manager_ws.ccnl_krx, data=self.tickers)
+            self.kws.subscribe(request=stock_data_manager_ws.asking_price_krx, data=self.tickers)
+        try:
+            asyncio.run(self.run_async())
+        except KeyboardInterrupt:
+            print("Closing by KeyboardInterrupt")
+        finally:
+            self.bar_aggregator.flush()
+            self.bar_writer.flush()
         pass
 
+    async def run_async(self):
+        """
+            웹소켓 수신과 이벤트 파이프라인 워커를 같은 이벤트 루프에서 실행.
+            수신 루프는 파이프라인 큐에 넣기만 하고, 시세 처리 / 전략 / 주문은 워커에서 처리.
+        """
+        self.pipeline = event_pipeline.EventPipeline(
+            on_market=self.on_market_event,
+            on_strategy=evaluate_strategy,
+            on_order=self.execute_order,
+            policies={tick_store.ASKING_PRICE_TR: "coalesce"},     # 호가는 최신 값만 처리
+            strategy_workers=self.strategy_workers,
+            strategy_executor=self.strategy_executor,
+            tracer=latency.get_tracer("live", waits=True),    # 체결 수신 -> 주문 응답 지연 시간
+        )
+        await self.pipeline.start()
+        try:
+            await self.kws.run_async(on_result=self.pipeline.on_result)
+        finally:
+            for task in self._backfill_tasks:
+                task.cancel()
+            await self.pipeline.stop()
+            logger.info(f"Pipeline stats: {self.pipeline.stats()}")
+            logger.info(f"Gap backfill stats: {self.gap_backfiller.stats()}")
+
     def on_result(self, ws, tr_id, result, data_info):
         """
-            웹소켓에서 받은 결과를 처리하는 메서드
+            웹소켓에서 받은 결과를 처리하는 메서드 (파이프라인 없이 바로 처리할 때)
+            result는 타입 변환된 레코드 튜플 리스트 (KISWebSocket result_format="records")
         """
-        print(f"WebSocket Result - TR ID: {tr_id}, Result: {result}, Data Info: {data_info}")
-        # 여기에 결과 처리 로직을 추가할 수 있습니다.
-        # 실제 처리 진행할 곳.
+        return self.on_market_event((tr_id, result, data_info))
+
+    def on_market_event(self, event):
+        """
+            시세 이벤트 처리: 틱 저장 + 봉 집계.
+            새로 완성된 봉마다 전략 작업 (종목, 작업)을 반환 -> 파이프라인 전략 큐 (종목별로 최신 작업만 유지)
+        """
+        tr_id, result, data_info = event
+        if not result:
+            return []
+        if tr_id == bar_aggregator.TRADE_TR and self.gap_backfiller.holding(result[0][0]):
+            # 끊긴 구간 보충 중: 보충이 끝나면 순서대로 다시 처리
+            self.gap_backfiller.hold(result[0][0], event)
+            return []
+
+        self.tick_store.add_records(tr_id, result, data_info["columns"])
+        if tr_id == bar_aggregator.TRADE_TR:
+            self.bar_aggregator.add_records(result, data_info["columns"])
+
+        completed, self._completed_bars = self._completed_bars, []
+        jobs = []
+        for bar in completed:
+            if bar.spec != self.strategy_bar or self.strategy is None:
+                continue
+            history = self.bar_aggregator.history(bar.ticker, bar.spec, limit=self.strategy_book.window)
+            jobs.append((bar.ticker, (self.strategy_book, bar.ticker, history, bar.date)))
+        return jobs
+
+    def execute_order(self, signal):
+        """주문 실행 (파이프라인 주문 워커 스레드에서 호출)"""
+        if self.orderer is None:
+            logger.info(f"Signal (no orderer): {signal.ticker} {signal.signal_type.value} {signal.target_time}")
+            return None
+        return self.orderer.place_order(order_info=signal)
+
+
+class StrategyBook:
+    """
+        라이브 트레이더의 종목별 전략 인스턴스 (봉마다 전략을 새로 만들지 않음)
+        - 종목마다 인스턴스 하나를 유지해서 포지션 크기 / 서브 전략 상태(step)가 봉 사이에 이어짐
+        - 지표는 최근 window개 봉으로만 다시 계산 (보관 중인 봉 전체를 매번 계산하지 않음)
+        - 같은 종목 작업은 잠금으로 순서대로 처리, 이미 처리한 봉보다 오래된 작업은 건너뜀
+    """
+    def __init__(self, strategy_class, window=200):
+        """
+        :param strategy_class: STRATEGIES의 전략 클래스
+        :param window: 지표 계산에 쓸 최근 봉 수 (전략의 가장 긴 지표 기간보다 충분히 길게)
+        """
+        if window < 2:
+            raise ValueError(f"window must be >= 2, got {window}")
+        self.strategy_class = strategy_class
+        self.window = window
+        self.key = f"{strategy_class.__name__}-{id(self)}"
+        self._init_runtime()
+
+    def _init_runtime(self):
+        self._strategies = {}       # 종목 -> 전략 인스턴스
+        self._last_time = {}        # 종목 -> 마지막으로 처리한 봉 시각 키
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # 프로세스 풀로 넘길 때는 설정만 (인스턴스 / 잠금은 프로세스마다 새로 만듦)
+        return {'strategy_class': self.strategy_class, 'window': self.window, 'key': self.key}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_runtime()
+
+    def _get(self, ticker):
+        with self._lock:
+            strategy = self._strategies.get(ticker)
+            if strategy is None:
+                strategy = self._strategies[ticker] = self.strategy_class()
+                self._locks[ticker] = threading.Lock()
+            return strategy, self._locks[ticker]
+
+    def evaluate(self, ticker, history, target_time):
+        """
+            완성 봉 하나에 대해 전략 실행
+            Returns:
+                TradingSignal | None: 이미 처리한 봉이면 None
+        """
+        strategy, lock = self._get(ticker)
+        with lock:
+            last = self._last_time.get(ticker)
+            if last is not None and str(target_time) <= last:
+                return None
+            strategy.set_data(ticker, history.tail(self.window).reset_index(drop=True))
+            signal = strategy.run_with_sub_strategies(target_time=target_time)
+            self._last_time[ticker] = str(target_time)
+            return signal
+
+    def reset(self, ticker=None):
+        """종목(또는 전체)의 전략 상태 초기화 (포지션을 다시 맞출 때)"""
+        with self._lock:
+            for name in ([ticker] if ticker is not None else list(self._strategies)):
+                self._strategies.pop(name, None)
+                self._last_time.pop(name, None)
+                self._locks.pop(name, None)
+
+
+# 프로세스 풀 워커에서 처음 받은 StrategyBook을 계속 사용 (워커마다 하나, 같은 프로세스 안에서는 상태 유지)
+_STRATEGY_BOOKS = {}
+
+def evaluate_strategy(job):
+    """
+        완성 봉 기준 전략 실행 (파이프라인 전략 워커, 프로세스 풀에서도 실행 가능하도록 모듈 최상위 함수)
+        job: (StrategyBook, 종목, 봉 데이터프레임, 봉 시각 키)
+        Returns:
+            list: 매수 / 매도 신호 (HOLD는 주문하지 않음)
+    """
+    book, ticker, history, target_time = job
+    book = _STRATEGY_BOOKS.setdefault(book.key, book)
+    signal = book.evaluate(ticker, history, target_time)
+    return [] if signal is None or signal.signal_type == SignalType.HOLD else [signal]
 
 
 ######################################################################################
@@ -156,39 +416,160 @@ class Live_Trader(I_Trader):
 ##################### 코인 라이브 트레이더 ##############################################
 ######################################################################################
 
-from strategy_crypto import test_strategy
-from module import upbit_fetcher, crypto_orderer
+from module import upbit_fetcher, upbit_ws, crypto_orderer
 
-import json
 class Live_Crypto_Trader(I_Trader):
+    '''
+    동작 구조 (이벤트 기반)
+        1. markets의 체결 / 호가를 업비트 웹소켓 연결 하나로 구독 (UpbitWebSocket)
+        2. 수신 -> 이벤트 파이프라인 -> 틱 저장 + 봉 집계 (on_market_event, 국내주식 Live_Trader와 같은 형식)
+        3. 봉이 완성되면 전략 실행 (evaluate_strategy) -> 매수 / 매도 신호면 주문 (execute_order)
+        4. 주문은 crypto_orderer.Live_Orderer -> 업비트 OrderService (dry_run=True가 기본, 실제 주문은 dry_run=False)
+    '''
+    DEFAULT_MARKETS = ("KRW-BTC", "KRW-ETH")
+    # 웹훅 서버(TradingView)에서 쓰는 Squeeze Momentum 전략, 24시간 분봉에서도 추세 / 변동성 수축 기준으로 동작
+    DEFAULT_STRATEGY = "SqueezeMomentum"
 
     def __init__(self, **kwargs):
         self.type = "live"
-        self.orderer = crypto_orderer.Live_Orderer()
-        self.strategy = test_strategy.Test_Strategy_Crypto()
+        self.strategy = self.set_strategy(kwargs.get('strategy', self.DEFAULT_STRATEGY))
 
         key_index = kwargs.get('index', 0)
 
-        with open('private/keys.json', 'r') as f:
-            keys = json.load(f)
-            self.APP_KEY = keys['COIN'][key_index]['APP_KEY']
-            self.APP_SECRET = keys['COIN'][key_index]['APP_SECRET']
+        # 시세 웹소켓은 키 없이 받을 수 있으므로 키가 없어도 시작 (주문에만 필요)
+        coin_keys = token_manager.keys.get('COIN', [])
+        if key_index < len(coin_keys):
+            self.APP_KEY = coin_keys[key_index]['APP_KEY']
+            self.APP_SECRET = coin_keys[key_index]['APP_SECRET']
+        else:
+            print(f"[경고] COIN 키가 없습니다 (index={key_index}), 주문은 실행할 수 없습니다.")
+            self.APP_KEY = self.APP_SECRET = None
+
+        """
+            주문. dry_run=True(기본)면 주문하지 않고 로그만, dry_run=False면 키가 있어야 함 (없으면 ValueError)
+            order_amount: position_size 1.0일 때 매수 금액 (원)
+        """
+        dry_run = kwargs.get('dry_run', True)
+        self.orderer = crypto_orderer.Live_Orderer(
+            self.APP_KEY, self.APP_SECRET, dry_run=dry_run,
+            order_amount=kwargs.get('order_amount', 100_000),
+        )
+        if dry_run:
+            logger.info("Live_Crypto_Trader: dry_run mode (orders are logged, not placed)")
+
+        """
+            실시간 시세. ws_url로 로컬 대용 서버(benchmark/upbit_stand_in.py)에 연결할 수 있음.
+            체결은 24시간이므로 거래일 / 장 시간 확인 없이 봉 집계.
+        """
+        self.markets = list(kwargs.get('markets', self.DEFAULT_MARKETS))
+        self.uws = upbit_ws.UpbitWebSocket(url=kwargs.get('ws_url', upbit_ws.URL))
+        self.tick_store = tick_store.TickStore(
+            capacity=kwargs.get('tick_capacity', 1024), column_types=upbit_ws.COLUMN_TYPES,
+        )
+        self.bar_aggregator = bar_aggregator.BarAggregator(
+            specs=kwargs.get('bar_specs', ("1m",)), country_code="CRYPTO", calendar=False,
+            regular_session_only=False, fields=upbit_ws.TRADE_FIELDS,
+        )
+        self.bar_writer = None
+        if kwargs.get('save_bars', True):
+            self.bar_writer = bar_aggregator.BarWriter(country_code="CRYPTO", api_name="upbit_ws_bar")
+            self.bar_aggregator.subscribe(self.bar_writer.add)
+
+        self.strategy_bar = kwargs.get('strategy_bar', next(iter(self.bar_aggregator.specs), None))
+        self.strategy_workers = kwargs.get('strategy_workers', 2)
+        self.strategy_book = StrategyBook(self.strategy, window=kwargs.get('strategy_window', 200))
+        self.pipeline = None
+        self._completed_bars = []
+        self.bar_aggregator.subscribe(self._on_bar)
+
+        self.shutdown_event = None
+        self._loop = None
+        self._stop = None
 
         # 데이터 가져오기.
         self.set_data()
 
+    def _on_bar(self, bar):
+        self._completed_bars.append(bar)
+
     def set_data(self):
-        pass
+        """실시간 체결 / 호가 구독 (연결 하나에 모든 마켓)"""
+        self.uws.subscribe(upbit_ws.TRADE, self.markets)
+        self.uws.subscribe(upbit_ws.ORDERBOOK, self.markets)
+
+    def set_shutdown_event(self, event):
+        self.shutdown_event = event
+
+    def stop(self):
+        """다른 스레드에서 호출 가능 (main.run_trader 종료 처리)"""
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
 
     def run(self):
+        try:
+            asyncio.run(self.run_async())
+        except KeyboardInterrupt:
+            print("Closing by KeyboardInterrupt")
+        finally:
+            self.bar_aggregator.flush()
+            if self.bar_writer is not None:
+                self.bar_writer.flush()
+
+    async def run_async(self):
+        """업비트 수신과 이벤트 파이프라인 워커를 같은 이벤트 루프에서 실행 (stop() 또는 shutdown_event로 종료)"""
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self.pipeline = event_pipeline.EventPipeline(
+            on_market=self.on_market_event,
+            on_strategy=evaluate_strategy,
+            on_order=self.execute_order,
+            policies={upbit_ws.ORDERBOOK: "coalesce", upbit_ws.TICKER: "coalesce"},
+            strategy_workers=self.strategy_workers,
+            tracer=latency.get_tracer("crypto", waits=True),
+        )
+        await self.pipeline.start()
+        receiver = asyncio.create_task(self.uws.run_async(on_result=self.pipeline.on_result))
+        try:
+            while not self._stop.is_set() and not receiver.done():
+                if self.shutdown_event is not None and self.shutdown_event.is_set():
+                    break
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self.uws.close()
+            receiver.cancel()
+            await asyncio.gather(receiver, return_exceptions=True)
+            await self.pipeline.stop()
+            self.orderer.close()
+            logger.info(f"Crypto pipeline stats: {self.pipeline.stats()}, orders: {self.orderer.stats()}")
+
+    def on_market_event(self, event):
         """
-            종목들에 대한 데이터 가져오기.
+            시세 이벤트 처리: 틱 저장 + (체결이면) 봉 집계.
+            새로 완성된 봉마다 전략 작업 (마켓, 작업) 반환 -> 파이프라인 전략 큐
         """
-        while True:
-            # print("Running Live Crypto Trader...")
-
-            time.sleep(1)  # 잠시 대기
-    pass
+        msg_type, result, data_info = event
+        if not result:
+            return []
+
+        self.tick_store.add_records(msg_type, result, data_info["columns"])
+        if msg_type == upbit_ws.TRADE:
+            self.bar_aggregator.add_records(result, data_info["columns"])
+
+        completed, self._completed_bars = self._completed_bars, []
+        jobs = []
+        for bar in completed:
+            if bar.spec != self.strategy_bar or self.strategy is None:
+                continue
+            history = self.bar_aggregator.history(bar.ticker, bar.spec, limit=self.strategy_book.window)
+            jobs.append((bar.ticker, (self.strategy_book, bar.ticker, history, bar.date)))
+        return jobs
+
+    def execute_order(self, signal):
+        """주문 실행 (파이프라인 주문 워커 스레드에서 호출)"""
+        return self.orderer.place_order(signal)
 
 ## Legacy
 #######################################################################################
@@ -201,33 +582,45 @@ class Trader:
             2. set_data() 
             3. run_backtest() or run_trader()
     '''
-    def __init__(self, type=""):
+    def __init__(self, type="", lean=False):
+        """
+            lean=True : 가격 데이터를 frame_schema로 줄이고(float32 가격, 정수 날짜),
+                        set_data 후 전략의 중간 컬럼을 지움 (전 종목 / 여러 종목 백테스트용)
+        """
         self.type = type
+        self.lean = lean
         self.strategy = None
+        self.strategy_name = None
+        self.strategy_params = {}
         
         if type == "backtest":
             self.orderer = stock_orderer.BackTest_Orderer()
+        elif type == "backtest_columnar":
+            self.orderer = stock_orderer.Columnar_BackTest_Orderer()
         elif type == "paper":
             self.orderer = stock_orderer.Paper_Orderer()
         elif type == "live":
             self.orderer = stock_orderer.Live_Orderer()
 
-    def set_strategy(self, strategy_name):
-        """전략 설정"""
+    def set_strategy(self, strategy_name, **params):
+        """전략 설정 (params는 전략 생성자 파라미터)"""
         if strategy_name in STRATEGIES:
-            self.strategy = STRATEGIES[strategy_name]()
+            self.strategy = STRATEGIES[strategy_name](**params)
+            self.strategy.prune_intermediates = self.lean
+            self.strategy_name = strategy_name
+            self.strategy_params = params
             print(f"Strategy set to {strategy_name} || {self.strategy.name}")
             logger.info(f"Strategy set to {strategy_name}")
         else:
             raise ValueError(f"Unknown strategy: {strategy_name}")
         
-    def add_sub_strategy(self, sub_strategy_name):
-        """서브 전략 추가"""
+    def add_sub_strategy(self, sub_strategy_name, **params):
+        """서브 전략 추가 (params는 서브 전략 생성자 파라미터, 추가한 순서대로 적용)"""
         if self.strategy is None:
             raise ValueError("Main strategy is not set. Please set the main strategy first.")
         
-        if sub_strategy_name in STRATEGIES:
-            sub_strategy = STRATEGIES[sub_strategy_name]()
+        if sub_strategy_name in SUB_STRATEGIES:
+            sub_strategy = SUB_STRATEGIES[sub_strategy_name](**params)
             self.strategy.add_sub_strategy(sub_strategy)
             print(f"Sub strategy {sub_strategy_name} added")
             logger.info(f"Sub strategy {sub_strategy_name} added")
@@ -244,34 +637,69 @@ class Trader:
             ticker=ticker,
             start_date=start_date, end_date=end_date
         )
+        if self.lean:
+            dataFrame = frame_schema.apply_price_schema(dataFrame, copy=False)
         data = self.strategy.set_data(ticker, dataFrame)
-        print(f"Data for {ticker} set with {len(self.strategy.dataFrame)} records")
+        print(f"Data for {ticker} set with {len(self.strategy.dataFrame)} records "
+              f"({self.strategy.memory_usage()['total'] / 1024:.1f} KiB)")
         
         return data.to_json(orient='records')
 
-    def run_backtest(self, ticker, start_date, end_date):
+    def _store_params(self):
+        """결과 저장소 hash용 파라미터 (서브 전략이 있으면 함께 포함)"""
+        params = dict(self.strategy_params)
+        sub_params = self.strategy.get_sub_strategy_params()
+        if sub_params:
+            params['sub_strategies'] = sub_params
+        return params
+
+    def run_backtest(self, ticker, start_date, end_date, use_store=True):
+        """
+        백테스트 실행
+        - use_store=True 이면 같은 (기간, 전략, 파라미터, 데이터 버전)의 저장된 결과가 있을 때 다시 실행하지 않고 바로 반환
+        - 새로 실행한 결과는 결과 저장소(backtest_store)에 기록
+        """
+        data_version = backtest_store.make_data_version(getattr(self.strategy, 'dataFrame', None))
+        if use_store:
+            run_id = backtest_store.find_backtest_run(
+                ticker, start_date, end_date, self.strategy_name, self._store_params(), data_version
+            )
+            if run_id is not None:
+                print(f"저장된 백테스트 결과를 사용합니다: run_id={run_id}")
+                return backtest_store.load_backtest_run(run_id)
+
         print("\n============= Backtest Start =============")
         print(f"Running backtest for {ticker} from {start_date} to {end_date}...")
         country_code = stock_data_manager.get_country_code(ticker)
 
         now = stock_data_manager.get_next_trading_day(start_date, country_code=country_code)
 
-        # trade_info = pd.DataFrame()
+        target_times = []
         while now <= end_date:
-            try:
-                res = self.strategy.run(target_time=now)    # 전략에 따른 판단.
-                self.orderer.place_order(order_info=res)    # 거래 수행
-
-            except Exception as e:
-                # 날짜가 없는 에러가 종종 남
-                print(f"[오류] {e}")
-
+            target_times.append(now)
             now = stock_data_manager.get_offset_date(now, 1)  # 다음 거래일로 이동
             now = stock_data_manager.get_next_trading_day(now, country_code=country_code)
 
+        # 1. 전체 기간의 메인 전략 신호를 SignalFrame으로 수집 (데이터가 없는 날짜는 건너뜀)
+        signals = self.strategy.run_batch(target_times)
+
+        # 2. 서브 전략(손절, 익절 등)을 신호 배열 전체에 한 번에 적용
+        signals = sub_strategy.apply_to_frame(self.strategy.sub_strategies, signals)
+
+        # 3. 거래 수행
+        self.orderer.place_orders(signals)
+
 
         # print(trade_info)
-        trade_result = self.orderer.end_test()
+        trade_result = self.orderer.end_test(save_file=not use_store)
+
+        if use_store:
+            run_id = backtest_store.save_backtest_run(
+                ticker, start_date, end_date,
+                self.strategy_name, self._store_params(), trade_result,
+                data_version=data_version,
+            )
+            trade_result = backtest_store.load_backtest_run(run_id)
 
         print("============= Backtest End =============\n")
         return trade_result
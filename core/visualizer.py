@@ -10,8 +10,9 @@ import importlib
 import sys
 from datetime import datetime
 
-from module import stock_data_manager
-from core import trader
+from module import stock_data_manager, screener
+from module.common import backtest_store
+from core import trader, walk_forward
 
 # Flask 앱 초기화
 app = Flask(__name__, 
@@ -98,6 +99,38 @@ def get_tickers():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/stock/screen')
+def screen_stocks():
+    """
+    종목 스크리너 API
+    ?filter=rsi_14<30&filter=market_cap>100000000000&sort_by=return_20&ascending=false&limit=50&bars=120
+    """
+    try:
+        result = screener.screen(
+            filters=request.args.getlist('filter'),
+            sort_by=request.args.get('sort_by'),
+            ascending=request.args.get('ascending', 'false').lower() == 'true',
+            limit=int(request.args.get('limit', 50)),
+            columns=[c for c in request.args.get('columns', '').split(',') if c.strip()],
+            bars=int(request.args.get('bars', screener.DEFAULT_BARS)),
+            end_date=request.args.get('end_date'),
+        )
+
+        # nan은 JSON으로 보낼 수 없으므로 None으로 변환
+        result = result.astype(object).where(result.notna(), None)
+        return jsonify({
+            'status': 'success',
+            'total_count': len(result),
+            'data': result.to_dict('records')
+        })
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Screen API error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/system/status')
 def get_system_status():
     """시스템 상태 API"""
@@ -129,9 +162,10 @@ def set_backtest_strategy():
         data = request.get_json()
         # strategy_name = data.get('strategy', 'MACD')
         strategy_name = data.get('strategy', 'MACD')
+        params = data.get('params', {})
         global backtest_trader
-        backtest_trader = trader.Trader("backtest")
-        backtest_trader.set_strategy(strategy_name)
+        backtest_trader = trader.Trader("backtest_columnar")
+        backtest_trader.set_strategy(strategy_name, **params)
         return jsonify({'status': 'success', 'message': f'Strategy set to {strategy_name}'})
     
     except Exception as e:
@@ -144,13 +178,14 @@ def add_backtest_sub_strategy():
     print("Received add sub strategy request")
     try:
         data = request.get_json()
-        sub_strategy = data.get('sub_strategy', 'RSI')
+        sub_strategy = data.get('sub_strategy', 'StopLoss')
+        params = data.get('params', {})
         
         global backtest_trader
         if backtest_trader is None:
             raise ValueError("Backtest trader is not initialized. Please set the strategy first.")
         
-        backtest_trader.add_sub_strategy(sub_strategy)
+        backtest_trader.add_sub_strategy(sub_strategy, **params)
         return jsonify({'status': 'success', 'message': f'Sub strategy {sub_strategy} added'})
     
     except Exception as e:
@@ -190,6 +225,7 @@ def run_backtest():
         ticker = data.get('ticker', '005930')
         start_date = data.get('start_date', '20240101')
         end_date = data.get('end_date', '20241231')
+        use_cache = data.get('use_cache', True)
         
         logger.info(f"Starting backtest for {ticker} from {start_date} to {end_date}")
         
@@ -197,7 +233,7 @@ def run_backtest():
         global backtest_trader
         if backtest_trader is None:
             raise ValueError("Backtest trader is not initialized. Please set the strategy first.")
-        result = backtest_trader.run_backtest(ticker=ticker, start_date=start_date, end_date=end_date)
+        result = backtest_trader.run_backtest(ticker=ticker, start_date=start_date, end_date=end_date, use_store=use_cache)
 
         return jsonify({
             'status': 'success',
@@ -208,6 +244,88 @@ def run_backtest():
         logger.error(f"Backtest API error: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/backtest/runs')
+def list_backtest_runs():
+    """저장된 백테스트 실행 목록 API"""
+    try:
+        params = request.args.get('params')
+        runs = backtest_store.list_backtest_runs(
+            ticker=request.args.get('ticker'),
+            strategy=request.args.get('strategy'),
+            params=json.loads(params) if params else None,
+            start_date=request.args.get('start_date'),
+            end_date=request.args.get('end_date'),
+            order_by=request.args.get('order_by', 'created_at'),
+            limit=int(request.args.get('limit', 100)),
+        )
+        return jsonify({'status': 'success', 'runs': runs})
+
+    except Exception as e:
+        logger.error(f"Backtest runs API error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/backtest/runs/<int:run_id>')
+def get_backtest_run(run_id):
+    """저장된 백테스트 결과 조회 API"""
+    try:
+        result = backtest_store.load_backtest_run(run_id)
+        if result is None:
+            return jsonify({'error': f'Backtest run not found: {run_id}'}), 404
+        return jsonify({'status': 'success', 'result': result})
+
+    except Exception as e:
+        logger.error(f"Backtest run API error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/backtest/compare')
+def compare_backtest_runs():
+    """백테스트 결과 비교 API (?run_ids=1,2,3)"""
+    try:
+        run_ids = [int(x) for x in request.args.get('run_ids', '').split(',') if x.strip()]
+        return jsonify({'status': 'success', 'result': backtest_store.compare_backtest_runs(run_ids)})
+
+    except Exception as e:
+        logger.error(f"Backtest compare API error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/backtest/walk_forward', methods=['POST'])
+def run_walk_forward():
+    """워크포워드 최적화 실행 API"""
+    print("Received walk forward request")
+
+    try:
+        data = request.get_json()
+
+        max_workers = data.get('max_workers')
+        if max_workers is not None:
+            try:
+                max_workers = int(max_workers)
+            except (TypeError, ValueError):
+                return jsonify({'error': f'max_workers must be an integer: {max_workers!r}'}), 400
+            if not 1 <= max_workers <= (os.cpu_count() or 1):
+                return jsonify({'error': f'max_workers must be between 1 and {os.cpu_count() or 1}'}), 400
+
+        result = walk_forward.run_walk_forward(
+            ticker=data.get('ticker', '005930'),
+            start_date=data.get('start_date', '20230101'),
+            end_date=data.get('end_date', '20241231'),
+            strategy_name=data.get('strategy', 'MACD'),
+            param_grid=data.get('param_grid', {}),
+            train_size=int(data.get('train_size', 120)),
+            test_size=int(data.get('test_size', 20)),
+            metric=data.get('metric', 'return'),
+            max_workers=max_workers,
+        )
+
+        return jsonify({
+            'status': 'success',
+            'result': result
+        })
+
+    except Exception as e:
+        logger.error(f"Walk forward API error: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/dev/reload', methods=['POST'])
 def reload_modules():
     """개발용: 모듈 리로드 API"""
@@ -0,0 +1,300 @@
+"""
+    워크포워드(Walk-Forward) 최적화 모듈
+
+    동작 구조
+        1. 전체 기간의 가격 데이터를 한 번만 불러와서 캐시해둠. (_PRICE_CACHE)
+        2. 거래일을 기준으로 train / test 윈도우를 겹치게(rolling) 나눔.
+        3. 파라미터 조합별로 지표를 전체 기간에 대해 한 번만 계산. (_INDICATOR_CACHE)
+           -> 지표는 과거 데이터만 사용하므로, 전체 기간에서 계산한 뒤 윈도우로 잘라 써도 결과가 같음.
+           -> 겹치는 윈도우끼리 지표를 다시 계산하지 않음.
+        4. 각 train 윈도우에서 파라미터 조합들을 병렬로 평가하고, 점수가 가장 높은 조합을 선택.
+        5. 선택된 파라미터를 바로 다음 test 윈도우에 적용.
+        6. test 윈도우들의 equity curve를 이어붙여 out-of-sample 결과를 만듦.
+"""
+
+import itertools
+import json
+import logging
+import math
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from module import stock_data_manager, stock_orderer
+from module.common import frame_schema
+from core.trader import STRATEGIES
+
+WARMUP_DAYS = 120           # 지표 계산용 앞쪽 여유 기간 (일)
+TRADING_DAYS_PER_YEAR = 252
+
+logger = logging.getLogger(__name__)
+
+# 캐시 최대 항목 수 (visualizer 서버처럼 오래 떠 있는 프로세스에서 계속 늘어나지 않도록, 오래 안 쓴 것부터 버림)
+PRICE_CACHE_SIZE = 8
+INDICATOR_CACHE_SIZE = 128
+
+# (ticker, start_date, end_date) -> 가격 데이터프레임
+_PRICE_CACHE = OrderedDict()
+
+# (strategy_name, params_key, ticker, start_date, end_date) -> 지표 계산이 끝난 전략 인스턴스
+# 프로세스마다 따로 존재하며, 같은 프로세스 안에서는 윈도우가 바뀌어도 재사용됨.
+_INDICATOR_CACHE = OrderedDict()
+
+
+##############################################################################################
+# 데이터 / 지표 캐시
+##############################################################################################
+def _cache_get(cache, key):
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+def _cache_put(cache, key, value, max_size):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > max_size:
+        cache.popitem(last=False)
+
+def load_price_data(ticker, start_date, end_date, warmup_days=WARMUP_DAYS):
+    """
+    워크포워드 전체 기간의 가격 데이터를 불러옵니다. (지표 계산용 warmup 기간 포함)
+    같은 (ticker, 기간) 요청은 캐시된 데이터를 그대로 반환합니다.
+    """
+    cache_key = (ticker, start_date, end_date)
+    cached = _cache_get(_PRICE_CACHE, cache_key)
+    if cached is not None:
+        return cached
+
+    load_start = stock_data_manager.get_offset_date(start_date, -warmup_days)
+    dataFrame = stock_data_manager.get_itempricechart_2(
+        ticker=ticker,
+        start_date=load_start, end_date=end_date
+    )
+    if dataFrame is None or dataFrame.empty:
+        raise ValueError(f"No price data for {ticker} ({load_start} ~ {end_date})")
+
+    dataFrame = dataFrame.drop_duplicates(subset=['date']).reset_index(drop=True)
+    # 작업마다 프로세스로 전달되므로 dtype을 줄여서 보관 (float32 가격, 정수 날짜)
+    dataFrame = frame_schema.apply_price_schema(dataFrame, copy=False)
+    _cache_put(_PRICE_CACHE, cache_key, dataFrame, PRICE_CACHE_SIZE)
+    return dataFrame
+
+def _params_key(params):
+    return json.dumps(params, sort_keys=True)
+
+def get_prepared_strategy(strategy_name, params, ticker, price_frame, data_key=None):
+    """
+    지표 계산이 끝난 전략 인스턴스를 반환합니다.
+    같은 (전략, 파라미터, 데이터)에 대해서는 set_data를 한 번만 호출하고, 이후에는 상태만 초기화해서 재사용합니다.
+    """
+    cache_key = (strategy_name, _params_key(params), ticker, data_key)
+    strategy = _cache_get(_INDICATOR_CACHE, cache_key)
+
+    if strategy is None:
+        strategy_class = STRATEGIES.get(strategy_name)
+        if strategy_class is None:
+            raise ValueError(f"Unknown strategy: {strategy_name}")
+
+        strategy = strategy_class(**params)
+        strategy.prune_intermediates = True     # 캐시에 파라미터 조합마다 남으므로 중간 컬럼은 지움
+        strategy.set_data(ticker, price_frame.copy())   # 일부 전략은 넘겨받은 프레임을 직접 수정함
+        _cache_put(_INDICATOR_CACHE, cache_key, strategy, INDICATOR_CACHE_SIZE)
+
+    strategy.reset_state()
+    return strategy
+
+def clear_cache():
+    """가격 / 지표 캐시 초기화"""
+    _PRICE_CACHE.clear()
+    _INDICATOR_CACHE.clear()
+
+
+##############################################################################################
+# 윈도우 / 파라미터
+##############################################################################################
+def split_walk_forward_windows(dates, train_size, test_size, step=None):
+    """
+    거래일 리스트를 rolling train / test 윈도우로 나눕니다.
+
+    Args:
+        dates (list[str]): YYYYMMDD 형식의 거래일 리스트 (오름차순)
+        train_size (int): train 윈도우 거래일 수
+        test_size (int): test 윈도우 거래일 수
+        step (int): 다음 윈도우로 이동할 거래일 수 (기본값: test_size -> test 구간이 겹치지 않음)
+
+    Returns:
+        list[dict]: {'train': [...], 'test': [...]} 리스트
+    """
+    if train_size <= 0 or test_size <= 0:
+        raise ValueError("train_size and test_size must be positive")
+
+    step = test_size if step is None else step
+    if step <= 0:
+        raise ValueError("step must be positive")
+
+    windows = []
+    start = 0
+    while start + train_size < len(dates):
+        train = dates[start:start + train_size]
+        test = dates[start + train_size:start + train_size + test_size]
+        windows.append({'train': train, 'test': test})
+        start += step
+
+    return windows
+
+def expand_param_grid(param_grid):
+    """
+    {'rsi_period': [9, 14], 'oversold_threshold': [25, 30]} 형태의 그리드를
+    파라미터 dict 리스트로 펼칩니다.
+    """
+    if not param_grid:
+        return [{}]
+
+    names = sorted(param_grid.keys())
+    values = [param_grid[name] if isinstance(param_grid[name], (list, tuple)) else [param_grid[name]]
+              for name in names]
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+##############################################################################################
+# 시뮬레이션 / 평가
+##############################################################################################
+def simulate(strategy, dates):
+    """
+    주어진 거래일 구간에서 전략을 실행하고 equity curve를 반환합니다.
+
+    Returns:
+        list[tuple[str, float]]: (날짜, 포트폴리오 가치) 리스트
+    """
+    orderer = stock_orderer.Columnar_BackTest_Orderer(record_hold=False)
+
+    for date in dates:
+        try:
+            res = strategy.run(target_time=date)
+            orderer.place_order(order_info=res)
+        except ValueError:
+            # 해당 날짜 데이터가 없는 경우 -> 가치만 기록
+            orderer.record_equity(date)
+
+    equity_time, equity_value = orderer.get_equity_curve()
+    return [(str(t), v) for t, v in zip(equity_time.tolist(), equity_value.tolist())]
+
+def score_equity(equity, metric="return"):
+    """
+    equity curve의 점수를 계산합니다.
+    - return : 구간 수익률
+    - sharpe : 일간 수익률 기준 연환산 샤프 지수
+    """
+    if len(equity) < 2:
+        return 0.0
+
+    values = [v for _, v in equity]
+    if metric == "return":
+        return values[-1] / values[0] - 1.0
+
+    if metric == "sharpe":
+        returns = [values[i] / values[i - 1] - 1.0 for i in range(1, len(values))]
+        mean = sum(returns) / len(returns)
+        var = sum((r - mean) ** 2 for r in returns) / len(returns)
+        if var == 0:
+            return 0.0
+        return mean / math.sqrt(var) * math.sqrt(TRADING_DAYS_PER_YEAR)
+
+    raise ValueError(f"Unknown metric: {metric}")
+
+def _evaluate_params(task):
+    """
+    (프로세스 풀 작업) 하나의 파라미터 조합을 모든 train 윈도우에서 평가합니다.
+    지표는 조합당 한 번만 계산되고, 윈도우마다 상태만 초기화해서 재사용됩니다.
+    """
+    strategy_name, params, ticker, price_frame, data_key, train_windows, metric = task
+
+    scores = []
+    for dates in train_windows:
+        strategy = get_prepared_strategy(strategy_name, params, ticker, price_frame, data_key)
+        scores.append(score_equity(simulate(strategy, dates), metric))
+    return params, scores
+
+
+##############################################################################################
+# 워크포워드 실행
+##############################################################################################
+def run_walk_forward(ticker, start_date, end_date, strategy_name, param_grid=None,
+                     train_size=120, test_size=20, step=None,
+                     metric="return", max_workers=None):
+    """
+    워크포워드 최적화 실행
+
+    Args:
+        ticker (str): 종목 코드
+        start_date (str), end_date (str): YYYYMMDD 형식의 전체 기간
+        strategy_name (str): STRATEGIES에 등록된 전략 이름
+        param_grid (dict): 전략 생성자 파라미터 그리드
+        train_size, test_size, step (int): 윈도우 크기 (거래일 수)
+        metric (str): train 윈도우에서 파라미터를 고르는 기준 ("return" 또는 "sharpe")
+        max_workers (int): 병렬 프로세스 수 (1이면 현재 프로세스에서 실행)
+
+    Returns:
+        dict: 윈도우별 결과와 이어붙인 out-of-sample equity curve
+    """
+    price_frame = load_price_data(ticker, start_date, end_date)
+    data_key = (start_date, end_date)
+
+    dates = [d for d in price_frame['date'].astype(str).tolist() if start_date <= d <= end_date]
+    windows = split_walk_forward_windows(dates, train_size, test_size, step)
+    if not windows:
+        raise ValueError("Not enough data for a single train/test window")
+
+    candidates = expand_param_grid(param_grid)
+    train_windows = [w['train'] for w in windows]
+    tasks = [(strategy_name, params, ticker, price_frame, data_key, train_windows, metric)
+             for params in candidates]
+
+    # 파라미터 조합별로 병렬 평가 (조합 하나 = 작업 하나 -> 프로세스 안에서 지표 재사용)
+    if max_workers == 1 or len(tasks) == 1:
+        results = [_evaluate_params(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_evaluate_params, tasks))
+
+    # 윈도우별 최적 파라미터 선택 후 test 윈도우에 적용
+    window_results = []
+    equity_curve = []
+    capital = None
+
+    for i, window in enumerate(windows):
+        best_params, best_scores = max(results, key=lambda r: r[1][i])
+
+        strategy = get_prepared_strategy(strategy_name, best_params, ticker, price_frame, data_key)
+        test_equity = simulate(strategy, window['test'])
+
+        # 이전 test 윈도우의 마지막 가치에서 이어지도록 스케일 조정
+        base = test_equity[0][1]
+        capital = base if capital is None else capital
+        for date, value in test_equity:
+            equity_curve.append((date, capital * value / base))
+        capital = equity_curve[-1][1]
+
+        window_results.append({
+            'train_start': window['train'][0],
+            'train_end': window['train'][-1],
+            'test_start': window['test'][0],
+            'test_end': window['test'][-1],
+            'params': best_params,
+            'train_score': best_scores[i],
+            'test_return': score_equity(test_equity, "return"),
+        })
+        logger.debug("[WF] %s ~ %s | params: %s | train %s: %.4f | test return: %.4f",
+                     window['test'][0], window['test'][-1], best_params,
+                     metric, best_scores[i], window_results[-1]['test_return'])
+
+    total_return = equity_curve[-1][1] / equity_curve[0][1] - 1.0 if equity_curve else 0.0
+
+    return {
+        'ticker': ticker,
+        'strategy': strategy_name,
+        'metric': metric,
+        'windows': window_results,
+        'equity_curve': [{'date': d, 'value': v} for d, v in equity_curve],
+        'total_return': total_return,
+    }
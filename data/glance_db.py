@@ -19,6 +19,7 @@ from datetime import datetime
 # 조회할 데이터베이스 파일 목록 (data 폴더 기준)
 DB_FILES = [
     "stock_data.db",
+    "backtest.db",
     # 추가 데이터베이스 파일들을 여기에 추가
 ]
 
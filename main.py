@@ -7,6 +7,7 @@ import sys
 
 from core import visualizer, trader, server
 from module import stock_data_manager
+from module.common import metrics
 
 # INVEST_TYPE = "PROD"  # 실전투자
 INVEST_TYPE = "VPS"    # 모의투자
@@ -34,12 +35,22 @@ def signal_handler(signum, frame):
     print("\n시그널을 받았습니다. 모든 프로세스를 종료합니다...")
     shutdown_event.set()
 
+def run_with_profile(name, func):
+    """AUTOTRADER_PROFILE 환경 변수가 있으면 cProfile / tracemalloc으로 감싸서 실행"""
+    with metrics.profile_from_env(name):
+        return func()
+
 def run_flask_server():
-    """플라스크 서버 실행"""
+    """플라스크 서버 실행
+
+    AUTOTRADER_PROFILE=cpu이면 "flask" 프로파일은 서버 시작 / 종료(메인 스레드)만,
+    웹훅 핸들러 시간은 요청 스레드마다 측정해서 합친 "flask_requests" 프로파일에 저장됨
+    """
     try:
         print("Starting Flask server...")
         # visualizer.run_server()
-        server.run_server()
+        with metrics.profile_requests_from_env("flask_requests", server.app):
+            run_with_profile("flask", server.run_server)
         
     except Exception as e:
         print(f"Flask server error: {e}")
@@ -58,7 +69,9 @@ def run_trader():
             if hasattr(trader_instance, 'set_shutdown_event'):
                 trader_instance.set_shutdown_event(shutdown_event)
             
-            trader_thread = threading.Thread(target=trader_instance.run)
+            trader_thread = threading.Thread(
+                target=run_with_profile, args=(f"trader_{TraderClass.__name__}", trader_instance.run)
+            )
             trader_thread.name = f"Trader-{TraderClass.__name__}"
             trader_thread.daemon = True  # 데몬 스레드로 설정
             
@@ -0,0 +1,380 @@
+"""
+    실시간 틱 -> 봉 집계
+
+    웹소켓 체결 틱(ccnl_krx, H0STCNT0)을 종목별 봉으로 모아서, 완성된 봉을 구독자에게 넘기고 배치로 DB에 저장합니다.
+    기존 전략(일봉 기준 set_data / run)을 분봉으로 돌릴 수 있도록 history()는 가격 데이터프레임 형식으로 반환합니다.
+
+    봉 종류 (spec)
+        "1s", "30s", "1m", "5m", "1h" : 시간 봉 (장 시작 기준이 아니라 자정 기준 구간, 09:00 / 09:05 ...)
+        "v10000"                     : 거래량 봉 (누적 거래량이 10000 이상이 되면 완성, 틱을 나누지 않음)
+        "t100"                       : 틱 수 봉 (체결 100건마다 완성)
+
+    봉 완성 시점
+        - 시간 봉: 다음 구간의 틱이 들어오거나, advance(date, time)로 시각이 구간 끝을 지났을 때
+        - 모든 봉: 날짜가 바뀌거나 장 마감 시각이 지나면 (진행 중인 봉을 그대로 완성 처리)
+        - 거래일이 아닌 날(거래일 달력 기준) / 정규장 밖의 틱은 버림
+
+    봉의 date는 구간 시작 시각 YYYYMMDDHHMMSS (거래량 / 틱 수 봉은 첫 틱 시각)
+
+    웹소켓이 끊겼던 구간은 backfill()로 REST 1분봉을 받아서 분 단위 시간 봉을 다시 채움 (module/gap_backfill.py)
+"""
+
+from collections import defaultdict, deque, namedtuple
+import re
+import time
+
+import pandas as pd
+
+from module.common import metrics
+
+TRADE_TR = "H0STCNT0"
+# add_records에서 읽을 체결 레코드 컬럼 (종목, 날짜 YYYYMMDD, 시각 HHMMSS, 가격, 체결량) - ccnl_krx 기준
+TRADE_FIELDS = ("MKSC_SHRN_ISCD", "BSOP_DATE", "STCK_CNTG_HOUR", "STCK_PRPR", "CNTG_VOL")
+
+# 국가별 정규장 (HHMMSS, 종가 단일가 체결 포함)
+SESSIONS = {
+    "KR": ("090000", "153000"),
+}
+
+Bar = namedtuple("Bar", ["ticker", "spec", "date", "open", "high", "low", "close", "volume", "amount", "ticks"])
+
+_TIME_UNITS = {"s": 1, "m": 60, "h": 3600}
+
+
+def parse_bar_spec(spec):
+    """
+    봉 종류 문자열 -> (kind, size)
+        "5m" -> ("time", 300), "v10000" -> ("volume", 10000), "t100" -> ("tick", 100)
+    """
+    match = re.fullmatch(r"(\d+)([smh])", spec)
+    if match:
+        return "time", int(match.group(1)) * _TIME_UNITS[match.group(2)]
+    match = re.fullmatch(r"([vt])(\d+)", spec)
+    if match:
+        return ("volume" if match.group(1) == "v" else "tick"), int(match.group(2))
+    raise ValueError(f"Unknown bar spec: {spec}")
+
+def _seconds(hhmmss):
+    hhmmss = int(hhmmss)
+    return hhmmss // 10000 * 3600 + hhmmss // 100 % 100 * 60 + hhmmss % 100
+
+def _hhmmss(seconds):
+    return f"{seconds // 3600:02d}{seconds // 60 % 60:02d}{seconds % 60:02d}"
+
+
+##############################################################################################
+# 거래일 달력
+##############################################################################################
+class TradingCalendar:
+    """
+    stock_data_manager.get_trading_days 기반 거래일 확인 (연도별 캐시)
+    거래일 정보를 못 가져오면 평일을 거래일로 봄
+    """
+    def __init__(self, country_code="KR"):
+        self.country_code = country_code
+        self._years = {}
+
+    def is_trading_day(self, date):
+        year = date[:4]
+        days = self._years.get(year)
+        if days is None:
+            try:
+                from module import stock_data_manager
+                days = {d.strftime("%Y%m%d") for d in stock_data_manager.get_trading_days(year, self.country_code)}
+            except Exception as e:
+                print(f"거래일 달력 로드 실패: {e}")
+                days = set()
+            self._years[year] = days
+
+        if not days:
+            return pd.Timestamp(date).weekday() < 5
+        return date in days
+
+
+##############################################################################################
+# 집계기
+##############################################################################################
+class _BarState:
+    __slots__ = ("date", "start", "end", "open", "high", "low", "close", "volume", "amount", "ticks")
+
+    def __init__(self, date, start, end, price, volume):
+        self.date, self.start, self.end = date, start, end
+        self.open = self.high = self.low = self.close = price
+        self.volume = volume
+        self.amount = price * volume
+        self.ticks = 1
+
+    def update(self, price, volume):
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+        self.volume += volume
+        self.amount += price * volume
+        self.ticks += 1
+
+
+class BarAggregator:
+    def __init__(self, specs=("1m",), country_code="KR", calendar=None, history=500, regular_session_only=True,
+                 fields=TRADE_FIELDS):
+        """
+        :param specs: 집계할 봉 종류 리스트
+        :param calendar: is_trading_day(YYYYMMDD)를 가진 객체 (기본 TradingCalendar, False면 확인 안 함)
+        :param history: 종목 x 봉 종류별로 보관할 완성 봉 수
+        :param regular_session_only: 정규장(SESSIONS) 밖 틱 버림
+        :param fields: add_records에서 읽을 체결 컬럼 이름 (업비트는 upbit_ws.TRADE_FIELDS)
+        """
+        self.specs = {spec: parse_bar_spec(spec) for spec in specs}
+        self.fields = fields
+        self.session = tuple(_seconds(t) for t in SESSIONS.get(country_code, ("000000", "235959")))
+        self.calendar = TradingCalendar(country_code) if calendar is None else calendar
+        self.regular_session_only = regular_session_only
+
+        self._bars = {}                                              # (ticker, spec) -> _BarState
+        self._history = defaultdict(lambda: deque(maxlen=history))   # (ticker, spec) -> deque[Bar]
+        self._subscribers = []                                       # (callback, spec, ticker)
+        self._trading_day = {}
+        self._clock = None                                           # 마지막 advance (date, seconds)
+
+    ##########################################################################################
+    # 구독
+    ##########################################################################################
+    def subscribe(self, callback, spec=None, ticker=None):
+        """완성 봉 콜백 등록 (spec / ticker로 거를 수 있음)"""
+        self._subscribers.append((callback, spec, ticker))
+
+    def unsubscribe(self, callback):
+        self._subscribers = [s for s in self._subscribers if s[0] is not callback]
+
+    def _emit(self, ticker, spec, state):
+        bar = Bar(ticker, spec, f"{state.date}{_hhmmss(state.start)}", state.open, state.high, state.low,
+                  state.close, state.volume, state.amount, state.ticks)
+        self._history[(ticker, spec)].append(bar)
+        self._publish(bar)
+
+    def _publish(self, bar):
+        ticker, spec = bar.ticker, bar.spec
+        for callback, spec_filter, ticker_filter in self._subscribers:
+            if (spec_filter is None or spec_filter == spec) and (ticker_filter is None or ticker_filter == ticker):
+                try:
+                    callback(bar)
+                except Exception as e:
+                    print(f"봉 구독자 처리 실패 ({ticker} {spec}): {e}")
+
+    ##########################################################################################
+    # 입력
+    ##########################################################################################
+    def _accept(self, date, seconds):
+        if self.regular_session_only and not (self.session[0] <= seconds <= self.session[1]):
+            return False
+        if self.calendar is False:
+            return True
+        accepted = self._trading_day.get(date)
+        if accepted is None:
+            accepted = self._trading_day[date] = self.calendar.is_trading_day(date)
+        return accepted
+
+    def add_tick(self, ticker, date, hhmmss, price, volume):
+        """
+        체결 틱 하나 반영
+        Args:
+            date (str): YYYYMMDD
+            hhmmss (str): 체결 시각 HHMMSS
+        Returns:
+            bool: 집계에 반영했는지 (거래일 / 장 시간 밖이면 False)
+        """
+        seconds = _seconds(hhmmss)
+        if not self._accept(date, seconds):
+            return False
+
+        for spec, (kind, size) in self.specs.items():
+            key = (ticker, spec)
+            state = self._bars.get(key)
+
+            if state is not None and (state.date != date or (kind == "time" and seconds >= state.end)):
+                # 날짜가 바뀌었거나 시간 구간이 끝남
+                del self._bars[key]
+                self._emit(ticker, spec, state)
+                state = None
+
+            if state is None:
+                start = seconds - seconds % size if kind == "time" else seconds
+                end = start + size if kind == "time" else None
+                self._bars[key] = state = _BarState(date, start, end, price, volume)
+            else:
+                state.update(price, volume)
+
+            if (kind == "volume" and state.volume >= size) or (kind == "tick" and state.ticks >= size):
+                del self._bars[key]
+                self._emit(ticker, spec, state)
+        return True
+
+    @metrics.timed("bar_aggregator.add_records")
+    def add_records(self, records, columns):
+        """
+        체결 레코드 튜플 리스트 반영 (ccnl_krx / KISWebSocket result_format="records", 업비트 trade)
+        Returns:
+            int: 반영한 틱 수
+        """
+        index = {col: i for i, col in enumerate(columns)}
+        i_ticker, i_date, i_time, i_price, i_volume = (index[field] for field in self.fields)
+
+        added = 0
+        for record in records:
+            if record[i_price] is None or record[i_volume] is None:
+                continue
+            added += self.add_tick(record[i_ticker], record[i_date], record[i_time],
+                                   record[i_price], record[i_volume])
+        if records:
+            self.advance(records[-1][i_date], records[-1][i_time])
+        return added
+
+    def advance(self, date, hhmmss):
+        """
+        현재 시각까지 끝난 봉을 완성 처리 (틱이 끊긴 종목의 봉도 제때 내보내기 위함)
+        같은 초에 여러 번 불려도 한 번만 확인
+        """
+        seconds = _seconds(hhmmss)
+        if self._clock == (date, seconds):
+            return
+        self._clock = (date, seconds)
+
+        session_over = seconds > self.session[1]
+        for key, state in list(self._bars.items()):
+            if state.date != date or session_over or (state.end is not None and seconds >= state.end):
+                del self._bars[key]
+                self._emit(key[0], key[1], state)
+
+    def backfill(self, ticker, minute_bars, until):
+        """
+        웹소켓이 끊긴 구간을 REST 1분봉으로 보충 (module/gap_backfill.py)
+        분 단위 시간 봉만 다시 만들 수 있음 (초 단위 / 거래량 / 틱 수 봉은 보충하지 않음)
+
+        - until이 속한 구간의 봉은 진행 중인 봉으로 두고, 이후 실시간 틱이 이어서 갱신
+        - 끊기기 전의 진행 중인 봉 / 같은 시각의 완성 봉(끊긴 사이 advance로 일부만 완성된 봉)은 보충한 봉으로 교체
+        - 보충해서 완성된 봉은 구독자에게 다시 전달 (BarWriter는 같은 키로 덮어씀)
+
+        Args:
+            minute_bars (list): (date YYYYMMDDHHMMSS, open, high, low, close, volume, amount) 완성된 1분봉 (오름차순)
+            until (str): 재접속 시각 YYYYMMDDHHMMSS
+        Returns:
+            list[Bar]: 완성 처리한 봉
+        """
+        until_date, until_seconds = until[:8], _seconds(until[8:])
+        completed = []
+
+        for spec, (kind, size) in self.specs.items():
+            if kind != "time" or size % 60:
+                continue
+            key = (ticker, spec)
+
+            buckets = {}
+            for date, open_, high, low, close, volume, amount in minute_bars:
+                day, seconds = date[:8], _seconds(date[8:14])
+                if not self._accept(day, seconds):
+                    continue
+                start = seconds - seconds % size
+                state = buckets.get((day, start))
+                if state is None:
+                    state = buckets[(day, start)] = _BarState(day, start, start + size, open_, volume)
+                    state.high, state.low, state.amount, state.ticks = high, low, amount, 0
+                else:
+                    state.high = max(state.high, high)
+                    state.low = min(state.low, low)
+                    state.volume += volume
+                    state.amount += amount
+                state.close = close
+            if not buckets:
+                continue
+
+            # 보충 구간까지의 진행 중인 봉은 버림 (보충한 봉이 같은 분봉을 모두 포함)
+            current = self._bars.get(key)
+            if current is not None and (current.date, current.start) <= max(buckets):
+                del self._bars[key]
+
+            bars = {bar.date: bar for bar in self._history[key]}
+            for (day, start), state in sorted(buckets.items()):
+                if day == until_date and state.end > until_seconds:
+                    if key not in self._bars:
+                        self._bars[key] = state
+                    continue
+                bar = Bar(ticker, spec, f"{day}{_hhmmss(start)}", state.open, state.high, state.low,
+                          state.close, state.volume, state.amount, state.ticks)
+                bars[bar.date] = bar
+                completed.append(bar)
+
+            history = self._history[key]
+            history.clear()
+            history.extend(bars[date] for date in sorted(bars))
+
+        for bar in completed:
+            self._publish(bar)
+        return completed
+
+    def flush(self):
+        """진행 중인 봉을 모두 완성 처리 (장 마감 / 종료 시)"""
+        for key, state in list(self._bars.items()):
+            del self._bars[key]
+            self._emit(key[0], key[1], state)
+
+    ##########################################################################################
+    # 조회
+    ##########################################################################################
+    def current(self, ticker, spec):
+        """진행 중인 봉 (없으면 None)"""
+        state = self._bars.get((ticker, spec))
+        if state is None:
+            return None
+        return Bar(ticker, spec, f"{state.date}{_hhmmss(state.start)}", state.open, state.high, state.low,
+                   state.close, state.volume, state.amount, state.ticks)
+
+    def history(self, ticker, spec, include_current=False, limit=None):
+        """
+        완성 봉을 가격 데이터프레임 형식으로 반환 (strategy.set_data에 바로 사용)
+        :param limit: 최근 limit개 봉만 (None이면 보관 중인 봉 전부)
+        Returns:
+            pd.DataFrame: date, open, high, low, close, volume, amount
+        """
+        bars = list(self._history.get((ticker, spec), ()))
+        if include_current and (ticker, spec) in self._bars:
+            bars.append(self.current(ticker, spec))
+        if limit is not None:
+            bars = bars[-limit:]
+        df = pd.DataFrame(bars, columns=Bar._fields)
+        return df[["date", "open", "high", "low", "close", "volume", "amount"]]
+
+
+##############################################################################################
+# 배치 저장
+##############################################################################################
+class BarWriter:
+    """
+    완성 봉을 모아서 db_manager.save_bars_to_db로 한 번에 저장
+    aggregator.subscribe(writer.add)로 연결하고, 종료 시 flush() 호출
+    """
+    def __init__(self, batch_size=500, flush_interval=5.0, country_code="KR", api_name="ws_bar", clock=time.monotonic):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.country_code = country_code
+        self.api_name = api_name
+        self.clock = clock
+
+        self._pending = []
+        self._last_flush = clock()
+        self.saved = 0
+
+    def add(self, bar):
+        self._pending.append((bar.ticker, bar.date, bar.spec, bar.open, bar.high, bar.low, bar.close,
+                              bar.volume, bar.amount))
+        if len(self._pending) >= self.batch_size or self.clock() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        from module.common import db_manager
+
+        pending, self._pending = self._pending, []
+        self._last_flush = self.clock()
+        if pending:
+            self.saved += db_manager.save_bars_to_db(pending, country_code=self.country_code, api_name=self.api_name)
+        return len(pending)
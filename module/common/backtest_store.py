@@ -0,0 +1,315 @@
+'''
+    백테스트 결과 저장소 (SQLite)
+
+    - 실행 정보(run), equity curve, 거래 기록을 테이블로 저장합니다.
+    - (ticker, 기간, 전략, 파라미터, 데이터 버전)으로 만든 content hash로 같은 백테스트를 다시 요청하면
+      다시 실행하지 않고 저장된 결과를 바로 반환할 수 있습니다.
+      데이터 버전(make_data_version)은 불러온 가격 데이터의 날짜 범위 / 행 수 / 종가 hash라서
+      가격 DB가 바뀌면 hash도 바뀌어 예전 결과를 쓰지 않습니다.
+'''
+
+import sqlite3
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+DATA_DIR = "data"
+DB_PATH = os.path.join(DATA_DIR, "backtest.db")
+
+# 테이블을 만든 DB 파일 (프로세스에서 한 번만 초기화, DB_PATH가 바뀌면 다시 초기화)
+_INITIALIZED_PATH = None
+_INIT_LOCK = threading.Lock()
+
+##############################################################################################
+# 초기화
+##############################################################################################
+def _init_database():
+    """백테스트 결과 테이블 초기화"""
+    os.makedirs(os.path.dirname(DB_PATH) or ".", exist_ok=True)
+    with sqlite3.connect(DB_PATH) as conn:
+        cursor = conn.cursor()
+
+        # 실행 정보 테이블
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS backtest_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_hash TEXT NOT NULL UNIQUE,
+                ticker TEXT NOT NULL,
+                strategy TEXT NOT NULL,
+                params TEXT NOT NULL,
+                params_hash TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                initial_balance REAL,
+                final_value REAL,
+                total_return REAL,
+                max_drawdown REAL,
+                trade_count INTEGER,
+                positions TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # equity curve 테이블
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS backtest_equity (
+                run_id INTEGER NOT NULL,
+                date TEXT NOT NULL,
+                value REAL NOT NULL
+            )
+        ''')
+
+        # 거래 기록 테이블 (HOLD 제외)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS backtest_trades (
+                run_id INTEGER NOT NULL,
+                target_time TEXT NOT NULL,
+                signal_type TEXT NOT NULL,
+                ticker TEXT NOT NULL,
+                position_size REAL,
+                current_price REAL,
+                quantity INTEGER,
+                confidence REAL
+            )
+        ''')
+
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_backtest_runs_lookup ON backtest_runs (ticker, strategy, params_hash)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_backtest_equity_run ON backtest_equity (run_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_backtest_trades_run ON backtest_trades (run_id)')
+        conn.commit()
+    conn.close()
+
+def _connect():
+    global _INITIALIZED_PATH
+    if _INITIALIZED_PATH != DB_PATH:
+        with _INIT_LOCK:
+            if _INITIALIZED_PATH != DB_PATH:
+                _init_database()
+                _INITIALIZED_PATH = DB_PATH
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+##############################################################################################
+# hash
+##############################################################################################
+def make_params_hash(params):
+    """파라미터 dict의 hash (키 순서와 무관)"""
+    return hashlib.sha256(json.dumps(params or {}, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def make_data_version(frame):
+    """
+    가격 데이터프레임의 버전 (첫 / 마지막 날짜, 행 수, 종가 hash)
+    같은 기간을 요청해도 가격 DB에 데이터가 추가 / 수정되면 값이 달라짐
+    """
+    if frame is None or len(frame) == 0:
+        return None
+    dates = frame['date']
+    return {
+        'first_date': str(dates.iloc[0]),
+        'last_date': str(dates.iloc[-1]),
+        'rows': int(len(frame)),
+        'close': hashlib.sha256(frame['close'].to_numpy(dtype='float64').tobytes()).hexdigest()[:16],
+    }
+
+def make_run_hash(ticker, start_date, end_date, strategy, params, data_version=None):
+    """(데이터 범위, 전략, 파라미터, 데이터 버전)으로 만든 백테스트 content hash"""
+    content = {
+        'ticker': ticker,
+        'start_date': str(start_date),
+        'end_date': str(end_date),
+        'strategy': strategy,
+        'params': params or {},
+        'data_version': data_version,
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def _max_drawdown(values):
+    peak = None
+    max_dd = 0.0
+    for value in values:
+        peak = value if peak is None else max(peak, value)
+        if peak > 0:
+            max_dd = max(max_dd, (peak - value) / peak)
+    return max_dd
+
+##############################################################################################
+# 저장 / 조회
+##############################################################################################
+def save_backtest_run(ticker, start_date, end_date, strategy, params, result,
+                      initial_balance=10000000, data_version=None):
+    """
+    백테스트 결과(orderer의 get_state() 형태)를 저장하고 run_id를 반환합니다.
+    같은 run_hash가 이미 있으면 기존 결과를 교체합니다.
+    """
+    run_hash = make_run_hash(ticker, start_date, end_date, strategy, params, data_version)
+    equity = result.get('equity_curve', [])
+    trades = [t for t in result.get('trade_history', []) if t.get('signal_type') != 'HOLD']
+
+    final_value = result.get('portfolioValue', initial_balance)
+    values = [e['value'] for e in equity]
+
+    with _connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM backtest_runs WHERE run_hash = ?", (run_hash,))
+        row = cursor.fetchone()
+        if row is not None:
+            _delete_run(cursor, row['id'])
+
+        cursor.execute('''
+            INSERT INTO backtest_runs
+            (run_hash, ticker, strategy, params, params_hash, start_date, end_date,
+             initial_balance, final_value, total_return, max_drawdown, trade_count, positions)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            run_hash, ticker, strategy, json.dumps(params or {}, sort_keys=True, default=str),
+            make_params_hash(params), str(start_date), str(end_date),
+            initial_balance, final_value, final_value / initial_balance - 1.0,
+            _max_drawdown(values), len(trades),
+            json.dumps(result.get('positions', {})),
+        ))
+        run_id = cursor.lastrowid
+
+        cursor.executemany(
+            "INSERT INTO backtest_equity (run_id, date, value) VALUES (?, ?, ?)",
+            [(run_id, str(e['date']), e['value']) for e in equity]
+        )
+        cursor.executemany('''
+            INSERT INTO backtest_trades
+            (run_id, target_time, signal_type, ticker, position_size, current_price, quantity, confidence)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (run_id, str(t['target_time']), t['signal_type'], t['ticker'], t.get('position_size'),
+             t.get('current_price'), t.get('quantity'), t.get('confidence'))
+            for t in trades
+        ])
+        conn.commit()
+
+    print(f"백테스트 결과가 저장되었습니다: run_id={run_id} ({ticker}, {strategy})")
+    return run_id
+
+def _delete_run(cursor, run_id):
+    cursor.execute("DELETE FROM backtest_equity WHERE run_id = ?", (run_id,))
+    cursor.execute("DELETE FROM backtest_trades WHERE run_id = ?", (run_id,))
+    cursor.execute("DELETE FROM backtest_runs WHERE id = ?", (run_id,))
+
+def delete_backtest_run(run_id):
+    """백테스트 결과 삭제"""
+    with _connect() as conn:
+        _delete_run(conn.cursor(), run_id)
+        conn.commit()
+
+def _run_row_to_dict(row):
+    run = dict(row)
+    run['params'] = json.loads(run['params'])
+    run.pop('positions', None)
+    return run
+
+def find_backtest_run(ticker, start_date, end_date, strategy, params, data_version=None):
+    """같은 (데이터 범위, 전략, 파라미터, 데이터 버전)으로 실행한 결과가 있으면 run_id 반환, 없으면 None"""
+    run_hash = make_run_hash(ticker, start_date, end_date, strategy, params, data_version)
+    with _connect() as conn:
+        row = conn.execute("SELECT id FROM backtest_runs WHERE run_hash = ?", (run_hash,)).fetchone()
+        return row['id'] if row is not None else None
+
+def load_backtest_run(run_id):
+    """
+    저장된 백테스트 결과를 orderer의 get_state()와 같은 형태로 반환합니다.
+    (run 메타데이터는 'run' 키에 포함)
+    """
+    with _connect() as conn:
+        row = conn.execute("SELECT * FROM backtest_runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+
+        equity = conn.execute(
+            "SELECT date, value FROM backtest_equity WHERE run_id = ? ORDER BY rowid", (run_id,)
+        ).fetchall()
+        trades = conn.execute('''
+            SELECT target_time, signal_type, ticker, position_size, current_price, quantity, confidence
+            FROM backtest_trades WHERE run_id = ? ORDER BY rowid
+        ''', (run_id,)).fetchall()
+
+    positions = json.loads(row['positions']) if row['positions'] else {}
+    balance = row['final_value'] - sum(p['quantity'] * p['current_price'] for p in positions.values())
+
+    return {
+        "balance": balance,
+        "portfolioValue": row['final_value'],
+        "positions": positions,
+        "trade_history": [dict(t) for t in trades],
+        "equity_curve": [dict(e) for e in equity],
+        "last_update": row['created_at'],
+        "status": "stopped",
+        "run": _run_row_to_dict(row),
+    }
+
+def list_backtest_runs(ticker=None, strategy=None, params=None,
+                       start_date=None, end_date=None, order_by="created_at", limit=100):
+    """
+    저장된 백테스트 실행 목록 조회 (필터는 모두 선택)
+
+    Args:
+        params (dict): 같은 파라미터 조합만 조회
+        start_date, end_date (str): 백테스트 기간이 이 범위 안에 있는 실행만 조회
+        order_by (str): created_at, total_return, max_drawdown, final_value 중 하나 (내림차순)
+    """
+    if order_by not in ('created_at', 'total_return', 'max_drawdown', 'final_value'):
+        raise ValueError(f"Invalid order_by: {order_by}")
+
+    query = "SELECT * FROM backtest_runs WHERE 1 = 1"
+    args = []
+    if ticker:
+        query += " AND ticker = ?"
+        args.append(ticker)
+    if strategy:
+        query += " AND strategy = ?"
+        args.append(strategy)
+    if params is not None:
+        query += " AND params_hash = ?"
+        args.append(make_params_hash(params))
+    if start_date:
+        query += " AND start_date >= ?"
+        args.append(str(start_date))
+    if end_date:
+        query += " AND end_date <= ?"
+        args.append(str(end_date))
+
+    query += f" ORDER BY {order_by} DESC LIMIT ?"
+    args.append(int(limit))
+
+    with _connect() as conn:
+        return [_run_row_to_dict(row) for row in conn.execute(query, args).fetchall()]
+
+def compare_backtest_runs(run_ids):
+    """
+    여러 실행 결과를 비교합니다.
+    - 요약 지표와 날짜 기준으로 맞춘 equity curve(시작값 1.0으로 정규화)를 반환
+    """
+    runs = []
+    curves = {}
+    with _connect() as conn:
+        for run_id in run_ids:
+            row = conn.execute("SELECT * FROM backtest_runs WHERE id = ?", (run_id,)).fetchone()
+            if row is None:
+                continue
+            runs.append(_run_row_to_dict(row))
+
+            equity = conn.execute(
+                "SELECT date, value FROM backtest_equity WHERE run_id = ? ORDER BY rowid", (run_id,)
+            ).fetchall()
+            if equity:
+                base = equity[0]['value']
+                curves[run_id] = {e['date']: e['value'] / base for e in equity}
+
+    dates = sorted(set(d for curve in curves.values() for d in curve))
+    return {
+        'runs': runs,
+        'dates': dates,
+        'equity': {
+            run_id: [curve.get(d) for d in dates]
+            for run_id, curve in curves.items()
+        },
+    }
@@ -3,6 +3,8 @@ import pandas as pd
 from datetime import datetime
 import os
 
+from module.common import metrics
+
 DATA_DIR = "data"
 DB_PATH = os.path.join(DATA_DIR, "stock_data.db")
 # 날짜 관련
@@ -11,6 +13,7 @@ os.makedirs(DATA_DIR, exist_ok=True)
 ##############################################################################################
 # 데이터 저장 관련 로직 (SQLite)
 ##############################################################################################
+@metrics.timed("db.init_database")
 def _init_database():
     """데이터베이스 및 테이블 초기화"""
     try:
@@ -49,6 +52,12 @@ def _init_database():
                 )
             ''')
             
+            # 전 종목 최근 N봉 조회(스크리너)용 날짜 인덱스
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_stock_price_data_date
+                ON stock_price_data (period_code, api_name, date)
+            ''')
+
             # 처리된 데이터 테이블 (MACD, 볼린저 밴드 등)
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS processed_data (
@@ -101,6 +110,7 @@ def _init_database():
     except Exception as e:
         print(f"데이터베이스 초기화 실패: {e}")
 
+@metrics.timed("db.save_trading_days_to_db")
 def save_trading_days_to_db(trading_days, year, country_code):
     """거래일 정보를 데이터베이스에 저장"""
     try:
@@ -129,6 +139,7 @@ def save_trading_days_to_db(trading_days, year, country_code):
     except Exception as e:
         print(f"거래일 데이터 저장 실패: {e}")
 
+@metrics.timed("db.load_trading_days_from_db")
 def load_trading_days_from_db(year, country_code):
     """데이터베이스에서 거래일 정보 로드"""
     try:
@@ -147,6 +158,7 @@ def load_trading_days_from_db(year, country_code):
         print(f"거래일 데이터 로드 실패: {e}")
         return []
 
+@metrics.timed("db.check_date_exists_in_db")
 def check_date_exists_in_db(ticker, target_date, period_code='D', api_name='itemchartprice_history'):
     """데이터베이스에서 특정 날짜 데이터 존재 여부 확인"""
     try:
@@ -162,6 +174,7 @@ def check_date_exists_in_db(ticker, target_date, period_code='D', api_name='item
         print(f"날짜 존재 확인 중 오류: {e}")
         return False
 
+@metrics.timed("db.load_existing_data_from_db")
 def load_existing_data_from_db(ticker, start_date=None, end_date=None, period_code='D', api_name='itemchartprice_history'):
     """데이터베이스에서 기존 데이터 로드"""
     try:
@@ -185,6 +198,49 @@ def load_existing_data_from_db(ticker, start_date=None, end_date=None, period_co
         print(f"기존 데이터 로드 실패: {e}")
         return pd.DataFrame()
 
+@metrics.timed("db.load_latest_bars_from_db")
+def load_latest_bars_from_db(bars, end_date=None, tickers=None, period_code='D', api_name='itemchartprice_history'):
+    """
+    데이터베이스에서 전 종목의 최근 bars개 거래일 데이터를 한 번에 로드 (스크리너용)
+    거래일은 DB에 있는 날짜 기준으로 모든 종목에 공통으로 맞춤 (그 기간에 데이터가 없는 종목은 행이 적게 나옴)
+
+    Args:
+        bars (int): 불러올 최근 거래일 수
+        end_date (str): 마지막 날짜 (YYYYMMDD, 없으면 DB의 마지막 날짜)
+        tickers (list): 종목 제한 (없으면 전 종목)
+    Returns:
+        pd.DataFrame: ticker, date, open, high, low, close, volume (ticker, date 순 정렬)
+    """
+    try:
+        with sqlite3.connect(DB_PATH) as conn:
+            date_filter = " AND date <= ?" if end_date else ""
+            date_params = [end_date] if end_date else []
+
+            query = f"""
+                WITH recent_dates AS (
+                    SELECT DISTINCT date FROM stock_price_data
+                    WHERE period_code = ? AND api_name = ?{date_filter}
+                    ORDER BY date DESC
+                    LIMIT ?
+                )
+                SELECT ticker, date, open, high, low, close, volume
+                FROM stock_price_data
+                WHERE period_code = ? AND api_name = ?{date_filter}
+                  AND date >= (SELECT MIN(date) FROM recent_dates)
+            """
+            params = [period_code, api_name, *date_params, int(bars), period_code, api_name, *date_params]
+
+            if tickers:
+                query += f" AND ticker IN ({','.join('?' * len(tickers))})"
+                params.extend(tickers)
+
+            query += " ORDER BY ticker, date"
+            return pd.read_sql_query(query, conn, params=params)
+    except Exception as e:
+        print(f"최근 데이터 로드 실패: {e}")
+        return pd.DataFrame()
+
+@metrics.timed("db.save_data_to_db")
 def save_data_to_db(dataframe, ticker, country_code, period_code='D', api_name='itemchartprice_history'):
     """데이터를 데이터베이스에 저장"""
     try:
@@ -222,6 +278,34 @@ def save_data_to_db(dataframe, ticker, country_code, period_code='D', api_name='
     except Exception as e:
         print(f"데이터베이스 저장 실패: {e}")
 
+@metrics.timed("db.save_bars_to_db")
+def save_bars_to_db(bars, country_code='KR', api_name='ws_bar'):
+    """
+    실시간 집계 봉을 여러 종목 / 여러 주기 한 번에 저장 (분봉 등은 date에 YYYYMMDDHHMMSS)
+
+    Args:
+        bars (list): (ticker, date, period_code, open, high, low, close, volume, amount) 튜플 리스트
+    Returns:
+        int: 저장한 행 수
+    """
+    if not bars:
+        return 0
+    try:
+        rows = [(ticker, country_code, date, period_code, api_name, *values)
+                for ticker, date, period_code, *values in bars]
+        with sqlite3.connect(DB_PATH) as conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO stock_price_data
+                (ticker, country_code, date, period_code, api_name, open, high, low, close, volume, amount, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', rows)
+            conn.commit()
+            return len(bars)
+    except Exception as e:
+        print(f"봉 데이터 저장 실패: {e}")
+        return 0
+
+@metrics.timed("db.save_ticker_info_to_db")
 def save_ticker_info_to_db(dataframe):
     """종목 정보를 데이터베이스에 저장"""
     try:
@@ -248,6 +332,7 @@ def save_ticker_info_to_db(dataframe):
     except Exception as e:
         print(f"종목 정보 저장 실패: {e}")
 
+@metrics.timed("db.load_ticker_info_from_db")
 def load_ticker_info_from_db():
     """데이터베이스에서 종목 정보 로드"""
     try:
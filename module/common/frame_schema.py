@@ -0,0 +1,90 @@
+"""
+    가격 데이터프레임 스키마 / 메모리 관리
+
+    DB / API에서 가져온 가격 데이터는 가격이 float64(또는 object), 날짜가 문자열로 들어와서
+    전 종목을 한 번에 다루면 메모리가 먼저 부족해집니다. apply_price_schema()로 dtype을 줄여서 사용합니다.
+
+    스키마
+        open, high, low, close : float32 (정수 가격 2^24 = 16,777,216 까지는 정확히 표현됨)
+        volume                 : int64 (결측이 있으면 nullable Int64)
+        amount                 : float64 (거래대금은 float32 범위를 넘음)
+        date                   : int32 YYYYMMDD
+        ticker 등 문자열 컬럼   : category
+
+    코인(KRW 마켓)처럼 가격이 2^24를 넘을 수 있으면 price_dtype=np.float64로 사용해야 합니다.
+"""
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ("open", "high", "low", "close")
+CATEGORY_COLUMNS = ("ticker", "country_code", "period_code", "api_name", "market", "sector")
+
+
+def date_to_int(dates):
+    """날짜 시리즈 (YYYYMMDD 문자열, YYYY-MM-DD 문자열, datetime) -> int32 YYYYMMDD"""
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return (dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day).astype(np.int32)
+    if pd.api.types.is_integer_dtype(dates):
+        return dates.astype(np.int32)
+    return pd.to_numeric(dates.astype(str).str.replace("-", "", regex=False).str[:8]).astype(np.int32)
+
+def apply_price_schema(dataFrame, price_dtype=np.float32, copy=True):
+    """
+    가격 데이터프레임의 dtype을 스키마에 맞게 줄입니다.
+
+    Args:
+        dataFrame (pd.DataFrame): 가격 데이터 (없는 컬럼은 건너뜀)
+        price_dtype: 가격 컬럼 dtype (기본 float32)
+        copy (bool): False면 넘겨받은 프레임을 직접 수정
+    Returns:
+        pd.DataFrame
+    """
+    df = dataFrame.copy() if copy else dataFrame
+
+    for col in PRICE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(price_dtype)
+
+    if 'volume' in df.columns:
+        volume = pd.to_numeric(df['volume'], errors='coerce')
+        df['volume'] = volume.astype(np.int64) if volume.notna().all() else volume.astype('Int64')
+
+    if 'amount' in df.columns:
+        df['amount'] = pd.to_numeric(df['amount'], errors='coerce').astype(np.float64)
+
+    if 'date' in df.columns and len(df):
+        df['date'] = date_to_int(df['date'])
+
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+
+    return df
+
+
+##############################################################################################
+# 메모리 사용량
+##############################################################################################
+def memory_usage(dataFrame):
+    """데이터프레임 메모리 사용량 (bytes, object / category 내용 포함)"""
+    if dataFrame is None:
+        return 0
+    return int(dataFrame.memory_usage(deep=True).sum())
+
+def memory_report(dataFrame):
+    """
+    컬럼별 메모리 사용량
+    Returns:
+        dict: {'rows', 'total', 'columns': {컬럼: {'dtype', 'bytes'}}} (bytes 큰 순)
+    """
+    if dataFrame is None:
+        return {'rows': 0, 'total': 0, 'columns': {}}
+
+    usage = dataFrame.memory_usage(deep=True, index=False)
+    columns = sorted(zip(usage.index, usage.to_numpy(), dataFrame.dtypes), key=lambda x: -x[1])
+    return {
+        'rows': len(dataFrame),
+        'total': memory_usage(dataFrame),
+        'columns': {col: {'dtype': str(dtype), 'bytes': int(size)} for col, size, dtype in columns},
+    }
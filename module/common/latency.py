@@ -0,0 +1,355 @@
+"""
+    지연 시간 추적 (신호 수신 -> 주문 응답)
+
+    이벤트(웹훅 신호 / 실시간 시세) 하나마다 Trace를 만들고 단계별 monotonic 시각(time.perf_counter_ns)을 기록합니다.
+    이벤트가 끝나면 단계별 소요 시간을 히스토그램에 더하고, 한 줄 JSON으로 로그 파일에 남깁니다.
+    metrics(span)는 함수별 실행 시간이고, 여기는 이벤트 하나가 어느 단계에서 얼마나 기다리고 걸렸는지를 봅니다.
+
+    단계
+        웹훅   : parse -> market_lookup -> balance_check -> price_lookup -> order_submit (주문 응답까지)
+        라이브 : market -> strategy -> order_submit (EventPipeline, waits=True로 단계 사이 큐 대기도 <단계>.wait로 기록)
+        total  : 수신 ~ finish (웹훅은 HTTP 응답 직전)
+    같은 단계가 여러 번 실행되면 (잔고를 두 번 조회하는 등) 합산해서 한 번으로 기록합니다.
+
+    사용 예
+        tracer = latency.get_tracer("webhook")
+        with tracer.trace(endpoint="ta-signal") as trace:
+            ...
+            with latency.stage("price_lookup"):    # 현재 trace가 없으면 아무것도 하지 않음
+                ...
+
+    환경 변수
+        AUTOTRADER_LATENCY=0               : 추적 끄기 (기본 켜짐)
+        AUTOTRADER_LATENCY_DIR=data/latency : 로그 폴더 ({이름}_{YYYYMMDD}.jsonl)
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+ENABLED = os.environ.get("AUTOTRADER_LATENCY", "1").lower() not in ("", "0", "false", "no")
+LOG_DIR = os.environ.get("AUTOTRADER_LATENCY_DIR", os.path.join("data", "latency"))
+
+# 히스토그램 구간 상한 (µs): 10µs ~ 100s, 1-2-5 간격
+BUCKETS_US = [m * 10 ** e for e in range(1, 8) for m in (1, 2, 5)] + [10 ** 8]
+PERCENTILES = (50, 90, 99)
+RECENT_SIZE = 200
+
+_current = contextvars.ContextVar("latency_trace", default=None)
+_TRACERS = {}
+_LOCK = threading.Lock()
+
+
+##############################################################################################
+# 히스토그램
+##############################################################################################
+class Histogram:
+    """고정 로그 구간 히스토그램 (샘플을 보관하지 않으므로 메모리 고정, 구간 상한으로 percentile 추정)"""
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_US) + 1)      # 마지막은 상한 초과
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, us):
+        lo, hi = 0, len(BUCKETS_US)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if us <= BUCKETS_US[mid]:
+                hi = mid
+            else:
+                lo = mid + 1
+        self.counts[lo] += 1
+        self.count += 1
+        self.total += us
+        if us > self.max:
+            self.max = us
+
+    def percentile(self, p):
+        if not self.count:
+            return 0
+        target = self.count * p / 100
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return min(BUCKETS_US[i], self.max) if i < len(BUCKETS_US) else self.max
+        return self.max
+
+    def to_dict(self):
+        res = {
+            'count': self.count,
+            'mean_us': self.total / self.count if self.count else 0,
+            'max_us': self.max,
+        }
+        for p in PERCENTILES:
+            res[f'p{p}_us'] = self.percentile(p)
+        res['buckets'] = {
+            (f"le_{BUCKETS_US[i]}" if i < len(BUCKETS_US) else "inf"): c
+            for i, c in enumerate(self.counts) if c
+        }
+        return res
+
+
+##############################################################################################
+# Trace
+##############################################################################################
+class Trace:
+    __slots__ = ("tracer", "id", "start_ns", "wall", "attrs", "stages", "marks", "status", "finished")
+
+    def __init__(self, tracer, trace_id, attrs):
+        self.tracer = tracer
+        self.id = trace_id
+        self.start_ns = time.perf_counter_ns()
+        self.wall = time.time()
+        self.attrs = attrs
+        self.stages = []        # (단계, 시작 ns, 끝 ns) 끝난 순서
+        self.marks = {}         # 이름 -> 시각 ns
+        self.status = None
+        self.finished = False
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter_ns()
+        try:
+            yield self
+        finally:
+            self.stages.append((name, start, time.perf_counter_ns()))
+
+    def mark(self, name):
+        self.marks[name] = time.perf_counter_ns()
+
+    def fork(self):
+        """같은 이벤트에서 갈라지는 작업(여러 주문 등)용 복사본"""
+        child = Trace(self.tracer, f"{self.id}.{len(self.stages)}", dict(self.attrs))
+        child.start_ns, child.wall = self.start_ns, self.wall
+        child.stages, child.marks = list(self.stages), dict(self.marks)
+        return child
+
+    def finish(self, status="ok", log=True):
+        """단계별 시간을 히스토그램에 더하고 로그 기록 (두 번째 호출부터는 무시)"""
+        if self.finished:
+            return
+        self.finished = True
+        self.status = status
+        self.tracer.record(self, time.perf_counter_ns(), log)
+
+    def discard(self):
+        """기록하지 않고 끝냄 (주문까지 가지 않은 시세 이벤트 등)"""
+        self.finished = True
+
+
+class _NoopTrace:
+    __slots__ = ()
+    id = None
+    finished = True
+
+    @property
+    def attrs(self):
+        return {}       # 기록하지 않으므로 매번 새 dict (값을 넣어도 버려짐)
+
+    @contextmanager
+    def stage(self, name):
+        yield self
+
+    def mark(self, name):
+        pass
+
+    def fork(self):
+        return self
+
+    def finish(self, status="ok", log=True):
+        pass
+
+    def discard(self):
+        pass
+
+NOOP_TRACE = _NoopTrace()
+
+
+##############################################################################################
+# Tracer
+##############################################################################################
+class Tracer:
+    def __init__(self, name, log_dir=LOG_DIR, write_log=True, waits=False):
+        """
+        :param write_log: 끝난 trace를 로그 파일에 기록
+        :param waits: 단계 사이 대기 시간(이전 단계 끝 ~ 다음 단계 시작)도 <단계>.wait로 기록 (큐를 거치는 파이프라인용)
+        """
+        self.name = name
+        self.log_dir = log_dir
+        self.write_log = write_log
+        self.waits = waits
+
+        self.histograms = {}                    # 단계 -> Histogram
+        self.statuses = {}                      # 상태 -> 수
+        self.recent = deque(maxlen=RECENT_SIZE) # 최근 로그 레코드
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._file_date = None
+
+    def start(self, **attrs):
+        if not ENABLED:
+            return NOOP_TRACE
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+        return Trace(self, f"{os.getpid()}-{seq}", attrs)
+
+    @contextmanager
+    def trace(self, **attrs):
+        """with 블록 동안 현재 trace로 설정 (블록이 끝나면 finish, 예외면 status=error)"""
+        trace = self.start(**attrs)
+        token = _current.set(trace)
+        try:
+            yield trace
+        except BaseException:
+            trace.finish("error")
+            raise
+        finally:
+            _current.reset(token)
+            trace.finish(trace.attrs.get("status", "ok"))
+
+    def record(self, trace, end_ns, log=True):
+        durations = {}
+        previous_end = trace.start_ns
+        for name, start, end in sorted(trace.stages, key=lambda s: s[1]):
+            durations[name] = durations.get(name, 0) + (end - start) // 1000
+            wait = (start - previous_end) // 1000
+            if self.waits and wait > 0:
+                durations[f"{name}.wait"] = durations.get(f"{name}.wait", 0) + wait
+            previous_end = max(previous_end, end)
+        durations["total"] = (end_ns - trace.start_ns) // 1000
+
+        entry = None
+        if log:
+            entry = {
+                'id': trace.id,
+                'ts': round(trace.wall, 3),
+                'status': trace.status,
+                'us': durations,
+            }
+            if trace.marks:
+                entry['marks'] = {name: (ns - trace.start_ns) // 1000 for name, ns in trace.marks.items()}
+            attrs = {k: v for k, v in trace.attrs.items() if k != "status"}
+            if attrs:
+                entry['attrs'] = attrs
+
+        with self._lock:
+            for name, us in durations.items():
+                hist = self.histograms.get(name)
+                if hist is None:
+                    hist = self.histograms[name] = Histogram()
+                hist.add(us)
+            self.statuses[trace.status] = self.statuses.get(trace.status, 0) + 1
+            if entry is not None:
+                self.recent.append(entry)
+                if self.write_log:
+                    self._write(entry)
+
+    def _write(self, entry):
+        try:
+            date = datetime.now().strftime("%Y%m%d")
+            if self._file is None or self._file_date != date:
+                if self._file is not None:
+                    self._file.close()
+                os.makedirs(self.log_dir, exist_ok=True)
+                self._file = open(os.path.join(self.log_dir, f"{self.name}_{date}.jsonl"), "a", encoding="utf-8")
+                self._file_date = date
+            self._file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+            self._file.flush()
+        except Exception as e:
+            print(f"지연 시간 로그 기록 실패: {e}")
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'statuses': dict(self.statuses),
+                'stages': {name: hist.to_dict() for name, hist in sorted(self.histograms.items())},
+            }
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.statuses.clear()
+            self.recent.clear()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+##############################################################################################
+# 모듈 함수
+##############################################################################################
+def get_tracer(name, **kwargs):
+    """이름별 Tracer (없으면 생성)"""
+    with _LOCK:
+        tracer = _TRACERS.get(name)
+        if tracer is None:
+            tracer = _TRACERS[name] = Tracer(name, **kwargs)
+        return tracer
+
+def current():
+    """현재 컨텍스트의 trace (없으면 NOOP_TRACE)"""
+    return _current.get() or NOOP_TRACE
+
+def stage(name):
+    """현재 trace에 단계 기록 (trace가 없으면 아무것도 하지 않음)"""
+    return current().stage(name)
+
+def staged(name):
+    """함수 실행을 현재 trace의 단계로 기록하는 데코레이터"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _current.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            with trace.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def snapshot(name=None):
+    with _LOCK:
+        tracers = dict(_TRACERS)
+    return {n: t.snapshot() for n, t in sorted(tracers.items()) if name is None or n == name}
+
+def recent(name, n=20):
+    with _LOCK:
+        tracer = _TRACERS.get(name)
+    if tracer is None:
+        return []
+    with tracer._lock:
+        return list(tracer.recent)[-n:]
+
+def to_prometheus(prefix="autotrader"):
+    """Prometheus text 형식 (histogram, 초 단위)"""
+    lines = [f"# TYPE {prefix}_latency_seconds histogram"]
+    with _LOCK:
+        tracers = dict(_TRACERS)
+    for tracer_name, tracer in sorted(tracers.items()):
+        with tracer._lock:
+            histograms = {name: (list(h.counts), h.count, h.total) for name, h in tracer.histograms.items()}
+        for stage_name, (counts, count, total) in sorted(histograms.items()):
+            labels = f'tracer="{tracer_name}",stage="{stage_name}"'
+            cumulative = 0
+            for i, bound in enumerate(BUCKETS_US):
+                cumulative += counts[i]
+                lines.append(f'{prefix}_latency_seconds_bucket{{{labels},le="{bound / 1e6:g}"}} {cumulative}')
+            lines.append(f'{prefix}_latency_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'{prefix}_latency_seconds_sum{{{labels}}} {total / 1e6:.6f}')
+            lines.append(f'{prefix}_latency_seconds_count{{{labels}}} {count}')
+    return "\n".join(lines) + "\n"
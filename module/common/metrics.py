@@ -0,0 +1,385 @@
+"""
+    성능 측정(instrumentation) 모듈
+
+    - span(name) 컨텍스트 매니저 / timed(name) 데코레이터로 구간 실행 시간을 모읍니다.
+    - 구간(span)별로 호출 수, 누적 시간, 최대값, 예외 수, 최근 샘플(percentile 계산용)을 보관합니다.
+    - 꺼져 있으면(기본값) 전역 플래그 하나만 확인하고 바로 원래 함수를 실행합니다.
+
+    환경 변수
+        AUTOTRADER_METRICS=1              : 측정 켜기
+        AUTOTRADER_METRICS_FILE=path.json : 프로세스 종료 시 측정 결과 저장
+        AUTOTRADER_PROFILE=cpu,mem        : profile_from_env()로 감싼 구간을 cProfile / tracemalloc으로 실행
+                                            (cProfile은 감싼 스레드만 측정, 웹 서버 요청은 profile_requests_from_env())
+        AUTOTRADER_PROFILE_DIR=data/profile : 프로파일 결과 저장 폴더
+
+    사용 예
+        from module.common import metrics
+
+        @metrics.timed("db.load")
+        def load(): ...
+
+        with metrics.span("strategy.run"):
+            ...
+
+        metrics.snapshot()  # {'db.load': {'count': 10, 'total': 0.12, 'p50': ..., ...}}
+"""
+
+import atexit
+import cProfile
+import functools
+import inspect
+import io
+import json
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+RESERVOIR_SIZE = 1024       # span별로 보관할 최대 샘플 수
+PERCENTILES = (50, 90, 99)
+
+ENABLED = os.environ.get("AUTOTRADER_METRICS", "0").lower() not in ("", "0", "false", "no")
+
+_SPANS = {}
+_LOCK = threading.Lock()
+
+
+class _SpanStats:
+    """span 하나의 누적 통계"""
+    __slots__ = ("count", "total", "max", "errors", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self.samples = []
+
+    def add(self, elapsed, error=False):
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        if error:
+            self.errors += 1
+
+        # reservoir sampling: 호출이 많아져도 메모리는 RESERVOIR_SIZE로 고정
+        if len(self.samples) < RESERVOIR_SIZE:
+            self.samples.append(elapsed)
+        else:
+            i = random.randrange(self.count)
+            if i < RESERVOIR_SIZE:
+                self.samples[i] = elapsed
+
+    def to_dict(self):
+        samples = sorted(self.samples)
+        res = {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'max': self.max,
+            'errors': self.errors,
+        }
+        for p in PERCENTILES:
+            res[f'p{p}'] = samples[min(len(samples) - 1, int(len(samples) * p / 100))] if samples else 0.0
+        return res
+
+
+##############################################################################################
+# 켜기 / 끄기
+##############################################################################################
+def enable(flag=True):
+    global ENABLED
+    ENABLED = bool(flag)
+
+def disable():
+    enable(False)
+
+def is_enabled():
+    return ENABLED
+
+
+##############################################################################################
+# 측정
+##############################################################################################
+def record(name, elapsed, error=False):
+    """측정값 하나를 직접 기록 (초 단위)"""
+    with _LOCK:
+        stats = _SPANS.get(name)
+        if stats is None:
+            stats = _SPANS[name] = _SpanStats()
+        stats.add(elapsed, error)
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record(self.name, time.perf_counter() - self.start, exc_type is not None)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name):
+    """
+    구간 측정 컨텍스트 매니저
+    with metrics.span("kis.ws.message"):
+        ...
+    """
+    if not ENABLED:
+        return _NOOP_SPAN
+    return _Span(name)
+
+def timed(name=None):
+    """
+    함수 실행 시간 측정 데코레이터 (name을 생략하면 '모듈.함수' 이름 사용)
+    코루틴 함수도 지원합니다.
+    """
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not ENABLED:
+                    return await func(*args, **kwargs)
+                with _Span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with _Span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    # @timed 처럼 괄호 없이 쓴 경우
+    if callable(name):
+        func, name = name, None
+        return decorator(func)
+    return decorator
+
+def wrap_methods(cls, method_names, prefix):
+    """
+    클래스에 직접 정의된 메소드들을 timed로 감쌉니다. (__init_subclass__에서 사용)
+    span 이름은 '{prefix}.{클래스명}.{메소드명}'
+    """
+    for method_name in method_names:
+        method = cls.__dict__.get(method_name)
+        if method is None or getattr(method, "__metrics_wrapped__", False):
+            continue
+        wrapped = timed(f"{prefix}.{cls.__name__}.{method_name}")(method)
+        wrapped.__metrics_wrapped__ = True
+        setattr(cls, method_name, wrapped)
+
+
+##############################################################################################
+# 조회 / 내보내기
+##############################################################################################
+def snapshot(prefix=None):
+    """span별 통계 dict (초 단위)"""
+    with _LOCK:
+        return {
+            name: stats.to_dict()
+            for name, stats in sorted(_SPANS.items())
+            if prefix is None or name.startswith(prefix)
+        }
+
+def reset():
+    with _LOCK:
+        _SPANS.clear()
+
+def dump(filepath):
+    """측정 결과를 JSON 파일로 저장"""
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump({
+            'timestamp': datetime.now().isoformat(),
+            'pid': os.getpid(),
+            'spans': snapshot(),
+        }, f, indent=2, ensure_ascii=False)
+    print(f"Metrics saved to {filepath}")
+
+def to_prometheus(prefix="autotrader"):
+    """Prometheus text 형식 (summary)"""
+    lines = [f"# TYPE {prefix}_span_seconds summary"]
+    for name, stats in snapshot().items():
+        label = name.replace("\\", "\\\\").replace('"', '\\"')
+        for p in PERCENTILES:
+            lines.append(f'{prefix}_span_seconds{{span="{label}",quantile="{p / 100}"}} {stats[f"p{p}"]:.9f}')
+        lines.append(f'{prefix}_span_seconds_sum{{span="{label}"}} {stats["total"]:.9f}')
+        lines.append(f'{prefix}_span_seconds_count{{span="{label}"}} {stats["count"]}')
+        lines.append(f'{prefix}_span_errors_total{{span="{label}"}} {stats["errors"]}')
+    return "\n".join(lines) + "\n"
+
+
+##############################################################################################
+# 프로파일링
+##############################################################################################
+@contextmanager
+def profile(name="profile", cpu=True, memory=False, output_dir="data/profile", top=30):
+    """
+    블록을 cProfile / tracemalloc으로 감싸서 실행하고 결과를 파일로 저장합니다.
+    - cpu    : {output_dir}/{name}_{시각}.prof (+ 상위 함수 요약 .txt)
+    - memory : {output_dir}/{name}_{시각}_mem.txt (할당 상위 라인)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    base = os.path.join(output_dir, f"{name}_{stamp}")
+
+    profiler = cProfile.Profile() if cpu else None
+    started_tracemalloc = False
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        started_tracemalloc = True
+
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(base + ".prof")
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                f.write(out.getvalue())
+            print(f"CPU profile saved to {base}.prof")
+
+        if memory:
+            mem_snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if started_tracemalloc:
+                tracemalloc.stop()
+            with open(base + "_mem.txt", "w", encoding="utf-8") as f:
+                f.write(f"current: {current / 1024:.1f} KiB, peak: {peak / 1024:.1f} KiB\n\n")
+                for stat in mem_snapshot.statistics("lineno")[:top]:
+                    f.write(f"{stat}\n")
+            print(f"Memory profile saved to {base}_mem.txt")
+
+def _profile_modes():
+    return [m.strip() for m in os.environ.get("AUTOTRADER_PROFILE", "").lower().split(",") if m.strip()]
+
+def profile_from_env(name):
+    """
+    AUTOTRADER_PROFILE 환경 변수가 있을 때만 profile()로 감쌉니다.
+    (예: AUTOTRADER_PROFILE=cpu,mem python main.py)
+    cProfile은 블록을 실행하는 스레드만 측정합니다. (메모리는 프로세스 전체)
+    """
+    modes = _profile_modes()
+    if not modes:
+        return nullcontext()
+    return profile(
+        name=name,
+        cpu="cpu" in modes,
+        memory="mem" in modes or "memory" in modes,
+        output_dir=os.environ.get("AUTOTRADER_PROFILE_DIR", "data/profile"),
+    )
+
+
+class RequestProfiler:
+    """
+    웹 서버 요청별 cProfile (요청마다 처리 스레드에서 켜고 끈 뒤 결과를 합침)
+
+    Flask는 요청을 각각 다른 스레드에서 처리하므로 서버를 시작한 스레드의 cProfile에는 핸들러 시간이 없습니다.
+    install(app)은 before_request / teardown_request 훅을 등록합니다.
+    Python 3.12+에서는 프로파일러가 동시에 하나만 켜질 수 있어서, 겹친 요청은 측정하지 않고 skipped로 셉니다.
+    """
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = None
+        self.requests = 0
+        self.skipped = 0
+
+    def install(self, app):
+        app.before_request(self._start)
+        app.teardown_request(self._stop)
+        return self
+
+    def _start(self):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            with self._lock:
+                self.skipped += 1
+            return
+        self._local.profiler = profiler
+
+    def _stop(self, exc=None):
+        profiler = getattr(self._local, "profiler", None)
+        if profiler is None:
+            return
+        profiler.disable()
+        self._local.profiler = None
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profiler)
+            else:
+                self._stats.add(profiler)
+            self.requests += 1
+
+    def dump(self, base, top=30):
+        """{base}.prof + 상위 함수 요약 {base}.txt 저장 (측정한 요청이 없으면 저장하지 않음)"""
+        with self._lock:
+            if self._stats is None:
+                return False
+            self._stats.dump_stats(base + ".prof")
+            out = io.StringIO()
+            self._stats.stream = out
+            self._stats.sort_stats("cumulative").print_stats(top)
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                f.write(f"requests: {self.requests}, skipped (overlapping): {self.skipped}\n\n")
+                f.write(out.getvalue())
+        print(f"Request profile saved to {base}.prof ({self.requests} requests)")
+        return True
+
+@contextmanager
+def profile_requests_from_env(name, app):
+    """
+    AUTOTRADER_PROFILE에 cpu가 있으면 블록 동안 app의 요청 처리를 RequestProfiler로 측정하고,
+    끝날 때 {AUTOTRADER_PROFILE_DIR}/{name}_{시각}.prof로 저장합니다.
+    (gunicorn 멀티 워커는 워커 프로세스마다 따로 측정되므로 저장되지 않음)
+    """
+    if "cpu" not in _profile_modes():
+        yield None
+        return
+    profiler = RequestProfiler().install(app)
+    try:
+        yield profiler
+    finally:
+        output_dir = os.environ.get("AUTOTRADER_PROFILE_DIR", "data/profile")
+        os.makedirs(output_dir, exist_ok=True)
+        profiler.dump(os.path.join(output_dir, f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"))
+
+
+# 종료 시 자동 저장
+_METRICS_FILE = os.environ.get("AUTOTRADER_METRICS_FILE")
+if _METRICS_FILE:
+    atexit.register(lambda: dump(_METRICS_FILE.replace("{pid}", str(os.getpid()))))
@@ -0,0 +1,214 @@
+"""
+    워커 프로세스 간 공유 상태 (SQLite + 파일 잠금)
+
+    웹훅 서버를 여러 워커 프로세스(gunicorn)로 띄우면 모듈 전역 변수는 프로세스마다 따로 생깁니다.
+    워커끼리 맞아야 하는 상태만 SQLite 파일 하나(WAL)에 두고, 마켓별 주문 순서는 파일 잠금(fcntl)으로 맞춥니다.
+
+    테이블
+        kv          : 키 -> JSON 값
+        counters    : 이름 -> 정수 (포트폴리오 버전: 어느 워커든 주문하면 +1 -> 다른 워커는 잔고 재조회)
+        idempotency : 중복 제거 키 -> 처음 받은 signal id (모든 워커가 같은 키를 봄)
+        signals     : 빠른 응답 모드 신호 저널 + 상태 (어느 워커에서든 /signals/<id> 조회, 재시작 시 복구)
+
+    연결은 스레드마다 하나 (sqlite3 연결은 스레드 / fork를 넘어 공유하면 안 됨, fork 후에는 reopen())
+"""
+
+import fcntl
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+
+class SharedState:
+    def __init__(self, path=os.path.join("data", "server_state.db"), lock_dir=None, timeout=10.0):
+        """
+        :param path: SQLite 파일
+        :param lock_dir: 잠금 파일 폴더 (기본 <path 폴더>/locks)
+        :param timeout: 다른 프로세스가 쓰는 중일 때 기다릴 시간 (초)
+        """
+        self.path = path
+        self.lock_dir = lock_dir or os.path.join(os.path.dirname(path) or ".", "locks")
+        self.timeout = timeout
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        os.makedirs(self.lock_dir, exist_ok=True)
+        self._init_database()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._pid != os.getpid():
+            if self._pid != os.getpid():
+                self.reopen()
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def reopen(self):
+        """fork 후 호출: 부모 프로세스의 연결을 쓰지 않도록 새로 연결"""
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _init_database(self):
+        conn = self._connect()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS kv (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                updated REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS idempotency (
+                key TEXT PRIMARY KEY,
+                signal_id TEXT NOT NULL,
+                ts REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_idempotency_ts ON idempotency (ts);
+            CREATE TABLE IF NOT EXISTS signals (
+                id TEXT PRIMARY KEY,
+                key TEXT,
+                ts REAL NOT NULL,
+                ticker TEXT,
+                action TEXT,
+                payload TEXT,
+                status TEXT NOT NULL,
+                finished REAL,
+                message TEXT,
+                boot TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_signals_status ON signals (status, boot);
+        ''')
+
+    ##########################################################################################
+    # kv / counters
+    ##########################################################################################
+    def get_json(self, key, default=None):
+        row = self._connect().execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return default if row is None else json.loads(row['value'])
+
+    def get_updated(self, key):
+        row = self._connect().execute("SELECT updated FROM kv WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row['updated']
+
+    def set_json(self, key, value):
+        self._connect().execute(
+            "INSERT INTO kv (key, value, updated) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated = excluded.updated",
+            (key, json.dumps(value, ensure_ascii=False), time.time()),
+        )
+
+    def counter(self, name):
+        row = self._connect().execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()
+        return 0 if row is None else row['value']
+
+    def bump(self, name):
+        """카운터 +1. Returns: 새 값"""
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO counters (name, value) VALUES (?, 1) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,),
+            )
+            return conn.execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()['value']
+
+    ##########################################################################################
+    # 중복 제거 / 신호
+    ##########################################################################################
+    def add_signal(self, signal, boot, ttl):
+        """
+        신호 추가 (중복 제거 키 확인 + 기록을 한 트랜잭션으로, ttl 안에 같은 키가 있으면 추가하지 않음, 키가 None이면 확인 없이 추가)
+        Returns:
+            str | None: 중복이면 처음 신호의 id, 추가했으면 None
+        """
+        with self._transaction() as conn:
+            if signal['key'] is not None:
+                conn.execute("DELETE FROM idempotency WHERE ts < ?", (signal['ts'] - ttl,))
+                row = conn.execute("SELECT signal_id FROM idempotency WHERE key = ?", (signal['key'],)).fetchone()
+                if row is not None:
+                    return row['signal_id']
+                conn.execute("INSERT INTO idempotency (key, signal_id, ts) VALUES (?, ?, ?)",
+                             (signal['key'], signal['id'], signal['ts']))
+            conn.execute(
+                "INSERT INTO signals (id, key, ts, ticker, action, payload, status, boot) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (signal['id'], signal['key'], signal['ts'], signal['ticker'], signal['action'],
+                 json.dumps(signal.get('payload'), ensure_ascii=False), signal['status'], boot),
+            )
+            return None
+
+    def update_signal(self, signal_id, status, finished, message=None):
+        self._connect().execute(
+            "UPDATE signals SET status = ?, finished = ?, message = ? WHERE id = ?",
+            (status, finished, message, signal_id),
+        )
+
+    def get_signal(self, signal_id):
+        row = self._connect().execute(
+            "SELECT id, ts, ticker, action, status, finished, message FROM signals WHERE id = ?", (signal_id,),
+        ).fetchone()
+        return None if row is None else {k: row[k] for k in row.keys() if row[k] is not None}
+
+    def claim_pending(self, status, boot):
+        """
+        이전 실행(boot가 다름)에서 끝나지 않은 신호를 이번 실행 것으로 가져옴 (여러 워커가 동시에 불러도 한 워커만 가져감)
+        Returns:
+            list: 신호 dict
+        """
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, key, ts, ticker, action, payload, status FROM signals "
+                "WHERE status = ? AND boot != ? ORDER BY ts", (status, boot),
+            ).fetchall()
+            conn.execute("UPDATE signals SET boot = ? WHERE status = ? AND boot != ?", (boot, status, boot))
+        return [{**dict(row), 'payload': json.loads(row['payload'])} for row in rows]
+
+    ##########################################################################################
+    # 프로세스 간 잠금
+    ##########################################################################################
+    def acquire(self, name):
+        """
+        이름별 프로세스 간 배타 잠금 (fcntl.flock, 프로세스가 죽으면 자동으로 풀림)
+        Returns:
+            int: release()에 넘길 파일 디스크립터
+        """
+        safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+        fd = os.open(os.path.join(self.lock_dir, f"{safe}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd
+
+    def release(self, fd):
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    @contextmanager
+    def lock(self, name):
+        fd = self.acquire(name)
+        try:
+            yield
+        finally:
+            self.release(fd)
@@ -1,10 +1,136 @@
-from module import upbit_fetcher
+"""
+    업비트 라이브 주문 (Live_Crypto_Trader)
+
+    전략 신호(TradingSignal)를 업비트 시장가 주문으로 바꿔서 OrderService로 실행합니다.
+    (같은 마켓은 넣은 순서대로 하나씩, 다른 마켓은 동시에. 요청은 UpbitClient로 연결 재사용 + 요청 수 제한)
+
+    주문 크기
+        BUY  : order_amount(원) x position_size 만큼 시장가 매수 (MIN_ORDER_AMOUNT 미만이면 주문하지 않음)
+        SELL : 보유 수량 x position_size 만큼 시장가 매도 (주문 직전에 /v1/accounts로 보유 수량 조회)
+
+    dry_run=True (기본) 이면 업비트에 주문하지 않고 만들 주문만 로그로 남깁니다.
+    실제 주문은 dry_run=False + API 키가 있을 때만 실행됩니다.
+"""
+
+import logging
+import math
+import uuid
+
+from module import upbit_client
+from module.common import metrics
+from strategy.strategy import SignalType
+
+logger = logging.getLogger(__name__)
+
+MIN_ORDER_AMOUNT = 5000     # 업비트 최소 주문 금액 (원)
+
 
 class Live_Orderer:
-    def __init__(self):
-        pass
+    def __init__(self, access_key=None, secret_key=None, dry_run=True, order_amount=100_000,
+                 client=None, service=None):
+        """
+        :param access_key / secret_key: 업비트 API 키 (dry_run이면 없어도 됨)
+        :param dry_run: True면 주문하지 않고 로그만
+        :param order_amount: position_size 1.0일 때 매수 금액 (원)
+        :param client: UpbitClient (없으면 새로 만듦)
+        :param service: OrderService (없으면 새로 만듦)
+        """
+        if not dry_run and not (access_key and secret_key):
+            raise ValueError("access_key / secret_key are required for live orders (or use dry_run=True)")
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.dry_run = dry_run
+        self.order_amount = order_amount
+        self.client = client or upbit_client.UpbitClient()
+        self.service = service or upbit_client.OrderService(workers=2, name="crypto-order")
 
+        self.placed = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def _headers(self, params=None):
+        # 재시도 시 nonce가 달라야 하므로 요청마다 토큰 생성
+        return lambda: {'Authorization': upbit_client.make_token(self.access_key, self.secret_key, params)}
+
+    def balance(self, currency):
+        """보유 수량 (주문 대기 중인 수량 제외)"""
+        response = self.client.get('/v1/accounts', headers=self._headers())
+        if response.status_code != 200:
+            raise RuntimeError(f"잔고 조회 실패: {response.status_code} {response.text}")
+        for account in response.json():
+            if account['currency'] == currency:
+                return float(account['balance'])
+        return 0.0
+
+    def order_params(self, signal, held=None):
+        """
+        신호 -> 주문 파라미터
+        :param held: 매도할 때 보유 수량 (None이면 조회)
+        Returns:
+            dict | None: 주문하지 않을 신호면 None
+        """
+        market = signal.ticker
+        if signal.signal_type == SignalType.BUY:
+            amount = int(self.order_amount * signal.position_size)
+            if amount < MIN_ORDER_AMOUNT:
+                return None
+            return {'market': market, 'side': 'bid', 'ord_type': 'price', 'price': str(amount),
+                    'identifier': uuid.uuid4().hex}
+        if signal.signal_type == SignalType.SELL:
+            if held is None:
+                held = self.balance(market.split('-', 1)[1])
+            # 소수 8자리에서 내림 (반올림하면 보유 수량보다 많아질 수 있음)
+            volume = math.floor(held * min(signal.position_size, 1.0) * 1e8) / 1e8
+            if volume <= 0:
+                return None
+            return {'market': market, 'side': 'ask', 'ord_type': 'market', 'volume': f"{volume:.8f}",
+                    'identifier': uuid.uuid4().hex}
+        return None
+
+    @metrics.timed("orderer.crypto.Live_Orderer.place_order")
     def place_order(self, order_data):
-        print(f"Placing live order: {order_data}")
-        # 실제 주문 로직 구현
-        pass
+        """
+        주문 실행 (HOLD는 무시)
+        Returns:
+            concurrent.futures.Future | dict | None: 실제 주문이면 업비트 응답 Future, dry_run이면 만들 주문 정보
+        """
+        if order_data.signal_type == SignalType.HOLD:
+            return None
+        if self.dry_run:
+            # 매도 수량은 보유 수량을 알아야 하므로 비율만 기록
+            params = self.order_params(order_data, held=0.0) if order_data.signal_type == SignalType.BUY else \
+                {'market': order_data.ticker, 'side': 'ask', 'ord_type': 'market', 'ratio': order_data.position_size}
+            logger.info(f"[dry-run] {order_data.ticker} {order_data.signal_type.value} {order_data.target_time}: {params}")
+            return {'dry_run': True, 'params': params}
+        return self.service.submit(order_data.ticker, self._execute, order_data)
+
+    def _execute(self, signal):
+        """주문 서비스 워커에서 실행 (같은 마켓은 순서대로)"""
+        params = self.order_params(signal)
+        if params is None:
+            self.skipped += 1
+            logger.info(f"Order skipped: {signal.ticker} {signal.signal_type.value} (size {signal.position_size})")
+            return None
+
+        response = self.client.post('/v1/orders', json=params, headers=self._headers(params))
+        if response.status_code != 201:
+            self.failed += 1
+            logger.error(f"Order failed: {params} -> {response.status_code} {response.text}")
+            return None
+        self.placed += 1
+        order = response.json()
+        logger.info(f"Order placed: {order}")
+        return order
+
+    def close(self):
+        self.service.shutdown(wait=True)
+        self.client.close()
+
+    def stats(self):
+        return {
+            'dry_run': self.dry_run,
+            'placed': self.placed,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'orders': self.service.stats(),
+        }
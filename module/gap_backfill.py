@@ -0,0 +1,136 @@
+"""
+    웹소켓 끊김 구간 보충 (REST)
+
+    웹소켓이 끊겼다가 다시 붙으면 구독은 open_map으로 다시 등록되지만, 끊긴 동안의 체결은 받을 수 없어서 봉에 구멍이 생깁니다.
+    재접속 시 끊긴 구간의 1분봉을 REST(주식당일분봉조회)로 받아서 BarAggregator.backfill()로 채운 뒤 실시간 처리를 이어갑니다.
+
+    순서 (연결 하나 기준)
+        1. on_disconnect: 끊긴 시각 기록 (KISWebSocket.disconnected_at)
+        2. on_connect(재접속): 그 연결의 체결 구독 종목을 보충 중으로 표시 -> begin()
+           보충 중인 종목의 실시간 체결 이벤트는 처리하지 않고 모아둠 -> hold()
+        3. 종목별로 REST 조회(스레드) -> 봉 보충 -> 모아둔 이벤트를 순서대로 다시 처리 (종목마다 바로 재개)
+
+    보충 범위: 끊긴 시각이 속한 구간 시작(가장 긴 분 단위 봉 기준) ~ 재접속 직전에 끝난 1분봉
+    재접속한 분의 접속 전 체결은 REST 분봉과 겹치지 않게 보충하지 않음 (그 분봉은 접속 후 체결만 반영)
+    틱 저장소(TickStore)의 틱은 보충하지 않음
+"""
+
+from datetime import datetime, timedelta
+import asyncio
+
+from module.common import metrics
+
+
+class GapBackfiller:
+    def __init__(self, aggregator, fetch=None, min_gap=1.0, request_interval=0.2, invest_type="VPS", index=0):
+        """
+        :param aggregator: 보충할 BarAggregator
+        :param fetch: fetch(ticker, start_time, end_time) -> (date, open, high, low, close, volume, amount) 1분봉 리스트
+                      (기본 stock_data_manager.get_minute_chart)
+        :param min_gap: 이보다 짧게(초) 끊긴 경우는 보충하지 않음
+        :param request_interval: REST 호출 간격 (초, 호출 제한)
+        """
+        self.aggregator = aggregator
+        self.fetch = fetch or self._fetch_minute_chart
+        self.min_gap = min_gap
+        self.request_interval = request_interval
+        self.invest_type = invest_type
+        self.index = index
+
+        self._held = {}             # 보충 중인 종목 -> 모아둔 시세 이벤트
+        self.gaps = 0
+        self.backfilled_bars = 0
+        self.failed = 0
+
+    def _fetch_minute_chart(self, ticker, start_time, end_time):
+        from module import stock_data_manager
+
+        df = stock_data_manager.get_minute_chart(
+            itm_no=ticker, start_time=start_time, end_time=end_time,
+            request_interval=self.request_interval, invest_type=self.invest_type, index=self.index,
+        )
+        return list(df.itertuples(index=False, name=None))
+
+    ##########################################################################################
+    # 보충 중인 종목의 실시간 이벤트 보류
+    ##########################################################################################
+    def begin(self, tickers):
+        """보충 시작 표시 (재접속 직후, 구독 재등록 전에 호출)"""
+        for ticker in tickers:
+            self._held.setdefault(ticker, [])
+
+    def holding(self, ticker):
+        return ticker in self._held
+
+    def hold(self, ticker, event):
+        self._held[ticker].append(event)
+
+    def release(self, ticker):
+        """보충 끝. Returns: 모아둔 이벤트 (받은 순서)"""
+        return self._held.pop(ticker, [])
+
+    ##########################################################################################
+    # 구간 계산 / 보충
+    ##########################################################################################
+    def gap_range(self, disconnected_at, reconnected_at):
+        """
+        끊긴 시각 / 재접속 시각(time.time) -> REST로 보충할 구간
+        Returns:
+            tuple | None: (date YYYYMMDD, 시작 HHMMSS, 끝 HHMMSS, until YYYYMMDDHHMMSS), 보충할 게 없으면 None
+        """
+        if disconnected_at is None or reconnected_at - disconnected_at < self.min_gap:
+            return None
+
+        session_start, session_end = self.aggregator.session
+        since = datetime.fromtimestamp(disconnected_at)
+        until = datetime.fromtimestamp(reconnected_at).replace(second=0, microsecond=0)
+        date = until.strftime("%Y%m%d")
+
+        # 당일 분봉만 조회 가능 (전날에 끊겼으면 오늘 장 시작부터)
+        since_seconds = since.hour * 3600 + since.minute * 60 + since.second if since.strftime("%Y%m%d") == date else 0
+        minute_sizes = [size for kind, size in self.aggregator.specs.values() if kind == "time" and size % 60 == 0]
+        bucket = max(minute_sizes, default=60)
+        since_seconds = max(since_seconds - since_seconds % bucket, session_start)
+
+        last_minute = until - timedelta(minutes=1)        # 재접속 직전에 끝난 1분봉
+        end_seconds = min(last_minute.hour * 3600 + last_minute.minute * 60, session_end)
+        if not minute_sizes or end_seconds < since_seconds:
+            return None
+
+        def hhmmss(seconds):
+            return f"{seconds // 3600:02d}{seconds // 60 % 60:02d}{seconds % 60:02d}"
+        return date, hhmmss(since_seconds), hhmmss(end_seconds), until.strftime("%Y%m%d%H%M%S")
+
+    async def backfill(self, tickers, disconnected_at, reconnected_at, replay):
+        """
+        끊긴 구간 보충 후 종목별로 모아둔 이벤트를 replay(event)로 다시 처리
+        이벤트 루프 안에서 실행 (REST 조회만 스레드에서, 봉 보충 / 재처리는 루프에서)
+        """
+        tickers = list(tickers)
+        gap = self.gap_range(disconnected_at, reconnected_at)
+        if gap is not None:
+            self.gaps += 1
+            date, start_time, end_time, until = gap
+            print(f"[보충] {len(tickers)}종목 {date} {start_time} ~ {end_time}")
+
+        loop = asyncio.get_running_loop()
+        for ticker in tickers:
+            if gap is not None:
+                try:
+                    with metrics.span("gap_backfill.fetch"):
+                        bars = await loop.run_in_executor(None, self.fetch, ticker, start_time, end_time)
+                    self.backfilled_bars += len(self.aggregator.backfill(ticker, bars, until))
+                except Exception as e:
+                    self.failed += 1
+                    print(f"[보충] {ticker} 실패: {e}")
+
+            for event in self.release(ticker):
+                replay(event)
+
+    def stats(self):
+        return {
+            'gaps': self.gaps,
+            'backfilled_bars': self.backfilled_bars,
+            'failed': self.failed,
+            'holding': {ticker: len(events) for ticker, events in self._held.items()},
+        }
@@ -7,6 +7,7 @@ from collections import namedtuple
 import module.token_manager as token_manager
 import requests
 import json
+from module.common import metrics
 
 _DEBUG = False  # 디버그 모드 설정
 
@@ -107,6 +108,7 @@ class APIResp:
     # end of class APIResp
 
 ########### API call wrapping : API 호출 공통
+@metrics.timed("kis.url_fetch")
 def url_fetch(api_url, ptr_id, tr_cont, params, appendHeaders=None, postFlag=False, invest_type="VPS", index=0):
     headers, base_url = _getBaseHeader(invest_type, index)  # 기본 header 값 정리
     url = f"{base_url}/{api_url}"
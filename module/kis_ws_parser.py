@@ -0,0 +1,230 @@
+"""
+    KIS 웹소켓 실시간 메시지 파서
+
+    실시간 데이터 메시지 형식
+        {암호화 여부 0/1}|{tr_id}|{건수(3자리)}|{필드1^필드2^...}
+        - 건수가 2 이상이면 레코드들의 필드가 ^로 이어져서 옴 (건수 x 컬럼 수)
+        - 암호화된 경우 마지막 부분이 AES-256-CBC + base64 (key, iv는 구독 응답에서 받음 -> token_manager.data_map)
+
+    메시지마다 DataFrame을 만들지 않고 문자열을 바로 나눠서 컬럼 타입대로 변환합니다.
+        parse(raw)             : (tr_id, [레코드 튜플, ...])   컬럼 순서는 data_map[tr_id]["columns"]
+        parse_into(raw, out)   : 숫자 컬럼을 미리 할당한 배열 out에 바로 채움 (링버퍼 등)
+        parse_dataframe(raw)   : 기존과 같은 DataFrame (dtype=object), 필요할 때만 사용
+
+    컬럼 타입은 COLUMN_TYPES에 tr_id별로 지정합니다. (지정하지 않은 tr_id / 컬럼은 문자열)
+"""
+
+from base64 import b64decode
+
+import numpy as np
+import pandas as pd
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import unpad
+
+STR, INT, FLOAT = "str", "int", "float"
+
+# tr_id -> {"default": 기본 타입, 컬럼: 타입}
+COLUMN_TYPES = {
+    # 국내주식 실시간호가 (KRX)
+    "H0STASP0": {
+        "default": INT,
+        "MKSC_SHRN_ISCD": STR, "BSOP_HOUR": STR, "HOUR_CLS_CODE": STR,
+        "ANTC_CNTG_VRSS_SIGN": STR, "STCK_DEAL_CLS_CODE": STR,
+        "ANTC_CNTG_PRDY_CTRT": FLOAT,
+    },
+    # 국내주식 실시간체결가 (KRX)
+    "H0STCNT0": {
+        "default": INT,
+        "MKSC_SHRN_ISCD": STR, "STCK_CNTG_HOUR": STR, "PRDY_VRSS_SIGN": STR, "CCLD_DVSN": STR,
+        "OPRC_HOUR": STR, "OPRC_VRSS_PRPR_SIGN": STR, "HGPR_HOUR": STR, "HGPR_VRSS_PRPR_SIGN": STR,
+        "LWPR_HOUR": STR, "LWPR_VRSS_PRPR_SIGN": STR, "BSOP_DATE": STR, "NEW_MKOP_CLS_CODE": STR,
+        "TRHT_YN": STR, "HOUR_CLS_CODE": STR, "MRKT_TRTM_CLS_CODE": STR,
+        "PRDY_CTRT": FLOAT, "WGHN_AVRG_STCK_PRC": FLOAT, "CTTR": FLOAT, "SHNU_RATE": FLOAT,
+        "PRDY_VOL_VRSS_ACML_VOL_RATE": FLOAT, "VOL_TNRT": FLOAT, "PRDY_SMNS_HOUR_ACML_VOL_RATE": FLOAT,
+    },
+    # 해외주식 실시간호가
+    "HDFSASP0": {
+        "default": FLOAT,
+        "symb": STR, "zdiv": STR, "xymd": STR, "xhms": STR, "kymd": STR, "khms": STR,
+    },
+}
+
+
+##############################################################################################
+# 타입 변환
+##############################################################################################
+def _to_int(value):
+    try:
+        return int(value)
+    except ValueError:
+        # "0.00" 처럼 소수점이 붙어서 오는 경우 / 빈 값
+        return int(float(value)) if value.strip() else None
+
+def _to_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+_CONVERTERS = {STR: str, INT: _to_int, FLOAT: _to_float}
+
+def _to_number(value):
+    """배열용 변환 (빈 값은 nan)"""
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+##############################################################################################
+# 복호화
+##############################################################################################
+class AESDecryptor:
+    """
+    AES-256-CBC 복호화기 (tr_id별로 하나씩 재사용)
+    CBC 객체는 메시지 하나를 복호화하면 상태가 바뀌어 다시 쓸 수 없으므로,
+    키 확장이 끝난 ECB 객체를 보관하고 CBC 연결(XOR)은 직접 계산합니다.
+    """
+    __slots__ = ("_ecb", "_iv")
+
+    def __init__(self, key, iv):
+        if key is None or iv is None:
+            raise AttributeError("key and iv cannot be None")
+        self._ecb = AES.new(key.encode("utf-8"), AES.MODE_ECB)
+        self._iv = iv.encode("utf-8")
+
+    def decrypt(self, cipher_text):
+        data = b64decode(cipher_text)
+        plain = self._ecb.decrypt(data)
+        # CBC: P_i = D(C_i) xor C_{i-1} (C_0 = iv)
+        chain = self._iv + data[:-AES.block_size]
+        plain = (int.from_bytes(plain, "little") ^ int.from_bytes(chain, "little")).to_bytes(len(data), "little")
+        return unpad(plain, AES.block_size).decode("utf-8")
+
+_DECRYPTORS = {}
+
+def get_decryptor(key, iv):
+    """(key, iv)별 복호화기 캐시"""
+    decryptor = _DECRYPTORS.get((key, iv))
+    if decryptor is None:
+        decryptor = _DECRYPTORS[(key, iv)] = AESDecryptor(key, iv)
+    return decryptor
+
+
+##############################################################################################
+# 파서
+##############################################################################################
+class TRSpec:
+    """tr_id 하나의 컬럼 / 변환 정보 (data_map 항목이 바뀌면 다시 만듦)"""
+    __slots__ = ("tr_id", "columns", "converters", "index", "numeric_index", "numeric_columns",
+                 "decryptor", "source")
+
+    def __init__(self, tr_id, entry, column_types=None):
+        types = (column_types or {}).get(tr_id, {})
+        default = types.get("default", STR)
+
+        self.tr_id = tr_id
+        self.columns = list(entry.get("columns") or [])
+        column_type = [types.get(col, default) for col in self.columns]
+        self.converters = [_CONVERTERS[t] for t in column_type]
+        self.index = {col: i for i, col in enumerate(self.columns)}
+        self.numeric_index = [i for i, t in enumerate(column_type) if t != STR]
+        self.numeric_columns = [self.columns[i] for i in self.numeric_index]
+
+        encrypted = entry.get("encrypt") == "Y"
+        self.decryptor = get_decryptor(entry["key"], entry["iv"]) if encrypted else None
+        self.source = (entry.get("columns"), entry.get("encrypt"), entry.get("key"), entry.get("iv"))
+
+
+class KISMessageParser:
+    def __init__(self, data_map, column_types=COLUMN_TYPES):
+        """
+        :param data_map: token_manager.data_map (tr_id -> columns, encrypt, key, iv), 구독 중에 계속 갱신됨
+        :param column_types: tr_id별 컬럼 타입
+        """
+        self.data_map = data_map
+        self.column_types = column_types
+        self._specs = {}
+
+    @staticmethod
+    def is_data_message(raw):
+        """실시간 데이터 메시지인지 (아니면 JSON 시스템 메시지)"""
+        return raw[:1] in ("0", "1")
+
+    def spec(self, tr_id):
+        entry = self.data_map.get(tr_id)
+        if entry is None:
+            raise ValueError(f"Unknown tr_id: {tr_id}")
+
+        spec = self._specs.get(tr_id)
+        source = (entry.get("columns"), entry.get("encrypt"), entry.get("key"), entry.get("iv"))
+        if spec is None or spec.source != source:
+            spec = self._specs[tr_id] = TRSpec(tr_id, entry, self.column_types)
+        return spec
+
+    def split(self, raw):
+        """
+        메시지 -> (spec, 레코드 수, 필드 문자열 리스트)
+        필드 수가 건수 x 컬럼 수보다 적으면 온전한 레코드 수만큼만 사용
+        """
+        parts = raw.split("|", 3)
+        if len(parts) < 4:
+            raise ValueError("data not found...")
+
+        spec = self.spec(parts[1])
+        payload = parts[3]
+        if spec.decryptor is not None:
+            payload = spec.decryptor.decrypt(payload)
+
+        fields = payload.split("^")
+        n_columns = len(spec.columns)
+        if n_columns == 0:
+            return spec, 0, fields
+
+        try:
+            count = int(parts[2])
+        except ValueError:
+            count = 1
+        count = min(count, len(fields) // n_columns)
+        return spec, count, fields
+
+    def parse(self, raw):
+        """메시지 -> (tr_id, [타입 변환된 레코드 튜플, ...])"""
+        spec, count, fields = self.split(raw)
+        n = len(spec.columns)
+        converters = spec.converters
+        records = [
+            tuple([conv(v) for conv, v in zip(converters, fields[i * n:(i + 1) * n])])
+            for i in range(count)
+        ]
+        return spec.tr_id, records
+
+    def parse_into(self, raw, out, start=0):
+        """
+        숫자 컬럼(spec.numeric_columns)을 out[start:start + 건수]에 바로 채웁니다.
+
+        Args:
+            out (np.ndarray): (행, len(numeric_columns)) float 배열
+            start (int): 채우기 시작할 행
+        Returns:
+            (tr_id, keys, count): keys는 레코드별 첫 컬럼 값 (종목코드)
+        """
+        spec, count, fields = self.split(raw)
+        n = len(spec.columns)
+        if start + count > len(out):
+            raise ValueError(f"out has no room for {count} records (start={start}, size={len(out)})")
+
+        numeric_index = spec.numeric_index
+        keys = []
+        for i in range(count):
+            base = i * n
+            keys.append(fields[base])
+            out[start + i] = [_to_number(fields[base + j]) for j in numeric_index]
+        return spec.tr_id, keys, count
+
+    def parse_dataframe(self, raw):
+        """메시지 -> (tr_id, DataFrame) 기존 pandas 방식과 같은 결과 (모든 값 문자열)"""
+        spec, count, fields = self.split(raw)
+        n = len(spec.columns)
+        rows = [fields[i * n:(i + 1) * n] for i in range(count)]
+        return spec.tr_id, pd.DataFrame(rows, columns=spec.columns, dtype=object)
@@ -0,0 +1,234 @@
+"""
+    업비트 마켓 목록 (로컬 스냅샷 + 백그라운드 갱신 + 별칭 색인)
+
+    /v1/market/all 응답을 파일(스냅샷)에 fetched_at과 함께 저장해 두고, 시작할 때는 파일을 바로 읽습니다.
+    (업비트에 연결하지 않아도 마지막 스냅샷으로 시작, 스냅샷이 없을 때만 시작하면서 조회)
+    refresh_interval이 지나면 백그라운드 스레드가 다시 조회해서 파일과 색인을 바꿉니다.
+    여러 프로세스가 같은 파일을 쓰면, 다른 프로세스가 먼저 갱신한 파일은 조회 없이 다시 읽기만 합니다.
+
+    별칭 색인 (KRW 마켓, 대문자로 맞춘 값 -> 마켓 코드)
+        KRW-BTC, BTC, BTCKRW, BTC/KRW, UPBIT:BTCKRW, 비트코인, BITCOIN
+        resolve(ticker)는 색인 dict 조회 한 번 (이름이 다른 코인의 심볼과 같으면 심볼이 우선)
+    색인 / 심볼 정보는 갱신할 때 새 dict로 통째로 바꾸므로 읽는 쪽은 잠금이 필요 없음
+
+    사용 예
+        catalog = MarketCatalog(fetch=lambda: requests.get(".../v1/market/all?is_details=true").json())
+        catalog.load_or_fetch()
+        catalog.start()                     # refresh_interval마다 갱신
+        catalog.resolve("BTCKRW")           # 'KRW-BTC'
+"""
+
+import json
+import os
+import threading
+import time
+
+QUOTE = "KRW"
+
+
+def aliases(market):
+    """
+    마켓 하나의 별칭 (대문자)
+    Returns:
+        tuple: (코드 / 심볼 별칭 리스트, 이름 별칭 리스트)
+    """
+    quote, symbol = market['market'].upper().split('-', 1)
+    codes = [f"{quote}-{symbol}", symbol, f"{symbol}{quote}", f"{symbol}/{quote}", f"UPBIT:{symbol}{quote}"]
+    names = [market.get('korean_name'), market.get('english_name')]
+    return codes, [name.strip().upper() for name in names if name and name.strip()]
+
+
+class MarketCatalog:
+    def __init__(self, fetch, path=os.path.join("data", "upbit_markets.json"), refresh_interval=6 * 3600.0,
+                 retry_interval=60.0, quote=QUOTE):
+        """
+        :param fetch: fetch() -> /v1/market/all 응답 리스트 (실패하면 None 또는 예외)
+        :param path: 스냅샷 파일
+        :param refresh_interval: 갱신 주기 (초)
+        :param retry_interval: 갱신 실패 시 다시 시도할 때까지 (초)
+        :param quote: 색인할 마켓 (KRW 마켓)
+        """
+        self.fetch = fetch
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self.quote = quote
+
+        self.fetched_at = None          # 스냅샷을 업비트에서 받은 시각 (epoch)
+        self.source = None              # snapshot / api
+        self._symbols = {}              # 심볼 -> {'market', 'korean_name', 'english_name', 'market_warning'}
+        self._aliases = {}              # 별칭 -> 마켓 코드
+        self._refresh_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+        self.refreshes = 0
+        self.reloads = 0
+        self.failures = 0
+
+    ##########################################################################################
+    # 색인
+    ##########################################################################################
+    def _build(self, markets, fetched_at, source):
+        symbols, names, codes = {}, {}, {}
+        prefix = f"{self.quote}-"
+        for market in markets:
+            if not market['market'].startswith(prefix):
+                continue
+            symbol = market['market'][len(prefix):].upper()
+            symbols[symbol] = {
+                'market': market['market'],
+                'korean_name': market.get('korean_name', ''),
+                'english_name': market.get('english_name', ''),
+                'market_warning': market.get('market_warning', 'NONE'),
+            }
+            market_codes, market_names = aliases(market)
+            for name in market_names:
+                names.setdefault(name, market['market'])
+            for code in market_codes:
+                codes[code] = market['market']
+
+        # 이름이 다른 코인의 심볼 / 코드와 겹치면 심볼 / 코드가 우선
+        index = {**names, **codes}
+        # 참조를 한 번에 바꿈 (읽는 쪽은 이전 색인 또는 새 색인 중 하나를 봄)
+        self._symbols, self._aliases = symbols, index
+        self.fetched_at, self.source = fetched_at, source
+
+    def resolve(self, ticker):
+        """티커 / 마켓 코드 / 이름 -> 마켓 코드 (없으면 None)"""
+        return self._aliases.get(ticker.strip().upper())
+
+    def info(self, symbol):
+        return self._symbols.get(symbol.upper())
+
+    def symbols(self):
+        return list(self._symbols)
+
+    def markets(self):
+        """심볼 -> 마켓 정보 dict (읽기 전용으로 사용)"""
+        return self._symbols
+
+    @property
+    def loaded(self):
+        return self.fetched_at is not None
+
+    def age(self):
+        return None if self.fetched_at is None else time.time() - self.fetched_at
+
+    ##########################################################################################
+    # 스냅샷 / 갱신
+    ##########################################################################################
+    def _read_snapshot(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            return snapshot['markets'], float(snapshot['fetched_at'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def load(self):
+        """
+        스냅샷 파일 읽기
+        Returns:
+            bool: 읽었는지 (파일이 없거나 깨졌으면 False)
+        """
+        snapshot = self._read_snapshot()
+        if snapshot is None:
+            return False
+        self._build(*snapshot, "snapshot")
+        return True
+
+    def refresh(self):
+        """
+        업비트에서 다시 받아 색인 / 스냅샷 갱신 (실패하면 기존 값 유지)
+        Returns:
+            bool: 성공 여부
+        """
+        with self._refresh_lock:
+            try:
+                markets = self.fetch()
+            except Exception as e:
+                print(f"[마켓 목록] 조회 실패: {e}")
+                markets = None
+            if not markets:
+                self.failures += 1
+                return False
+
+            fetched_at = time.time()
+            self._build(markets, fetched_at, "api")
+            self.refreshes += 1
+            try:
+                self._save(markets, fetched_at)
+            except OSError as e:
+                print(f"[마켓 목록] 스냅샷 저장 실패: {e}")
+            return True
+
+    def _save(self, markets, fetched_at):
+        # 임시 파일에 쓰고 바꿔치기 (읽는 쪽이 쓰다 만 파일을 보지 않도록)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({'fetched_at': fetched_at, 'markets': markets}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def refresh_if_due(self):
+        """
+        갱신 주기가 지났으면 갱신. 다른 프로세스가 먼저 갱신한 스냅샷이 있으면 조회 없이 다시 읽음
+        Returns:
+            bool: 최신 상태인지 (갱신 실패면 False)
+        """
+        age = self.age()
+        if age is not None and age < self.refresh_interval:
+            return True
+        snapshot = self._read_snapshot()
+        if snapshot is not None and (self.fetched_at is None or snapshot[1] > self.fetched_at) \
+                and time.time() - snapshot[1] < self.refresh_interval:
+            self._build(*snapshot, "snapshot")
+            self.reloads += 1
+            return True
+        return self.refresh()
+
+    def load_or_fetch(self):
+        """
+        시작할 때: 스냅샷이 있으면 바로 사용 (오래됐어도, 갱신은 백그라운드에서), 없으면 조회
+        Returns:
+            bool: 마켓 목록이 있는지
+        """
+        return self.load() or self.refresh()
+
+    ##########################################################################################
+    # 백그라운드 갱신
+    ##########################################################################################
+    def start(self):
+        """refresh_interval마다 갱신하는 스레드 시작 (fork한 프로세스에서는 다시 호출)"""
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="market-catalog", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def _run(self):
+        while not self._stop.is_set():
+            ok = self.refresh_if_due()
+            age = self.age()
+            if not ok or age is None:
+                delay = self.retry_interval
+            else:
+                delay = max(self.refresh_interval - age, 1.0)
+            self._stop.wait(delay)
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {
+            'markets': len(self._symbols),
+            'aliases': len(self._aliases),
+            'source': self.source,
+            'fetched_at': self.fetched_at,
+            'age': self.age(),
+            'refreshes': self.refreshes,
+            'reloads': self.reloads,
+            'failures': self.failures,
+        }
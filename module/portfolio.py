@@ -0,0 +1,218 @@
+"""
+    포트폴리오 미러 (업비트 잔고를 메모리에 유지)
+
+    매수 / 매도 판단마다 잔고 API를 호출하지 않도록, 처음 한 번 /v1/accounts로 잔고를 받아두고 아래로 갱신합니다.
+        - 주문 응답 (apply_order)     : 주문에 묶인 금액 / 수량을 balance -> locked로 옮김
+        - 내 주문 스트림 (myOrder)    : 체결(state=trade)마다 locked에서 빼고 받은 쪽 balance에 더함
+        - 내 자산 스트림 (myAsset)    : 업비트가 보내는 화폐별 잔고로 그대로 맞춤 (가장 정확)
+        - 주기적 재조회 (reconcile)   : reconcile_interval마다 /v1/accounts로 다시 맞춤 (어긋난 화폐 수는 drift로 기록)
+    스트림이 연결되어 있지 않으면 주문 응답 이후의 체결을 알 수 없으므로, 열린 주문이 있을 때 다음 조회에서 재조회합니다.
+
+    balances()는 /v1/accounts와 같은 형식의 리스트 (balance / locked / avg_buy_price는 float)
+"""
+
+import threading
+import time
+
+from module import upbit_ws
+
+KRW = "KRW"
+
+
+class PortfolioMirror:
+    def __init__(self, fetch_balances, reconcile_interval=300.0, clock=time.monotonic):
+        """
+        :param fetch_balances: fetch_balances() -> /v1/accounts 응답 리스트 (실패하면 None)
+        :param reconcile_interval: 재조회 주기 (초, 0이면 조회할 때마다 재조회)
+        """
+        self.fetch_balances = fetch_balances
+        self.reconcile_interval = reconcile_interval
+        self.clock = clock
+
+        self._assets = {}           # 화폐 -> {'balance', 'locked', 'avg_buy_price'}
+        self._open_orders = {}      # 주문 uuid -> 마켓 (응답은 반영했고 완료 / 취소는 아직)
+        self._loaded_at = None
+        self._stale = False         # 스트림 재접속 등으로 다음 조회에서 재조회
+        self._lock = threading.RLock()
+        self.streaming = False      # 내 주문 / 자산 스트림 연결 여부
+
+        self.reconciles = 0
+        self.drift = 0
+        self.order_updates = 0
+        self.fills = 0
+        self.asset_updates = 0
+
+    ##########################################################################################
+    # 재조회
+    ##########################################################################################
+    def reconcile(self):
+        """
+        /v1/accounts로 다시 맞춤
+        Returns:
+            bool: 성공 여부 (실패하면 기존 값 유지)
+        """
+        balances = self.fetch_balances()
+        if balances is None:
+            return False
+
+        assets = {
+            b['currency']: {
+                'balance': float(b['balance']),
+                'locked': float(b.get('locked') or 0),
+                'avg_buy_price': float(b.get('avg_buy_price') or 0),
+            } for b in balances
+        }
+        with self._lock:
+            if self._loaded_at is not None:
+                self.drift += sum(
+                    1 for currency in set(assets) | set(self._assets)
+                    if not _same(assets.get(currency), self._assets.get(currency))
+                )
+            self._assets = assets
+            self._loaded_at = self.clock()
+            self._stale = False
+            if not self.streaming:
+                # 스트림이 없으면 재조회 결과가 기준 (열린 주문의 체결도 이미 반영됨)
+                self._open_orders.clear()
+            self.reconciles += 1
+        return True
+
+    def needs_reconcile(self):
+        with self._lock:
+            if self._loaded_at is None or self._stale:
+                return True
+            if self.clock() - self._loaded_at >= self.reconcile_interval:
+                return True
+            return bool(self._open_orders) and not self.streaming
+
+    def ensure_fresh(self):
+        """필요하면 재조회. Returns: 잔고를 가지고 있는지"""
+        if self.needs_reconcile():
+            self.reconcile()
+        return self._loaded_at is not None
+
+    def mark_stale(self):
+        """다음 조회에서 재조회 (다른 워커 프로세스가 주문한 경우 등)"""
+        with self._lock:
+            self._stale = True
+
+    ##########################################################################################
+    # 조회 (메모리)
+    ##########################################################################################
+    def balances(self):
+        """/v1/accounts 형식 리스트 (잔고가 없으면 None)"""
+        with self._lock:
+            if self._loaded_at is None:
+                return None
+            return [{'currency': currency, **asset} for currency, asset in self._assets.items()]
+
+    def balance(self, currency):
+        """주문 가능 수량 (locked 제외)"""
+        with self._lock:
+            asset = self._assets.get(currency)
+            return asset['balance'] if asset else 0.0
+
+    def position(self, currency):
+        with self._lock:
+            asset = self._assets.get(currency)
+            return dict(asset) if asset else None
+
+    ##########################################################################################
+    # 갱신
+    ##########################################################################################
+    def _asset(self, currency):
+        return self._assets.setdefault(currency, {'balance': 0.0, 'locked': 0.0, 'avg_buy_price': 0.0})
+
+    def apply_order(self, order):
+        """주문 접수 응답(POST /v1/orders) 반영: 묶인 금액 / 수량을 locked로"""
+        market = order.get('market', '')
+        currency = market.split('-', 1)[-1]
+        with self._lock:
+            if order.get('side') == 'bid':
+                amount = float(order.get('locked') or 0) or float(order.get('price') or 0) + float(order.get('reserved_fee') or 0)
+                asset = self._asset(KRW)
+            else:
+                amount = float(order.get('volume') or 0)
+                asset = self._asset(currency)
+            moved = min(amount, asset['balance'])
+            asset['balance'] -= moved
+            asset['locked'] += moved
+            if order.get('uuid'):
+                self._open_orders[order['uuid']] = market
+            self.order_updates += 1
+
+    def apply_trade(self, market, side, price, volume, fee=0.0):
+        """체결 하나 반영"""
+        currency = market.split('-', 1)[-1]
+        funds = price * volume
+        with self._lock:
+            krw, coin = self._asset(KRW), self._asset(currency)
+            if side == 'bid':
+                krw['locked'] = max(krw['locked'] - funds - fee, 0.0)
+                held = coin['balance'] + coin['locked']
+                coin['avg_buy_price'] = (coin['avg_buy_price'] * held + funds) / (held + volume) if held + volume else 0.0
+                coin['balance'] += volume
+            else:
+                coin['locked'] = max(coin['locked'] - volume, 0.0)
+                krw['balance'] += funds - fee
+            self.fills += 1
+
+    def apply_assets(self, assets):
+        """화폐별 잔고 그대로 반영 [(화폐, balance, locked), ...]"""
+        with self._lock:
+            for currency, balance, locked in assets:
+                asset = self._asset(currency)
+                asset['balance'], asset['locked'] = float(balance), float(locked)
+            self.asset_updates += 1
+
+    ##########################################################################################
+    # 내 주문 / 자산 스트림 (UpbitWebSocket 콜백)
+    ##########################################################################################
+    def on_result(self, ws, msg_type, records, data_info):
+        columns = data_info["columns"]
+        if msg_type == upbit_ws.MY_ASSET:
+            self.apply_assets([(r[0], r[1], r[2]) for r in records])
+            return
+        if msg_type != upbit_ws.MY_ORDER:
+            return
+
+        for record in records:
+            event = dict(zip(columns, record))
+            if event['state'] == 'trade':
+                self.apply_trade(event['code'], event['ask_bid'].lower(), float(event['price']),
+                                 float(event['volume']), float(event.get('trade_fee') or 0))
+            elif event['state'] in ('done', 'cancel'):
+                with self._lock:
+                    self._open_orders.pop(event['uuid'], None)
+
+    def on_connect(self, uws, reconnected):
+        with self._lock:
+            self.streaming = True
+            if reconnected:
+                # 끊긴 동안의 체결은 받지 못했으므로 다음 조회에서 재조회
+                self._stale = True
+
+    def on_disconnect(self, uws, error):
+        with self._lock:
+            self.streaming = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'loaded': self._loaded_at is not None,
+                'age': None if self._loaded_at is None else self.clock() - self._loaded_at,
+                'streaming': self.streaming,
+                'assets': len(self._assets),
+                'open_orders': len(self._open_orders),
+                'reconciles': self.reconciles,
+                'drift': self.drift,
+                'order_updates': self.order_updates,
+                'fills': self.fills,
+                'asset_updates': self.asset_updates,
+            }
+
+
+def _same(a, b, tolerance=1e-8):
+    if a is None or b is None:
+        return a is b
+    return abs(a['balance'] - b['balance']) <= tolerance and abs(a['locked'] - b['locked']) <= tolerance
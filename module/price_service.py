@@ -0,0 +1,103 @@
+"""
+    현재가 서비스 (묶음 조회 + TTL 캐시)
+
+    업비트 /v1/ticker는 마켓 여러 개를 한 번에 조회할 수 있으므로, 필요한 마켓을 모아서 한 번에 가져오고
+    ttl 초 동안 캐시합니다. 보유 코인 30개의 평가 금액도 HTTP 호출 한 번입니다.
+
+    - get_prices(markets): 캐시가 없거나 오래된 마켓만 모아서 fetch 한 번 (max_batch개씩)
+    - update(market, price): 밖에서 받은 가격 반영 (웹소켓 체결 / 현재가)
+    - on_result: UpbitWebSocket on_result 콜백 형식 (체결 / 현재가 레코드의 trade_price 반영)
+      웹소켓으로 계속 받는 마켓은 REST 조회 없이 캐시에서 바로 나감
+
+    fetch(markets) -> {마켓: 가격} 은 호출하는 쪽에서 넣어줌 (UpbitClient 요청, 요청 수 제한 / 계측 포함)
+"""
+
+import threading
+import time
+
+TRADE_PRICE = "trade_price"
+
+
+class PriceService:
+    def __init__(self, fetch, ttl=2.0, max_batch=100, clock=time.monotonic):
+        """
+        :param fetch: fetch(markets) -> {마켓: 가격}. 실패하면 예외 또는 빈 dict
+        :param ttl: 캐시 유지 시간 (초)
+        :param max_batch: 요청 한 번에 조회할 최대 마켓 수
+        """
+        self.fetch = fetch
+        self.ttl = ttl
+        self.max_batch = max_batch
+        self.clock = clock
+
+        self._prices = {}           # 마켓 -> (가격, 받은 시각)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.requests = 0
+        self.stream_updates = 0
+
+    def get_prices(self, markets):
+        """
+        Returns:
+            dict: {마켓: 가격} (조회 실패한 마켓은 빠짐)
+        """
+        markets = list(dict.fromkeys(markets))
+        now = self.clock()
+        prices, missing = {}, []
+        with self._lock:
+            for market in markets:
+                cached = self._prices.get(market)
+                if cached is not None and now - cached[1] < self.ttl:
+                    prices[market] = cached[0]
+                else:
+                    missing.append(market)
+            self.hits += len(prices)
+            self.misses += len(missing)
+
+        for i in range(0, len(missing), self.max_batch):
+            batch = missing[i:i + self.max_batch]
+            self.requests += 1
+            fetched = self.fetch(batch) or {}
+            received = self.clock()
+            with self._lock:
+                for market, price in fetched.items():
+                    self._prices[market] = (price, received)
+            prices.update(fetched)
+        return prices
+
+    def get_price(self, market):
+        return self.get_prices([market]).get(market)
+
+    def update(self, market, price, received=None):
+        """밖에서 받은 가격 반영 (웹소켓 등)"""
+        with self._lock:
+            self._prices[market] = (price, self.clock() if received is None else received)
+            self.stream_updates += 1
+
+    def on_result(self, ws, msg_type, records, data_info):
+        """UpbitWebSocket on_result 콜백: 체결 / 현재가 레코드의 가격 반영 (호가는 무시)"""
+        columns = data_info["columns"]
+        if TRADE_PRICE not in columns:
+            return
+        index = columns.index(TRADE_PRICE)
+        for record in records:
+            self.update(record[0], record[index])
+
+    def invalidate(self, markets=None):
+        with self._lock:
+            if markets is None:
+                self._prices.clear()
+            for market in markets or ():
+                self._prices.pop(market, None)
+
+    def stats(self):
+        return {
+            'ttl': self.ttl,
+            'cached': len(self._prices),
+            'hits': self.hits,
+            'misses': self.misses,
+            'requests': self.requests,
+            'stream_updates': self.stream_updates,
+        }
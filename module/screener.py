@@ -0,0 +1,346 @@
+"""
+    종목 스크리너
+
+    전 종목(KOSPI + KOSDAQ)의 최근 N봉을 (종목 x 날짜) 행렬로 한 번에 불러와서,
+    지표 / 재무 조건을 종목 전체에 대해 배열 연산으로 계산하고 조건에 맞는 종목을 순위대로 반환합니다.
+    종목별로 데이터를 불러와 반복하지 않으므로 전 종목 스캔도 몇 초 안에 끝납니다.
+
+    필드
+        가격      : open, high, low, close, volume (마지막 봉 값), bars (유효한 봉 수)
+        지표      : sma_N, ema_N, rsi_N, return_N, volume_ratio_N, high_ratio_N, low_ratio_N,
+                    volatility_N, bb_percent_N, macd_hist
+                    (N은 기간, 예: rsi_14, sma_20, return_5)
+        재무/종목 : ticker_info 테이블의 market_cap, per, pbr, eps, bps, dividend_yield, dps, shares,
+                    market, sector, name (get_full_ticker로 채워짐)
+
+    조건
+        ("rsi_14", "<", 30), ("close", ">", "sma_20"), ("market", "in", ["KOSPI"]),
+        ("per", "between", (0, 15)) 또는 문자열 "rsi_14 < 30", "close > sma_20"
+        값 자리에 필드 이름을 쓰면 필드끼리 비교합니다. 값이 없는(na) 종목은 조건을 통과하지 못합니다.
+
+    사용 예
+        from module import screener
+
+        result = screener.screen(
+            filters=["rsi_14 < 30", "market_cap > 100000000000", ("close", ">", "sma_60")],
+            sort_by="volume_ratio_20", limit=20,
+        )
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from module.common import db_manager, metrics
+
+DEFAULT_BARS = 120
+
+FUNDAMENTAL_FIELDS = ("market_cap", "shares", "close_price", "bps", "per", "pbr", "eps", "dividend_yield", "dps")
+INFO_FIELDS = ("name", "market", "sector")
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+
+_FILTER_RE = re.compile(r"^\s*([A-Za-z_][A-Za-z_0-9]*)\s*(<=|>=|==|!=|<|>)\s*(\S+)\s*$")
+_INDICATOR_RE = re.compile(r"^([a-z_]+?)_(\d+)$")
+
+
+##############################################################################################
+# 종목 x 날짜 행렬
+##############################################################################################
+class MarketMatrix:
+    """
+    전 종목 가격 데이터 (행: 종목, 열: 날짜, 데이터가 없는 칸은 nan)
+    """
+    __slots__ = ("tickers", "dates", "open", "high", "low", "close", "volume")
+
+    def __init__(self, tickers, dates, open, high, low, close, volume):
+        self.tickers = tickers      # np.ndarray[str] (n_tickers,)
+        self.dates = dates          # np.ndarray[str] (n_dates,) YYYYMMDD
+        self.open = open            # np.ndarray[float32] (n_tickers, n_dates)
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    @property
+    def shape(self):
+        return self.close.shape
+
+    @classmethod
+    def from_long(cls, df, price_dtype=np.float32):
+        """
+        (ticker, date, open, high, low, close, volume) 형태의 데이터프레임 -> 행렬
+        가격은 frame_schema와 같이 float32로 보관 (거래량은 nan 표현을 위해 float64)
+        """
+        if df.empty:
+            empty = np.empty((0, 0))
+            return cls(np.array([], dtype=object), np.array([], dtype=object), empty, empty, empty, empty, empty)
+
+        ticker_cat = pd.Categorical(df['ticker'].astype(str))
+        date_cat = pd.Categorical(df['date'].astype(str))
+        rows, cols = ticker_cat.codes, date_cat.codes
+        shape = (len(ticker_cat.categories), len(date_cat.categories))
+
+        arrays = {}
+        for col in PRICE_FIELDS:
+            dtype = np.float64 if col == 'volume' else price_dtype
+            arr = np.full(shape, np.nan, dtype=dtype)
+            arr[rows, cols] = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=dtype)
+            arrays[col] = arr
+
+        return cls(
+            np.asarray(ticker_cat.categories, dtype=object),
+            np.asarray(date_cat.categories, dtype=object),
+            **arrays,
+        )
+
+
+##############################################################################################
+# 행렬 지표 (axis=1이 시간)
+##############################################################################################
+def _frame(x):
+    # pandas rolling / ewm은 열 단위로 계산하므로 (날짜 x 종목)으로 뒤집어서 처리
+    return pd.DataFrame(x.T)
+
+def rolling_mean(x, n):
+    return _frame(x).rolling(n, min_periods=n).mean().to_numpy().T
+
+def rolling_std(x, n):
+    return _frame(x).rolling(n, min_periods=n).std(ddof=0).to_numpy().T
+
+def rolling_max(x, n):
+    return _frame(x).rolling(n, min_periods=n).max().to_numpy().T
+
+def rolling_min(x, n):
+    return _frame(x).rolling(n, min_periods=n).min().to_numpy().T
+
+def ema(x, n):
+    return _frame(x).ewm(span=n, adjust=False, min_periods=n).mean().to_numpy().T
+
+def shift(x, n):
+    out = np.full_like(x, np.nan)
+    if n < x.shape[1]:
+        out[:, n:] = x[:, :x.shape[1] - n]
+    return out
+
+def rsi(close, n):
+    """rsi_strategy와 같은 방식 (Wilder 평활, ewm alpha=1/n)"""
+    change = close - shift(close, 1)
+    # rsi_strategy처럼 변화량이 없는(nan) 봉은 0으로 취급
+    gain = _frame(np.where(change > 0, change, 0.0))
+    loss = _frame(np.where(change < 0, -change, 0.0))
+    avg_gain = gain.ewm(alpha=1 / n, adjust=False, min_periods=n).mean().to_numpy().T
+    avg_loss = loss.ewm(alpha=1 / n, adjust=False, min_periods=n).mean().to_numpy().T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+##############################################################################################
+# 스크리너
+##############################################################################################
+class Screener:
+    def __init__(self, bars=DEFAULT_BARS, end_date=None, tickers=None):
+        """
+        :param bars: 불러올 최근 거래일 수 (가장 긴 지표 기간보다 길어야 함)
+        :param end_date: 기준일 (YYYYMMDD, 없으면 DB의 마지막 날짜)
+        :param tickers: 종목 제한 (없으면 DB의 전 종목)
+        """
+        self.bars = bars
+        self.end_date = end_date
+        self.tickers = tickers
+        self.matrix = None
+        self.info = None
+        self._fields = {}       # 필드 이름 -> 종목별 값 (n_tickers,)
+
+    @metrics.timed("screener.load")
+    def load(self, matrix=None, info=None):
+        """
+        가격 행렬과 종목 정보를 불러옵니다. (matrix / info를 넘기면 DB 대신 사용)
+        """
+        if matrix is None:
+            matrix = MarketMatrix.from_long(
+                db_manager.load_latest_bars_from_db(self.bars, end_date=self.end_date, tickers=self.tickers)
+            )
+        if info is None:
+            info = db_manager.load_ticker_info_from_db()
+
+        self.matrix = matrix
+        if info is not None and not info.empty and 'ticker' in info.columns:
+            info = info.assign(ticker=info['ticker'].astype(str)).drop_duplicates(subset=['ticker'])
+            self.info = info.set_index('ticker').reindex(matrix.tickers)
+        else:
+            self.info = pd.DataFrame(index=pd.Index(matrix.tickers, name='ticker'))
+        self._fields = {}
+        print(f"스크리너 데이터 로드: {matrix.shape[0]}개 종목 x {matrix.shape[1]}일")
+        return self
+
+    ##########################################################################################
+    # 필드 계산
+    ##########################################################################################
+    def field(self, name):
+        """필드 이름 -> 종목별 마지막 봉 기준 값 (캐시)"""
+        if self.matrix is None:
+            self.load()
+        if name not in self._fields:
+            self._fields[name] = self._compute_field(name)
+        return self._fields[name]
+
+    def _latest(self, x):
+        return x[:, -1] if x.shape[1] else np.full(x.shape[0], np.nan)
+
+    def _compute_field(self, name):
+        m = self.matrix
+
+        if name in PRICE_FIELDS:
+            return self._latest(getattr(m, name))
+        if name == "bars":
+            return np.count_nonzero(~np.isnan(m.close), axis=1).astype(np.float64)
+        if name == "macd_hist":
+            macd = ema(m.close, 12) - ema(m.close, 26)
+            return self._latest(macd - ema(macd, 9))
+        if name in FUNDAMENTAL_FIELDS:
+            if name not in self.info.columns:
+                return np.full(m.shape[0], np.nan)
+            return pd.to_numeric(self.info[name], errors='coerce').to_numpy(dtype=np.float64)
+        if name in INFO_FIELDS:
+            if name not in self.info.columns:
+                return np.full(m.shape[0], None, dtype=object)
+            return self.info[name].to_numpy(dtype=object)
+
+        match = _INDICATOR_RE.match(name)
+        if match is None:
+            raise ValueError(f"Unknown screener field: {name}")
+        indicator, n = match.group(1), int(match.group(2))
+        if n < 1:
+            raise ValueError(f"Invalid period for {name}")
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if indicator == "sma":
+                return self._latest(rolling_mean(m.close, n))
+            if indicator == "ema":
+                return self._latest(ema(m.close, n))
+            if indicator == "rsi":
+                return self._latest(rsi(m.close, n))
+            if indicator == "return":
+                return self._latest(m.close / shift(m.close, n) - 1)
+            if indicator == "volume_ratio":
+                # 마지막 봉 거래량 / 직전 n봉 평균 거래량
+                return self._latest(m.volume / shift(rolling_mean(m.volume, n), 1))
+            if indicator == "high_ratio":
+                return self._latest(m.close / rolling_max(m.high, n))
+            if indicator == "low_ratio":
+                return self._latest(m.close / rolling_min(m.low, n))
+            if indicator == "volatility":
+                return self._latest(rolling_std(m.close / shift(m.close, 1) - 1, n))
+            if indicator == "bb_percent":
+                mean, std = rolling_mean(m.close, n), rolling_std(m.close, n)
+                return self._latest((m.close - (mean - 2 * std)) / (4 * std))
+
+        raise ValueError(f"Unknown screener field: {name}")
+
+    def is_field(self, name):
+        if not isinstance(name, str):
+            return False
+        if name in PRICE_FIELDS or name in FUNDAMENTAL_FIELDS or name in INFO_FIELDS or name in ("bars", "macd_hist"):
+            return True
+        return _INDICATOR_RE.match(name) is not None
+
+    ##########################################################################################
+    # 조건 / 순위
+    ##########################################################################################
+    @staticmethod
+    def parse_filter(spec):
+        """문자열 조건 "rsi_14 < 30" -> ("rsi_14", "<", 30.0)"""
+        if not isinstance(spec, str):
+            if len(spec) != 3:
+                raise ValueError(f"Invalid filter: {spec}")
+            return tuple(spec)
+
+        match = _FILTER_RE.match(spec)
+        if match is None:
+            raise ValueError(f"Invalid filter: {spec}")
+        field, op, value = match.groups()
+        try:
+            value = float(value)
+        except ValueError:
+            pass
+        return field, op, value
+
+    def mask(self, spec):
+        """조건 하나 -> 종목별 통과 여부 (bool 배열)"""
+        field, op, value = self.parse_filter(spec)
+        left = self.field(field)
+
+        if op in ("in", "not in"):
+            values = [value] if isinstance(value, str) else list(value)
+            res = pd.Series(left).isin(values).to_numpy()
+            return res if op == "in" else ~res & pd.notna(left)
+
+        if op == "between":
+            low, high = value
+            with np.errstate(invalid='ignore'):
+                return (left >= low) & (left <= high)
+
+        right = self.field(value) if self.is_field(value) else value
+        with np.errstate(invalid='ignore'):
+            if op == "<":
+                return left < right
+            if op == "<=":
+                return left <= right
+            if op == ">":
+                return left > right
+            if op == ">=":
+                return left >= right
+            if op == "==":
+                return pd.Series(left).eq(right).to_numpy()
+            if op == "!=":
+                return pd.Series(left).ne(right).to_numpy() & pd.notna(left)
+        raise ValueError(f"Unknown filter operator: {op}")
+
+    @metrics.timed("screener.screen")
+    def screen(self, filters=(), sort_by=None, ascending=False, limit=50, columns=()):
+        """
+        조건을 모두 만족하는 종목을 sort_by 순서로 반환
+
+        Args:
+            filters (list): 조건 리스트 (튜플 또는 문자열)
+            sort_by (str): 순위 필드 (없으면 종목 코드 순)
+            ascending (bool): 오름차순 여부
+            limit (int): 최대 종목 수 (None이면 전체)
+            columns (list): 결과에 추가로 넣을 필드
+        Returns:
+            pd.DataFrame: ticker, name, market, 조건 / 순위 / 추가 필드 컬럼
+        """
+        if self.matrix is None:
+            self.load()
+
+        specs = [self.parse_filter(f) for f in filters]
+        selected = np.ones(self.matrix.shape[0], dtype=bool)
+        for spec in specs:
+            selected &= self.mask(spec)
+
+        # 결과 컬럼: 조건에 쓰인 필드 + 순위 필드 + 추가 필드 (순서 유지, 중복 제거)
+        fields = []
+        for name in [s[0] for s in specs] + [s[2] for s in specs if self.is_field(s[2])] + [sort_by, *columns]:
+            if name and name not in fields and name not in ("name", "market"):
+                fields.append(name)
+
+        rows = np.flatnonzero(selected)
+        result = pd.DataFrame({'ticker': self.matrix.tickers[rows]})
+        for name in ("name", "market"):
+            result[name] = self.field(name)[rows]
+        for name in fields:
+            result[name] = self.field(name)[rows]
+
+        if sort_by:
+            result = result.sort_values(sort_by, ascending=ascending, na_position='last', kind='stable')
+        if limit is not None:
+            result = result.head(int(limit))
+        return result.reset_index(drop=True)
+
+
+def screen(filters=(), sort_by=None, ascending=False, limit=50, columns=(), bars=DEFAULT_BARS, end_date=None, tickers=None):
+    """Screener를 만들어 한 번 스캔하는 편의 함수"""
+    return Screener(bars=bars, end_date=end_date, tickers=tickers).screen(
+        filters=filters, sort_by=sort_by, ascending=ascending, limit=limit, columns=columns
+    )
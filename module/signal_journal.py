@@ -0,0 +1,444 @@
+"""
+    웹훅 신호 기록 (버퍼 + 백그라운드 기록 JSONL, SQLite 색인)
+
+    요청마다 파일을 열고 한 줄 쓰는 대신, append()는 메모리 버퍼에 넣고 바로 돌아오고
+    백그라운드 스레드가 모아서 기록합니다.
+        - flush_interval 초마다, 또는 버퍼가 flush_bytes를 넘으면 기록
+        - 파일이 max_file_bytes를 넘거나 날짜가 바뀌면 새 파일 (signals_YYYYMMDD_<pid>_<번호>.jsonl)
+          프로세스마다 파일이 따로라서 멀티 워커에서도 줄이 섞이지 않음
+        - fsync 정책
+            none   : OS 버퍼까지만 (기본, 프로세스가 죽어도 남고 OS 장애 시 마지막 기록은 잃을 수 있음)
+            batch  : 기록할 때마다 fsync (최대 flush_interval 초만큼 잃을 수 있음)
+            always : append()에서 바로 기록 + fsync (느림, 잃지 않음)
+
+    색인 (index.db)
+        기록한 줄마다 (시각, 티커, 액션, 파일, 위치)를 SQLite에 넣어 둠
+        query(ticker, since, until)는 색인으로 해당 줄만 읽음 (파일 전체를 훑지 않음)
+        색인이 없거나 어긋나면 rebuild_index()로 파일에서 다시 만듦
+
+    재생
+        replay(handler, ...)는 조회한 신호를 시각 순서대로 handler(record)에 넘김 (speed를 주면 간격도 재현)
+        python -m module.signal_journal query --ticker BTC --since 2025-01-01
+        python -m module.signal_journal replay --url http://localhost:5000/ta-signal-test --ticker BTC
+
+    레코드
+        {"ts": 1735689600.123, "endpoint": "ta-signal", "ticker": "BTC", "action": "buy",
+         "strategy": "SMI/RSI", "trace": "...", "payload": {...}}   (텍스트 신호는 payload 대신 "text")
+"""
+
+import argparse
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from datetime import datetime
+
+FSYNC_POLICIES = ("none", "batch", "always")
+
+# 열려 있는 기록 (종료 / fork 처리용, 닫힌 기록은 참조를 잡지 않음)
+_OPEN_JOURNALS = weakref.WeakSet()
+_hooks_installed = False
+_hooks_lock = threading.Lock()
+
+
+def make_record(data, endpoint, trace=None, ts=None):
+    """웹훅 본문(dict 또는 문자열) -> 기록할 레코드"""
+    record = {"ts": time.time() if ts is None else ts, "endpoint": endpoint}
+    if isinstance(data, dict):
+        record.update(
+            ticker=str(data.get("instrument", {}).get("ticker") or "").upper() or None,
+            action=str(data.get("order", {}).get("action") or "").lower() or None,
+            strategy=data.get("strategy", {}).get("name"),
+            payload=data,
+        )
+    else:
+        record["text"] = data
+    if trace is not None:
+        record["trace"] = trace
+    return record
+
+def _parse_time(value):
+    """timestamp(float, 문자열 포함) / datetime / 'YYYY-MM-DD[ HH:MM:SS]' -> timestamp"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def _close_all():
+    for journal in list(_OPEN_JOURNALS):
+        journal.close()
+
+def _after_fork_all():
+    for journal in list(_OPEN_JOURNALS):
+        journal._after_fork()
+
+def _track(journal):
+    """열린 기록으로 등록 (atexit / fork 처리는 프로세스당 한 번만 등록)"""
+    global _hooks_installed
+    _OPEN_JOURNALS.add(journal)
+    if _hooks_installed:
+        return
+    with _hooks_lock:
+        if not _hooks_installed:
+            atexit.register(_close_all)
+            # fork한 워커(gunicorn)는 부모의 기록 스레드 / 잠금 / 파일을 물려받지 않음
+            os.register_at_fork(after_in_child=_after_fork_all)
+            _hooks_installed = True
+
+
+class SignalJournal:
+    def __init__(self, directory=os.path.join("data", "signals", "log"), flush_interval=1.0, flush_bytes=64 * 1024,
+                 max_file_bytes=64 * 1024 * 1024, fsync="none", index=True):
+        """
+        :param directory: 기록 폴더 (JSONL 파일 + index.db)
+        :param flush_interval: 버퍼를 기록하는 주기 (초)
+        :param flush_bytes: 버퍼가 이만큼 쌓이면 주기를 기다리지 않고 기록
+        :param max_file_bytes: 파일 하나의 최대 크기 (넘으면 새 파일)
+        :param fsync: none / batch / always
+        :param index: SQLite 색인 사용 여부
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}: {fsync}")
+
+        # 작업 폴더가 바뀌어도 (데몬화 등) 같은 폴더에 기록
+        self.directory = os.path.abspath(directory)
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.max_file_bytes = max_file_bytes
+        self.fsync = fsync
+        self.index = index
+
+        self._buffer = []               # (레코드, 직렬화된 줄)
+        self._buffered_bytes = 0
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+        self._file = None
+        self._file_name = None
+        self._file_date = None
+        self._file_seq = 0
+        self._index_conn = None
+
+        self.appended = 0
+        self.written = 0
+        self.flushes = 0
+        self.rotations = 0
+        self.errors = 0
+
+        _track(self)
+
+    ##########################################################################################
+    # 기록
+    ##########################################################################################
+    def append(self, record):
+        """레코드 추가 (버퍼에 넣고 바로 반환, fsync=always면 기록까지)"""
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        if self.fsync == "always":
+            self.appended += 1
+            self._write([(record, line)])
+            return
+
+        self._ensure_writer()
+        with self._cond:
+            self._buffer.append((record, line))
+            self._buffered_bytes += len(line)
+            self.appended += 1
+            if self._buffered_bytes >= self.flush_bytes:
+                self._cond.notify()
+
+    def flush(self):
+        """버퍼에 있는 레코드를 지금 기록"""
+        with self._cond:
+            batch, self._buffer, self._buffered_bytes = self._buffer, [], 0
+        if batch:
+            self._write(batch)
+
+    def _after_fork(self):
+        # 부모 버퍼의 레코드는 부모가 기록함, 파일 이름에 pid가 들어가므로 자식은 새 파일
+        self._buffer, self._buffered_bytes = [], 0
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._file = self._index_conn = None
+        self._file_date = None
+
+    def _ensure_writer(self):
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._closed = False
+            _track(self)        # close() 후 다시 쓰는 경우
+            self._thread = threading.Thread(target=self._run, name="signal-journal", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and self._buffered_bytes < self.flush_bytes:
+                    self._cond.wait(self.flush_interval)
+                closed = self._closed
+            try:
+                self.flush()
+            except Exception as e:
+                self.errors += 1
+                print(f"[신호 기록] 기록 실패: {e}")
+            if closed:
+                return
+
+    def _open(self, now):
+        date = now.strftime("%Y%m%d")
+        if self._file is not None and date == self._file_date and self._file.tell() < self.max_file_bytes:
+            return
+        if self._file is not None:
+            self._file.close()
+            self.rotations += 1
+        if date != self._file_date:
+            self._file_date, self._file_seq = date, 0
+        os.makedirs(self.directory, exist_ok=True)
+        while True:
+            self._file_seq += 1
+            name = f"signals_{date}_{os.getpid()}_{self._file_seq:03d}.jsonl"
+            path = os.path.join(self.directory, name)
+            if not os.path.exists(path) or os.path.getsize(path) < self.max_file_bytes:
+                break
+        self._file_name = name
+        self._file = open(path, "ab")
+        _track(self)
+
+    def _write(self, batch):
+        with self._write_lock:
+            rows = []
+            for record, line in batch:
+                self._open(datetime.fromtimestamp(record["ts"]))
+                data = line.encode("utf-8")
+                offset = self._file.tell()
+                self._file.write(data)
+                rows.append((record["ts"], record.get("ticker"), record.get("action"), record.get("endpoint"),
+                             self._file_name, offset, len(data)))
+            self._file.flush()
+            if self.fsync != "none":
+                os.fsync(self._file.fileno())
+            if self.index:
+                self._index_rows(rows)
+            self.written += len(batch)
+            self.flushes += 1
+
+    def close(self):
+        """남은 버퍼를 기록하고 기록 스레드 종료"""
+        _OPEN_JOURNALS.discard(self)
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=10)
+        self.flush()
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._index_conn is not None:
+                self._index_conn.close()
+                self._index_conn = None
+
+    ##########################################################################################
+    # 색인
+    ##########################################################################################
+    def _connect_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(self.directory, "index.db"), timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS records (
+                ts REAL NOT NULL,
+                ticker TEXT,
+                action TEXT,
+                endpoint TEXT,
+                file TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                PRIMARY KEY (file, offset)
+            );
+            CREATE INDEX IF NOT EXISTS idx_records_ts ON records (ts);
+            CREATE INDEX IF NOT EXISTS idx_records_ticker_ts ON records (ticker, ts);
+        ''')
+        return conn
+
+    def _index_rows(self, rows):
+        if self._index_conn is None:
+            self._index_conn = self._connect_index()
+        with self._index_conn:
+            self._index_conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def files(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name for name in os.listdir(self.directory) if name.startswith("signals_") and name.endswith(".jsonl"))
+
+    def rebuild_index(self):
+        """
+        JSONL 파일로 색인을 다시 만듦 (색인을 지웠거나 파일을 옮겨온 경우)
+        Returns:
+            int: 색인한 레코드 수
+        """
+        self.flush()
+        conn = self._connect_index()
+        count = 0
+        with conn:
+            conn.execute("DELETE FROM records")
+            for name in self.files():
+                rows = []
+                with open(os.path.join(self.directory, name), "rb") as f:
+                    offset = 0
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break           # 쓰다 만 마지막 줄
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            offset += len(line)
+                            continue
+                        rows.append((record["ts"], record.get("ticker"), record.get("action"), record.get("endpoint"),
+                                     name, offset, len(line)))
+                        offset += len(line)
+                conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                count += len(rows)
+        conn.close()
+        return count
+
+    ##########################################################################################
+    # 조회 / 재생
+    ##########################################################################################
+    def query(self, ticker=None, since=None, until=None, action=None, endpoint=None, limit=None):
+        """
+        색인으로 신호 조회 (시각 순서)
+        :param since, until: timestamp / datetime / 'YYYY-MM-DD[ HH:MM:SS]' (until은 포함하지 않음)
+        Returns:
+            list: 레코드 dict
+        """
+        self.flush()
+        conditions, params = [], []
+        for column, value in (("ticker", ticker.upper() if ticker else None), ("action", action), ("endpoint", endpoint)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            conditions.append("ts >= ?")
+            params.append(_parse_time(since))
+        if until is not None:
+            conditions.append("ts < ?")
+            params.append(_parse_time(until))
+        sql = "SELECT file, offset, length FROM records"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY ts"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+
+        conn = self._connect_index()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+        records, handles = [], {}
+        try:
+            for name, offset, length in rows:
+                f = handles.get(name)
+                if f is None:
+                    f = handles[name] = open(os.path.join(self.directory, name), "rb")
+                f.seek(offset)
+                records.append(json.loads(f.read(length)))
+        finally:
+            for f in handles.values():
+                f.close()
+        return records
+
+    def replay(self, handler, speed=None, **filters):
+        """
+        조회한 신호를 시각 순서대로 handler(record)에 넘김
+        :param speed: None이면 기다리지 않음, 1.0이면 기록된 간격 그대로, 10.0이면 10배 빠르게
+        :param filters: query() 인자 (ticker, since, until, action, endpoint, limit)
+        Returns:
+            int: 재생한 신호 수
+        """
+        previous = None
+        records = self.query(**filters)
+        for record in records:
+            if speed and previous is not None:
+                time.sleep(max(record["ts"] - previous, 0) / speed)
+            previous = record["ts"]
+            handler(record)
+        return len(records)
+
+    def stats(self):
+        return {
+            'fsync': self.fsync,
+            'appended': self.appended,
+            'written': self.written,
+            'buffered': len(self._buffer),
+            'flushes': self.flushes,
+            'rotations': self.rotations,
+            'errors': self.errors,
+            'file': self._file_name,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="웹훅 신호 기록 조회 / 재생")
+    parser.add_argument("command", choices=["query", "replay", "reindex"])
+    parser.add_argument("--dir", default=os.path.join("data", "signals", "log"), help="기록 폴더")
+    parser.add_argument("--ticker")
+    parser.add_argument("--action")
+    parser.add_argument("--endpoint")
+    parser.add_argument("--since", help="YYYY-MM-DD[ HH:MM:SS]")
+    parser.add_argument("--until", help="YYYY-MM-DD[ HH:MM:SS]")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--url", help="replay: 신호를 보낼 웹훅 주소 (없으면 출력만)")
+    parser.add_argument("--speed", type=float, help="replay: 재생 속도 (1.0이면 기록된 간격 그대로)")
+    args = parser.parse_args()
+
+    journal = SignalJournal(args.dir)
+    if args.command == "reindex":
+        print(f"색인한 레코드 수: {journal.rebuild_index()}")
+        return
+
+    filters = dict(ticker=args.ticker, action=args.action, endpoint=args.endpoint,
+                   since=args.since, until=args.until, limit=args.limit)
+    if args.command == "query":
+        for record in journal.query(**filters):
+            print(json.dumps(record, ensure_ascii=False))
+        return
+
+    if args.url:
+        import requests
+
+        session = requests.Session()
+
+        def handler(record):
+            if "payload" in record:
+                response = session.post(args.url, json=record["payload"], timeout=30)
+            else:
+                response = session.post(args.url, data=(record.get("text") or "").encode("utf-8"), timeout=30)
+            print(f"[재생] {datetime.fromtimestamp(record['ts'])} {record.get('ticker')} {record.get('action')} -> {response.status_code}")
+    else:
+        def handler(record):
+            print(json.dumps(record, ensure_ascii=False))
+
+    print(f"재생한 신호 수: {journal.replay(handler, speed=args.speed, **filters)}")
+
+
+if __name__ == "__main__":
+    main()
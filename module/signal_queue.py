@@ -0,0 +1,278 @@
+"""
+    웹훅 신호 대기열 (빠른 응답 모드)
+
+    웹훅 핸들러는 신호를 확인하고 저널에 기록한 뒤 signal id와 함께 바로 응답하고,
+    주문(잔고 / 현재가 조회, 주문 접수)은 백그라운드(dispatch, 보통 OrderService)에서 실행합니다.
+
+    저널 (append-only JSONL, 한 줄에 이벤트 하나)
+        {"op": "queued", "id": ..., "key": ..., "ts": ..., "ticker": ..., "action": ..., "payload": {...}}
+        {"op": "done" | "failed" | "error" | "expired", "id": ..., "ts": ..., "message": ...}
+    기록할 때마다 flush (프로세스가 죽어도 남음), fsync=True면 OS 장애에도 남도록 fsync
+    recover(): 시작 시 저널을 읽어 상태를 복원하고, 끝나지 않은 신호(queued)를 다시 실행
+        받은 지 max_replay_age 초가 지난 신호는 실행하지 않고 expired로 기록 (오래된 시장가 주문이 지금 가격에 나가지 않도록)
+        다시 실행하는 신호에는 recovered=True를 붙여 dispatch (이미 주문이 접수됐는지 확인하는 건 dispatch 쪽,
+        서버는 signal id를 업비트 주문 identifier로 써서 조회)
+        읽은 뒤 저널을 끝나지 않은 신호 + 중복 제거 키가 아직 유효한 신호의 줄만 남기고 다시 씀 (저널이 계속 커지지 않도록)
+
+    중복 제거 (idempotency)
+        같은 키의 신호가 idempotency_ttl 초 안에 다시 오면 실행하지 않고 처음 신호의 id를 돌려줌
+        키는 호출하는 쪽이 명시적으로 줄 때만 (Idempotency-Key 헤더 등), 키가 없으면 중복 제거하지 않음
+        (TradingView 알림 본문에는 시각이 없어서 같은 본문의 신호가 실제로 다시 올 수 있음)
+
+    여러 워커 프로세스 (store=SharedState)
+        저널 / 중복 제거 키 / 상태를 SQLite(store)에 두어 모든 워커가 같이 씀 (JSONL 저널은 쓰지 않음)
+        recover()는 boot가 다른(이전 실행) 끝나지 않은 신호를 한 워커만 가져가서 다시 실행
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+QUEUED = "queued"
+DONE = "done"
+FAILED = "failed"
+ERROR = "error"
+EXPIRED = "expired"
+
+
+class SignalQueue:
+    def __init__(self, dispatch, journal_path=os.path.join("data", "signals", "journal.jsonl"),
+                 idempotency_ttl=600.0, fsync=False, max_records=10_000, store=None, boot=None,
+                 max_replay_age=60.0):
+        """
+        :param dispatch: dispatch(signal, callback) -> Future. 신호 실행 (callback(future)는 끝났을 때 호출)
+                         future 결과가 True면 done, False면 failed, 예외면 error
+        :param journal_path: 저널 파일 (None이면 기록하지 않음, 테스트용)
+        :param idempotency_ttl: 같은 키를 중복으로 보는 시간 (초)
+        :param fsync: 기록마다 fsync (느리지만 OS 장애에도 보존)
+        :param max_records: 메모리에 보관할 신호 상태 수 (오래된 것부터 버림, 저널에는 남음)
+        :param store: 워커 간 공유 저장소 (module.common.shared_state.SharedState, 있으면 journal_path 대신 사용)
+        :param boot: 이번 실행 id (store를 쓸 때 recover에서 이전 실행의 신호를 구분)
+        :param max_replay_age: recover에서 다시 실행할 신호의 최대 나이 (초, 더 오래되면 expired)
+        """
+        self.dispatch = dispatch
+        self.journal_path = journal_path
+        self.idempotency_ttl = idempotency_ttl
+        self.fsync = fsync
+        self.max_records = max_records
+        self.store = store
+        self.boot = boot or uuid.uuid4().hex
+        self.max_replay_age = max_replay_age
+
+        self._signals = OrderedDict()   # id -> 상태 dict
+        self._keys = OrderedDict()      # 중복 제거 키 -> (id, 받은 시각), 받은 순서
+        self._lock = threading.Lock()
+        self._file = None
+
+        self.accepted = 0
+        self.duplicates = 0
+        self.expired = 0
+
+    ##########################################################################################
+    # 저널
+    ##########################################################################################
+    def _write(self, entry):
+        """저널에 한 줄 기록 (lock 안에서 호출)"""
+        if self.journal_path is None:
+            return
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+            self._file = open(self.journal_path, "a", encoding="utf-8")
+        self._file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _remember(self, signal):
+        self._signals[signal['id']] = signal
+        while len(self._signals) > self.max_records:
+            self._signals.popitem(last=False)
+
+    def _expire_keys(self, now):
+        while self._keys:
+            key, (_, received) = next(iter(self._keys.items()))
+            if now - received < self.idempotency_ttl:
+                break
+            self._keys.popitem(last=False)
+
+    def recover(self):
+        """
+        저널로 상태 복원, 끝나지 않은 신호 다시 실행
+        Returns:
+            int: 다시 실행한 신호 수
+        """
+        if self.store is not None:
+            return self._recover_store()
+        if self.journal_path is None or not os.path.exists(self.journal_path):
+            return 0
+
+        now = time.time()
+        pending = OrderedDict()
+        lines = OrderedDict()   # id -> 저널 줄 (다시 쓸 때 남길 신호 고르기용)
+        with self._lock:
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break               # 쓰다 만 마지막 줄 (다시 쓸 때 버림)
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if entry.get('op') == QUEUED:
+                        signal = {k: v for k, v in entry.items() if k != 'op'}
+                        signal['status'] = QUEUED
+                        self._remember(signal)
+                        pending[signal['id']] = signal
+                        lines[signal['id']] = [line]
+                        if entry.get('key') and now - entry['ts'] < self.idempotency_ttl:
+                            self._keys[entry['key']] = (entry['id'], entry['ts'])
+                    elif entry.get('id') in lines:
+                        # max_records로 메모리에서 빠진 신호도 끝난 것으로 처리 (다시 실행하지 않도록)
+                        if entry['id'] in self._signals:
+                            self._signals[entry['id']].update(status=entry['op'], finished=entry['ts'], message=entry.get('message'))
+                        pending.pop(entry['id'], None)
+                        lines[entry['id']].append(line)
+
+            live = {signal_id for signal_id, _ in self._keys.values()}
+            self._compact([b"".join(lines[signal_id]) for signal_id in lines
+                           if signal_id in pending or signal_id in live])
+
+        return self._replay(pending.values(), now)
+
+    def _compact(self, lines):
+        """저널을 주어진 줄로 다시 씀 (임시 파일에 쓰고 교체, lock 안에서 호출)"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        tmp_path = self.journal_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.writelines(lines)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+
+    def _recover_store(self):
+        pending = self.store.claim_pending(QUEUED, self.boot)
+        with self._lock:
+            for signal in pending:
+                self._remember(signal)
+        return self._replay(pending, time.time())
+
+    def _replay(self, pending, now):
+        replayed = 0
+        for signal in pending:
+            age = now - signal['ts']
+            if age > self.max_replay_age:
+                print(f"[신호] 오래된 신호는 실행하지 않음 ({age:.0f}초 전): {signal['id']} {signal['ticker']} {signal['action']}")
+                self.expired += 1
+                self._set_status(signal, EXPIRED, f"{age:.0f}초 전 신호 (최대 {self.max_replay_age:.0f}초)")
+                continue
+            print(f"[신호] 끝나지 않은 신호 다시 실행: {signal['id']} {signal['ticker']} {signal['action']}")
+            signal['recovered'] = True
+            self._dispatch(signal)
+            replayed += 1
+        return replayed
+
+    ##########################################################################################
+    # 신호 추가 / 실행
+    ##########################################################################################
+    def submit(self, ticker, action, payload=None, key=None):
+        """
+        신호 추가 (저널 기록 후 dispatch)
+        :param key: 중복 제거 키 (없으면 중복 제거하지 않음)
+        Returns:
+            tuple: (signal id, 중복 여부). 중복이면 처음 신호의 id, 실행하지 않음
+        """
+        now = time.time()
+
+        signal = {
+            'id': uuid.uuid4().hex, 'key': key, 'ts': now,
+            'ticker': ticker, 'action': action, 'payload': payload,
+        }
+        with self._lock:
+            if self.store is not None:
+                seen = self.store.add_signal({**signal, 'status': QUEUED}, self.boot, self.idempotency_ttl)
+                if seen is not None:
+                    self.duplicates += 1
+                    return seen, True
+            else:
+                self._expire_keys(now)
+                seen = self._keys.get(key) if key is not None else None
+                if seen is not None:
+                    self.duplicates += 1
+                    return seen[0], True
+                self._write({'op': QUEUED, **signal})
+                if key is not None:
+                    self._keys[key] = (signal['id'], now)
+
+            signal['status'] = QUEUED
+            self._remember(signal)
+            self.accepted += 1
+
+        self._dispatch(signal)
+        return signal['id'], False
+
+    def _dispatch(self, signal):
+        try:
+            self.dispatch(signal, lambda future: self._finish(signal, future))
+        except Exception as e:
+            self._set_status(signal, ERROR, f"dispatch 실패: {e}")
+
+    def _finish(self, signal, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            self._set_status(signal, ERROR, str(e))
+            return
+        self._set_status(signal, DONE if result else FAILED)
+
+    def _set_status(self, signal, status, message=None):
+        now = time.time()
+        with self._lock:
+            signal.update(status=status, finished=now, message=message)
+            entry = {'op': status, 'id': signal['id'], 'ts': now}
+            if message:
+                entry['message'] = message
+            try:
+                if self.store is not None:
+                    self.store.update_signal(signal['id'], status, now, message)
+                else:
+                    self._write(entry)
+            except Exception as e:
+                print(f"[신호] 저널 기록 실패: {e}")
+
+    ##########################################################################################
+    # 조회
+    ##########################################################################################
+    def status(self, signal_id):
+        """신호 상태 (없으면 None, payload 제외). store를 쓰면 다른 워커가 받은 신호도 조회"""
+        with self._lock:
+            signal = self._signals.get(signal_id)
+            if signal is not None:
+                return {k: v for k, v in signal.items() if k not in ('payload', 'key')}
+        if self.store is not None:
+            return self.store.get_signal(signal_id)
+        return None
+
+    def pending(self):
+        with self._lock:
+            return sum(1 for signal in self._signals.values() if signal['status'] == QUEUED)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def stats(self):
+        return {
+            'accepted': self.accepted,
+            'duplicates': self.duplicates,
+            'expired': self.expired,
+            'pending': self.pending(),
+            'tracked': len(self._signals),
+        }
@@ -523,6 +523,72 @@ def get_itempricechart_2(
 
     return result_data
 
+##############################################################################################
+# [국내주식] 기본시세 > 주식당일분봉조회
+# 당일 1분봉을 FID_INPUT_HOUR_1 시각부터 과거 방향으로 최대 30건씩 조회합니다. (전일 이전 분봉은 조회 불가)
+# 웹소켓이 끊긴 구간의 봉을 다시 채울 때 사용 (module/gap_backfill.py)
+##############################################################################################
+def get_minute_chart(
+        itm_no="",          # 종목번호 (6자리)
+        start_time="090000",# 조회 시작 시각 HHMMSS (포함)
+        end_time="153000",  # 조회 끝 시각 HHMMSS (포함)
+        div_code="J",       # 시장 분류 코드 J: 주식/ETF/ETN
+        request_interval=0.2,
+        invest_type="VPS", index=0,
+):
+    """
+    Returns:
+        pd.DataFrame: date(YYYYMMDDHHMMSS, 분 시작 시각), open, high, low, close, volume, amount (오름차순)
+        amount는 누적 거래대금의 차이 (조회 구간 첫 분봉은 close * volume으로 근사)
+    """
+    url = '/uapi/domestic-stock/v1/quotations/inquire-time-itemchartprice'
+    tr_id = "FHKST03010200"  # 주식당일분봉조회
+
+    rows = {}
+    cursor = end_time
+    while cursor >= start_time:
+        params = {
+            "FID_ETC_CLS_CODE": "",
+            "FID_COND_MRKT_DIV_CODE": div_code,
+            "FID_INPUT_ISCD": itm_no,
+            "FID_INPUT_HOUR_1": cursor,         # 이 시각 이전 30건
+            "FID_PW_DATA_INCU_YN": "N",         # 과거 데이터 포함 여부
+        }
+        res = kis_fetcher.url_fetch(url, tr_id, "", params, invest_type=invest_type, index=index)
+        if res is None or not res.isOK():
+            break
+
+        output = getattr(res.getBody(), "output2", None) or []
+        for item in output:
+            hhmmss = item.get("stck_cntg_hour", "")
+            if not hhmmss or not (start_time <= hhmmss <= end_time):
+                continue
+            rows[item["stck_bsop_date"] + hhmmss] = (
+                int(item["stck_oprc"]), int(item["stck_hgpr"]), int(item["stck_lwpr"]), int(item["stck_prpr"]),
+                int(item["cntg_vol"]), int(item["acml_tr_pbmn"]),
+            )
+
+        times = [item.get("stck_cntg_hour", "") for item in output if item.get("stck_cntg_hour")]
+        if len(output) < 30 or not times or min(times) >= cursor:
+            break
+        # 다음 페이지: 가장 이른 분봉의 1분 전부터
+        earliest = datetime.strptime(min(times), "%H%M%S") - timedelta(minutes=1)
+        cursor = earliest.strftime("%H%M%S")
+        time.sleep(request_interval)
+
+    columns = ['date', 'open', 'high', 'low', 'close', 'volume', 'amount']
+    if not rows:
+        return pd.DataFrame(columns=columns)
+
+    dataframe = pd.DataFrame(
+        [(date, *values) for date, values in sorted(rows.items())],
+        columns=['date', 'open', 'high', 'low', 'close', 'volume', 'acml_amount'],
+    )
+    dataframe['amount'] = dataframe['acml_amount'].diff()
+    dataframe.loc[dataframe.index[0], 'amount'] = dataframe['close'].iloc[0] * dataframe['volume'].iloc[0]
+    dataframe['amount'] = dataframe['amount'].astype('int64')
+    return dataframe[columns]
+
 def get_full_ticker(include_screening_data=True):
     """
     pykrx를 사용해서 한국에 상장된 모든 ticker를 가져와서 데이터베이스에 저장
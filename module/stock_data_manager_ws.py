@@ -148,6 +148,64 @@ def asking_price_krx(tr_type: str, tr_key: str, env_dv: str = "real",) -> list:
 
     return [msg, columns]
 
+##############################################################################################
+# [국내주식] 실시간시세 > 국내주식 실시간체결가 (KRX) [실시간-003]
+##############################################################################################
+
+def ccnl_krx(tr_type: str, tr_key: str, env_dv: str = "real",) -> list:
+    """
+    국내주식 실시간 체결가 데이터 구독 (KRX)[H0STCNT0]
+
+    체결이 일어날 때마다 체결가(STCK_PRPR), 체결 거래량(CNTG_VOL), 누적 거래량 등을 받습니다.
+    틱 저장소(tick_store) / 실시간 봉 집계에서 사용하는 틱 데이터입니다.
+
+    Args:
+        tr_type (str): [필수] 구독 등록("1") 또는 해제("2") 여부
+        tr_key (str): [필수] 종목코드 (빈 문자열 불가)
+        env_dv (str): 실전모의구분 (real: 실전, demo: 모의)
+
+    Returns:
+        message (dict): 실시간 데이터 구독에 대한 메시지 데이터
+        columns (list[str]): 실시간 데이터의 컬럼 정보
+
+    Raises:
+        ValueError: 필수 파라미터가 누락되었거나 잘못된 경우 발생
+
+    Example:
+        >>> msg, columns = ccnl_krx("1", "005930")
+    """
+
+    # 필수 파라미터 검증
+    if not tr_key:
+        raise ValueError("tr_key는 필수 입력값입니다.")
+
+    if env_dv not in ("real", "demo"):
+        raise ValueError("env_dv는 'real' 또는 'demo'만 가능합니다.")
+    tr_id = "H0STCNT0"  # 실전 / 모의 동일
+
+    params = {
+        "tr_key": tr_key,
+    }
+
+    # 데이터 구독 요청
+    msg = kis_fetcher.data_fetch(tr_id, tr_type, params)
+
+    # 응답 데이터 컬럼 정보
+    columns = [
+        "MKSC_SHRN_ISCD", "STCK_CNTG_HOUR", "STCK_PRPR", "PRDY_VRSS_SIGN", "PRDY_VRSS",
+        "PRDY_CTRT", "WGHN_AVRG_STCK_PRC", "STCK_OPRC", "STCK_HGPR", "STCK_LWPR",
+        "ASKP1", "BIDP1", "CNTG_VOL", "ACML_VOL", "ACML_TR_PBMN",
+        "SELN_CNTG_CSNU", "SHNU_CNTG_CSNU", "NTBY_CNTG_CSNU", "CTTR", "SELN_CNTG_SMTN",
+        "SHNU_CNTG_SMTN", "CCLD_DVSN", "SHNU_RATE", "PRDY_VOL_VRSS_ACML_VOL_RATE", "OPRC_HOUR",
+        "OPRC_VRSS_PRPR_SIGN", "OPRC_VRSS_PRPR", "HGPR_HOUR", "HGPR_VRSS_PRPR_SIGN", "HGPR_VRSS_PRPR",
+        "LWPR_HOUR", "LWPR_VRSS_PRPR_SIGN", "LWPR_VRSS_PRPR", "BSOP_DATE", "NEW_MKOP_CLS_CODE",
+        "TRHT_YN", "ASKP_RSQN1", "BIDP_RSQN1", "TOTAL_ASKP_RSQN", "TOTAL_BIDP_RSQN",
+        "VOL_TNRT", "PRDY_SMNS_HOUR_ACML_VOL", "PRDY_SMNS_HOUR_ACML_VOL_RATE", "HOUR_CLS_CODE",
+        "MRKT_TRTM_CLS_CODE", "VI_STND_PRC"
+    ]
+
+    return [msg, columns]
+
 ##############################################################################################
 # [국내주식] 실시간시세 > 국내주식 실시간호가 (NXT)
 ############################################################
\ No newline at end of file
@@ -1,8 +1,11 @@
 
 import json
+import operator
 import os
 from datetime import datetime
-from strategy.strategy import SignalType, TradingSignal
+import numpy as np
+from strategy.strategy import SignalType, TradingSignal, SignalFrame, SIGNAL_CODES, CODE_TO_SIGNAL
+from module.common import metrics
 
 BACKTEST_FILEPATH = "data/state/backtest/"
 PAPER_FILEPATH = "data/state/paper/"
@@ -30,6 +33,11 @@ class Orderer:
         self.filepath = None    # 파일 경로를 저장할 변수
         self.state = None  # 상태를 저장할 변수
 
+    def __init_subclass__(cls, **kwargs):
+        # 하위 orderer의 주문 / 상태 저장 실행 시간 측정
+        super().__init_subclass__(**kwargs)
+        metrics.wrap_methods(cls, ("place_order", "place_orders", "save_state", "load_state", "end_test"), prefix="orderer")
+
     def get_state(self):
         return self.state
 
@@ -60,6 +68,16 @@ class Orderer:
         """
         raise NotImplementedError("This method should be overridden by subclasses")
 
+    def place_orders(self, signal_frame):
+        """
+        SignalFrame의 신호들을 순서대로 주문합니다. (배치 처리)
+        기본 구현은 신호마다 TradingSignal로 바꿔서 place_order를 호출합니다.
+        """
+        if not isinstance(signal_frame, SignalFrame):
+            raise ValueError("signal_frame must be a SignalFrame")
+        for signal in signal_frame.to_signals():
+            self.place_order(order_info=signal)
+
 class BackTest_Orderer(Orderer):
     """
         백테스트용 주문 실행 모듈
@@ -70,12 +88,18 @@ class BackTest_Orderer(Orderer):
         - price : 주문 가격
     """
 
-    def end_test(self):
+    def end_test(self, save_file=True):
         """
         백테스트 종료 메서드
         - 백테스트 결과를 저장하고 상태를 초기화합니다.
+        - save_file=False 이면 파일로 저장하지 않고 상태만 반환합니다. (결과 저장소를 쓰는 경우)
         """
         print("Ending backtest and saving state...")
+        if not save_file:
+            self.state['portfolioValue'] = self.state['balance'] + sum(
+                pos['quantity'] * pos['current_price'] for pos in self.state['positions'].values()
+            )
+            return self.state
         return self.save_state(self.state)
 
     def save_state(self, state):
@@ -219,6 +243,252 @@ class BackTest_Orderer(Orderer):
             'confidence': confidence
         })
 
+
+class Columnar_BackTest_Orderer(Orderer):
+    """
+        컬럼(struct-of-arrays) 기반 백테스트용 주문 실행 모듈
+
+        - 주문 중에는 포지션, 거래 기록, 스텝별 equity curve를 컬럼별 파이썬 리스트에 쌓습니다.
+          (NumPy 배열을 스칼라 하나씩 읽고 쓰면 dict보다 느림)
+        - 조회 / 저장할 때 리스트를 한 번에 NumPy 배열로 만듭니다. (get_equity_curve, save_state)
+        - get_state()는 BackTest_Orderer와 같은 dict 형태를 만들어서 반환합니다.
+        - save_state()는 압축된 .npz 바이너리 파일로 저장합니다.
+        - record_hold=False 이면 HOLD 신호는 거래 기록에 남기지 않습니다. (equity curve에는 기록)
+    """
+    INITIAL_BALANCE = 10000000
+    TRADE_COLUMNS = (
+        ('trade_time', np.int64), ('trade_code', np.int8), ('trade_ticker', np.int32),
+        ('trade_position_size', np.float64), ('trade_price', np.float64),
+        ('trade_quantity', np.int64),       # -1 : 수량 없음 (None)
+        ('trade_confidence', np.float64),
+    )
+
+    def __init__(self, record_hold=True):
+        self.filepath = BACKTEST_FILEPATH
+        self.record_hold = record_hold
+        self.status = "running"
+        self.last_update = datetime.now().isoformat()
+        self.balance = float(self.INITIAL_BALANCE)
+
+        # 거래 기록 (trade log), 컬럼별 리스트
+        self.trades = {name: [] for name, _ in self.TRADE_COLUMNS}
+
+        # 스텝별 equity curve
+        self.equity_time = []
+        self.equity_value = []
+
+        # 포지션 (ticker index 기준)
+        self.tickers = []
+        self.ticker_index = {}
+        self.pos_quantity = []
+        self.pos_average_price = []
+        self.pos_current_price = []
+
+    @property
+    def state(self):
+        return self.get_state()
+
+    @property
+    def trade_count(self):
+        return len(self.trades['trade_time'])
+
+    @property
+    def equity_count(self):
+        return len(self.equity_time)
+
+    ####################################################################
+    # 내부 상태 관리
+    ####################################################################
+    def _get_ticker_index(self, ticker):
+        idx = self.ticker_index.get(ticker)
+        if idx is None:
+            idx = len(self.tickers)
+            self.tickers.append(ticker)
+            self.ticker_index[ticker] = idx
+            self.pos_quantity.append(0)
+            self.pos_average_price.append(0.0)
+            self.pos_current_price.append(0.0)
+        return idx
+
+    def _trade_arrays(self):
+        return {name: np.array(self.trades[name], dtype=dtype) for name, dtype in self.TRADE_COLUMNS}
+
+    ####################################################################
+    # 주문 / 기록
+    ####################################################################
+    def get_portfolio_value(self):
+        return self.balance + sum(map(operator.mul, self.pos_quantity, self.pos_current_price))
+
+    def record_equity(self, target_time):
+        """현재 포트폴리오 가치를 equity curve에 기록"""
+        self.equity_time.append(int(target_time))
+        self.equity_value.append(self.get_portfolio_value())
+
+    def place_order(self, order_info):
+        if not isinstance(order_info, TradingSignal):
+            raise ValueError("order_info must be a TradingSignal")
+
+        self._place(
+            SIGNAL_CODES[order_info.signal_type],
+            order_info.ticker,
+            float(order_info.position_size),
+            order_info.quantity,
+            float(order_info.current_price),
+            order_info.target_time,
+            order_info.confidence,
+        )
+
+    def place_orders(self, signal_frame):
+        """SignalFrame을 TradingSignal로 바꾸지 않고 배열 값으로 바로 주문 처리"""
+        if not isinstance(signal_frame, SignalFrame):
+            raise ValueError("signal_frame must be a SignalFrame")
+
+        tickers = signal_frame.tickers
+        place = self._place
+        for t, k, c, p, s, q, conf in zip(
+            signal_frame.target_time.tolist(), signal_frame.ticker_index.tolist(),
+            signal_frame.code.tolist(), signal_frame.price.tolist(),
+            signal_frame.position_size.tolist(), signal_frame.quantity.tolist(),
+            signal_frame.confidence.tolist(),
+        ):
+            place(c, tickers[k], s, None if q < 0 else q, p, t, conf)
+
+    def _place(self, code, ticker, position_size, quantity, current_price, target_time, confidence):
+        idx = self._get_ticker_index(ticker)
+        held = self.pos_quantity[idx]
+
+        # 보유 종목이면 current_price 업데이트
+        if held > 0:
+            self.pos_current_price[idx] = current_price
+
+        if code == 1:       # BUY
+            quantity = int(self.balance * position_size / current_price) if quantity is None else quantity
+            if held > 0:
+                self.pos_average_price[idx] = (
+                    (self.pos_average_price[idx] * held + quantity * current_price) / (held + quantity)
+                )
+            else:
+                self.pos_average_price[idx] = current_price
+                self.pos_current_price[idx] = current_price
+            self.pos_quantity[idx] = held + quantity
+            self.balance -= quantity * current_price
+
+        elif code == -1:    # SELL
+            if held > 0:
+                quantity = int(held * position_size) if quantity is None else quantity
+                quantity = min(quantity, held)      # 보유 수량보다 많이 팔 수 없음
+                self.pos_quantity[idx] = held - quantity
+                self.balance += quantity * current_price
+
+        if code != 0 or self.record_hold:
+            trades = self.trades
+            trades['trade_time'].append(int(target_time))
+            trades['trade_code'].append(code)
+            trades['trade_ticker'].append(idx)
+            trades['trade_position_size'].append(position_size)
+            trades['trade_price'].append(current_price)
+            trades['trade_quantity'].append(-1 if quantity is None else quantity)
+            trades['trade_confidence'].append(confidence)
+
+        self.record_equity(target_time)
+
+    ####################################################################
+    # 상태 조회 / 저장
+    ####################################################################
+    def get_equity_curve(self):
+        """(날짜, 포트폴리오 가치) NumPy 배열 반환"""
+        return np.array(self.equity_time, dtype=np.int64), np.array(self.equity_value, dtype=np.float64)
+
+    def get_state(self):
+        """BackTest_Orderer와 같은 형태의 dict 상태 반환"""
+        positions = {}
+        for idx, ticker in enumerate(self.tickers):
+            if self.pos_quantity[idx] > 0:
+                positions[ticker] = {
+                    'quantity': int(self.pos_quantity[idx]),
+                    'average_price': float(self.pos_average_price[idx]),
+                    'current_price': float(self.pos_current_price[idx]),
+                }
+
+        trades = self.trades
+        trade_history = [
+            {
+                'target_time': str(t),
+                'signal_type': CODE_TO_SIGNAL[c].value,
+                'ticker': self.tickers[k],
+                'position_size': s,
+                'current_price': p,
+                'quantity': None if q < 0 else q,
+                'confidence': conf,
+            }
+            for t, c, k, s, p, q, conf in zip(*(trades[name] for name, _ in self.TRADE_COLUMNS))
+        ]
+
+        return {
+            "balance": self.balance,
+            "portfolioValue": self.get_portfolio_value(),
+            "positions": positions,
+            "trade_history": trade_history,
+            "equity_curve": [
+                {'date': str(t), 'value': v}
+                for t, v in zip(self.equity_time, self.equity_value)
+            ],
+            "last_update": self.last_update,
+            "status": self.status,
+        }
+
+    def end_test(self, save_file=True):
+        """백테스트 종료 후 상태 저장 (save_file=False 이면 상태만 반환)"""
+        print("Ending backtest and saving state...")
+        self.status = "stopped"
+        if not save_file:
+            return self.get_state()
+        return self.save_state(None)
+
+    def save_state(self, state):
+        """
+        상태를 압축된 바이너리(.npz)로 저장하는 메서드
+        - state_{YYMMDD_HHMMSS}.npz 형식으로 저장
+        """
+        self.last_update = datetime.now().isoformat()
+
+        if not os.path.exists(self.filepath):
+            os.makedirs(self.filepath)
+        filename = f"state_{datetime.now().strftime('%Y%m%d_%H%M%S')}.npz"
+        filepath = os.path.join(self.filepath, filename)
+
+        equity_time, equity_value = self.get_equity_curve()
+        np.savez_compressed(
+            filepath,
+            balance=np.array([self.balance]),
+            tickers=np.array(self.tickers, dtype=str),
+            pos_quantity=np.array(self.pos_quantity, dtype=np.int64),
+            pos_average_price=np.array(self.pos_average_price, dtype=np.float64),
+            pos_current_price=np.array(self.pos_current_price, dtype=np.float64),
+            equity_time=equity_time,
+            equity_value=equity_value,
+            **self._trade_arrays(),
+        )
+        print(f"State saved to {filepath}")
+
+        return self.get_state()
+
+    def load_state(self, filepath=None):
+        """save_state로 저장한 .npz 파일에서 상태를 복원"""
+        if filepath is None:
+            return self.get_state()
+
+        with np.load(filepath) as data:
+            self.balance = float(data['balance'][0])
+            self.tickers = [str(t) for t in data['tickers']]
+            self.ticker_index = {t: i for i, t in enumerate(self.tickers)}
+
+            for name in ('pos_quantity', 'pos_average_price', 'pos_current_price', 'equity_time', 'equity_value'):
+                setattr(self, name, data[name].tolist())
+            self.trades = {name: data[name].tolist() for name, _ in self.TRADE_COLUMNS}
+
+        return self.get_state()
+
 class Paper_Orderer(Orderer):
     """
         모의 거래용 주문 실행 모듈
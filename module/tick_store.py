@@ -0,0 +1,267 @@
+"""
+    실시간 틱 / 호가 저장소
+
+    웹소켓으로 받은 레코드를 종목 x tr_id별 고정 크기 NumPy 링버퍼에 쌓아 둡니다.
+    전략이 매 틱마다 수백 종목의 최근 데이터를 볼 때 DataFrame을 다시 만들지 않도록 하기 위한 구조입니다.
+
+    RingBuffer
+        - 같은 행을 i, i + capacity 두 곳에 기록해서 최근 n개가 항상 연속된 구간이 되도록 함
+          -> append는 O(1), window(n) / column(name, n)은 복사 없는 읽기 전용 view
+        - view는 이후 append로 내용이 바뀔 수 있으므로 보관할 값은 snapshot()으로 복사해서 사용
+
+    TickStore
+        add_records(tr_id, records, columns) : KISWebSocket(result_format="records") 결과 저장
+        on_message(raw)                      : 원본 메시지를 파싱해서 바로 저장 (KISMessageParser.parse_into)
+        window / column / latest / order_book / snapshot : 조회
+
+    숫자 컬럼만 저장합니다. (컬럼 타입은 kis_ws_parser.COLUMN_TYPES, 첫 번째 컬럼은 종목코드 키)
+    시각은 수신 시각(ns)을 함께 저장합니다.
+"""
+
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from module.kis_ws_parser import COLUMN_TYPES, TRSpec, KISMessageParser
+
+ASKING_PRICE_TR = "H0STASP0"
+ORDER_BOOK_LEVELS = 10
+
+OrderBook = namedtuple("OrderBook", ["ask_prices", "bid_prices", "ask_sizes", "bid_sizes", "time"])
+
+
+##############################################################################################
+# 링버퍼
+##############################################################################################
+class RingBuffer:
+    __slots__ = ("capacity", "columns", "index", "_data", "_times", "_pos", "_total")
+
+    def __init__(self, capacity, columns, dtype=np.float64):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+
+        self.capacity = capacity
+        self.columns = list(columns)
+        self.index = {col: i for i, col in enumerate(self.columns)}
+        self._data = np.full((2 * capacity, len(self.columns)), np.nan, dtype=dtype)
+        self._times = np.zeros(2 * capacity, dtype=np.int64)
+        self._pos = 0       # 다음에 기록할 위치 (0 ~ capacity - 1)
+        self._total = 0     # 지금까지 기록한 행 수
+
+    def __len__(self):
+        return min(self._total, self.capacity)
+
+    @property
+    def total(self):
+        return self._total
+
+    def append(self, row, timestamp=0):
+        pos, capacity = self._pos, self.capacity
+        self._data[pos] = row
+        self._data[pos + capacity] = row
+        self._times[pos] = self._times[pos + capacity] = timestamp
+
+        self._pos = pos + 1 if pos + 1 < capacity else 0
+        self._total += 1
+
+    def _range(self, n):
+        size = len(self)
+        n = size if n is None else max(0, min(n, size))
+        end = self._pos + self.capacity
+        return end - n, end
+
+    @staticmethod
+    def _readonly(view):
+        view.flags.writeable = False
+        return view
+
+    def window(self, n=None):
+        """최근 n행 (행, 컬럼) view, 오래된 순"""
+        start, end = self._range(n)
+        return self._readonly(self._data[start:end])
+
+    def times(self, n=None):
+        start, end = self._range(n)
+        return self._readonly(self._times[start:end])
+
+    def column(self, name, n=None):
+        """컬럼 하나의 최근 n개 view"""
+        start, end = self._range(n)
+        return self._readonly(self._data[start:end, self.index[name]])
+
+    def latest(self):
+        """가장 최근 행 view (비어 있으면 None)"""
+        if self._total == 0:
+            return None
+        return self._readonly(self._data[self._pos + self.capacity - 1])
+
+    def latest_time(self):
+        return int(self._times[self._pos + self.capacity - 1]) if self._total else None
+
+    def snapshot(self, n=None):
+        """최근 n행 복사본 {'time': 배열, 컬럼: 배열}"""
+        start, end = self._range(n)
+        result = {"time": self._times[start:end].copy()}
+        data = self._data[start:end]
+        for col, i in self.index.items():
+            result[col] = data[:, i].copy()
+        return result
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes + self._times.nbytes
+
+
+##############################################################################################
+# 틱 저장소
+##############################################################################################
+class TickStore:
+    def __init__(self, capacity=1024, data_map=None, column_types=COLUMN_TYPES, clock=time.time_ns):
+        """
+        :param capacity: 종목 x tr_id별 보관할 최근 레코드 수
+        :param data_map: on_message()에서 사용할 token_manager.data_map
+        :param clock: 수신 시각 함수 (ns)
+        """
+        self.capacity = capacity
+        self.column_types = column_types
+        self.clock = clock
+        self.parser = KISMessageParser(data_map, column_types) if data_map is not None else None
+
+        self._buffers = {}      # tr_id -> {ticker: RingBuffer}
+        self._specs = {}        # (tr_id, columns) -> TRSpec
+        self._scratch = {}      # tr_id -> parse_into 용 배열
+
+    ##########################################################################################
+    # 저장
+    ##########################################################################################
+    def buffer(self, tr_id, ticker, columns=None):
+        """(tr_id, ticker) 링버퍼, 없으면 columns로 생성"""
+        buffers = self._buffers.setdefault(tr_id, {})
+        buf = buffers.get(ticker)
+        if buf is None:
+            if columns is None:
+                raise ValueError(f"No buffer for {tr_id}/{ticker}")
+            buf = buffers[ticker] = RingBuffer(self.capacity, columns)
+        return buf
+
+    def append(self, tr_id, ticker, row, columns, timestamp=None):
+        """숫자 컬럼 값 한 행 저장"""
+        timestamp = self.clock() if timestamp is None else timestamp
+        self.buffer(tr_id, ticker, columns).append(row, timestamp)
+
+    def _spec(self, tr_id, columns):
+        key = (tr_id, tuple(columns))
+        spec = self._specs.get(key)
+        if spec is None:
+            spec = self._specs[key] = TRSpec(tr_id, {"columns": columns}, self.column_types)
+        return spec
+
+    def add_records(self, tr_id, records, columns, timestamp=None):
+        """
+        KISMessageParser.parse() 결과 (타입 변환된 레코드 튜플) 저장
+        Returns:
+            list: 저장한 레코드의 종목코드
+        """
+        spec = self._spec(tr_id, columns)
+        numeric_index = spec.numeric_index
+        timestamp = self.clock() if timestamp is None else timestamp
+
+        tickers = []
+        for record in records:
+            ticker = record[0]
+            row = [np.nan if record[i] is None else record[i] for i in numeric_index]
+            self.buffer(tr_id, ticker, spec.numeric_columns).append(row, timestamp)
+            tickers.append(ticker)
+        return tickers
+
+    def on_message(self, raw, timestamp=None):
+        """
+        원본 실시간 메시지를 바로 저장 (튜플 / DataFrame을 만들지 않음)
+        Returns:
+            (tr_id, tickers)
+        """
+        if self.parser is None:
+            raise ValueError("TickStore needs data_map to parse raw messages")
+
+        tr_id = raw.split("|", 2)[1]
+        spec = self.parser.spec(tr_id)
+        scratch = self._scratch.get(tr_id)
+        if scratch is None or scratch.shape[1] != len(spec.numeric_columns):
+            scratch = self._scratch[tr_id] = np.empty((64, len(spec.numeric_columns)))
+
+        timestamp = self.clock() if timestamp is None else timestamp
+        tr_id, tickers, count = self.parser.parse_into(raw, scratch)
+        for i, ticker in enumerate(tickers):
+            self.buffer(tr_id, ticker, spec.numeric_columns).append(scratch[i], timestamp)
+        return tr_id, tickers
+
+    def clear(self, tr_id=None):
+        if tr_id is None:
+            self._buffers.clear()
+        else:
+            self._buffers.pop(tr_id, None)
+
+    ##########################################################################################
+    # 조회
+    ##########################################################################################
+    def tickers(self, tr_id):
+        return list(self._buffers.get(tr_id, {}).keys())
+
+    def has(self, tr_id, ticker):
+        return ticker in self._buffers.get(tr_id, {})
+
+    def window(self, tr_id, ticker, n=None):
+        return self.buffer(tr_id, ticker).window(n)
+
+    def column(self, tr_id, ticker, name, n=None):
+        return self.buffer(tr_id, ticker).column(name, n)
+
+    def latest(self, tr_id, name, tickers=None):
+        """
+        종목별 최신 값 (횡단면)
+        Returns:
+            (tickers, np.ndarray): 데이터가 없는 종목은 nan
+        """
+        buffers = self._buffers.get(tr_id, {})
+        tickers = list(buffers.keys()) if tickers is None else list(tickers)
+        values = np.full(len(tickers), np.nan)
+        for i, ticker in enumerate(tickers):
+            buf = buffers.get(ticker)
+            if buf is not None and buf.total:
+                values[i] = buf.latest()[buf.index[name]]
+        return tickers, values
+
+    def order_book(self, ticker, tr_id=ASKING_PRICE_TR, levels=ORDER_BOOK_LEVELS):
+        """
+        최신 호가 (asking_price_krx 컬럼 이름 기준, levels단계) view
+        Returns:
+            OrderBook 또는 None (데이터 없음)
+        """
+        if not self.has(tr_id, ticker):
+            return None
+        buf = self.buffer(tr_id, ticker)
+        row = buf.latest()
+        if row is None:
+            return None
+
+        def side(prefix):
+            start = buf.index[f"{prefix}1"]
+            return row[start:start + levels]
+
+        return OrderBook(
+            ask_prices=side("ASKP"),
+            bid_prices=side("BIDP"),
+            ask_sizes=side("ASKP_RSQN"),
+            bid_sizes=side("BIDP_RSQN"),
+            time=buf.latest_time(),
+        )
+
+    def snapshot(self, tr_id, tickers=None, n=None):
+        """{종목: 최근 n행 복사본} (전략에 넘겨서 보관해도 되는 값)"""
+        buffers = self._buffers.get(tr_id, {})
+        tickers = buffers.keys() if tickers is None else tickers
+        return {ticker: buffers[ticker].snapshot(n) for ticker in tickers if ticker in buffers}
+
+    def memory_usage(self):
+        return sum(buf.nbytes for buffers in self._buffers.values() for buf in buffers.values())
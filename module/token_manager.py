@@ -27,11 +27,21 @@ token_path = os.path.normpath(token_path)
 
 
 # 키 파일에서 API 키 정보를 읽어옵니다.
-with open(keys_path, 'r') as f:
-    keys = json.load(f)
-
-with open(token_path, 'r') as f:
-    tokens = json.load(f)
+# 파일이 없으면 빈 값으로 시작합니다. (오프라인 실행, 벤치마크 등 API를 호출하지 않는 경우)
+keys = {}
+tokens = {}
+
+if os.path.exists(keys_path):
+    with open(keys_path, 'r') as f:
+        keys = json.load(f)
+else:
+    print(f"[경고] 키 파일이 없습니다: {keys_path}")
+
+if os.path.exists(token_path):
+    with open(token_path, 'r') as f:
+        tokens = json.load(f)
+else:
+    print(f"[경고] 토큰 파일이 없습니다: {token_path}")
 
 # 모의투자, 실전투자 구
 # INVEST_TYPE = "PROD" # 실전투자
@@ -150,19 +160,16 @@ import asyncio
 import websockets
 import pandas as pd
 from typing import Callable
-from io import StringIO
 import logging
-from base64 import b64decode
-from Crypto.Cipher import AES
-from Crypto.Util.Padding import unpad
+import random
 import time
 
-def aes_cbc_base64_dec(key, iv, cipher_text):
-    if key is None or iv is None:
-        raise AttributeError("key and iv cannot be None")
+from module.common import metrics
+from module.kis_ws_parser import KISMessageParser, get_decryptor
 
-    cipher = AES.new(key.encode("utf-8"), AES.MODE_CBC, iv.encode("utf-8"))
-    return bytes.decode(unpad(cipher.decrypt(b64decode(cipher_text)), AES.block_size))
+def aes_cbc_base64_dec(key, iv, cipher_text):
+    # (key, iv)별로 만들어 둔 복호화기를 재사용
+    return get_decryptor(key, iv).decrypt(cipher_text)
 
 
 # iv, ekey, encrypt 는 각 기능 메소드 파일에 저장할 수 있도록 dict에서 return 하도록
@@ -227,18 +234,34 @@ def add_open_map(
         request: Callable[[str, str, ...], any],
         data: str | list[str],
         kwargs: dict = None,
+        target: dict = None,
 ):
-    if open_map.get(name, None) is None:
-        open_map[name] = {
+    target = open_map if target is None else target
+    if target.get(name, None) is None:
+        target[name] = {
             "func": request,
             "items": [],
             "kwargs": kwargs,
         }
 
-    if type(data) is list:
-        open_map[name]["items"] += data
-    elif type(data) is str:
-        open_map[name]["items"].append(data)
+    items = target[name]["items"]
+    for d in ([data] if type(data) is str else data):
+        if d not in items:
+            items.append(d)
+
+def remove_open_map(name: str, data: str | list[str], target: dict = None):
+    target = open_map if target is None else target
+    if name not in target:
+        return
+    removed = set([data] if type(data) is str else data)
+    target[name]["items"] = [d for d in target[name]["items"] if d not in removed]
+    if not target[name]["items"]:
+        del target[name]
+
+def open_map_size(target: dict = None) -> int:
+    """구독 등록 수 (KIS는 세션당 등록 수 제한이 있음)"""
+    target = open_map if target is None else target
+    return sum(len(obj["items"]) for obj in target.values())
 
 data_map: dict = {}
 
@@ -248,105 +271,163 @@ def add_data_map(
         encrypt: str = None,
         key: str = None,
         iv: str = None,
+        target: dict = None,
 ):
-    if data_map.get(tr_id, None) is None:
-        data_map[tr_id] = {"columns": [], "encrypt": False, "key": None, "iv": None}
+    target = data_map if target is None else target
+    if target.get(tr_id, None) is None:
+        target[tr_id] = {"columns": [], "encrypt": False, "key": None, "iv": None}
 
     if columns is not None:
-        data_map[tr_id]["columns"] = columns
+        target[tr_id]["columns"] = columns
 
     if encrypt is not None:
-        data_map[tr_id]["encrypt"] = encrypt
+        target[tr_id]["encrypt"] = encrypt
 
     if key is not None:
-        data_map[tr_id]["key"] = key
+        target[tr_id]["key"] = key
 
     if iv is not None:
-        data_map[tr_id]["iv"] = iv
+        target[tr_id]["iv"] = iv
 
 
 class KISWebSocket:
     base_url: str = ""
     api_url: str = ""
     on_result: Callable[
-        [websockets.ClientConnection, str, pd.DataFrame, dict], None
+        [websockets.ClientConnection, str, list | pd.DataFrame, dict], None
     ] = None
     result_all_data: bool = False
 
     retry_count: int = 0
     amx_retries: int = 0
 
+    RESULT_FORMATS = ("records", "dataframe")
+    MAX_SUBSCRIPTIONS = 40          # 세션당 구독 등록 제한
+
     # init
-    def __init__(self, api_url: str, max_retries: int = 3, invest_type="VPS", index=0):
+    def __init__(self, api_url: str, max_retries: int = 3, invest_type="VPS", index=0, result_format="records",
+                 open_map: dict = None, data_map: dict = None, send_interval: float = 0.1, send_batch: int = 5,
+                 backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 on_connect: Callable = None, on_disconnect: Callable = None):
+        """
+        :param max_retries: 연속 접속 실패 허용 횟수 (접속에 성공하면 다시 0부터, None이면 무제한)
+        :param result_format: on_result로 넘길 결과 형식
+            records   : 타입 변환된 레코드 튜플 리스트 (컬럼 순서는 data_info["columns"])
+            dataframe : 기존 방식의 DataFrame (dtype=object), 메시지마다 DataFrame을 만드므로 느림
+        :param open_map / data_map: 이 연결의 구독 / 복호화 정보 (없으면 모듈 전역, 여러 연결을 쓸 때는 연결별로 따로)
+        :param send_interval / send_batch: 구독 메시지를 send_batch개씩 보내고 send_interval초 쉼
+        :param backoff_base / backoff_max: 재접속 대기 시간 (backoff_base * 2^실패 횟수, 최대 backoff_max초, 지터 적용)
+        :param on_connect: on_connect(kws, reconnected) 접속 직후, 구독 재등록 전에 호출
+        :param on_disconnect: on_disconnect(kws, error) 연결이 끊긴 직후 호출 (error는 정상 종료면 None)
+        """
+        if result_format not in self.RESULT_FORMATS:
+            raise ValueError(f"result_format must be one of {self.RESULT_FORMATS}")
+
         self.invest_type = invest_type
         self.index = index
         self.base_url = keys[invest_type][index]['URL_BASE_WS']
         
         self.api_url = api_url
         self.max_retries = max_retries
+        self.result_format = result_format
+        self.send_interval = send_interval
+        self.send_batch = send_batch
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.on_connect = on_connect
+        self.on_disconnect = on_disconnect
+
+        self.open_map = globals()["open_map"] if open_map is None else open_map
+        self.data_map = globals()["data_map"] if data_map is None else data_map
+        self.parser = KISMessageParser(self.data_map)
+        self.ws = None              # 연결 중인 웹소켓 (구독 변경을 바로 보낼 때 사용)
+
+        self.retry_count = 0        # 연속 접속 실패 횟수
+        self.connect_count = 0      # 접속 성공 횟수 (2 이상이면 재접속한 적 있음)
+        self.connected_at = None    # 마지막 접속 시각 (time.time)
+        self.disconnected_at = None # 마지막 끊김 시각 (time.time)
+
+    @property
+    def approval_key(self):
+        """이 연결(invest_type, index)의 웹소켓 접속키"""
+        return tokens.get(self.invest_type, {}).get(str(self.index), {}).get("WS_APPROVAL_KEY")
 
     # private
     async def __subscriber(self, ws: websockets.ClientConnection):
-        async for raw in ws:
-            logging.info("received message >> %s" % raw)
-            show_result = False
-
-            df = pd.DataFrame()
-
-            if raw[0] in ["0", "1"]:
-                d1 = raw.split("|")
-                if len(d1) < 4:
-                    raise ValueError("data not found...")
-
-                tr_id = d1[1]
-
-                dm = data_map[tr_id]
-                d = d1[3]
-                if dm.get("encrypt", None) == "Y":
-                    d = aes_cbc_base64_dec(dm["key"], dm["iv"], d)
-
-                df = pd.read_csv(
-                    StringIO(d), header=None, sep="^", names=dm["columns"], dtype=object
-                )
+        parse = self.parser.parse_dataframe if self.result_format == "dataframe" else self.parser.parse
+        debug = logging.getLogger().isEnabledFor(logging.DEBUG)
 
-                show_result = True
-
-            else:
-                rsp = system_resp(raw)
-
-                tr_id = rsp.tr_id
-                add_data_map(
-                    tr_id=rsp.tr_id, encrypt=rsp.encrypt, key=rsp.ekey, iv=rsp.iv
-                )
-                print(tr_id, rsp.isOk, rsp.tr_msg)
-
-                if rsp.isPingPong:
-                    print(f"### RECV [PINGPONG] [{raw}]")
-                    await ws.pong(raw)
-                    print(f"### SEND [PINGPONG] [{raw}]")
+        async for raw in ws:
+            with metrics.span("kis.ws.message"):
+                if debug:
+                    logging.debug("received message >> %s" % raw)
+                show_result = False
 
-                if self.result_all_data:
+                if self.parser.is_data_message(raw):
+                    tr_id, result = parse(raw)
                     show_result = True
 
-            print(f"### RECV [{tr_id}] [{raw}]")
-            if show_result is True and self.on_result is not None:
-                self.on_result(ws, tr_id, df, data_map[tr_id])
+                else:
+                    result = pd.DataFrame() if self.result_format == "dataframe" else []
+                    rsp = system_resp(raw)
+
+                    tr_id = rsp.tr_id
+                    add_data_map(
+                        tr_id=rsp.tr_id, encrypt=rsp.encrypt, key=rsp.ekey, iv=rsp.iv, target=self.data_map
+                    )
+                    print(f"[{self.invest_type}:{self.index}]", tr_id, rsp.isOk, rsp.tr_msg)
+
+                    if rsp.isPingPong:
+                        print(f"### RECV [PINGPONG] [{raw}]")
+                        await ws.pong(raw)
+                        print(f"### SEND [PINGPONG] [{raw}]")
+                    else:
+                        print(f"### RECV [{tr_id}] [{raw}]")
+
+                    if self.result_all_data:
+                        show_result = True
+
+                if show_result is True and self.on_result is not None:
+                    self.on_result(ws, tr_id, result, self.data_map[tr_id])
+
+    def reconnect_delay(self, attempt: int) -> float:
+        """
+        재접속 대기 시간 (지수 백오프 + 지터)
+        장 시작처럼 여러 연결이 한꺼번에 끊겼을 때 같은 시각에 다시 몰리지 않도록 절반은 무작위로 둠
+        """
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _notify(self, callback, *args):
+        if callback is None:
+            return
+        try:
+            callback(self, *args)
+        except Exception as e:
+            print(f"[{self.invest_type}:{self.index}] 연결 콜백 실패: {e}")
 
     async def __runner(self):
-        print('open_map', open_map)
-        if len(open_map.keys()) > 40:
-            raise ValueError("Subscription's max is 40")
+        print('open_map', self.open_map)
+        if open_map_size(self.open_map) > self.MAX_SUBSCRIPTIONS:
+            raise ValueError(f"Subscription's max is {self.MAX_SUBSCRIPTIONS}")
 
         url = f"{self.base_url}{self.api_url}"
 
-        while self.retry_count < self.max_retries:
+        self.retry_count = 0
+        while self.max_retries is None or self.retry_count < self.max_retries:
+            error = None
             try:
                 print(url)
                 async with websockets.connect(url) as ws:
-                    # request subscribe
-                    print('open_map size:', len(open_map))
-                    for name, obj in open_map.items():
-                        print('obj:', obj)
+                    self.ws = ws
+                    self.retry_count = 0
+                    self.connect_count += 1
+                    self.connected_at = time.time()
+                    self._notify(self.on_connect, self.connect_count > 1)
+
+                    # request subscribe (재접속이면 open_map의 구독을 그대로 다시 등록)
+                    print('open_map size:', open_map_size(self.open_map))
+                    for name, obj in list(self.open_map.items()):
                         await self.send_multiple(
                             ws, obj["func"], "1", obj["items"], obj["kwargs"]
                         )
@@ -355,15 +436,44 @@ class KISWebSocket:
                     await asyncio.gather(
                         self.__subscriber(ws),
                     )
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 print("Connection exception >> ", e)
+                error = e
+            finally:
+                was_connected = self.ws is not None
+                self.ws = None
+
+            if was_connected:
+                # 접속 중에 끊김: 바로 다시 접속 (첫 대기는 짧게)
+                self.disconnected_at = time.time()
+                self._notify(self.on_disconnect, error)
+                delay = self.reconnect_delay(0)
+            else:
+                # 접속 실패: 실패 횟수만큼 대기 시간을 늘림
                 self.retry_count += 1
-                await asyncio.sleep(1)
+                delay = self.reconnect_delay(self.retry_count)
+            await asyncio.sleep(delay)
 
     # func
-    @classmethod
+    def build_message(
+            self,
+            request: Callable[[str, str, ...], tuple[dict, list[str]]],
+            tr_type: str,
+            data: str,
+            kwargs: dict = None,
+    ) -> str:
+        """구독 / 해제 메시지 생성 (이 연결의 접속키로 교체)"""
+        k = {} if kwargs is None else kwargs
+        msg, columns = request(tr_type, data, **k)
+        add_data_map(tr_id=msg["body"]["input"]["tr_id"], columns=columns, target=self.data_map)
+        if self.approval_key:
+            msg["header"]["approval_key"] = self.approval_key
+        return json.dumps(msg)
+
     async def send(
-            cls,
+            self,
             ws: websockets.ClientConnection,
             request: Callable[[str, str, ...], tuple[dict, list[str]]],
             # request: Callable[[str, str], tuple[dict, list[str]]],
@@ -371,14 +481,11 @@ class KISWebSocket:
             data: str,
             kwargs: dict = None,
     ):
-        k = {} if kwargs is None else kwargs
-        msg, columns = request(tr_type, data, **k)
-        # print(msg)
-        add_data_map(tr_id=msg["body"]["input"]["tr_id"], columns=columns)
-        logging.info("send message >> %s" % json.dumps(msg))
+        msg = self.build_message(request, tr_type, data, kwargs)
+        logging.info("send message >> %s" % msg)
 
-        await ws.send(json.dumps(msg))
-        time.sleep(0.1)  # 잠시 대기
+        await ws.send(msg)
+        await asyncio.sleep(self.send_interval)  # 잠시 대기 (이벤트 루프는 막지 않음)
 
     async def send_multiple(
             self,
@@ -388,47 +495,81 @@ class KISWebSocket:
             data: list | str,
             kwargs: dict = None,
     ):
+        """send_batch개씩 묶어서 보내고, 묶음 사이에 send_interval초 대기"""
         if type(data) is str:
-            await self.send(ws, request, tr_type, data, kwargs)
-        elif type(data) is list:
-            for d in data:
-                await self.send(ws, request, tr_type, d, kwargs)
-        else:
+            data = [data]
+        elif type(data) is not list:
             raise ValueError("data must be str or list")
 
-    @classmethod
+        for i in range(0, len(data), self.send_batch):
+            batch = [self.build_message(request, tr_type, d, kwargs) for d in data[i:i + self.send_batch]]
+            for msg in batch:
+                logging.info("send message >> %s" % msg)
+                await ws.send(msg)
+            await asyncio.sleep(self.send_interval)
+
     def subscribe(
-            cls,
+            self,
             request: Callable[[str, str, ...], tuple[dict, list[str]]],
             data: list | str,
             kwargs: dict = None,
     ):
-        add_open_map(request.__name__, request, data, kwargs)
+        """구독 목록에 추가 (연결 전이면 연결할 때 등록, 연결 중이면 subscribe_now 사용)"""
+        add_open_map(request.__name__, request, data, kwargs, target=self.open_map)
 
-    def unsubscribe(
+    async def subscribe_now(
+            self,
+            request: Callable[[str, str, ...], tuple[dict, list[str]]],
+            data: list | str,
+            kwargs: dict = None,
+    ):
+        """구독 목록에 추가하고, 연결 중이면 바로 등록 메시지 전송"""
+        self.subscribe(request, data, kwargs)
+        if self.ws is not None:
+            await self.send_multiple(self.ws, request, "1", data, kwargs)
+
+    async def unsubscribe(
             self,
             ws: websockets.ClientConnection,
             request: Callable[[str, str, ...], tuple[dict, list[str]]],
             # request: Callable[[str, str], tuple[dict, list[str]]],
             data: list | str,
     ):
-        self.send_multiple(ws, request, "2", data)
+        """구독 해제 (목록에서 빼고, 연결 중이면 해제 메시지 전송)"""
+        kwargs = self.open_map.get(request.__name__, {}).get("kwargs")
+        remove_open_map(request.__name__, data, target=self.open_map)
+        ws = ws or self.ws
+        if ws is not None:
+            await self.send_multiple(ws, request, "2", data, kwargs)
+
+    def subscription_count(self) -> int:
+        return open_map_size(self.open_map)
 
     # start
     def start(
             self,
             on_result: Callable[
-                [websockets.ClientConnection, str, pd.DataFrame, dict], None
+                [websockets.ClientConnection, str, list | pd.DataFrame, dict], None
             ],
             result_all_data: bool = False,
     ):
-        self.on_result = on_result
-        self.result_all_data = result_all_data
         try:
-            asyncio.run(self.__runner())
+            asyncio.run(self.run_async(on_result, result_all_data))
         except KeyboardInterrupt:
             print("Closing by KeyboardInterrupt")
 
+    async def run_async(
+            self,
+            on_result: Callable[
+                [websockets.ClientConnection, str, list | pd.DataFrame, dict], None
+            ],
+            result_all_data: bool = False,
+    ):
+        """실행 중인 이벤트 루프 안에서 수신 (이벤트 파이프라인 워커 등과 함께 실행할 때)"""
+        self.on_result = on_result
+        self.result_all_data = result_all_data
+        await self.__runner()
+
 
 def get_crypto_keys(index=0):
     """암호화폐 거래를 위한 키 정보 반환"""
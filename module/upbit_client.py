@@ -0,0 +1,367 @@
+"""
+    업비트 REST 클라이언트 / 주문 실행 서비스
+
+    UpbitClient
+        - requests.Session으로 연결 재사용 (호출마다 TCP/TLS 연결을 새로 맺지 않음, HTTPAdapter 풀)
+        - 요청 전에 RateLimiter에서 그룹별 요청 권한을 받고, 응답의 Remaining-Req 헤더로 남은 요청 수를 맞춤
+        - 429(요청 수 초과)면 그 그룹을 잠시 막고 재시도. 주문(POST)은 429일 때만 재시도
+          (연결 오류 / 타임아웃은 주문이 이미 접수됐을 수 있으므로 재시도하지 않음)
+
+    make_token
+        인증 헤더 값 (JWT, 요청마다 nonce가 달라야 하므로 요청할 때마다 새로 만듦)
+
+    RateLimiter
+        그룹별 슬라이딩 윈도우 (최근 1초 안의 요청 수 < REQUEST_LIMITS, 업비트 요청 수 제한 기준)
+        Remaining-Req: group=default; min=1799; sec=29  -> 그 그룹의 이번 초 남은 요청 수를 sec 이하로 맞춤
+
+    OrderService
+        스레드 풀 워커에서 주문 작업 실행. 같은 키(마켓)의 작업은 넣은 순서대로 하나씩, 다른 키는 동시에.
+        submit()은 concurrent.futures.Future를 반환 (callback을 주면 완료 시 호출)
+        작업은 넣은 쪽의 contextvars를 그대로 가지고 실행 (latency trace 등)
+
+    사용 예
+        client = UpbitClient()
+        response = client.get("https://api.upbit.com/v1/ticker", params={"markets": "KRW-BTC"})
+
+        service = OrderService(workers=4)
+        future = service.submit("KRW-BTC", place_order, ...)
+        future.result(timeout=10)
+"""
+
+import contextvars
+import hashlib
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import unquote, urlencode, urlparse
+import uuid
+
+import jwt
+import requests
+from requests.adapters import HTTPAdapter
+
+from module.common import metrics
+
+BASE_URL = "https://api.upbit.com"
+
+# 그룹별 초당 요청 수 (업비트 요청 수 제한)
+REQUEST_LIMITS = {
+    "order": 8,             # 주문 생성 / 취소
+    "default": 30,          # 그 밖의 EXCHANGE API (잔고 조회 등)
+    "market": 10,           # QUOTATION API (그룹별)
+    "candles": 10,
+    "ticker": 10,
+    "orderbook": 10,
+    "trades": 10,
+}
+
+_REMAINING_REQ = re.compile(r"group=([\w-]+).*?sec=(\d+)")
+
+
+def request_group(method, path):
+    """요청 -> 요청 수 제한 그룹"""
+    parts = [p for p in path.split("/") if p]       # ['v1', 'ticker'], ['v1', 'candles', 'minutes', '1']
+    name = parts[1] if len(parts) > 1 else ""
+    if name in ("orders", "order") and method in ("POST", "DELETE"):
+        return "order"
+    if name in ("market", "candles", "ticker", "orderbook", "trades"):
+        return name
+    return "default"
+
+def parse_remaining_req(header):
+    """
+    Remaining-Req 헤더 -> (그룹, 이번 초 남은 요청 수)
+    Returns: tuple | None
+    """
+    if not header:
+        return None
+    match = _REMAINING_REQ.search(header)
+    if match is None:
+        return None
+    return match.group(1), int(match.group(2))
+
+
+def make_token(access_key, secret_key, query_params=None):
+    """
+    업비트 인증 헤더 값 (query_params가 있으면 query_hash 포함)
+    Returns:
+        str: 'Bearer <JWT>'
+    """
+    payload = {
+        'access_key': access_key,
+        'nonce': str(uuid.uuid4()),
+    }
+    if query_params:
+        query_string = unquote(urlencode(query_params, doseq=True)).encode("utf-8")
+        payload['query_hash'] = hashlib.sha512(query_string).hexdigest()
+        payload['query_hash_alg'] = 'SHA512'
+
+    token = jwt.encode(payload, secret_key, algorithm='HS256')
+    if isinstance(token, bytes):        # PyJWT 1.x
+        token = token.decode('utf-8')
+    return f'Bearer {token}'
+
+
+##############################################################################################
+# 요청 수 제한
+##############################################################################################
+class RateLimiter:
+    def __init__(self, limits=None, window=1.0, clock=time.monotonic, sleep=time.sleep):
+        """
+        :param limits: 그룹 -> window 동안 보낼 수 있는 요청 수 (없으면 REQUEST_LIMITS, 모르는 그룹은 default 한도)
+        :param window: 요청 수를 세는 구간 (초). 최근 window 안에 보낸 요청이 한도 미만일 때만 보냄 (슬라이딩 윈도우)
+        """
+        self.limits = dict(REQUEST_LIMITS if limits is None else limits)
+        self.window = window
+        self.clock = clock
+        self.sleep = sleep
+
+        self._sent = {}             # 그룹 -> 최근 window 안에 보낸 요청 시각 deque
+        self._blocked = {}          # 그룹 -> 이 시각까지 보내지 않음 (429)
+        self._lock = threading.Lock()
+        self.waited = 0.0
+        self.throttled = 0
+
+    def _window(self, group, now):
+        sent = self._sent.get(group)
+        if sent is None:
+            sent = self._sent[group] = deque()
+        while sent and sent[0] <= now - self.window:
+            sent.popleft()
+        return sent, self.limits.get(group, self.limits.get("default", 10))
+
+    def acquire(self, group="default"):
+        """요청 하나 보낼 권한을 받을 때까지 대기. Returns: 기다린 시간(초)"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self.clock()
+                sent, limit = self._window(group, now)
+                blocked = self._blocked.get(group, 0.0)
+                if now >= blocked and len(sent) < limit:
+                    sent.append(now)
+                    if waited:
+                        self.waited += waited
+                        self.throttled += 1
+                    return waited
+                delay = max(blocked - now, sent[0] + self.window - now if len(sent) >= limit else 0.0, 0.001)
+            self.sleep(delay)
+            waited += delay
+
+    def update(self, group, remaining):
+        """
+        응답 헤더 기준 남은 요청 수 반영
+        서버가 더 적게 남았다고 하면 (다른 프로세스가 같은 키를 쓰는 등) 그만큼 지금 보낸 것으로 채움
+        """
+        with self._lock:
+            now = self.clock()
+            sent, limit = self._window(group, now)
+            for _ in range(limit - remaining - len(sent)):
+                sent.append(now)
+
+    def block(self, group, seconds):
+        """429 등으로 그룹을 seconds 동안 막음"""
+        with self._lock:
+            self._blocked[group] = max(self._blocked.get(group, 0.0), self.clock() + seconds)
+
+    def stats(self):
+        with self._lock:
+            now = self.clock()
+            return {
+                'waited': self.waited,
+                'throttled': self.throttled,
+                'in_window': {group: len(self._window(group, now)[0]) for group in list(self._sent)},
+            }
+
+
+##############################################################################################
+# REST 클라이언트
+##############################################################################################
+class UpbitClient:
+    def __init__(self, base_url=BASE_URL, pool_size=10, timeout=5.0, max_retries=3, retry_delay=0.5, limiter=None):
+        """
+        :param pool_size: 호스트당 유지할 연결 수 (동시에 요청하는 워커 수 이상)
+        :param timeout: 요청 타임아웃 (초)
+        :param max_retries: 429 / 연결 오류 재시도 횟수
+        :param retry_delay: 재시도 대기 기본값 (초, 시도마다 2배)
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.limiter = limiter or RateLimiter()
+
+        self.pool_size = pool_size
+        self.session = self._new_session()
+
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self._stats_lock = threading.Lock()     # 여러 스레드(주문 워커 등)가 같이 요청하므로 카운터는 lock 안에서
+
+    def _count(self, name):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _new_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def reset(self, share=1):
+        """
+        fork 후 호출: 부모 프로세스의 연결 풀(소켓)을 같이 쓰지 않도록 세션을 새로 만듦
+        :param share: 같은 API 키를 쓰는 프로세스 수 (그룹별 한도를 나눠 가짐, 남는 요청은 Remaining-Req로 맞춤)
+        """
+        self.session = self._new_session()
+        # fork 시점에 다른 스레드가 잡고 있던 lock을 물려받지 않도록
+        self._stats_lock = threading.Lock()
+        limits = {group: max(1, limit // share) for group, limit in self.limiter.limits.items()}
+        self.limiter = RateLimiter(limits, self.limiter.window, self.limiter.clock, self.limiter.sleep)
+
+    def request(self, method, url, params=None, json=None, headers=None):
+        """
+        요청 수 제한을 지키며 요청 (url은 전체 주소 또는 /v1/... 경로)
+        :param headers: dict 또는 시도마다 새 헤더를 만드는 함수 (JWT nonce는 요청마다 달라야 하므로 인증 요청은 함수로)
+        Returns:
+            requests.Response: 마지막 응답 (상태 코드 확인은 호출하는 쪽에서)
+        """
+        method = method.upper()
+        if url.startswith("/"):
+            url = self.base_url + url
+        group = request_group(method, urlparse(url).path)
+
+        attempt = 0
+        while True:
+            self.limiter.acquire(group)
+            self._count('requests')
+            try:
+                with metrics.span(f"upbit.http.{group}"):
+                    response = self.session.request(
+                        method, url, params=params, json=json,
+                        headers=headers() if callable(headers) else headers, timeout=self.timeout,
+                    )
+            except requests.RequestException:
+                # 주문은 접수됐을 수 있으므로 재시도하지 않음
+                if group == "order" or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                self._count('retries')
+                time.sleep(self.retry_delay * 2 ** (attempt - 1))
+                continue
+
+            remaining = parse_remaining_req(response.headers.get("Remaining-Req"))
+            if remaining is not None:
+                self.limiter.update(*remaining)
+
+            if response.status_code == 429:
+                self._count('rate_limited')
+                self.limiter.block(group, self.retry_delay * 2 ** attempt)
+                if attempt < self.max_retries:
+                    attempt += 1
+                    self._count('retries')
+                    continue
+            return response
+
+    def get(self, url, params=None, headers=None):
+        return self.request("GET", url, params=params, headers=headers)
+
+    def post(self, url, json=None, headers=None):
+        return self.request("POST", url, json=json, headers=headers)
+
+    def close(self):
+        self.session.close()
+
+    def stats(self):
+        with self._stats_lock:
+            counts = {'requests': self.requests, 'retries': self.retries, 'rate_limited': self.rate_limited}
+        return {**counts, 'limiter': self.limiter.stats()}
+
+
+##############################################################################################
+# 주문 실행 서비스
+##############################################################################################
+class OrderService:
+    def __init__(self, workers=4, name="upbit-order"):
+        """
+        :param workers: 동시에 실행할 작업 수 (서로 다른 마켓 수만큼 동시에)
+        """
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._queues = {}           # 키 -> 대기 중인 작업 deque (키가 있으면 그 키의 작업이 실행 중)
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, key, fn, *args, callback=None, **kwargs):
+        """
+        작업 추가. 같은 key의 앞 작업이 끝난 뒤 실행
+        :param callback: callback(future), 작업이 끝나면 워커 스레드에서 호출
+        Returns:
+            concurrent.futures.Future: fn의 반환값 / 예외
+        """
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(callback)
+        item = (future, contextvars.copy_context(), fn, args, kwargs)
+
+        with self._lock:
+            self.submitted += 1
+            queue = self._queues.get(key)
+            if queue is not None:
+                queue.append(item)
+                return future
+            self._queues[key] = deque()
+        self._pool.submit(self._run, key, item)
+        return future
+
+    def _run(self, key, item):
+        """key의 작업을 대기열이 빌 때까지 차례로 실행"""
+        while True:
+            future, context, fn, args, kwargs = item
+            failed = False
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = context.run(fn, *args, **kwargs)
+                except BaseException as e:
+                    failed = True
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+
+            with self._lock:
+                if failed:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+                queue = self._queues[key]
+                if not queue:
+                    del self._queues[key]
+                    return
+                item = queue.popleft()
+
+    def pending(self):
+        """대기 중이거나 실행 중인 작업 수"""
+        with self._lock:
+            return sum(len(queue) + 1 for queue in self._queues.values())
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+    def stats(self):
+        with self._lock:
+            queued = {key: len(queue) for key, queue in self._queues.items()}
+        return {
+            'workers': self.workers,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'active_keys': len(queued),
+            'queued': queued,
+        }
@@ -0,0 +1,329 @@
+"""
+    업비트 실시간 시세 웹소켓 (asyncio)
+
+    업비트는 구독 메시지 하나에 여러 타입(trade / orderbook / ticker) x 여러 마켓을 담을 수 있어서 연결 하나로 많은 마켓을 받습니다.
+    구독은 마지막으로 보낸 구독 메시지 기준이므로, 구독을 바꿀 때는 전체 구독 목록을 다시 보냅니다.
+
+    받은 메시지(JSON)는 KIS 실시간 데이터와 같은 레코드 튜플 형식으로 바꿔서 넘깁니다.
+        on_result(ws, 타입, 레코드 튜플 리스트, {"columns": 컬럼 리스트})
+        -> EventPipeline.on_result / TickStore.add_records / BarAggregator.add_records를 그대로 사용
+    - 레코드의 첫 번째 컬럼은 마켓 코드 (KRW-BTC)
+    - 체결 시각은 trade_timestamp를 한국 시간 YYYYMMDD / HHMMSS로 변환 (봉 구간이 국내주식과 같은 기준)
+    - 호가 컬럼은 KIS 호가(H0STASP0)와 같은 이름 (ASKP1, BIDP1, ASKP_RSQN1, BIDP_RSQN1 ...) -> TickStore.order_book(levels=15)
+
+    내 주문 / 자산 (myOrder / myAsset)은 PRIVATE_URL에 인증 헤더(auth)를 붙여서 연결합니다.
+    - myOrder 레코드의 첫 번째 컬럼은 마켓 코드, myAsset은 자산 하나당 레코드 하나 (첫 번째 컬럼은 화폐)
+
+    로컬 테스트 / 벤치마크: benchmark/upbit_stand_in.py 서버를 띄우고 url만 바꿔서 실행
+"""
+
+import asyncio
+import json
+import logging
+import random
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone
+
+import websockets
+
+from module.common import metrics
+from module.kis_ws_parser import STR, INT, FLOAT
+
+URL = "wss://api.upbit.com/websocket/v1"
+PRIVATE_URL = "wss://api.upbit.com/websocket/v1/private"
+
+TRADE, ORDERBOOK, TICKER = "trade", "orderbook", "ticker"
+MY_ORDER, MY_ASSET = "myOrder", "myAsset"
+PRIVATE_TYPES = (MY_ORDER, MY_ASSET)
+TYPES = (TRADE, ORDERBOOK, TICKER) + PRIVATE_TYPES
+ORDER_BOOK_LEVELS = 15
+
+KST = timezone(timedelta(hours=9))
+
+
+def _levels(prefix):
+    return [f"{prefix}{i}" for i in range(1, ORDER_BOOK_LEVELS + 1)]
+
+# 타입 -> 레코드 컬럼 (첫 번째 컬럼은 마켓 코드)
+COLUMNS = {
+    TRADE: ["code", "trade_date", "trade_time", "trade_price", "trade_volume", "ask_bid",
+            "prev_closing_price", "change_price", "trade_timestamp", "sequential_id"],
+    TICKER: ["code", "trade_date", "trade_time", "trade_price", "opening_price", "high_price", "low_price",
+             "prev_closing_price", "signed_change_rate", "acc_trade_volume", "acc_trade_price",
+             "acc_trade_volume_24h", "acc_trade_price_24h", "trade_timestamp"],
+    ORDERBOOK: ["code", "timestamp", "TOTAL_ASKP_RSQN", "TOTAL_BIDP_RSQN"]
+               + _levels("ASKP") + _levels("BIDP") + _levels("ASKP_RSQN") + _levels("BIDP_RSQN"),
+    # state가 trade면 price / volume / trade_fee는 그 체결의 가격 / 수량 / 수수료
+    MY_ORDER: ["code", "uuid", "ask_bid", "order_type", "state", "price", "volume", "trade_fee",
+               "executed_volume", "remaining_volume", "locked", "timestamp"],
+    MY_ASSET: ["currency", "balance", "locked", "timestamp"],
+}
+
+# 타입 -> 컬럼 타입 (kis_ws_parser.COLUMN_TYPES 형식, TickStore(column_types=...)에 사용)
+COLUMN_TYPES = {
+    TRADE: {"default": FLOAT, "code": STR, "trade_date": STR, "trade_time": STR, "ask_bid": STR,
+            "trade_timestamp": INT, "sequential_id": INT},
+    TICKER: {"default": FLOAT, "code": STR, "trade_date": STR, "trade_time": STR, "trade_timestamp": INT},
+    ORDERBOOK: {"default": FLOAT, "code": STR, "timestamp": INT},
+    MY_ORDER: {"default": FLOAT, "code": STR, "uuid": STR, "ask_bid": STR, "order_type": STR, "state": STR,
+               "timestamp": INT},
+    MY_ASSET: {"default": FLOAT, "currency": STR, "timestamp": INT},
+}
+
+# BarAggregator(fields=...)에 넘길 체결 컬럼
+TRADE_FIELDS = ("code", "trade_date", "trade_time", "trade_price", "trade_volume")
+
+_TRADE_KEYS = ("trade_price", "trade_volume", "ask_bid", "prev_closing_price", "change_price",
+               "trade_timestamp", "sequential_id")
+_TICKER_KEYS = ("trade_price", "opening_price", "high_price", "low_price", "prev_closing_price",
+                "signed_change_rate", "acc_trade_volume", "acc_trade_price", "acc_trade_volume_24h",
+                "acc_trade_price_24h", "trade_timestamp")
+_MY_ORDER_KEYS = ("uuid", "ask_bid", "order_type", "state", "price", "volume", "trade_fee",
+                  "executed_volume", "remaining_volume", "locked", "timestamp")
+_NAN = float("nan")
+
+
+##############################################################################################
+# 메시지 파싱
+##############################################################################################
+class UpbitMessageParser:
+    """업비트 실시간 메시지(JSON, DEFAULT 포맷) -> (타입, 레코드 튜플 리스트)"""
+
+    def __init__(self):
+        self._second = None     # 마지막으로 변환한 초 (같은 초의 체결이 몰려 들어오므로 변환 결과 재사용)
+        self._stamp = None
+
+    @staticmethod
+    def decode(raw):
+        """업비트는 바이너리 프레임으로 보냄 (압축 옵션을 쓴 경우 zlib)"""
+        if isinstance(raw, (bytes, bytearray)):
+            if raw[:1] in (b"{", b"["):
+                return raw.decode("utf-8")
+            return zlib.decompress(raw).decode("utf-8")
+        return raw
+
+    def kst(self, timestamp_ms):
+        """ms 타임스탬프 -> 한국 시간 (YYYYMMDD, HHMMSS)"""
+        second = timestamp_ms // 1000
+        if second != self._second:
+            dt = datetime.fromtimestamp(second, KST)
+            self._second, self._stamp = second, (dt.strftime("%Y%m%d"), dt.strftime("%H%M%S"))
+        return self._stamp
+
+    def parse(self, raw):
+        """
+        Returns:
+            (타입, 레코드 리스트): 시세가 아닌 메시지(상태 / 오류)는 (None, [])
+        """
+        data = json.loads(self.decode(raw))
+        msg_type = data.get("type")
+
+        if msg_type == TRADE:
+            date, hhmmss = self.kst(data["trade_timestamp"])
+            return TRADE, [(data["code"], date, hhmmss, *[data.get(key) for key in _TRADE_KEYS])]
+
+        if msg_type == ORDERBOOK:
+            units = data.get("orderbook_units", [])[:ORDER_BOOK_LEVELS]
+            pad = [_NAN] * (ORDER_BOOK_LEVELS - len(units))
+            record = (
+                data["code"], data.get("timestamp"), data.get("total_ask_size"), data.get("total_bid_size"),
+                *[unit["ask_price"] for unit in units], *pad,
+                *[unit["bid_price"] for unit in units], *pad,
+                *[unit["ask_size"] for unit in units], *pad,
+                *[unit["bid_size"] for unit in units], *pad,
+            )
+            return ORDERBOOK, [record]
+
+        if msg_type == TICKER:
+            date, hhmmss = self.kst(data["trade_timestamp"])
+            return TICKER, [(data["code"], date, hhmmss, *[data.get(key) for key in _TICKER_KEYS])]
+
+        if msg_type == MY_ORDER:
+            return MY_ORDER, [(data["code"], *[data.get(key) for key in _MY_ORDER_KEYS])]
+
+        if msg_type == MY_ASSET:
+            timestamp = data.get("asset_timestamp", data.get("timestamp"))
+            return MY_ASSET, [
+                (asset["currency"], float(asset["balance"]), float(asset["locked"]), timestamp)
+                for asset in data.get("assets", [])
+            ]
+
+        if "error" in data:
+            print(f"[업비트] 웹소켓 오류: {data['error']}")
+        return None, []
+
+
+##############################################################################################
+# 웹소켓
+##############################################################################################
+class UpbitWebSocket:
+    def __init__(self, url=URL, ticket=None, max_retries=None, backoff_base=0.5, backoff_max=30.0,
+                 is_only_realtime=True, on_connect=None, on_disconnect=None, auth=None):
+        """
+        :param url: 웹소켓 주소 (로컬 테스트는 benchmark/upbit_stand_in.py 주소)
+        :param ticket: 구독 티켓 (없으면 uuid)
+        :param max_retries: 연속 접속 실패 허용 횟수 (None이면 무제한, 접속에 성공하면 다시 0부터)
+        :param backoff_base / backoff_max: 재접속 대기 시간 (KISWebSocket과 같은 지터 백오프)
+        :param is_only_realtime: 구독 직후의 스냅샷 없이 실시간 데이터만 받음
+        :param on_connect / on_disconnect: on_connect(uws, reconnected), on_disconnect(uws, error)
+        :param auth: 접속마다 호출해서 인증 헤더 dict를 만드는 함수 (PRIVATE_URL, JWT nonce는 접속마다 새로)
+        """
+        self.url = url
+        self.auth = auth
+        self.ticket = ticket or str(uuid.uuid4())
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.is_only_realtime = is_only_realtime
+        self.on_connect = on_connect
+        self.on_disconnect = on_disconnect
+
+        self.subscriptions = {}     # 타입 -> [마켓 코드] (구독 순서 유지)
+        self.parser = UpbitMessageParser()
+        self.ws = None
+
+        self.on_result = None
+        self.retry_count = 0
+        self.connect_count = 0
+        self.message_count = 0
+        self._closing = False
+
+    ##########################################################################################
+    # 구독
+    ##########################################################################################
+    def subscribe(self, type, codes):
+        """구독 목록에 추가 (연결 전이면 연결할 때 등록, 연결 중이면 subscribe_now 사용, 내 주문 / 자산은 codes=[]이면 전체)"""
+        if type not in TYPES:
+            raise ValueError(f"type must be one of {TYPES}")
+        current = self.subscriptions.setdefault(type, [])
+        for code in ([codes] if isinstance(codes, str) else codes):
+            if code not in current:
+                current.append(code)
+
+    async def subscribe_now(self, type, codes):
+        self.subscribe(type, codes)
+        await self._send_subscriptions()
+
+    async def unsubscribe(self, type, codes):
+        """구독 해제 (남은 구독 목록 전체를 다시 보냄)"""
+        codes = {codes} if isinstance(codes, str) else set(codes)
+        remaining = [code for code in self.subscriptions.get(type, []) if code not in codes]
+        if remaining:
+            self.subscriptions[type] = remaining
+        else:
+            self.subscriptions.pop(type, None)
+        await self._send_subscriptions()
+
+    def subscription_count(self):
+        return sum(len(codes) for codes in self.subscriptions.values())
+
+    def build_message(self):
+        """전체 구독 목록 -> 구독 메시지 (타입마다 항목 하나, 마켓은 codes에 모두)"""
+        message = [{"ticket": self.ticket}]
+        for type, codes in self.subscriptions.items():
+            if type in PRIVATE_TYPES:
+                # 내 주문 / 자산: codes가 없으면 전체 마켓
+                message.append({"type": type, "codes": list(codes)} if codes else {"type": type})
+            elif codes:
+                message.append({"type": type, "codes": list(codes), "is_only_realtime": self.is_only_realtime})
+        message.append({"format": "DEFAULT"})
+        return json.dumps(message)
+
+    async def _send_subscriptions(self, ws=None):
+        ws = ws or self.ws
+        if ws is None or not self.subscriptions:
+            return
+        msg = self.build_message()
+        logging.info("send message >> %s" % msg)
+        await ws.send(msg)
+
+    ##########################################################################################
+    # 수신
+    ##########################################################################################
+    def reconnect_delay(self, attempt):
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _notify(self, callback, *args):
+        if callback is None:
+            return
+        try:
+            callback(self, *args)
+        except Exception as e:
+            print(f"[업비트] 연결 콜백 실패: {e}")
+
+    async def _subscriber(self, ws):
+        parse = self.parser.parse
+        async for raw in ws:
+            with metrics.span("upbit.ws.message"):
+                try:
+                    msg_type, records = parse(raw)
+                except Exception as e:
+                    print(f"[업비트] 메시지 처리 실패: {e}")
+                    continue
+                if not records:
+                    continue
+                self.message_count += 1
+                if self.on_result is not None:
+                    self.on_result(ws, msg_type, records, {"columns": COLUMNS[msg_type]})
+
+    async def _runner(self):
+        self.retry_count = 0
+        while not self._closing and (self.max_retries is None or self.retry_count < self.max_retries):
+            error = None
+            try:
+                headers = self.auth() if self.auth is not None else None
+                async with websockets.connect(self.url, additional_headers=headers) as ws:
+                    self.ws = ws
+                    self.retry_count = 0
+                    self.connect_count += 1
+                    self._notify(self.on_connect, self.connect_count > 1)
+
+                    # 재접속이면 구독 목록을 그대로 다시 등록
+                    await self._send_subscriptions(ws)
+                    await self._subscriber(ws)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print("[업비트] Connection exception >> ", e)
+                error = e
+            finally:
+                was_connected = self.ws is not None
+                self.ws = None
+
+            if self._closing:
+                break
+            if was_connected:
+                self._notify(self.on_disconnect, error)
+                delay = self.reconnect_delay(0)
+            else:
+                self.retry_count += 1
+                delay = self.reconnect_delay(self.retry_count)
+            await asyncio.sleep(delay)
+
+    async def run_async(self, on_result):
+        """실행 중인 이벤트 루프 안에서 수신 (on_result는 KISWebSocket과 같은 형식)"""
+        self.on_result = on_result
+        self._closing = False
+        await self._runner()
+
+    def start(self, on_result):
+        try:
+            asyncio.run(self.run_async(on_result))
+        except KeyboardInterrupt:
+            print("Closing by KeyboardInterrupt")
+
+    async def close(self):
+        """재접속하지 않고 연결 종료"""
+        self._closing = True
+        if self.ws is not None:
+            await self.ws.close()
+
+    def stats(self):
+        return {
+            'connected': self.ws is not None,
+            'connects': self.connect_count,
+            'messages': self.message_count,
+            'subscriptions': {type: len(codes) for type, codes in self.subscriptions.items()},
+        }
@@ -0,0 +1,231 @@
+"""
+    웹소켓 구독 분산 관리
+
+    KIS 웹소켓은 세션(접속키) 하나당 구독 등록 수가 제한되어 있어서(40) 한 연결로는 수백 종목을 받을 수 없습니다.
+    keys.json의 키 인덱스별로 연결(KISWebSocket)을 하나씩 만들고, 구독(요청 함수, 종목)을 연결들에 나눠 담습니다.
+
+    - 구독은 등록 수가 가장 적은 연결에 배정 (모든 연결이 가득 차면 ValueError)
+    - 연결은 배정된 구독이 생길 때 만들어짐 (쓰지 않는 키는 접속하지 않음)
+    - 구독 / 해제 메시지는 연결별로 묶어서 전송 (KISWebSocket.send_multiple)
+    - rebalance()로 연결 간 등록 수 차이가 1 이하가 되도록 옮김 (실행 중이면 해제 -> 등록 메시지 전송)
+    - 모든 연결의 수신 결과는 같은 on_result 콜백 하나로 모임 (이벤트 파이프라인 등)
+
+    KISWebSocket과 같은 방식으로 사용:
+        manager = SubscriptionManager(indexes=[0, 1, 2])
+        manager.subscribe(request=stock_data_manager_ws.ccnl_krx, data=tickers)
+        manager.start(on_result=...)        # 또는 await manager.run_async(on_result)
+"""
+
+import asyncio
+from collections import defaultdict
+
+from module import token_manager
+
+
+class SubscriptionManager:
+    def __init__(self, api_url="/tryitout", invest_type="VPS", indexes=None,
+                 max_per_connection=token_manager.KISWebSocket.MAX_SUBSCRIPTIONS,
+                 result_format="records", validate=True, **ws_kwargs):
+        """
+        :param indexes: 사용할 키 인덱스 (없으면 keys.json의 invest_type 키 전부)
+        :param max_per_connection: 연결 하나의 최대 구독 등록 수
+        :param validate: 연결 시작 전에 키별 웹소켓 접속키 확인 (auth_ws_validate)
+        :param ws_kwargs: KISWebSocket에 넘길 나머지 인자 (max_retries, send_interval, send_batch, on_connect ...)
+        """
+        if indexes is None:
+            indexes = range(len(token_manager.keys.get(invest_type, [])))
+        self.indexes = list(indexes)
+        if not self.indexes:
+            raise ValueError(f"No websocket keys for invest_type: {invest_type}")
+
+        self.api_url = api_url
+        self.invest_type = invest_type
+        self.max_per_connection = max_per_connection
+        self.result_format = result_format
+        self.validate = validate
+        self.ws_kwargs = ws_kwargs
+
+        self.shards = {}            # 키 인덱스 -> KISWebSocket
+        self.assignments = {}       # (요청 함수 이름, 종목) -> 키 인덱스
+        self._requests = {}         # 요청 함수 이름 -> (요청 함수, kwargs)
+
+        self.on_result = None
+        self.result_all_data = False
+        self._tasks = {}            # 키 인덱스 -> 수신 task (실행 중일 때)
+
+    ##########################################################################################
+    # 연결 / 배정
+    ##########################################################################################
+    def _shard(self, index):
+        shard = self.shards.get(index)
+        if shard is None:
+            shard = self.shards[index] = token_manager.KISWebSocket(
+                api_url=self.api_url, invest_type=self.invest_type, index=index, result_format=self.result_format,
+                open_map={}, data_map={}, **self.ws_kwargs,
+            )
+            if self.on_result is not None:
+                # 실행 중에 새 연결이 필요해진 경우 바로 시작
+                self._start_shard(index)
+        return shard
+
+    def load(self):
+        """키 인덱스별 구독 등록 수"""
+        counts = {index: 0 for index in self.indexes}
+        for index in self.assignments.values():
+            counts[index] += 1
+        return counts
+
+    def _pick(self, counts):
+        index = min(self.indexes, key=lambda i: (counts[i], self.indexes.index(i)))
+        if counts[index] >= self.max_per_connection:
+            raise ValueError(
+                f"구독 가능 수 초과: 연결 {len(self.indexes)}개 x {self.max_per_connection} = "
+                f"{len(self.indexes) * self.max_per_connection}"
+            )
+        return index
+
+    def _assign(self, request, data, kwargs):
+        """새 구독을 연결에 배정. Returns: {키 인덱스: [종목, ...]}"""
+        name = request.__name__
+        self._requests[name] = (request, kwargs)
+
+        counts = self.load()
+        added = defaultdict(list)
+        for item in ([data] if isinstance(data, str) else data):
+            if (name, item) in self.assignments:
+                continue
+            index = self._pick(counts)
+            self.assignments[(name, item)] = index
+            counts[index] += 1
+            added[index].append(item)
+        return added
+
+    ##########################################################################################
+    # 구독 변경
+    ##########################################################################################
+    def subscribe(self, request, data, kwargs=None):
+        """구독 추가 (연결 전). 실행 중에는 subscribe_now 사용"""
+        for index, items in self._assign(request, data, kwargs).items():
+            self._shard(index).subscribe(request, items, kwargs)
+
+    async def subscribe_now(self, request, data, kwargs=None):
+        """구독 추가, 실행 중인 연결에는 바로 등록 메시지 전송 (연결별로 묶어서)"""
+        added = self._assign(request, data, kwargs)
+        await asyncio.gather(*[
+            self._shard(index).subscribe_now(request, items, kwargs) for index, items in added.items()
+        ])
+
+    async def unsubscribe(self, request, data):
+        """구독 해제 (연결별로 묶어서 해제 메시지 전송)"""
+        name = request.__name__
+        removed = defaultdict(list)
+        for item in ([data] if isinstance(data, str) else data):
+            index = self.assignments.pop((name, item), None)
+            if index is not None:
+                removed[index].append(item)
+
+        await asyncio.gather(*[
+            self.shards[index].unsubscribe(None, request, items) for index, items in removed.items()
+        ])
+
+    async def set_subscriptions(self, request, data, kwargs=None, rebalance=True):
+        """
+        요청 함수의 구독 종목을 data로 맞춤 (빠진 종목 해제, 새 종목 등록) 후 재분배
+        스크리너로 관심 종목을 갱신할 때 사용
+        """
+        name = request.__name__
+        target = [data] if isinstance(data, str) else list(data)
+        current = [item for (n, item) in self.assignments if n == name]
+
+        await self.unsubscribe(request, [item for item in current if item not in target])
+        await self.subscribe_now(request, [item for item in target if item not in current], kwargs)
+        if rebalance:
+            await self.rebalance()
+
+    def plan_rebalance(self):
+        """
+        연결 간 등록 수 차이가 1 이하가 되도록 옮길 구독 목록
+        Returns:
+            list: [((요청 함수 이름, 종목), 원래 인덱스, 옮길 인덱스), ...]
+        """
+        counts = self.load()
+        by_index = defaultdict(list)
+        for key, index in self.assignments.items():
+            by_index[index].append(key)
+
+        moves = []
+        while True:
+            src = max(self.indexes, key=lambda i: counts[i])
+            dst = min(self.indexes, key=lambda i: counts[i])
+            if counts[src] - counts[dst] <= 1:
+                return moves
+            key = by_index[src].pop()
+            moves.append((key, src, dst))
+            counts[src] -= 1
+            counts[dst] += 1
+
+    async def rebalance(self):
+        """plan_rebalance() 대로 구독을 옮김 (원래 연결에서 해제 -> 새 연결에 등록, 묶어서 전송)"""
+        moves = self.plan_rebalance()
+        groups = defaultdict(list)          # (요청 함수 이름, 원래, 옮길) -> [종목]
+        for (name, item), src, dst in moves:
+            groups[(name, src, dst)].append(item)
+
+        for (name, src, dst), items in groups.items():
+            request, kwargs = self._requests[name]
+            await self.shards[src].unsubscribe(None, request, items)
+            for item in items:
+                self.assignments[(name, item)] = dst
+            await self._shard(dst).subscribe_now(request, items, kwargs)
+        return moves
+
+    ##########################################################################################
+    # 실행
+    ##########################################################################################
+    def _start_shard(self, index):
+        if index in self._tasks:
+            return
+        if self.validate:
+            try:
+                token_manager.auth_ws_validate(self.invest_type, index)
+            except Exception as e:
+                print(f"[경고] 웹소켓 접속키 확인 실패 ({self.invest_type}:{index}): {e}")
+        self._tasks[index] = asyncio.create_task(
+            self.shards[index].run_async(self.on_result, self.result_all_data)
+        )
+
+    async def run_async(self, on_result, result_all_data=False):
+        """구독이 배정된 연결들을 모두 시작하고, 결과를 on_result 하나로 받음"""
+        self.on_result = on_result
+        self.result_all_data = result_all_data
+        for index in sorted(set(self.assignments.values())):
+            self._shard(index)
+            self._start_shard(index)
+
+        try:
+            # 실행 중에 연결이 추가될 수 있으므로 남은 task가 없을 때까지 대기
+            while self._tasks:
+                done, _ = await asyncio.wait(list(self._tasks.values()), return_when=asyncio.FIRST_COMPLETED)
+                for index in [i for i, task in self._tasks.items() if task in done]:
+                    task = self._tasks.pop(index)
+                    if not task.cancelled() and task.exception() is not None:
+                        print(f"[경고] 웹소켓 연결 종료 ({self.invest_type}:{index}): {task.exception()}")
+        finally:
+            for task in self._tasks.values():
+                task.cancel()
+            self._tasks = {}
+            self.on_result = None
+
+    def start(self, on_result, result_all_data=False):
+        try:
+            asyncio.run(self.run_async(on_result, result_all_data))
+        except KeyboardInterrupt:
+            print("Closing by KeyboardInterrupt")
+
+    def stats(self):
+        return {
+            'connections': len(self.shards),
+            'load': self.load(),
+            'connected': [index for index, shard in self.shards.items() if shard.ws is not None],
+            'reconnects': {index: max(shard.connect_count - 1, 0) for index, shard in self.shards.items()},
+        }
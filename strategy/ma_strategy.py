@@ -3,6 +3,8 @@ import pandas as pd
 from strategy.strategy import *
 
 class MA_strategy(STRATEGY):
+    INTERMEDIATE_COLUMNS = ("MA5_prev", "MA20_prev")
+
     def __init__(self, period: int = 20, std_multiplier: float = 2.0):
         super().__init__()
         self.name = "MA5-MA20 Golden Cross Strategy"
@@ -13,7 +15,7 @@ class MA_strategy(STRATEGY):
 
     def set_data(self, ticker, dataFrame):
         self.ticker = ticker
-        self.dataFrame = dataFrame.copy()  # 원본 데이터 보호
+        self.dataFrame = dataFrame  # 아래 중복 제거에서 새 프레임이 만들어지므로 원본은 수정되지 않음
         
         print(self.dataFrame)
 
@@ -23,12 +25,12 @@ class MA_strategy(STRATEGY):
             # 중복된 컬럼 제거 (첫 번째 것만 유지)
             self.dataFrame = self.dataFrame.loc[:, ~self.dataFrame.columns.duplicated()]
         
-        # 중복된 행 제거
-        self.dataFrame = self.dataFrame.drop_duplicates().reset_index(drop=True)
+        # 중복된 날짜 제거 (전체 컬럼 비교 대신 날짜만 비교, 나중에 저장된 행 유지)
+        self.dataFrame = self.dataFrame.drop_duplicates(subset=['date'], keep='last').reset_index(drop=True)
         
         # 날짜 컬럼 변환 (에러 방지)
         try:
-            self.dataFrame['date'] = pd.to_datetime(self.dataFrame['date'], format='%Y%m%d', errors='coerce')
+            self.dataFrame['date'] = parse_time(self.dataFrame['date'])
         except Exception as e:
             print(f"날짜 변환 중 에러 발생: {e}")
             # 날짜가 이미 datetime 형태인 경우 그대로 사용
@@ -43,7 +45,7 @@ class MA_strategy(STRATEGY):
         print(f"컬럼: {list(self.dataFrame.columns)}")
         
         self.calculate_moving_averages()
-        return self.dataFrame
+        return self.prune_frame()
 
     def calculate_moving_averages(self):                
         # MA5, MA20 계산
@@ -85,7 +87,7 @@ class MA_strategy(STRATEGY):
             raise ValueError("dataFrame must be set before running the strategy")
         
         # targetTime과 같은 날짜의 데이터를 가져오기
-        target_date = pd.to_datetime(target_time, format='%Y%m%d', errors='coerce')
+        target_date = parse_time(target_time)
         filtered_data = self.dataFrame[self.dataFrame['date'] == target_date]
         
         if filtered_data.empty:
@@ -192,3 +194,40 @@ class MA_strategy(STRATEGY):
                 target_time=target_time,
                 current_price=current_price
             )
+
+    def run_batch(self, target_times, state=None) -> SignalFrame:
+        """
+        run()과 같은 신호를 날짜마다 프레임을 필터링하지 않고 계산
+        크로스 / 추세 컬럼은 배열로 한 번에 읽고, 포지션 크기만 봉 순서대로 따라감 (TradingSignal을 만들지 않음)
+        """
+        rows, target_time = self._batch_rows(target_times)
+        golden_cross = self._column('golden_cross', rows).tolist()
+        dead_cross = self._column('dead_cross', rows).tolist()
+        uptrend = self._column('uptrend', rows).tolist()
+        downtrend = self._column('downtrend', rows).tolist()
+
+        n = len(rows)
+        code = np.zeros(n, dtype=np.int8)
+        size = np.zeros(n, dtype=np.float64)
+        confidence = np.zeros(n, dtype=np.float64)
+        position = self.position_size
+        for i in range(n):
+            if golden_cross[i] and position < 1.0:
+                trade = min(1.0 - position, 0.5)
+                position += trade
+                code[i], size[i], confidence[i] = 1, trade, 0.8
+            elif dead_cross[i] and position > 0.0:
+                trade = min(position, 1.0)
+                position -= trade
+                code[i], size[i], confidence[i] = -1, trade, 0.8
+            elif uptrend[i] and position < 1.0 and position == 0.0:
+                trade = min(1.0 - position, 0.3)
+                position += trade
+                code[i], size[i], confidence[i] = 1, trade, 0.6
+            elif downtrend[i] and position > 0.0:
+                trade = min(position, 0.5)
+                position -= trade
+                code[i], size[i], confidence[i] = -1, trade, 0.6
+        self.position_size = position
+
+        return self._batch_frame(rows, target_time, code, size, confidence)
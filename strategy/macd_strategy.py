@@ -3,6 +3,8 @@ import pandas as pd
 from strategy.strategy import *
 
 class MACD_strategy(STRATEGY):
+    INTERMEDIATE_COLUMNS = ("MA5_prev", "MA20_prev", "MA60_prev", "MACD_prev", "MACD_signal_prev")
+
     def __init__(self, period: int = 20, std_multiplier: float = 2.0):
         super().__init__()
         self.name = "Multi-MA + MACD Strategy"  # 전략 이름 변경
@@ -14,9 +16,9 @@ class MACD_strategy(STRATEGY):
     def set_data(self, ticker, dataFrame):
         self.ticker = ticker
         self.dataFrame = dataFrame
-        self.dataFrame['date'] = pd.to_datetime(self.dataFrame['date'], format='%Y%m%d', errors='coerce')
+        self.dataFrame['date'] = parse_time(self.dataFrame['date'])
         self.calculate_moving_averages()
-        return self.dataFrame
+        return self.prune_frame()
 
     def calculate_moving_averages(self):                
         # MA5, MA20, MA60 계산
@@ -82,7 +84,7 @@ class MACD_strategy(STRATEGY):
             raise ValueError("dataFrame must be set before running the strategy")
         
         # targetTime과 같은 날짜의 데이터를 가져오기
-        target_date = pd.to_datetime(target_time, format='%Y%m%d', errors='coerce')
+        target_date = parse_time(target_time)
         filtered_data = self.dataFrame[self.dataFrame['date'] == target_date]
         
         if filtered_data.empty:
@@ -207,4 +209,54 @@ class MACD_strategy(STRATEGY):
                 ticker=self.ticker,
                 target_time=target_time,
                 current_price=current_price
-            )
\ No newline at end of file
+            )
+
+    def run_batch(self, target_times, state=None) -> SignalFrame:
+        """
+        run()과 같은 신호를 날짜마다 프레임을 필터링하지 않고 계산
+        매수 / 매도 점수는 배열 연산으로 한 번에 계산하고, 포지션 크기만 봉 순서대로 따라감 (TradingSignal을 만들지 않음)
+        """
+        rows, target_time = self._batch_rows(target_times)
+        column = lambda name: self._column(name, rows)
+        ma5, ma20 = column('MA5'), column('MA20')
+        macd, macd_signal, macd_histogram = column('MACD'), column('MACD_signal'), column('MACD_histogram')
+
+        buy_score = (
+            50 * column('golden_cross')
+            + 30 * (column('macd_golden_cross') & (macd < 0))
+            + 25 * (column('uptrend') & (macd_histogram > 0))
+            + 20 * ((ma5 > ma20) & (macd > macd_signal))
+        ).tolist()
+        sell_score = (
+            50 * column('dead_cross')
+            + 30 * (column('macd_dead_cross') & (macd > 0))
+            + 25 * (column('downtrend') & (macd_histogram < 0))
+            + 20 * ((ma5 < ma20) & (macd < macd_signal))
+        ).tolist()
+
+        n = len(rows)
+        code = np.zeros(n, dtype=np.int8)
+        size = np.zeros(n, dtype=np.float64)
+        confidence = np.zeros(n, dtype=np.float64)
+        position = self.position_size
+        for i in range(n):
+            buy, sell = buy_score[i], sell_score[i]
+            if buy >= 50 and position < 1.0:
+                trade = min(1.0 - position, 0.5)
+                position += trade
+                code[i], size[i], confidence[i] = 1, trade, min(0.9, 0.6 + (buy - 50) * 0.01)
+            elif sell >= 50 and position > 0.0:
+                trade = min(position, 1.0)
+                position -= trade
+                code[i], size[i], confidence[i] = -1, trade, min(0.9, 0.6 + (sell - 50) * 0.01)
+            elif buy >= 30 and position < 1.0:
+                trade = min(1.0 - position, 0.3)
+                position += trade
+                code[i], size[i], confidence[i] = 1, trade, 0.6
+            elif sell >= 30 and position > 0.0:
+                trade = min(position, 0.5)
+                position -= trade
+                code[i], size[i], confidence[i] = -1, trade, 0.6
+        self.position_size = position
+
+        return self._batch_frame(rows, target_time, code, size, confidence)
@@ -0,0 +1,916 @@
+"""
+    Pine Script 스타일 전략
+
+    TradingView Pine Script 문법의 일부를 파싱해서, 가격 데이터 전체에 대한 NumPy 배열 연산으로 실행합니다.
+    웹훅(/ta-signal)으로만 받던 TradingView 전략 로직을 로컬에서 그대로 백테스트하기 위한 용도입니다.
+
+    동작 구조
+        1. 스크립트를 토큰화 / 파싱해서 AST를 만듦 (전략 생성 시 한 번)
+        2. AST를 클로저로 컴파일 (PineProgram)
+        3. set_data에서 가격 데이터 전체에 대해 프로그램을 한 번 실행
+           -> 모든 식이 봉 하나가 아니라 전체 배열 단위로 계산됨
+        4. strategy.entry / strategy.close 호출 결과를 봉별 신호(BUY / SELL / HOLD)로 변환
+
+    지원 문법
+        - 주석(//), 선언문 strategy(...) / indicator(...)
+        - 변수 할당 (=, :=, 타입 키워드 float/int/bool 무시), if / else if / else 블록 (들여쓰기)
+        - 산술 / 비교 / 논리 연산 (and, or, not), 삼항 연산자 (a ? b : c), 과거 참조 x[n]
+        - 가격 시리즈: open, high, low, close, volume, hl2, hlc3, ohlc4, bar_index
+        - input(), input.int(), input.float(), input.bool(), input.source()
+        - ta.sma, ta.ema, ta.rma, ta.rsi, ta.crossover, ta.crossunder, ta.cross,
+          ta.highest, ta.lowest, ta.stdev, ta.change, ta.atr
+        - math.abs, math.max, math.min, math.sqrt, math.log, nz(), na()
+        - strategy.entry(id, strategy.long / strategy.short), strategy.close(id), strategy.close_all()
+        - plot 계열 함수는 무시
+
+    제한 사항
+        - var / varip 등 봉 사이에 값을 이어가는 변수는 지원하지 않음 (배열 연산으로 표현할 수 없음)
+        - long 전용: strategy.short 진입은 보유 포지션 청산(SELL)으로 처리
+        - 주문은 신호가 나온 봉의 종가로 체결되는 것으로 봄 (다른 전략들과 동일)
+
+    예시
+        strategy("SMA Cross", default_qty_type=strategy.percent_of_equity, default_qty_value=30)
+        fast = input.int(5, "Fast")
+        slow = input.int(20, "Slow")
+        if ta.crossover(ta.sma(close, fast), ta.sma(close, slow))
+            strategy.entry("L", strategy.long)
+        if ta.crossunder(ta.sma(close, fast), ta.sma(close, slow))
+            strategy.close("L")
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from strategy.strategy import *
+from strategy.sub.sub_strategy import holding_segments, BUY, SELL, HOLD
+from strategy.sub.max_position_strategy import MaxPosition_strategy
+
+DEFAULT_SCRIPT = """
+strategy("SMA Cross", default_qty_type=strategy.percent_of_equity, default_qty_value=50)
+fast = input.int(5, "Fast Length")
+slow = input.int(20, "Slow Length")
+fast_ma = ta.sma(close, fast)
+slow_ma = ta.sma(close, slow)
+if ta.crossover(fast_ma, slow_ma)
+    strategy.entry("Long", strategy.long)
+if ta.crossunder(fast_ma, slow_ma)
+    strategy.close("Long")
+"""
+
+
+class PineSyntaxError(ValueError):
+    """Pine 스크립트 파싱 / 컴파일 오류"""
+    def __init__(self, message, line=None):
+        super().__init__(f"line {line}: {message}" if line is not None else message)
+        self.line = line
+
+
+##############################################################################################
+# 토큰화
+##############################################################################################
+_TOKEN_RE = re.compile(r"""
+    (?P<COMMENT>//.*)
+  | (?P<NUM>\d+\.\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?|\d+(?:[eE][+-]?\d+)?)
+  | (?P<STR>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<NAME>[A-Za-z_][A-Za-z_0-9]*(?:\.[A-Za-z_][A-Za-z_0-9]*)*)
+  | (?P<OP>:=|==|!=|>=|<=|[-+*/%<>=?:\[\](),])
+  | (?P<WS>[ \t]+)
+""", re.VERBOSE)
+
+def _indent_width(line):
+    width = 0
+    for ch in line:
+        if ch == ' ':
+            width += 1
+        elif ch == '\t':
+            width += 4
+        else:
+            break
+    return width
+
+def tokenize(source):
+    """
+    소스 -> 토큰 리스트 [(kind, value, line)]
+    kind: NUM, STR, NAME, OP, NEWLINE, INDENT, DEDENT, EOF
+    괄호 안에서 줄이 바뀌면 이어지는 줄로 봄.
+    """
+    tokens = []
+    indents = [0]
+    depth = 0
+
+    for line_no, line in enumerate(source.splitlines(), start=1):
+        line_tokens = []
+        pos = 0
+        while pos < len(line):
+            match = _TOKEN_RE.match(line, pos)
+            if match is None:
+                raise PineSyntaxError(f"unexpected character {line[pos]!r}", line_no)
+            pos = match.end()
+            kind = match.lastgroup
+            if kind in ("WS", "COMMENT"):
+                continue
+            value = match.group()
+            if kind == "OP" and value in "([":
+                depth += 1
+            elif kind == "OP" and value in ")]":
+                depth -= 1
+            line_tokens.append((kind, value, line_no))
+
+        if not line_tokens:
+            continue
+
+        # 괄호가 열린 채로 시작한 줄은 앞 줄에 이어붙임
+        continuation = bool(tokens) and tokens[-1][0] != "NEWLINE"
+        if not continuation:
+            width = _indent_width(line)
+            if width > indents[-1]:
+                indents.append(width)
+                tokens.append(("INDENT", "", line_no))
+            while width < indents[-1]:
+                indents.pop()
+                tokens.append(("DEDENT", "", line_no))
+            if width != indents[-1]:
+                raise PineSyntaxError("inconsistent indentation", line_no)
+
+        tokens.extend(line_tokens)
+        if depth == 0:
+            tokens.append(("NEWLINE", "", line_no))
+
+    if depth != 0:
+        raise PineSyntaxError("unbalanced parentheses")
+
+    last_line = tokens[-1][2] if tokens else 0
+    while len(indents) > 1:
+        indents.pop()
+        tokens.append(("DEDENT", "", last_line))
+    tokens.append(("EOF", "", last_line))
+    return tokens
+
+
+##############################################################################################
+# 파싱 (AST는 튜플)
+##############################################################################################
+#   식    : ('num', v) ('str', s) ('bool', b) ('na',) ('name', id) ('index', e, n)
+#           ('call', fname, args, kwargs) ('unary', op, e) ('bin', op, a, b) ('ternary', c, a, b)
+#   문장  : ('assign', name, e, line) ('expr', e, line) ('if', cond, body, else_body, line)
+_TYPE_KEYWORDS = {"float", "int", "bool", "string", "series", "simple", "const"}
+
+_BINARY_PRECEDENCE = [
+    ("or",),
+    ("and",),
+    ("==", "!="),
+    ("<", ">", "<=", ">="),
+    ("+", "-"),
+    ("*", "/", "%"),
+]
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    # 토큰 헬퍼
+    def peek(self, offset=0):
+        return self.tokens[min(self.pos + offset, len(self.tokens) - 1)]
+
+    def next(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def match(self, kind, value=None):
+        token = self.peek()
+        if token[0] == kind and (value is None or token[1] == value):
+            self.pos += 1
+            return token
+        return None
+
+    def expect(self, kind, value=None):
+        token = self.match(kind, value)
+        if token is None:
+            found = self.peek()
+            raise PineSyntaxError(f"expected {value or kind}, found {found[1] or found[0]!r}", found[2])
+        return token
+
+    # 문장
+    def parse_program(self):
+        statements = []
+        while self.peek()[0] != "EOF":
+            if self.match("NEWLINE"):
+                continue
+            statements.append(self.parse_statement())
+        return statements
+
+    def parse_block(self):
+        self.expect("NEWLINE")
+        self.expect("INDENT")
+        body = []
+        while not self.match("DEDENT"):
+            if self.match("NEWLINE"):
+                continue
+            body.append(self.parse_statement())
+        return body
+
+    def parse_statement(self):
+        kind, value, line = self.peek()
+
+        if kind == "NAME" and value in ("var", "varip"):
+            raise PineSyntaxError(f"'{value}' declarations are not supported", line)
+
+        if kind == "NAME" and value == "if":
+            return self.parse_if()
+
+        # 타입 키워드 (float x = ...)
+        if kind == "NAME" and value in _TYPE_KEYWORDS and self.peek(1)[0] == "NAME":
+            self.next()
+            kind, value, line = self.peek()
+
+        if kind == "NAME" and self.peek(1)[0] == "OP" and self.peek(1)[1] in ("=", ":="):
+            self.next()
+            self.next()
+            expr = self.parse_expr()
+            self.expect_end()
+            return ('assign', value, expr, line)
+
+        expr = self.parse_expr()
+        self.expect_end()
+        return ('expr', expr, line)
+
+    def parse_if(self):
+        line = self.expect("NAME", "if")[2]
+        cond = self.parse_expr()
+        body = self.parse_block()
+
+        else_body = []
+        if self.peek()[0] == "NAME" and self.peek()[1] == "else":
+            self.next()
+            if self.peek()[0] == "NAME" and self.peek()[1] == "if":
+                else_body = [self.parse_if()]
+            else:
+                else_body = self.parse_block()
+        return ('if', cond, body, else_body, line)
+
+    def expect_end(self):
+        if self.peek()[0] in ("DEDENT", "EOF"):
+            return
+        self.expect("NEWLINE")
+
+    # 식
+    def parse_expr(self):
+        cond = self.parse_binary(0)
+        if self.match("OP", "?"):
+            a = self.parse_expr()
+            self.expect("OP", ":")
+            b = self.parse_expr()
+            return ('ternary', cond, a, b)
+        return cond
+
+    def parse_binary(self, level):
+        if level == len(_BINARY_PRECEDENCE):
+            return self.parse_unary()
+
+        left = self.parse_binary(level + 1)
+        while True:
+            kind, value, _ = self.peek()
+            if kind in ("OP", "NAME") and value in _BINARY_PRECEDENCE[level]:
+                self.next()
+                right = self.parse_binary(level + 1)
+                left = ('bin', value, left, right)
+            else:
+                return left
+
+    def parse_unary(self):
+        if self.match("OP", "-"):
+            return ('unary', '-', self.parse_unary())
+        if self.match("OP", "+"):
+            return self.parse_unary()
+        if self.match("NAME", "not"):
+            return ('unary', 'not', self.parse_unary())
+        return self.parse_postfix()
+
+    def parse_postfix(self):
+        expr = self.parse_primary()
+        while self.match("OP", "["):
+            offset = self.parse_expr()
+            self.expect("OP", "]")
+            expr = ('index', expr, offset)
+        return expr
+
+    def parse_primary(self):
+        kind, value, line = self.next()
+
+        if kind == "NUM":
+            return ('num', float(value) if any(c in value for c in ".eE") else int(value))
+        if kind == "STR":
+            return ('str', bytes(value[1:-1], "utf-8").decode("unicode_escape"))
+        if kind == "OP" and value == "(":
+            expr = self.parse_expr()
+            self.expect("OP", ")")
+            return expr
+        if kind == "NAME":
+            if value in ("true", "false"):
+                return ('bool', value == "true")
+            if value == "na" and not (self.peek()[0] == "OP" and self.peek()[1] == "("):
+                return ('na',)
+            if self.match("OP", "("):
+                args, kwargs = self.parse_arguments()
+                return ('call', value, args, kwargs)
+            return ('name', value)
+
+        raise PineSyntaxError(f"unexpected token {value or kind!r}", line)
+
+    def parse_arguments(self):
+        args, kwargs = [], {}
+        if self.match("OP", ")"):
+            return args, kwargs
+        while True:
+            if self.peek()[0] == "NAME" and self.peek(1)[:2] == ("OP", "="):
+                name = self.next()[1]
+                self.next()
+                kwargs[name] = self.parse_expr()
+            else:
+                if kwargs:
+                    raise PineSyntaxError("positional argument after keyword argument", self.peek()[2])
+                args.append(self.parse_expr())
+            if self.match("OP", ")"):
+                return args, kwargs
+            self.expect("OP", ",")
+
+def parse(source):
+    """Pine 스크립트 -> 문장 AST 리스트"""
+    return _Parser(tokenize(source)).parse_program()
+
+
+##############################################################################################
+# 시리즈 연산 (ta.*)
+##############################################################################################
+def _as_float(x, n):
+    arr = np.asarray(x, dtype=np.float64)
+    return np.full(n, float(arr)) if arr.ndim == 0 else arr
+
+def shift(x, k):
+    """x[k]: k봉 전 값 (앞부분은 na, bool은 false)"""
+    if np.ndim(x) == 0 or k == 0:
+        return x
+    if k < 0:
+        raise ValueError("history offset must be non-negative")
+    x = np.asarray(x)
+    fill = False if x.dtype == np.bool_ else np.nan
+    out = np.full(len(x), fill, dtype=x.dtype if x.dtype == np.bool_ else np.float64)
+    out[k:] = x[:len(x) - k]
+    return out
+
+def sma(src, length):
+    return pd.Series(src).rolling(int(length)).mean().to_numpy()
+
+def _seeded_ewm(src, length, alpha):
+    # Pine의 ema / rma: 처음 length개의 단순 평균으로 시작해서 재귀적으로 계산
+    src = np.asarray(src, dtype=np.float64)
+    seed = sma(src, length)
+    valid = np.flatnonzero(~np.isnan(seed))
+    if len(valid) == 0:
+        return np.full(len(src), np.nan)
+    first = valid[0]
+    x = src.copy()
+    x[:first] = np.nan
+    x[first] = seed[first]
+    out = pd.Series(x).ewm(alpha=alpha, adjust=False).mean().to_numpy(copy=True)
+    out[:first] = np.nan
+    return out
+
+def ema(src, length):
+    return _seeded_ewm(src, length, 2.0 / (int(length) + 1))
+
+def rma(src, length):
+    return _seeded_ewm(src, length, 1.0 / int(length))
+
+def rsi(src, length):
+    change = np.diff(np.asarray(src, dtype=np.float64), prepend=np.nan)
+    up = rma(np.where(np.isnan(change), np.nan, np.maximum(change, 0)), length)
+    down = rma(np.where(np.isnan(change), np.nan, -np.minimum(change, 0)), length)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        res = 100 - 100 / (1 + up / down)
+    res = np.where(down == 0, 100.0, np.where(up == 0, 0.0, res))
+    return np.where(np.isnan(up) | np.isnan(down), np.nan, res)
+
+def crossover(a, b):
+    with np.errstate(invalid='ignore'):
+        return (a > b) & (shift(_as_float(a, np.size(b) if np.ndim(a) == 0 else len(a)), 1) <=
+                          shift(_as_float(b, np.size(a) if np.ndim(b) == 0 else len(b)), 1))
+
+def crossunder(a, b):
+    with np.errstate(invalid='ignore'):
+        return (a < b) & (shift(_as_float(a, np.size(b) if np.ndim(a) == 0 else len(a)), 1) >=
+                          shift(_as_float(b, np.size(a) if np.ndim(b) == 0 else len(b)), 1))
+
+def highest(src, length):
+    return pd.Series(src).rolling(int(length)).max().to_numpy()
+
+def lowest(src, length):
+    return pd.Series(src).rolling(int(length)).min().to_numpy()
+
+def stdev(src, length):
+    return pd.Series(src).rolling(int(length)).std(ddof=0).to_numpy()
+
+def true_range(high, low, close):
+    prev_close = shift(close, 1)
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return tr
+
+
+##############################################################################################
+# 컴파일
+##############################################################################################
+class _Env:
+    """프로그램 한 번 실행 동안의 상태"""
+    def __init__(self, series, inputs, n):
+        self.series = series        # 가격 시리즈 (open, close, ...)
+        self.vars = {}              # 스크립트 변수
+        self.inputs = inputs        # input() 덮어쓰기 값
+        self.n = n
+        self.code = np.zeros(n, dtype=np.int8)
+        self.size = np.zeros(n, dtype=np.float64)
+
+
+class PineResult:
+    """프로그램 실행 결과"""
+    def __init__(self, code, size, variables):
+        self.code = code                # 봉별 신호 코드 (SIGNAL_CODES)
+        self.size = size                # 봉별 position_size
+        self.variables = variables      # 스크립트 변수 (전체 길이 배열만)
+
+
+_PRICE_SOURCES = ("open", "high", "low", "close", "volume", "hl2", "hlc3", "ohlc4")
+
+_CONSTANTS = {
+    "strategy.long": "long",
+    "strategy.short": "short",
+    "strategy.percent_of_equity": "percent_of_equity",
+    "strategy.fixed": "fixed",
+    "strategy.cash": "cash",
+}
+
+_IGNORED_CALLS = {
+    "plot", "plotshape", "plotchar", "plotarrow", "plotcandle", "plotbar", "hline", "fill",
+    "bgcolor", "barcolor", "alertcondition", "alert", "indicator", "study", "library",
+}
+
+_INPUT_CALLS = {"input", "input.int", "input.float", "input.bool", "input.source", "input.string"}
+
+def _series_functions():
+    """ta / math 함수: (최소 인자 수, 최대 인자 수, 구현)"""
+    return {
+        "ta.sma":       (2, 2, lambda env, src, length: sma(_as_float(src, env.n), length)),
+        "ta.ema":       (2, 2, lambda env, src, length: ema(_as_float(src, env.n), length)),
+        "ta.rma":       (2, 2, lambda env, src, length: rma(_as_float(src, env.n), length)),
+        "ta.rsi":       (2, 2, lambda env, src, length: rsi(_as_float(src, env.n), length)),
+        "ta.crossover": (2, 2, lambda env, a, b: crossover(_as_float(a, env.n), _as_float(b, env.n))),
+        "ta.crossunder": (2, 2, lambda env, a, b: crossunder(_as_float(a, env.n), _as_float(b, env.n))),
+        "ta.cross":     (2, 2, lambda env, a, b: crossover(_as_float(a, env.n), _as_float(b, env.n)) |
+                                                  crossunder(_as_float(a, env.n), _as_float(b, env.n))),
+        "ta.highest":   (1, 2, lambda env, *a: highest(env.series["high"], a[0]) if len(a) == 1
+                                               else highest(_as_float(a[0], env.n), a[1])),
+        "ta.lowest":    (1, 2, lambda env, *a: lowest(env.series["low"], a[0]) if len(a) == 1
+                                              else lowest(_as_float(a[0], env.n), a[1])),
+        "ta.stdev":     (2, 2, lambda env, src, length: stdev(_as_float(src, env.n), length)),
+        "ta.change":    (1, 2, lambda env, src, length=1: _as_float(src, env.n) - shift(_as_float(src, env.n), int(length))),
+        "ta.atr":       (1, 1, lambda env, length: rma(true_range(env.series["high"], env.series["low"],
+                                                                  env.series["close"]), length)),
+        "math.abs":     (1, 1, lambda env, x: np.abs(x)),
+        "math.max":     (2, 2, lambda env, a, b: np.fmax(a, b)),
+        "math.min":     (2, 2, lambda env, a, b: np.fmin(a, b)),
+        "math.sqrt":    (1, 1, lambda env, x: np.sqrt(x)),
+        "math.log":     (1, 1, lambda env, x: np.log(x)),
+        "nz":           (1, 2, lambda env, x, y=0: np.where(np.isnan(_as_float(x, env.n)), y, x)),
+        "na":           (1, 1, lambda env, x: np.isnan(_as_float(x, env.n))),
+    }
+
+_SERIES_FUNCTIONS = _series_functions()
+
+def _binary(op, a, b):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if op == "+":
+            return a + b
+        if op == "-":
+            return a - b
+        if op == "*":
+            return a * b
+        if op == "/":
+            return np.true_divide(a, b)
+        if op == "%":
+            return np.mod(a, b)
+        if op == "==":
+            return np.equal(a, b)
+        if op == "!=":
+            return np.not_equal(a, b)
+        if op == "<":
+            return np.less(a, b)
+        if op == ">":
+            return np.greater(a, b)
+        if op == "<=":
+            return np.less_equal(a, b)
+        if op == ">=":
+            return np.greater_equal(a, b)
+        if op == "and":
+            return np.logical_and(a, b)
+        if op == "or":
+            return np.logical_or(a, b)
+    raise PineSyntaxError(f"unknown operator {op}")
+
+def _as_bool(x):
+    # na는 false로 취급
+    if np.ndim(x) == 0:
+        return bool(x) and not (isinstance(x, float) and np.isnan(x))
+    x = np.asarray(x)
+    if x.dtype == np.bool_:
+        return x
+    with np.errstate(invalid='ignore'):
+        return np.nan_to_num(x, nan=0.0) != 0
+
+
+class PineProgram:
+    """
+    컴파일된 Pine 스크립트
+    run(dataFrame, inputs)로 가격 데이터 전체에 대해 실행합니다.
+    """
+    def __init__(self, source):
+        self.source = source
+        self.settings = {}      # strategy(...) 선언 인자
+        self.title = "Pine Script"
+        self.inputs = {}        # 변수 이름 -> 기본값 (input으로 선언된 것)
+
+        statements = parse(source)
+        self._statements = [self._compile_stmt(stmt) for stmt in statements]
+
+    ##########################################################################################
+    # 실행
+    ##########################################################################################
+    def run(self, dataFrame, inputs=None, position_size=0.5):
+        """
+        Args:
+            dataFrame (pd.DataFrame): open, high, low, close, volume 컬럼이 있는 가격 데이터 (시간 오름차순)
+            inputs (dict): input() 기본값 덮어쓰기 (변수 이름 또는 input의 title 기준)
+            position_size (float): strategy.entry 기본 매수 비율 (선언문에 percent_of_equity가 있으면 그 값 사용)
+
+        Returns:
+            PineResult
+        """
+        n = len(dataFrame)
+        series = {}
+        for col in ("open", "high", "low", "close", "volume"):
+            if col in dataFrame.columns:
+                series[col] = dataFrame[col].to_numpy(dtype=np.float64)
+        if "close" not in series:
+            raise ValueError("dataFrame must have a 'close' column")
+        for col in ("open", "high", "low"):
+            series.setdefault(col, series["close"])
+        series.setdefault("volume", np.zeros(n))
+        series["hl2"] = (series["high"] + series["low"]) / 2
+        series["hlc3"] = (series["high"] + series["low"] + series["close"]) / 3
+        series["ohlc4"] = (series["open"] + series["high"] + series["low"] + series["close"]) / 4
+        series["bar_index"] = np.arange(n, dtype=np.float64)
+
+        env = _Env(series, dict(inputs or {}), n)
+        env.default_size = self._default_size(position_size)
+
+        for stmt in self._statements:
+            stmt(env, None)
+
+        code, size = self._apply_position_rules(env.code, env.size)
+        variables = {name: value for name, value in env.vars.items() if np.ndim(value) == 1 and len(value) == n}
+        return PineResult(code, size, variables)
+
+    def _default_size(self, position_size):
+        if self.settings.get("default_qty_type") == "percent_of_equity" and "default_qty_value" in self.settings:
+            return float(self.settings["default_qty_value"]) / 100
+        return position_size
+
+    def _apply_position_rules(self, code, size):
+        """
+        TradingView 전략 실행 규칙 적용
+        - pyramiding(기본 0): 이미 보유 중일 때 추가 진입은 pyramiding 횟수까지만 허용
+        - 포지션이 없을 때의 청산 신호는 무시
+        """
+        pyramiding = int(self.settings.get("pyramiding", 0))
+        code, size = MaxPosition_strategy(max_size=1.0, max_entries=pyramiding + 1).apply(code, size, None)
+
+        holding, _, _ = holding_segments(code, size)
+        was_holding = shift(holding, 1)
+        flat_exit = (code == SELL) & ~was_holding
+        code[flat_exit] = HOLD
+        size[flat_exit] = 0.0
+        return code, size
+
+    ##########################################################################################
+    # 문장 컴파일
+    ##########################################################################################
+    def _compile_stmt(self, stmt):
+        kind = stmt[0]
+
+        if kind == 'assign':
+            _, name, expr, line = stmt
+            if name in _PRICE_SOURCES or name in _CONSTANTS:
+                raise PineSyntaxError(f"cannot assign to built-in '{name}'", line)
+            value_fn = self._compile_input(name, expr, line) if self._is_input(expr) else self._compile_expr(expr, line)
+
+            def assign(env, mask):
+                value = value_fn(env)
+                if mask is None:
+                    env.vars[name] = value
+                else:
+                    # if 블록 안의 할당: 조건이 맞는 봉만 값을 바꿈
+                    env.vars[name] = np.where(mask, value, env.vars.get(name, np.nan))
+            return assign
+
+        if kind == 'if':
+            _, cond, body, else_body, line = stmt
+            cond_fn = self._compile_expr(cond, line)
+            body_fns = [self._compile_stmt(s) for s in body]
+            else_fns = [self._compile_stmt(s) for s in else_body]
+
+            def run_if(env, mask):
+                cond_mask = np.broadcast_to(_as_bool(cond_fn(env)), (env.n,))
+                outer = np.ones(env.n, dtype=bool) if mask is None else mask
+                for fn in body_fns:
+                    fn(env, outer & cond_mask)
+                for fn in else_fns:
+                    fn(env, outer & ~cond_mask)
+            return run_if
+
+        if kind == 'expr':
+            _, expr, line = stmt
+            if expr[0] == 'call':
+                fname = expr[1]
+                if fname == "strategy":
+                    self._compile_declaration(expr, line)
+                    return lambda env, mask: None
+                if fname in _IGNORED_CALLS:
+                    return lambda env, mask: None
+                if fname.startswith("strategy."):
+                    return self._compile_order(expr, line)
+            value_fn = self._compile_expr(expr, line)
+            return lambda env, mask: value_fn(env)
+
+        raise PineSyntaxError(f"unknown statement {kind}")
+
+    def _compile_declaration(self, expr, line):
+        _, _, args, kwargs = expr
+        if args:
+            self.title = self._literal(args[0], line)
+        for key, value in kwargs.items():
+            self.settings[key] = self._literal(value, line)
+        if "title" in self.settings:
+            self.title = self.settings["title"]
+
+    def _literal(self, expr, line):
+        """선언문 인자처럼 상수여야 하는 식 평가"""
+        if expr[0] in ('num', 'str', 'bool'):
+            return expr[1]
+        if expr[0] == 'name' and expr[1] in _CONSTANTS:
+            return _CONSTANTS[expr[1]]
+        if expr[0] == 'unary' and expr[1] == '-' and expr[2][0] == 'num':
+            return -expr[2][1]
+        raise PineSyntaxError("expected a constant value", line)
+
+    def _compile_order(self, expr, line):
+        _, fname, args, kwargs = expr
+        when_fn = self._compile_expr(kwargs["when"], line) if "when" in kwargs else None
+
+        if fname == "strategy.entry":
+            if len(args) < 2 and "direction" not in kwargs:
+                raise PineSyntaxError("strategy.entry requires id and direction", line)
+            direction = self._literal(kwargs.get("direction", args[1] if len(args) > 1 else None), line)
+            qty = kwargs.get("qty", args[2] if len(args) > 2 else None)
+            qty_fn = self._compile_expr(qty, line) if qty is not None else None
+
+            def entry(env, mask):
+                cond = self._order_mask(env, mask, when_fn)
+                if direction == "long":
+                    size = env.default_size
+                    if qty_fn is not None and self.settings.get("default_qty_type") == "percent_of_equity":
+                        size = _as_float(qty_fn(env), env.n)[cond] / 100
+                    env.code[cond] = BUY
+                    env.size[cond] = size
+                else:
+                    # long 전용: 숏 진입은 롱 포지션 청산으로 처리
+                    env.code[cond] = SELL
+                    env.size[cond] = 1.0
+            return entry
+
+        if fname in ("strategy.close", "strategy.close_all"):
+            qty_percent = kwargs.get("qty_percent")
+            qty_percent_fn = self._compile_expr(qty_percent, line) if qty_percent is not None else None
+
+            def close(env, mask):
+                cond = self._order_mask(env, mask, when_fn)
+                env.code[cond] = SELL
+                env.size[cond] = 1.0 if qty_percent_fn is None else _as_float(qty_percent_fn(env), env.n)[cond] / 100
+            return close
+
+        raise PineSyntaxError(f"unsupported order function '{fname}'", line)
+
+    @staticmethod
+    def _order_mask(env, mask, when_fn):
+        cond = np.ones(env.n, dtype=bool) if mask is None else mask.copy()
+        if when_fn is not None:
+            cond &= np.broadcast_to(_as_bool(when_fn(env)), (env.n,))
+        return cond
+
+    ##########################################################################################
+    # input
+    ##########################################################################################
+    @staticmethod
+    def _is_input(expr):
+        return expr[0] == 'call' and expr[1] in _INPUT_CALLS
+
+    def _compile_input(self, name, expr, line):
+        _, fname, args, kwargs = expr
+        default = kwargs.get("defval", args[0] if args else None)
+        if default is None:
+            raise PineSyntaxError(f"{fname} requires a default value", line)
+        title = kwargs.get("title", args[1] if len(args) > 1 else None)
+        title = self._literal(title, line) if title is not None else None
+
+        if fname == "input.source":
+            if default[0] != 'name' or default[1] not in _PRICE_SOURCES:
+                raise PineSyntaxError("input.source default must be a price series", line)
+            default_value = default[1]
+        else:
+            default_value = self._literal(default, line)
+        self.inputs[name] = default_value
+
+        def value(env):
+            v = env.inputs.get(name, env.inputs.get(title, default_value)) if title else env.inputs.get(name, default_value)
+            if fname == "input.source":
+                if v not in env.series:
+                    raise ValueError(f"Unknown source for input '{name}': {v}")
+                return env.series[v]
+            if fname == "input.int":
+                return int(v)
+            if fname == "input.float":
+                return float(v)
+            if fname == "input.bool":
+                return bool(v)
+            return v
+        return value
+
+    ##########################################################################################
+    # 식 컴파일 -> 클로저
+    ##########################################################################################
+    def _compile_expr(self, expr, line):
+        kind = expr[0]
+
+        if kind in ('num', 'str', 'bool'):
+            value = expr[1]
+            return lambda env: value
+
+        if kind == 'na':
+            return lambda env: np.nan
+
+        if kind == 'name':
+            name = expr[1]
+            if name in _CONSTANTS:
+                constant = _CONSTANTS[name]
+                return lambda env: constant
+
+            def load(env):
+                if name in env.vars:
+                    return env.vars[name]
+                if name in env.series:
+                    return env.series[name]
+                raise PineSyntaxError(f"undefined variable '{name}'", line)
+            return load
+
+        if kind == 'index':
+            value_fn = self._compile_expr(expr[1], line)
+            if expr[2][0] != 'num' or not isinstance(expr[2][1], int):
+                raise PineSyntaxError("history offset must be an integer constant", line)
+            offset = expr[2][1]
+            return lambda env: shift(value_fn(env), offset)
+
+        if kind == 'unary':
+            op = expr[1]
+            value_fn = self._compile_expr(expr[2], line)
+            if op == '-':
+                return lambda env: -value_fn(env)
+            return lambda env: np.logical_not(_as_bool(value_fn(env)))
+
+        if kind == 'bin':
+            op = expr[1]
+            a_fn = self._compile_expr(expr[2], line)
+            b_fn = self._compile_expr(expr[3], line)
+            if op in ("and", "or"):
+                return lambda env: _binary(op, _as_bool(a_fn(env)), _as_bool(b_fn(env)))
+            return lambda env: _binary(op, a_fn(env), b_fn(env))
+
+        if kind == 'ternary':
+            cond_fn = self._compile_expr(expr[1], line)
+            a_fn = self._compile_expr(expr[2], line)
+            b_fn = self._compile_expr(expr[3], line)
+            return lambda env: np.where(_as_bool(cond_fn(env)), a_fn(env), b_fn(env))
+
+        if kind == 'call':
+            _, fname, args, kwargs = expr
+            if fname in _INPUT_CALLS:
+                # 변수에 할당하지 않은 input은 title로만 덮어쓸 수 있음
+                return self._compile_input(f"_input_{len(self.inputs)}", expr, line)
+
+            if fname not in _SERIES_FUNCTIONS:
+                raise PineSyntaxError(f"unsupported function '{fname}'", line)
+            min_args, max_args, func = _SERIES_FUNCTIONS[fname]
+            if kwargs:
+                raise PineSyntaxError(f"keyword arguments are not supported for '{fname}'", line)
+            if not min_args <= len(args) <= max_args:
+                raise PineSyntaxError(f"'{fname}' takes {min_args}~{max_args} arguments", line)
+
+            arg_fns = [self._compile_expr(arg, line) for arg in args]
+            return lambda env: func(env, *[fn(env) for fn in arg_fns])
+
+        raise PineSyntaxError(f"unknown expression {kind}", line)
+
+def compile_pine(source):
+    """Pine 스크립트 소스 -> PineProgram"""
+    return PineProgram(source)
+
+
+##############################################################################################
+# 전략
+##############################################################################################
+class PineStyle_strategy(STRATEGY):
+    def __init__(self, script: str = None, script_path: str = None, position_size: float = 0.5, **inputs):
+        """
+        :param script: Pine 스크립트 소스 (없으면 script_path, 둘 다 없으면 DEFAULT_SCRIPT)
+        :param script_path: Pine 스크립트 파일 경로
+        :param position_size: strategy.entry 기본 매수 비율
+        :param inputs: input() 기본값 덮어쓰기 (변수 이름 또는 title = 값)
+        """
+        super().__init__()
+        if script is None and script_path is not None:
+            with open(script_path, 'r', encoding='utf-8') as f:
+                script = f.read()
+
+        self.program = compile_pine(script or DEFAULT_SCRIPT)     # 파싱 / 컴파일은 한 번만
+        self.name = f"Pine Style Strategy ({self.program.title})"
+        self.inputs = inputs
+        self.default_position_size = position_size
+        self.dataFrame = None
+        self._rows = {}         # 봉 시각 키 ('YYYYMMDD' / 'YYYYMMDDHHMMSS') -> 행 번호
+
+    def set_data(self, ticker, dataFrame):
+        self.ticker = ticker
+        self.dataFrame = dataFrame.copy()
+
+        self.dataFrame['date'] = parse_time(self.dataFrame['date'])
+        self.dataFrame = (
+            self.dataFrame.dropna(subset=['date'])
+            .drop_duplicates(subset=['date'], keep='last')
+            .sort_values('date')
+            .reset_index(drop=True)
+        )
+
+        result = self.program.run(self.dataFrame, inputs=self.inputs, position_size=self.default_position_size)
+        self.dataFrame['pine_signal'] = result.code
+        self.dataFrame['pine_position_size'] = result.size
+
+        # 스크립트 변수도 컬럼으로 추가 (시각화용, 가격 컬럼과 겹치면 생략)
+        for name, values in result.variables.items():
+            if name not in self.dataFrame.columns:
+                self.dataFrame[name] = values
+
+        self._rows = {date: row for row, date in enumerate(format_time(self.dataFrame['date']))}
+        print(f"Data for {ticker} set with {len(self.dataFrame)} records ({self.program.title})")
+        return self.dataFrame
+
+    def _signal_at(self, row, target_time):
+        code = int(self.dataFrame['pine_signal'].iat[row])
+        current_price = self.dataFrame['close'].iat[row]
+        size = float(self.dataFrame['pine_position_size'].iat[row])
+
+        if code == BUY:
+            return TradingSignal.create_buy_signal(self.ticker, target_time, current_price, size, confidence=0.5)
+        if code == SELL:
+            return TradingSignal.create_sell_signal(self.ticker, target_time, current_price, size, confidence=0.5)
+        return TradingSignal.create_hold_signal(self.ticker, target_time, current_price)
+
+    def run(self, target_time=None, state=None) -> TradingSignal:
+        if target_time is None:
+            raise ValueError("targetTime must be provided")
+        if self.dataFrame is None:
+            raise ValueError("dataFrame must be set before running the strategy")
+
+        row = self._rows.get(str(target_time))
+        if row is None:
+            raise ValueError(f"No data found for date: {target_time}")
+        return self._signal_at(row, target_time)
+
+    def run_batch(self, target_times, state=None) -> SignalFrame:
+        """신호가 이미 배열로 계산되어 있으므로 날짜별 run() 호출 없이 바로 SignalFrame 생성"""
+        rows, target_time = self._batch_rows(target_times, self._rows)
+        code = self.dataFrame['pine_signal'].to_numpy()[rows]
+        return self._batch_frame(
+            rows, target_time, code,
+            position_size=self.dataFrame['pine_position_size'].to_numpy()[rows],
+            confidence=np.where(code != HOLD, 0.5, 0.0),
+        )
@@ -4,6 +4,9 @@ import numpy as np
 from strategy.strategy import *
 
 class RSI_strategy(STRATEGY):
+    INTERMEDIATE_COLUMNS = ("price_change", "gain", "loss", "avg_gain", "avg_loss", "rs",
+                            "rsi_oversold_prev", "rsi_overbought_prev")
+
     def __init__(self, rsi_period: int = 14, oversold_threshold: float = 30, overbought_threshold: float = 70):
         super().__init__()
         self.name = "RSI Strategy"
@@ -15,9 +18,9 @@ class RSI_strategy(STRATEGY):
     def set_data(self, ticker, dataFrame):
         self.ticker = ticker
         self.dataFrame = dataFrame
-        self.dataFrame['date'] = pd.to_datetime(self.dataFrame['date'], format='%Y%m%d', errors='coerce')
+        self.dataFrame['date'] = parse_time(self.dataFrame['date'])
         self.calculate_rsi_indicators()
-        return self.dataFrame
+        return self.prune_frame()
 
     def calculate_rsi_indicators(self):
         """RSI 및 관련 지표 계산"""
@@ -105,7 +108,7 @@ class RSI_strategy(STRATEGY):
             raise ValueError("dataFrame must be set before running the strategy")
         
         # targetTime과 같은 날짜의 데이터를 가져오기
-        target_date = pd.to_datetime(target_time, format='%Y%m%d', errors='coerce')
+        target_date = parse_time(target_time)
         filtered_data = self.dataFrame[self.dataFrame['date'] == target_date]
         
         if filtered_data.empty:
@@ -254,3 +257,34 @@ class RSI_strategy(STRATEGY):
                 target_time=target_time,
                 current_price=current_price
             )
+
+    def run_batch(self, target_times, state=None) -> SignalFrame:
+        """run()과 같은 신호를 배열 연산으로 한 번에 계산 (포지션 상태가 없어서 봉끼리 독립)"""
+        rows, target_time = self._batch_rows(target_times)
+        column = lambda name: self._column(name, rows)
+        rsi, rsi_prev = column('rsi'), column('rsi_prev')
+        oversold, overbought = column('rsi_oversold'), column('rsi_overbought')
+
+        buy = (
+            50 * column('rsi_oversold_exit')
+            + 40 * (oversold & column('uptrend'))
+            + np.where(rsi < 25, 30, np.where(rsi < self.oversold_threshold, 20, 0))
+            + 25 * (oversold & (rsi > rsi_prev))
+        )
+        sell = (
+            50 * column('rsi_overbought_entry')
+            + 40 * (overbought & column('downtrend'))
+            + np.where(rsi > 75, 30, np.where(rsi > self.overbought_threshold, 20, 0))
+            + 25 * (overbought & (rsi < rsi_prev))
+        )
+        valid = ~(np.isnan(rsi) | np.isnan(rsi_prev))     # RSI가 없으면 홀드
+
+        conditions = [valid & (buy >= 60), valid & (sell >= 60), valid & (buy >= 40),
+                      valid & (sell >= 40), valid & (buy >= 20), valid & (sell >= 20)]
+        code = np.select(conditions, [1, -1, 1, -1, 1, -1], 0).astype(np.int8)
+        size = np.select(conditions, [np.minimum(1.0, (buy - 40) * 0.02), np.minimum(1.0, (sell - 40) * 0.02),
+                                      0.3, 0.3, 0.1, 0.1], 0.0)
+        confidence = np.select(conditions, [np.minimum(0.9, 0.7 + (buy - 60) * 0.01),
+                                            np.minimum(0.9, 0.7 + (sell - 60) * 0.01),
+                                            0.6, 0.6, 0.5, 0.5], 0.0)
+        return self._batch_frame(rows, target_time, code, size, confidence)
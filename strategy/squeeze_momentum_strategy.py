@@ -4,6 +4,8 @@ import numpy as np
 from strategy.strategy import *
 
 class SqueezeMomentum_strategy(STRATEGY):
+    INTERMEDIATE_COLUMNS = ("high_prev", "low_prev", "close_prev", "tr1", "tr2", "tr3", "true_range", "momentum_prev")
+
     def __init__(self, bb_period: int = 20, bb_multiplier: float = 2.0, kc_period: int = 20, kc_multiplier: float = 1.5):
         super().__init__()
         self.name = "Squeeze Momentum Strategy"
@@ -16,11 +18,11 @@ class SqueezeMomentum_strategy(STRATEGY):
     def set_data(self, ticker, dataFrame):
         self.ticker = ticker
         self.dataFrame = dataFrame
-        self.dataFrame['date'] = pd.to_datetime(self.dataFrame['date'], format='%Y%m%d', errors='coerce')
+        self.dataFrame['date'] = parse_time(self.dataFrame['date'])
         self.calculate_squeeze_indicators()
 
         print(self.dataFrame)
-        return self.dataFrame
+        return self.prune_frame()
 
     def calculate_squeeze_indicators(self):
         """Squeeze Momentum 관련 지표 계산"""
@@ -172,7 +174,7 @@ class SqueezeMomentum_strategy(STRATEGY):
             raise ValueError("dataFrame must be set before running the strategy")
         
         # targetTime과 같은 날짜의 데이터를 가져오기
-        target_date = pd.to_datetime(target_time, format='%Y%m%d', errors='coerce')
+        target_date = parse_time(target_time)
         filtered_data = self.dataFrame[self.dataFrame['date'] == target_date]
         
         if filtered_data.empty:
@@ -312,3 +314,25 @@ class SqueezeMomentum_strategy(STRATEGY):
                 target_time=target_time,
                 current_price=current_price
             )
+
+    def run_batch(self, target_times, state=None) -> SignalFrame:
+        """run()과 같은 신호를 배열 연산으로 한 번에 계산 (포지션 상태가 없어서 봉끼리 독립)"""
+        rows, target_time = self._batch_rows(target_times)
+        flag = lambda name: self._column(name, rows, fill=False).astype(bool)
+        momentum = np.nan_to_num(self._column('momentum', rows, fill=0.0).astype(np.float64), nan=0.0)
+        squeeze_on, squeeze_end = flag('squeeze_on'), flag('squeeze_end')
+        rising = flag('momentum_increasing') & (momentum > 0)
+        falling = flag('momentum_decreasing') & (momentum < 0)
+
+        buy = 50 * (squeeze_end & rising) + 25 * (squeeze_on & rising) + 20 * (flag('ma_uptrend') & rising)
+        sell = (50 * (squeeze_end & falling) + 30 * flag('momentum_cross_down')
+                + 25 * (squeeze_on & falling) + 20 * (flag('ma_downtrend') & falling))
+
+        conditions = [buy >= 60, sell >= 60, buy >= 35, sell >= 35, buy >= 20, sell >= 20]
+        code = np.select(conditions, [1, -1, 1, -1, 1, -1], 0).astype(np.int8)
+        size = np.select(conditions, [np.minimum(1.0, (buy - 40) * 0.015), np.minimum(1.0, (sell - 40) * 0.015),
+                                      0.4, 0.4, 0.2, 0.2], 0.0)
+        confidence = np.select(conditions, [np.minimum(0.95, 0.7 + (buy - 60) * 0.01),
+                                            np.minimum(0.95, 0.7 + (sell - 60) * 0.01),
+                                            0.65, 0.65, 0.55, 0.55], 0.0)
+        return self._batch_frame(rows, target_time, code, size, confidence)
@@ -3,15 +3,57 @@ from typing import Optional, Dict, Any
 from enum import Enum
 from datetime import datetime
 
+import numpy as np
+import pandas as pd
+
+from module.common import metrics, frame_schema
+
 class SignalType(Enum):
     """매매 신호 타입"""
     BUY = "BUY"
     SELL = "SELL"
     HOLD = "HOLD"
 
-@dataclass
+# 배열(컬럼형) 처리에서 사용하는 신호 코드
+SIGNAL_CODES = {
+    SignalType.HOLD: 0,
+    SignalType.BUY: 1,
+    SignalType.SELL: -1,
+}
+CODE_TO_SIGNAL = {code: signal_type for signal_type, code in SIGNAL_CODES.items()}
+
+# 봉 시각 키: 일봉 'YYYYMMDD', 분봉 등 실시간 집계 봉(bar_aggregator) 'YYYYMMDDHHMMSS'
+DATE_FORMAT = '%Y%m%d'
+INTRADAY_FORMAT = '%Y%m%d%H%M%S'
+
+def parse_time(value):
+    """
+    봉 시각 키 (문자열 / 정수, 8자리 또는 14자리) -> Timestamp
+    시리즈를 넘기면 시리즈로 반환 (첫 값의 자릿수로 형식 결정, 이미 datetime이면 그대로)
+    """
+    if isinstance(value, pd.Series):
+        if pd.api.types.is_datetime64_any_dtype(value):
+            return value
+        text = value.astype(str)
+        intraday = len(text) > 0 and len(text.iloc[0]) == 14
+        return pd.to_datetime(text, format=INTRADAY_FORMAT if intraday else DATE_FORMAT, errors='coerce')
+    if isinstance(value, datetime):
+        return pd.Timestamp(value)
+    text = str(value)
+    return pd.to_datetime(text, format=INTRADAY_FORMAT if len(text) == 14 else DATE_FORMAT, errors='coerce')
+
+def format_time(dates):
+    """datetime 시리즈 -> 봉 시각 키 문자열 시리즈 (모두 자정이면 'YYYYMMDD', 아니면 'YYYYMMDDHHMMSS')"""
+    intraday = bool((dates.dt.normalize() != dates).any())
+    return dates.dt.strftime(INTRADAY_FORMAT if intraday else DATE_FORMAT)
+
+def _native(value):
+    """numpy 스칼라 -> 파이썬 숫자 (float32 가격 프레임의 값이 orderer 잔고 계산에 섞이지 않도록)"""
+    return value.item() if isinstance(value, np.generic) else value
+
+@dataclass(slots=True)
 class TradingSignal:
-    """매매 신호 구조체"""
+    """매매 신호 구조체 (단일 신호용, 여러 신호를 한 번에 다룰 때는 SignalFrame 사용)"""
     timestamp: datetime                 # 신호 발생 시간
 
     # 기본 신호 정보
@@ -48,7 +90,7 @@ class TradingSignal:
             signal_type=SignalType.HOLD,
             target_time=target_time,
             ticker=ticker,
-            current_price=current_price,
+            current_price=_native(current_price),
             position_size=0.0,
         )
     
@@ -62,9 +104,9 @@ class TradingSignal:
             signal_type=SignalType.BUY,
             target_time=target_time,
             ticker=ticker,
-            current_price=current_price,
-            position_size=position_size,
-            confidence=confidence
+            current_price=_native(current_price),
+            position_size=_native(position_size),
+            confidence=_native(confidence)
         )
     
     @classmethod
@@ -77,9 +119,9 @@ class TradingSignal:
             signal_type=SignalType.SELL,
             target_time=target_time,
             ticker=ticker,
-            current_price=current_price,
-            position_size=position_size,
-            confidence=confidence
+            current_price=_native(current_price),
+            position_size=_native(position_size),
+            confidence=_native(confidence)
         )   
 
 
@@ -96,9 +138,171 @@ class TradingSignal:
         print(f"Confidence: {self.confidence:.2f}")
         print("----------------------\n")
 
+class SignalFrame:
+    """
+    컬럼형 매매 신호 묶음 (배치 처리용)
+
+    - 신호 하나마다 TradingSignal 객체를 만들지 않고, 필드별 NumPy 배열로 보관합니다.
+    - 백테스트처럼 날짜 / 종목이 많은 경우 전략 -> 서브 전략 -> orderer 사이의 교환 형식으로 사용합니다.
+
+    배열 (모두 길이 n)
+        target_time   : int64   YYYYMMDD
+        ticker_index  : int32   tickers 리스트의 인덱스
+        code          : int8    신호 코드 (SIGNAL_CODES)
+        price         : float64 current_price
+        position_size : float64
+        confidence    : float64
+        quantity      : int64   (-1 이면 None)
+    """
+    __slots__ = ("timestamp", "tickers", "target_time", "ticker_index", "code",
+                 "price", "position_size", "confidence", "quantity")
+
+    def __init__(self, tickers, target_time, ticker_index, code, price, position_size,
+                 confidence=None, quantity=None, timestamp=None):
+        n = len(code)
+        self.timestamp = timestamp or datetime.now()    # 묶음 전체의 신호 발생 시간
+        self.tickers = list(tickers)
+        self.target_time = np.asarray(target_time, dtype=np.int64)
+        self.ticker_index = np.asarray(ticker_index, dtype=np.int32)
+        self.code = np.asarray(code, dtype=np.int8)
+        self.price = np.asarray(price, dtype=np.float64)
+        self.position_size = np.asarray(position_size, dtype=np.float64)
+        self.confidence = np.zeros(n) if confidence is None else np.asarray(confidence, dtype=np.float64)
+        self.quantity = np.full(n, -1, dtype=np.int64) if quantity is None else np.asarray(quantity, dtype=np.int64)
+
+    @classmethod
+    def from_arrays(cls, ticker, target_time, code, price, position_size, confidence=None, quantity=None):
+        """한 종목의 신호 배열로 생성"""
+        return cls([ticker], target_time, np.zeros(len(code), dtype=np.int32), code, price, position_size,
+                   confidence, quantity)
+
+    @classmethod
+    def from_signals(cls, signals):
+        """TradingSignal 리스트 -> SignalFrame"""
+        n = len(signals)
+        tickers = {}
+        ticker_index = np.fromiter((tickers.setdefault(s.ticker, len(tickers)) for s in signals),
+                                   dtype=np.int32, count=n)
+        return cls(
+            tickers=list(tickers),
+            target_time=np.fromiter((int(s.target_time) for s in signals), dtype=np.int64, count=n),
+            ticker_index=ticker_index,
+            code=np.fromiter((SIGNAL_CODES[s.signal_type] for s in signals), dtype=np.int8, count=n),
+            price=np.fromiter((s.current_price for s in signals), dtype=np.float64, count=n),
+            position_size=np.fromiter((s.position_size for s in signals), dtype=np.float64, count=n),
+            confidence=np.fromiter((s.confidence for s in signals), dtype=np.float64, count=n),
+            quantity=np.fromiter((-1 if s.quantity is None else s.quantity for s in signals), dtype=np.int64, count=n),
+        )
+
+    @classmethod
+    def concat(cls, frames):
+        """여러 SignalFrame을 하나로 합침 (종목 인덱스는 다시 매김)"""
+        tickers = {}
+        ticker_index = []
+        for frame in frames:
+            remap = np.array([tickers.setdefault(t, len(tickers)) for t in frame.tickers], dtype=np.int32)
+            ticker_index.append(remap[frame.ticker_index] if len(remap) else frame.ticker_index)
+
+        def cat(name):
+            return np.concatenate([getattr(f, name) for f in frames]) if frames else np.array([])
+
+        return cls(list(tickers), cat("target_time"), np.concatenate(ticker_index) if frames else [],
+                   cat("code"), cat("price"), cat("position_size"), cat("confidence"), cat("quantity"))
+
+    def __len__(self):
+        return len(self.code)
+
+    def __getitem__(self, i):
+        return self.signal(i)
+
+    def __iter__(self):
+        return iter(self.to_signals())
+
+    def replace(self, **arrays):
+        """일부 배열만 바꾼 새 SignalFrame (나머지 배열은 공유)"""
+        fields = {name: getattr(self, name) for name in
+                  ("tickers", "target_time", "ticker_index", "code", "price",
+                   "position_size", "confidence", "quantity", "timestamp")}
+        fields.update(arrays)
+        return SignalFrame(**fields)
+
+    def take(self, indices):
+        """인덱스(또는 bool mask)로 고른 신호들의 SignalFrame"""
+        return SignalFrame(
+            self.tickers, self.target_time[indices], self.ticker_index[indices], self.code[indices],
+            self.price[indices], self.position_size[indices], self.confidence[indices],
+            self.quantity[indices], self.timestamp,
+        )
+
+    def ticker_rows(self, ticker):
+        """해당 종목 신호의 인덱스 배열 (시간 순서 유지)"""
+        if ticker not in self.tickers:
+            return np.array([], dtype=np.int64)
+        return np.flatnonzero(self.ticker_index == self.tickers.index(ticker))
+
+    def actions(self):
+        """HOLD가 아닌 신호의 인덱스 배열"""
+        return np.flatnonzero(self.code != SIGNAL_CODES[SignalType.HOLD])
+
+    def signal(self, i) -> TradingSignal:
+        """i번째 신호를 TradingSignal로 변환"""
+        quantity = int(self.quantity[i])
+        return TradingSignal(
+            timestamp=self.timestamp,
+            signal_type=CODE_TO_SIGNAL[int(self.code[i])],
+            target_time=str(int(self.target_time[i])),
+            ticker=self.tickers[int(self.ticker_index[i])],
+            current_price=float(self.price[i]),
+            position_size=float(self.position_size[i]),
+            quantity=None if quantity < 0 else quantity,
+            confidence=float(self.confidence[i]),
+        )
+
+    def to_signals(self):
+        """SignalFrame -> TradingSignal 리스트"""
+        return [
+            TradingSignal(
+                timestamp=self.timestamp,
+                signal_type=CODE_TO_SIGNAL[c],
+                target_time=str(t),
+                ticker=self.tickers[k],
+                current_price=p,
+                position_size=s,
+                quantity=None if q < 0 else q,
+                confidence=conf,
+            )
+            for t, k, c, p, s, q, conf in zip(
+                self.target_time.tolist(), self.ticker_index.tolist(), self.code.tolist(),
+                self.price.tolist(), self.position_size.tolist(), self.quantity.tolist(),
+                self.confidence.tolist(),
+            )
+        ]
+
+    def to_dataframe(self):
+        """확인 / 시각화용 DataFrame"""
+        return pd.DataFrame({
+            'target_time': self.target_time.astype(str),
+            'ticker': np.asarray(self.tickers, dtype=object)[self.ticker_index] if self.tickers else [],
+            'signal_type': [CODE_TO_SIGNAL[c].value for c in self.code.tolist()],
+            'current_price': self.price,
+            'position_size': self.position_size,
+            'quantity': np.where(self.quantity < 0, np.nan, self.quantity),
+            'confidence': self.confidence,
+        })
+
+
 class STRATEGY:
+    # set_data에서 신호를 계산하는 데만 쓰이고 run() / 시각화에서는 쓰지 않는 중간 컬럼 (하위 클래스에서 지정)
+    INTERMEDIATE_COLUMNS = ()
+
     def __init__(self):
-        pass
+        self.sub_strategies = []    # 메인 신호를 후처리하는 서브 전략 (strategy.sub), 추가한 순서대로 적용
+        self.prune_intermediates = False    # True면 set_data 후 INTERMEDIATE_COLUMNS를 지움 (전 종목 실행 등 메모리 절약)
+
+    def __init_subclass__(cls, **kwargs):
+        # 하위 전략의 set_data / run 실행 시간 측정 (metrics가 꺼져 있으면 바로 원래 메소드 실행)
+        super().__init_subclass__(**kwargs)
+        metrics.wrap_methods(cls, ("set_data", "run"), prefix="strategy")
 
     def set_data(self, ticker, dataFrame=None, state=None):
         """
@@ -119,6 +323,142 @@ class STRATEGY:
             raise ValueError("DataFrame is not set. Please set the DataFrame using set_data() method.")
         return self.dataFrame
 
+    def prune_frame(self):
+        """
+        신호 계산이 끝난 뒤 중간 컬럼 삭제 (prune_intermediates가 켜져 있을 때만, set_data 마지막에 호출)
+        :return: 데이터프레임
+        """
+        if getattr(self, 'prune_intermediates', False) and self.dataFrame is not None:
+            columns = [col for col in self.INTERMEDIATE_COLUMNS if col in self.dataFrame.columns]
+            if columns:
+                self.dataFrame.drop(columns=columns, inplace=True)
+        return self.dataFrame
+
+    def memory_usage(self):
+        """
+        전략 인스턴스가 들고 있는 데이터프레임의 메모리 사용량
+        :return: {'rows', 'total', 'columns': {컬럼: {'dtype', 'bytes'}}}
+        """
+        return frame_schema.memory_report(getattr(self, 'dataFrame', None))
+
+    def reset_state(self):
+        """
+        전략 내부 상태 초기화 메소드
+        - 계산된 지표(dataFrame)는 유지하고, 포지션 등 실행 중에 쌓인 상태만 초기화합니다.
+        - 같은 지표로 여러 구간을 백테스트할 때 사용합니다.
+        """
+        if hasattr(self, 'position_size'):
+            self.position_size = 0.0
+        for sub_strategy in getattr(self, 'sub_strategies', []):
+            sub_strategy.reset_state()
+
+    def add_sub_strategy(self, sub_strategy):
+        """서브 전략 추가 (추가한 순서대로 적용됨)"""
+        if not hasattr(self, 'sub_strategies'):
+            self.sub_strategies = []
+        self.sub_strategies.append(sub_strategy)
+
+    def get_sub_strategy_params(self):
+        """서브 전략 이름 / 파라미터 리스트 (결과 저장소 hash 등에 사용)"""
+        return [
+            {'name': sub.__class__.__name__, 'params': sub.get_params()}
+            for sub in getattr(self, 'sub_strategies', [])
+        ]
+
+    def apply_sub_strategies(self, codes, sizes, prices):
+        """
+        백테스트용: 전체 기간 신호 배열에 서브 전략들을 순서대로 한 번에 적용
+        :return: (codes, sizes)
+        """
+        for sub_strategy in getattr(self, 'sub_strategies', []):
+            codes, sizes = sub_strategy.apply(codes, sizes, prices)
+        return codes, sizes
+
+    def run_batch(self, target_times, state=None) -> SignalFrame:
+        """
+        여러 날짜에 대해 전략을 실행하고 결과를 SignalFrame으로 반환합니다. (백테스트용)
+        - 기본 구현은 run()을 날짜마다 호출해서 배열에 바로 채움 (TradingSignal 리스트를 쌓지 않음)
+        - 내장 전략은 지표 컬럼으로 신호를 배열 연산으로 계산하도록 오버라이드함 (_batch_rows / _batch_frame)
+        - 데이터가 없는 날짜는 건너뛰고, 끝난 뒤 한 번에 알림
+        """
+        n = len(target_times)
+        target_time = np.empty(n, dtype=np.int64)
+        code = np.empty(n, dtype=np.int8)
+        price = np.empty(n, dtype=np.float64)
+        position_size = np.empty(n, dtype=np.float64)
+        confidence = np.empty(n, dtype=np.float64)
+        quantity = np.empty(n, dtype=np.int64)
+
+        ticker = getattr(self, 'ticker', None)
+        count = 0
+        skipped = []
+        for now in target_times:
+            try:
+                signal = self.run(target_time=now, state=state)
+            except Exception as e:
+                # 날짜가 없는 에러가 종종 남
+                skipped.append((now, e))
+                continue
+
+            ticker = signal.ticker
+            target_time[count] = int(signal.target_time)
+            code[count] = SIGNAL_CODES[signal.signal_type]
+            price[count] = signal.current_price
+            position_size[count] = signal.position_size
+            confidence[count] = signal.confidence
+            quantity[count] = -1 if signal.quantity is None else signal.quantity
+            count += 1
+
+        if skipped:
+            print(f"[오류] {len(skipped)}개 날짜 건너뜀 ({skipped[0][0]} ~ {skipped[-1][0]}), 첫 오류: {skipped[0][1]}")
+        return SignalFrame.from_arrays(
+            ticker, target_time[:count], code[:count], price[:count], position_size[:count],
+            confidence[:count], quantity[:count],
+        )
+
+    def _batch_rows(self, target_times, rows=None):
+        """
+        run_batch용: target_times -> (데이터프레임 행 번호 배열, 찾은 날짜의 target_time 배열)
+        :param rows: 봉 시각 키 -> 행 번호 dict (없으면 date 컬럼으로 만듦, 같은 날짜가 여러 행이면 첫 행)
+        데이터가 없는 날짜는 빼고, 한 번에 모아서 한 줄로 알림
+        """
+        if self.dataFrame is None:
+            raise ValueError("dataFrame must be set before running the strategy")
+        if rows is None:
+            rows = {}
+            for row, key in enumerate(format_time(self.dataFrame['date']).tolist()):
+                rows.setdefault(key, row)
+
+        times = np.asarray(target_times)
+        index = np.fromiter((rows.get(str(t), -1) for t in target_times), dtype=np.int64, count=len(times))
+        found = index >= 0
+        if not found.all():
+            missing = times[~found]
+            print(f"[오류] No data found for {len(missing)} dates ({missing[0]} ~ {missing[-1]})")
+        return index[found], times[found].astype(np.int64)
+
+    def _batch_frame(self, rows, target_time, code, position_size, confidence) -> SignalFrame:
+        """run_batch용: 행 번호 / 신호 배열 -> SignalFrame (가격은 close 컬럼)"""
+        return SignalFrame.from_arrays(
+            self.ticker, target_time, code,
+            price=self.dataFrame['close'].to_numpy(dtype=np.float64)[rows],
+            position_size=position_size, confidence=confidence,
+        )
+
+    def _column(self, name, rows, fill=False):
+        """run_batch용: 컬럼 값 배열 (NaN은 fill, bool 컬럼은 bool 배열)"""
+        values = self.dataFrame[name].to_numpy()[rows]
+        if values.dtype == object:
+            values = pd.Series(values).fillna(fill).to_numpy(dtype=type(fill))
+        return values
+
+    def run_with_sub_strategies(self, target_time=None, state=None) -> TradingSignal:
+        """실시간용: run()의 신호에 서브 전략들을 봉 단위로 적용"""
+        signal = self.run(target_time=target_time, state=state)
+        for sub_strategy in getattr(self, 'sub_strategies', []):
+            signal = sub_strategy.run(target_time=target_time, signal=signal)
+        return signal
+
     def run(self, target_time=None, state=None) -> TradingSignal:
         """
         전략 실행 메소드
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from strategy.sub.sub_strategy import Sub_Strategy, BUY, SELL, HOLD
+
+class Cooldown_strategy(Sub_Strategy):
+    """SELL 신호 이후 bars 봉 동안은 BUY 신호를 무시 (잦은 재진입 방지)"""
+    def __init__(self, bars: int = 5):
+        if bars < 0:
+            raise ValueError("bars must be non-negative")
+        self.bars = bars
+        super().__init__()
+
+    def get_params(self):
+        return {'bars': self.bars}
+
+    def reset_state(self):
+        self.index = -1
+        self.last_exit = None
+
+    def apply(self, codes, sizes, prices):
+        codes = np.array(codes, copy=True)
+        sizes = np.array(sizes, dtype=np.float64, copy=True)
+
+        index = np.arange(len(codes))
+        last_exit = pd.Series(np.where(codes == SELL, index, np.nan)).ffill().to_numpy()
+        with np.errstate(invalid='ignore'):
+            blocked = (codes == BUY) & (index - last_exit <= self.bars)
+
+        codes[blocked] = HOLD
+        sizes[blocked] = 0.0
+        return codes, sizes
+
+    def step(self, code, size, price):
+        self.index += 1
+        if code == SELL:
+            self.last_exit = self.index
+        elif code == BUY and self.last_exit is not None and self.index - self.last_exit <= self.bars:
+            return HOLD, 0.0
+        return code, size
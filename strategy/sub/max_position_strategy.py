@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from strategy.sub.sub_strategy import Sub_Strategy, holding_segments, update_position, POSITION_EPS, BUY, SELL, HOLD
+
+class MaxPosition_strategy(Sub_Strategy):
+    """
+    포지션 크기 제한
+    - BUY 한 번의 position_size를 max_size 이하로 제한
+    - 한 보유 구간 안에서 BUY(물타기/불타기)는 max_entries 번까지만 허용
+      (일부 매도로는 구간이 끝나지 않으므로 횟수도 그대로, 포지션이 0이 되면 다시 셈)
+    """
+    def __init__(self, max_size: float = 0.5, max_entries: int = 1):
+        if not 0 < max_size <= 1:
+            raise ValueError("max_size must be in (0, 1]")
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_size = max_size
+        self.max_entries = max_entries
+        super().__init__()
+
+    def get_params(self):
+        return {'max_size': self.max_size, 'max_entries': self.max_entries}
+
+    def reset_state(self):
+        self.position = 0.0     # 메인 전략 신호 기준 순 포지션
+        self.entries = 0
+
+    def apply(self, codes, sizes, prices):
+        codes = np.array(codes, copy=True)
+        sizes = np.array(sizes, dtype=np.float64, copy=True)
+
+        holding, start, seg_id = holding_segments(codes, sizes)
+        is_buy = codes == BUY
+        # 보유 구간별 BUY 횟수 (구간을 연 BUY가 1번째)
+        entry_no = pd.Series(is_buy.astype(np.int64)).groupby(seg_id).cumsum().to_numpy()
+
+        blocked = is_buy & holding & (entry_no > self.max_entries)
+        codes[blocked] = HOLD
+        sizes[blocked] = 0.0
+
+        allowed = is_buy & ~blocked
+        sizes[allowed] = np.minimum(sizes[allowed], self.max_size)
+        return codes, sizes
+
+    def step(self, code, size, price):
+        self.position = update_position(self.position, code, size)
+        if self.position <= POSITION_EPS:
+            self.entries = 0
+        elif code == BUY:
+            self.entries += 1
+            if self.entries > self.max_entries:
+                return HOLD, 0.0
+            return code, min(size, self.max_size)
+        return code, size
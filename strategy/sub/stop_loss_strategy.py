@@ -1,13 +1,21 @@
-from strategy.sub.sub_strategy import Sub_Strategy
+import numpy as np
 
-class StopLoss_strategy(Sub_Strategy):
-    def __init__(self, dataFrame=None):
-        self.dataFrame = dataFrame
+from strategy.sub.sub_strategy import Exit_Sub_Strategy
 
-    def set_data(self, dataFrame):
-        self.dataFrame = dataFrame
+class StopLoss_strategy(Exit_Sub_Strategy):
+    """진입 가격 대비 stop_loss 비율 이상 하락하면 전량 매도"""
+    def __init__(self, stop_loss: float = 0.05):
+        if stop_loss <= 0:
+            raise ValueError("stop_loss must be positive")
+        self.stop_loss = stop_loss
+        super().__init__()
 
-    def get_data(self):
-        if self.dataFrame is None:
-            raise ValueError("Data not set")
-        return self.dataFrame
\ No newline at end of file
+    def get_params(self):
+        return {'stop_loss': self.stop_loss}
+
+    def trigger_mask(self, prices, entry, holding, seg_id):
+        with np.errstate(invalid='ignore'):
+            return holding & (prices <= entry * (1 - self.stop_loss))
+
+    def is_triggered(self, price):
+        return price <= self.entry_price * (1 - self.stop_loss)
@@ -1,13 +1,269 @@
-from turtle import pd
-from strategy.strategy import SignalType, TradingSignal
+"""
+    서브 전략 (메인 전략 신호 후처리 / 리스크 오버레이)
 
+    메인 전략이 낸 신호를 받아서 보수적으로 조정합니다. (손절, 익절, 트레일링 스탑, 쿨다운, 포지션 제한 등)
+    두 가지 형태로 같은 결과를 냅니다.
+        - apply(codes, sizes, prices) : 백테스트용. 전체 기간의 신호 배열을 한 번에 처리 (날짜별 반복 없음)
+        - run(target_time, signal)    : 실시간용. 봉 하나씩 들어오는 신호를 상태를 유지하며 처리
+
+    신호 배열
+        codes  : 신호 코드 (1: BUY, -1: SELL, 0: HOLD) -> strategy.SIGNAL_CODES
+        sizes  : position_size
+        prices : 해당 봉의 가격 (current_price)
+
+    보유 구간(holding segment)
+        신호의 position_size로 순 포지션을 따라갑니다. (BUY는 더하고 SELL은 빼며 0 ~ 1로 자름)
+        포지션이 생긴 BUY 봉부터 포지션이 0이 되는 SELL 직전 봉까지를 한 보유 구간으로 봅니다.
+        (일부 매도 후에도 남은 포지션이 있으면 같은 구간, 진입 가격은 구간을 연 BUY 봉의 가격)
+        서브 전략이 구간 중간에 강제 청산(SELL)을 내면, 메인 전략의 포지션이 0이 될 때까지
+        같은 구간의 추가 BUY는 HOLD로 바꿉니다. (청산 직후 재진입 방지)
+"""
+
+import dataclasses
+
+import numpy as np
+import pandas as pd
+
+from strategy.strategy import SignalType, TradingSignal, SignalFrame, SIGNAL_CODES, CODE_TO_SIGNAL
+
+BUY = SIGNAL_CODES[SignalType.BUY]
+SELL = SIGNAL_CODES[SignalType.SELL]
+HOLD = SIGNAL_CODES[SignalType.HOLD]
+
+POSITION_EPS = 1e-9     # 이 이하의 순 포지션은 0(미보유)으로 봄
+
+
+##############################################################################################
+# 배열 처리 헬퍼
+##############################################################################################
+def update_position(position, code, size):
+    """봉 하나의 신호로 순 포지션 갱신 (BUY는 더하고 SELL은 빼며 0 ~ 1로 자름)"""
+    if code == BUY:
+        return min(position + size, 1.0)
+    if code == SELL:
+        return max(position - size, 0.0)
+    return position
+
+def net_position(codes, sizes=None):
+    """
+    각 봉의 신호까지 반영한 순 포지션 배열
+    :param sizes: position_size 배열 (None이면 모든 BUY/SELL을 전량(1.0)으로 봄)
+    """
+    codes = np.asarray(codes)
+    sizes = np.ones(len(codes)) if sizes is None else np.asarray(sizes, dtype=np.float64)
+
+    # 0 ~ 1로 자르는 누적합이라 벡터화가 안 되므로 BUY/SELL 봉만 순서대로 계산
+    actions = np.flatnonzero(codes != HOLD)
+    after = np.empty(len(actions))
+    position = 0.0
+    for k, i in enumerate(actions):
+        position = update_position(position, codes[i], float(sizes[i]))
+        after[k] = position
+
+    values = np.full(len(codes), np.nan)
+    values[actions] = after
+    return pd.Series(values).ffill().fillna(0.0).to_numpy()
+
+def holding_segments(codes, sizes=None):
+    """
+    신호 코드 배열에서 보유 구간을 계산합니다.
+    :param sizes: position_size 배열 (None이면 모든 BUY/SELL을 전량으로 봄 -> SELL이 나오면 구간 종료)
+
+    Returns:
+        holding (bool[]) : 해당 봉에서 포지션을 들고 있는지 (구간을 연 BUY 봉 포함)
+        start (bool[])   : 보유 구간이 시작되는 봉
+        seg_id (int[])   : 보유 구간 번호 (1부터, 보유 중이 아니면 0)
+    """
+    holding = net_position(codes, sizes) > POSITION_EPS
+
+    start = holding.copy()
+    start[1:] &= ~holding[:-1]
+    seg_id = np.where(holding, np.cumsum(start), 0)
+    return holding, start, seg_id
+
+def segment_entry_prices(prices, start, seg_id):
+    """보유 구간별 진입 가격(구간을 연 BUY 봉의 가격)을 각 봉에 펼친 배열 (보유 중이 아니면 nan)"""
+    entry_by_seg = np.concatenate(([np.nan], np.asarray(prices, dtype=np.float64)[start]))
+    return entry_by_seg[seg_id]
+
+def force_exit(codes, sizes, trigger, holding, seg_id):
+    """
+    보유 구간마다 첫 trigger 봉에 전량 매도(SELL, 1.0)를 넣고,
+    같은 구간의 이후 BUY는 HOLD로 바꿉니다.
+
+    Returns:
+        (codes, sizes): 새 배열 (입력 배열은 수정하지 않음)
+    """
+    codes = np.array(codes, copy=True)
+    sizes = np.array(sizes, dtype=np.float64, copy=True)
+
+    trigger = np.asarray(trigger) & holding
+    if not trigger.any():
+        return codes, sizes
+
+    index = np.arange(len(codes))
+    hit = np.flatnonzero(trigger)
+    # 구간별 첫 trigger 위치 (구간 번호는 시간순으로 증가하므로 처음 나온 것이 첫 trigger)
+    segs, first = np.unique(seg_id[hit], return_index=True)
+    exit_at = np.full(seg_id.max() + 1, len(codes))
+    exit_at[segs] = hit[first]
+
+    after = holding & (index > exit_at[seg_id])
+    blocked = after & (codes == BUY)
+    codes[blocked] = HOLD
+    sizes[blocked] = 0.0
+
+    exits = exit_at[segs]
+    codes[exits] = SELL
+    sizes[exits] = 1.0
+    return codes, sizes
+
+
+##############################################################################################
+# 기본 클래스
+##############################################################################################
 class Sub_Strategy():
     def __init__(self):
-        pass
+        self.name = self.__class__.__name__
+        self.ticker = None
+        self.dataFrame = None
+        self.reset_state()
+
+    def get_params(self):
+        """결과 저장소 hash 등에 사용할 파라미터 dict"""
+        return {}
 
     def set_data(self, ticker, dataFrame=None):
-        raise NotImplementedError("Sub_Strategy must implement set_data method")
+        """(선택) 서브 전략이 가격 외의 데이터를 필요로 할 때 사용"""
+        self.ticker = ticker
+        self.dataFrame = dataFrame
+
+    def reset_state(self):
+        """실시간(run) 처리용 상태 초기화"""
+        pass
+
+    def apply(self, codes, sizes, prices):
+        """
+        전체 기간 신호 배열을 한 번에 처리합니다.
+        :return: (codes, sizes) 새 배열
+        """
+        raise NotImplementedError("Sub_Strategy must implement apply method")
+
+    def step(self, code, size, price):
+        """
+        봉 하나의 신호를 처리합니다. (run에서 사용, apply와 같은 결과를 내야 함)
+        :return: (code, size)
+        """
+        raise NotImplementedError("Sub_Strategy must implement step method")
 
     # 메인에서 결정된 시그널을 받아서 보수적으로 어떻게 할지 정하는 로직.
     def run(self, target_time=None, signal : TradingSignal = None) -> TradingSignal:
-        raise NotImplementedError("Sub_Strategy must implement run method")
\ No newline at end of file
+        if signal is None:
+            raise ValueError("signal must be provided")
+
+        code, size = self.step(SIGNAL_CODES[signal.signal_type], signal.position_size, signal.current_price)
+        if code == SIGNAL_CODES[signal.signal_type] and size == signal.position_size:
+            return signal
+
+        return dataclasses.replace(
+            signal,
+            signal_type=CODE_TO_SIGNAL[code],
+            position_size=size,
+            quantity=None if code != SIGNAL_CODES[signal.signal_type] else signal.quantity,
+        )
+
+
+class Exit_Sub_Strategy(Sub_Strategy):
+    """
+    보유 구간 안에서 가격 조건이 맞으면 전량 청산하는 서브 전략의 기본 클래스 (손절, 익절, 트레일링 스탑)
+    하위 클래스는 trigger_mask (배열)와 is_triggered (봉 하나)를 구현합니다.
+    """
+    def reset_state(self):
+        self.position = 0.0     # 메인 전략 신호 기준 순 포지션
+        self.holding = False
+        self.stopped = False    # 강제 청산 후 메인 전략의 포지션이 0이 되기를 기다리는 중
+        self.entry_price = None
+        self.peak_price = None
+
+    def trigger_mask(self, prices, entry, holding, seg_id):
+        raise NotImplementedError("Exit_Sub_Strategy must implement trigger_mask method")
+
+    def is_triggered(self, price):
+        raise NotImplementedError("Exit_Sub_Strategy must implement is_triggered method")
+
+    def apply(self, codes, sizes, prices):
+        prices = np.asarray(prices, dtype=np.float64)
+        holding, start, seg_id = holding_segments(codes, sizes)
+        entry = segment_entry_prices(prices, start, seg_id)
+        trigger = self.trigger_mask(prices, entry, holding, seg_id)
+        return force_exit(codes, sizes, trigger, holding, seg_id)
+
+    def step(self, code, size, price):
+        self.position = update_position(self.position, code, size)
+        if self.position <= POSITION_EPS:
+            self.holding = False
+            self.stopped = False
+            return code, size
+
+        if self.stopped:
+            return (HOLD, 0.0) if code == BUY else (code, size)
+
+        if not self.holding:
+            # 포지션은 BUY로만 늘어나므로 구간을 여는 봉은 항상 BUY
+            self.holding = True
+            self.entry_price = price
+            self.peak_price = price
+
+        self.peak_price = max(self.peak_price, price)
+        if self.is_triggered(price):
+            self.holding = False
+            self.stopped = True
+            return SELL, 1.0
+
+        return code, size
+
+
+##############################################################################################
+# SignalFrame / TradingSignal 리스트 처리
+##############################################################################################
+def apply_to_frame(sub_strategies, frame):
+    """
+    SignalFrame에 서브 전략들을 종목별로 한 번에 적용합니다. (백테스트용)
+    신호가 바뀐 행의 quantity는 None(-1)으로 초기화합니다.
+    """
+    if not sub_strategies or len(frame) == 0:
+        return frame
+
+    codes = frame.code.copy()
+    sizes = frame.position_size.copy()
+    for ticker in frame.tickers:
+        rows = frame.ticker_rows(ticker)
+        c, s = frame.code[rows], frame.position_size[rows]
+        for sub_strategy in sub_strategies:
+            c, s = sub_strategy.apply(c, s, frame.price[rows])
+        codes[rows] = c
+        sizes[rows] = s
+
+    quantity = np.where(codes != frame.code, -1, frame.quantity)
+    return frame.replace(code=codes, position_size=sizes, quantity=quantity)
+
+def apply_to_signals(sub_strategies, signals):
+    """
+    TradingSignal 리스트에 서브 전략들을 배열 단위로 한 번에 적용합니다.
+    바뀐 신호만 새 TradingSignal로 교체한 리스트를 반환합니다.
+    """
+    if not sub_strategies or not signals:
+        return list(signals)
+
+    frame = SignalFrame.from_signals(signals)
+    new_frame = apply_to_frame(sub_strategies, frame)
+
+    result = list(signals)
+    for i in np.flatnonzero((new_frame.code != frame.code) | (new_frame.position_size != frame.position_size)):
+        result[i] = dataclasses.replace(
+            signals[i],
+            signal_type=CODE_TO_SIGNAL[int(new_frame.code[i])],
+            position_size=float(new_frame.position_size[i]),
+            quantity=None if new_frame.quantity[i] < 0 else int(new_frame.quantity[i]),
+        )
+    return result
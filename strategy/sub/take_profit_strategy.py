@@ -0,0 +1,21 @@
+import numpy as np
+
+from strategy.sub.sub_strategy import Exit_Sub_Strategy
+
+class TakeProfit_strategy(Exit_Sub_Strategy):
+    """진입 가격 대비 take_profit 비율 이상 상승하면 전량 매도"""
+    def __init__(self, take_profit: float = 0.1):
+        if take_profit <= 0:
+            raise ValueError("take_profit must be positive")
+        self.take_profit = take_profit
+        super().__init__()
+
+    def get_params(self):
+        return {'take_profit': self.take_profit}
+
+    def trigger_mask(self, prices, entry, holding, seg_id):
+        with np.errstate(invalid='ignore'):
+            return holding & (prices >= entry * (1 + self.take_profit))
+
+    def is_triggered(self, price):
+        return price >= self.entry_price * (1 + self.take_profit)
@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from strategy.sub.sub_strategy import Exit_Sub_Strategy
+
+class TrailingStop_strategy(Exit_Sub_Strategy):
+    """보유 구간 중 최고가 대비 trailing 비율 이상 하락하면 전량 매도"""
+    def __init__(self, trailing: float = 0.08):
+        if trailing <= 0:
+            raise ValueError("trailing must be positive")
+        self.trailing = trailing
+        super().__init__()
+
+    def get_params(self):
+        return {'trailing': self.trailing}
+
+    def trigger_mask(self, prices, entry, holding, seg_id):
+        # 보유 구간별 누적 최고가
+        peak = pd.Series(np.where(holding, prices, -np.inf)).groupby(seg_id).cummax().to_numpy()
+        return holding & (prices <= peak * (1 - self.trailing))
+
+    def is_triggered(self, price):
+        return price <= self.peak_price * (1 - self.trailing)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+웹훅 매수 금액 계산 테스트 (보유 코인 평가)
+
+업비트 REST 대용 서버(benchmark.upbit_rest_stand_in)에 연결해서 execute_buy_signal이
+보유 코인을 현재가로 평가하는지 확인합니다. (평균 매수가로 평가하면 오른 포지션을 작게 보고 더 삼)
+마켓 스냅샷 / 신호 기록은 임시 폴더에 씀 (네트워크 / 키 파일 불필요)
+
+사용법:
+python test_buy_sizing.py
+python -m pytest test_buy_sizing.py
+
+실패하면 종료 코드 1
+"""
+
+import functools
+import os
+import sys
+import tempfile
+import traceback
+
+from benchmark.upbit_rest_stand_in import UpbitRestStandIn
+
+BTC_PRICE = 90_000_000.0
+
+
+@functools.lru_cache(maxsize=1)
+def load_server():
+    """대용 서버 + core.server (테스트끼리 공유, reset()으로 잔고를 다시 맞춤)"""
+    workdir = tempfile.mkdtemp(prefix="buy_sizing_")
+    stand_in = UpbitRestStandIn(latency_ms=1, limits={}).start()
+    os.environ["UPBIT_API_URL"] = stand_in.url
+    os.environ["UPBIT_MARKET_CACHE"] = os.path.join(workdir, "upbit_markets.json")
+    os.environ["SIGNAL_LOG_DIR"] = os.path.join(workdir, "signals")
+
+    from core import server
+    server.ACCESS_KEY, server.SECRET_KEY = "test", "test-secret-" + "0" * 32
+    server._load_markets()
+    return stand_in, server
+
+def reset(krw, holdings=()):
+    """
+    대용 서버 잔고를 바꾸고 서버의 잔고 / 현재가 캐시를 비움
+    :param holdings: (화폐, 수량, 평균 매수가) 리스트
+    """
+    stand_in, server = load_server()
+    with stand_in._lock:
+        stand_in.assets = {"KRW": float(krw)}
+        stand_in.costs = {}
+        stand_in.orders = 0
+    for currency, balance, avg_buy_price in holdings:
+        stand_in.set_holding(currency, balance, avg_buy_price)
+    stand_in.set_price("KRW-BTC", BTC_PRICE)
+    server.PRICES.invalidate()
+    server.PORTFOLIO.mark_stale()
+    return stand_in, server
+
+def test_gained_position_blocks_buy():
+    """평균 매수가 10M -> 현재 25M (전체 100M의 25%): 목표 비중 20%를 이미 넘었으므로 매수하지 않음"""
+    print("\n=== 오른 포지션: 매수 안 함 ===")
+    volume = 25_000_000 / BTC_PRICE
+    stand_in, server = reset(75_000_000, [("BTC", volume, 10_000_000 / volume)])
+
+    # 평균 매수가로 평가하면 전체 85M, 목표 17M, 보유 10M -> 7M을 더 샀음
+    assert server.execute_buy_signal("BTC") is False
+    assert stand_in.orders == 0, f"주문이 나감: {stand_in.orders}"
+    print("매수 안 함")
+
+def test_gained_position_limits_buy():
+    """평균 매수가 5M -> 현재 10M (전체 100M): 목표 20M까지 10M만 매수"""
+    print("\n=== 오른 포지션: 남은 비중만 매수 ===")
+    volume = 10_000_000 / BTC_PRICE
+    stand_in, server = reset(90_000_000, [("BTC", volume, 5_000_000 / volume)])
+
+    # 평균 매수가로 평가하면 전체 95M, 목표 19M, 보유 5M -> 14M 매수 (24%)
+    assert server.execute_buy_signal("BTC") is True
+    bought = 90_000_000 - stand_in.assets["KRW"]
+    assert abs(bought - 10_000_000) <= 1, f"매수 금액: {bought}"
+    value = stand_in.assets["BTC"] * BTC_PRICE
+    assert value <= 20_000_000 + 1, f"매수 후 BTC 평가 금액: {value}"
+    print(f"매수 금액: {bought:,.0f}원")
+
+def test_missing_price_rejects_buy():
+    """보유 코인 현재가를 받지 못하면 비중을 모르므로 매수하지 않음 (평균 매수가로 대신하지 않음)"""
+    print("\n=== 현재가 없음: 매수 안 함 ===")
+    stand_in, server = reset(90_000_000, [("ETH", 2.0, 3_000_000)])
+
+    fetch, server.PRICES.fetch = server.PRICES.fetch, lambda markets: {}
+    try:
+        assert server.execute_buy_signal("BTC") is False
+    finally:
+        server.PRICES.fetch = fetch
+    assert stand_in.orders == 0, f"주문이 나감: {stand_in.orders}"
+    print("매수 안 함")
+
+def main():
+    """메인 테스트 실행"""
+    print("매수 금액 계산 테스트")
+    print("="*50)
+
+    checks = [test_gained_position_blocks_buy, test_gained_position_limits_buy, test_missing_price_rejects_buy]
+    failed = 0
+    for check in checks:
+        try:
+            check()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {e}")
+            traceback.print_exc()
+
+    print("\n" + "="*50)
+    if failed:
+        print(f"❌ 실패한 테스트가 있습니다. ({failed}/{len(checks)})")
+        sys.exit(1)
+    print("테스트 완료!")
+
+if __name__ == "__main__":
+    main()
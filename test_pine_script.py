@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Pine Script 스타일 전략 테스트 스크립트
+
+합성 가격 데이터(benchmark.synthetic)로 Pine 스크립트를 실행해서
+pandas로 직접 계산한 결과와 신호가 같은지 확인합니다. (네트워크 / DB 불필요)
+
+사용법:
+python test_pine_script.py
+python test_pine_script.py my_strategy.pine
+python -m pytest test_pine_script.py
+
+실패하면 종료 코드 1
+"""
+
+import functools
+import sys
+import traceback
+
+import numpy as np
+import pandas as pd
+
+from benchmark import synthetic
+from strategy.pine_style_strategy import PineStyle_strategy, PineSyntaxError, compile_pine
+
+RSI_SCRIPT = """
+//@version=5
+strategy("RSI Reversal", default_qty_type=strategy.percent_of_equity, default_qty_value=30)
+length = input.int(14, "RSI Length")
+oversold = input.float(30, "Oversold")
+overbought = input.float(70, "Overbought")
+
+r = ta.rsi(close, length)
+if ta.crossover(r, oversold)
+    strategy.entry("Long", strategy.long)
+else if ta.crossunder(r, overbought)
+    strategy.close("Long")
+plot(r)
+"""
+
+@functools.lru_cache(maxsize=1)
+def load_frame(years=3):
+    """합성 데이터 (테스트끼리 공유, 쓰기 전에 copy())"""
+    market = synthetic.generate_market(n_tickers=1, years=years)
+    ticker = market['tickers'][0]
+    return ticker, market['prices'][ticker]
+
+def print_signals(strategy, limit=10):
+    frame = strategy.dataFrame
+    rows = frame[frame['pine_signal'] != 0]
+    print(f"신호 수: BUY {int((rows['pine_signal'] == 1).sum())}, SELL {int((rows['pine_signal'] == -1).sum())}")
+    print(rows[['date', 'close', 'pine_signal', 'pine_position_size']].head(limit).to_string(index=False))
+
+def test_default_script():
+    """기본 스크립트 (SMA 5 / 20 골든크로스) vs pandas 계산"""
+    print("\n=== 기본 스크립트 (SMA Cross) ===")
+    ticker, frame = load_frame()
+
+    strategy = PineStyle_strategy()
+    strategy.set_data(ticker, frame.copy())
+    print_signals(strategy)
+
+    close = strategy.dataFrame['close']
+    fast, slow = close.rolling(5).mean(), close.rolling(20).mean()
+    cross_up = (fast > slow) & (fast.shift(1) <= slow.shift(1))
+
+    buys = strategy.dataFrame['pine_signal'] == 1
+    mismatch = strategy.dataFrame['date'][buys != cross_up]
+    assert mismatch.empty, f"골든크로스 위치 불일치: {mismatch.head().tolist()}"
+    print("골든크로스 위치 일치")
+
+def test_rsi_script():
+    """RSI 스크립트 + input 덮어쓰기, run / run_batch 결과 비교"""
+    print("\n=== RSI 스크립트 (input 덮어쓰기: RSI Length=10) ===")
+    ticker, frame = load_frame()
+
+    strategy = PineStyle_strategy(script=RSI_SCRIPT, **{"RSI Length": 10})
+    strategy.set_data(ticker, frame.copy())
+    print(f"input 기본값: {strategy.program.inputs}")
+    print_signals(strategy)
+
+    dates = strategy.dataFrame['date'].dt.strftime('%Y%m%d').tolist()
+    batch = strategy.run_batch(dates)
+    single = [strategy.run(target_time=date) for date in dates]
+
+    assert len(batch) == len(single)
+    for i, signal in enumerate(single):
+        assert batch.signal(i).signal_type == signal.signal_type, f"{dates[i]}: 신호 불일치"
+        assert batch.signal(i).position_size == signal.position_size, f"{dates[i]}: 포지션 크기 불일치"
+    print("run / run_batch 일치")
+
+def test_syntax_errors():
+    """지원하지 않는 문법은 줄 번호와 함께 ValueError"""
+    print("\n=== 문법 오류 ===")
+
+    scripts = [
+        "var count = 0",
+        "x = ta.vwma(close, 10)",
+        "x = close[length]",
+        "if close > open\nx = 1",
+    ]
+    accepted = []
+    for script in scripts:
+        try:
+            compile_pine(script)
+            accepted.append(script)
+        except PineSyntaxError as e:
+            print(f"✅ {script!r} -> {e}")
+    assert not accepted, f"오류 없이 컴파일됨: {accepted}"
+
+def run_script_file(path):
+    """사용자 스크립트 파일 실행 (스크립트 오류는 ValueError)"""
+    print(f"\n=== 스크립트 파일: {path} ===")
+    ticker, frame = load_frame()
+    strategy = PineStyle_strategy(script_path=path)
+    strategy.set_data(ticker, frame.copy())
+    print_signals(strategy, limit=20)
+
+def main():
+    """메인 테스트 실행"""
+    print("Pine Script 스타일 전략 테스트")
+    print("="*50)
+
+    ticker, frame = load_frame()
+    print(f"합성 데이터: {ticker}, {len(frame)}일")
+
+    if len(sys.argv) > 1:
+        checks = [functools.partial(run_script_file, sys.argv[1])]
+    else:
+        checks = [test_default_script, test_rsi_script, test_syntax_errors]
+
+    failed = 0
+    for check in checks:
+        try:
+            check()
+        except (AssertionError, ValueError) as e:
+            failed += 1
+            print(f"❌ {e}")
+            traceback.print_exc()
+
+    print("\n" + "="*50)
+    if failed:
+        print(f"❌ 실패한 테스트가 있습니다. ({failed}/{len(checks)})")
+        sys.exit(1)
+    print("테스트 완료!")
+
+if __name__ == "__main__":
+    main()
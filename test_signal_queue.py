@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+웹훅 신호 대기열 복구 테스트 (module.signal_queue)
+
+임시 폴더의 JSONL 저널로 프로세스가 죽었다가 다시 시작하는 상황을 흉내 내서
+끝나지 않은 신호가 한 번만 다시 실행되는지, 복구할 때 저널이 줄어드는지 확인합니다. (네트워크 불필요)
+
+사용법:
+python test_signal_queue.py
+python -m pytest test_signal_queue.py
+
+실패하면 종료 코드 1
+"""
+
+import os
+import sys
+import tempfile
+import traceback
+from concurrent.futures import Future
+
+from module.signal_queue import SignalQueue, QUEUED, DONE
+
+
+class Dispatcher:
+    """dispatch 대용. finish=False면 실행하다 죽은 것처럼 callback을 부르지 않음"""
+    def __init__(self, finish=True):
+        self.finish = finish
+        self.calls = []
+
+    def __call__(self, signal, callback):
+        self.calls.append(signal)
+        future = Future()
+        if self.finish:
+            future.set_result(True)
+            callback(future)
+        return future
+
+def journal_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return f.readlines()
+
+def test_pending_signal_replayed_once():
+    """죽기 전에 끝나지 않은 신호: 다음 시작 때 한 번만 다시 실행, done 이후에는 다시 실행하지 않음"""
+    print("\n=== 끝나지 않은 신호 복구 ===")
+    path = os.path.join(tempfile.mkdtemp(prefix="signal_queue_"), "journal.jsonl")
+
+    # 1) 신호 둘 중 하나는 끝나고, 하나는 실행 중에 프로세스가 죽음
+    queue = SignalQueue(Dispatcher(), journal_path=path)
+    finished_id, _ = queue.submit("KRW-BTC", "buy")
+    queue.dispatch = Dispatcher(finish=False)
+    pending_id, _ = queue.submit("KRW-ETH", "sell")
+    queue.close()
+    assert queue.status(pending_id)['status'] == QUEUED
+    # 쓰다 만 줄
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"op":"done","id":')
+
+    # 2) 다시 시작: 끝나지 않은 신호만 다시 실행
+    dispatch = Dispatcher()
+    queue = SignalQueue(dispatch, journal_path=path)
+    assert queue.recover() == 1
+    assert [signal['id'] for signal in dispatch.calls] == [pending_id]
+    assert dispatch.calls[0]['recovered'] is True
+    assert queue.status(pending_id)['status'] == DONE
+    queue.close()
+
+    # 복구할 때 끝난 신호는 저널에서 빠짐 (다시 실행한 신호의 queued + done만 남음)
+    lines = journal_lines(path)
+    print(f"복구 후 저널: {len(lines)}줄")
+    assert len(lines) == 2, lines
+    assert all(finished_id not in line for line in lines)
+
+    # 3) 한 번 더 시작: 다시 실행하지 않고 저널도 비워짐
+    dispatch = Dispatcher()
+    queue = SignalQueue(dispatch, journal_path=path)
+    assert queue.recover() == 0
+    assert dispatch.calls == []
+    queue.close()
+    assert journal_lines(path) == []
+    print("다시 실행: 한 번")
+
+def test_idempotency_key_survives_compaction():
+    """중복 제거 키가 아직 유효한 신호는 저널에 남아서 재시작 후에도 중복으로 걸러짐"""
+    print("\n=== 복구 후 중복 제거 ===")
+    path = os.path.join(tempfile.mkdtemp(prefix="signal_queue_"), "journal.jsonl")
+
+    queue = SignalQueue(Dispatcher(), journal_path=path)
+    signal_id, _ = queue.submit("KRW-BTC", "buy", key="alert-1")
+    queue.close()
+
+    for _ in range(2):
+        dispatch = Dispatcher()
+        queue = SignalQueue(dispatch, journal_path=path)
+        assert queue.recover() == 0
+        assert queue.submit("KRW-BTC", "buy", key="alert-1") == (signal_id, True)
+        assert dispatch.calls == []
+        queue.close()
+    print("중복 제거 유지")
+
+def main():
+    """메인 테스트 실행"""
+    print("신호 대기열 테스트")
+    print("="*50)
+
+    checks = [test_pending_signal_replayed_once, test_idempotency_key_survives_compaction]
+    failed = 0
+    for check in checks:
+        try:
+            check()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {e}")
+            traceback.print_exc()
+
+    print("\n" + "="*50)
+    if failed:
+        print(f"❌ 실패한 테스트가 있습니다. ({failed}/{len(checks)})")
+        sys.exit(1)
+    print("테스트 완료!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+서브 전략 테스트 (손절 / 익절 / 트레일링 스탑 / 쿨다운 / 포지션 제한)
+
+무작위 신호 배열로 백테스트용 apply_to_frame과 실시간용 run(봉 하나씩)의 결과가 같은지,
+일부 매도 후에도 남은 포지션에 손절이 걸리는지 확인합니다. (네트워크 / DB 불필요)
+
+사용법:
+python test_sub_strategy.py
+python -m pytest test_sub_strategy.py
+
+실패하면 종료 코드 1
+"""
+
+import sys
+import traceback
+
+import numpy as np
+
+from strategy.strategy import SignalFrame, SIGNAL_CODES
+from strategy.sub.sub_strategy import apply_to_frame, BUY, SELL, HOLD
+from strategy.sub.stop_loss_strategy import StopLoss_strategy
+from strategy.sub.take_profit_strategy import TakeProfit_strategy
+from strategy.sub.trailing_stop_strategy import TrailingStop_strategy
+from strategy.sub.cooldown_strategy import Cooldown_strategy
+from strategy.sub.max_position_strategy import MaxPosition_strategy
+
+SIZES = [0.1, 0.3, 0.5, 1.0]
+
+
+def random_frame(seed, n_tickers=3, n=400):
+    """종목별 무작위 신호 (BUY / SELL 크기는 SIZES 중 하나, 가격은 랜덤 워크)"""
+    rng = np.random.default_rng(seed)
+    tickers, target_time, ticker_index, codes, prices, sizes = [], [], [], [], [], []
+    for t in range(n_tickers):
+        tickers.append(f"T{t:03d}")
+        target_time.append(20200101 + np.arange(n))
+        ticker_index.append(np.full(n, t))
+        codes.append(rng.choice([BUY, SELL, HOLD], size=n, p=[0.15, 0.1, 0.75]))
+        prices.append(100 * np.exp(np.cumsum(rng.normal(0, 0.03, n))))
+        sizes.append(rng.choice(SIZES, size=n))
+
+    codes = np.concatenate(codes)
+    sizes = np.where(codes == HOLD, 0.0, np.concatenate(sizes))
+    return SignalFrame(tickers, np.concatenate(target_time), np.concatenate(ticker_index),
+                       codes, np.concatenate(prices), sizes)
+
+def run_per_bar(make_subs, frame):
+    """종목별로 새 서브 전략을 만들어 신호를 하나씩 run에 통과시킴"""
+    codes = frame.code.copy()
+    sizes = frame.position_size.copy()
+    for ticker in frame.tickers:
+        subs = make_subs()
+        for i in frame.ticker_rows(ticker):
+            signal = frame.signal(i)
+            for sub in subs:
+                signal = sub.run(signal.target_time, signal)
+            codes[i] = SIGNAL_CODES[signal.signal_type]
+            sizes[i] = signal.position_size
+    return codes, sizes
+
+def check_same(make_subs, frame, label):
+    batch = apply_to_frame(make_subs(), frame)
+    codes, sizes = run_per_bar(make_subs, frame)
+
+    diff = np.flatnonzero((batch.code != codes) | (batch.position_size != sizes))
+    assert len(diff) == 0, (f"{label}: apply_to_frame / run 결과가 다름 ({len(diff)}개, 첫 위치 {diff[0]}: "
+                            f"apply {batch.code[diff[0]]} {batch.position_size[diff[0]]} / "
+                            f"run {codes[diff[0]]} {sizes[diff[0]]})")
+    changed = int((batch.code != frame.code).sum())
+    print(f"{label}: 같음 (바뀐 신호 {changed}개)")
+
+def test_apply_matches_run():
+    """무작위 신호 배열: apply_to_frame과 봉 하나씩 run한 결과가 같아야 함"""
+    print("\n=== apply_to_frame vs run ===")
+    cases = {
+        'StopLoss': lambda: [StopLoss_strategy(0.05)],
+        'TakeProfit': lambda: [TakeProfit_strategy(0.1)],
+        'TrailingStop': lambda: [TrailingStop_strategy(0.08)],
+        'Cooldown': lambda: [Cooldown_strategy(3)],
+        'MaxPosition': lambda: [MaxPosition_strategy(max_size=0.5, max_entries=2)],
+        'Chain': lambda: [MaxPosition_strategy(max_size=0.5, max_entries=3), StopLoss_strategy(0.05),
+                          TrailingStop_strategy(0.1), Cooldown_strategy(2)],
+    }
+    for seed in range(3):
+        frame = random_frame(seed)
+        for label, make_subs in cases.items():
+            check_same(make_subs, frame, f"{label} (seed {seed})")
+
+def test_stop_loss_after_partial_sell():
+    """일부 매도 후 남은 포지션도 손절 대상 (진입 가격은 구간을 연 BUY 봉 가격)"""
+    print("\n=== 일부 매도 후 손절 ===")
+    codes = np.array([BUY, HOLD, SELL, HOLD, HOLD, BUY, SELL])
+    sizes = np.array([1.0, 0.0, 0.5, 0.0, 0.0, 0.3, 1.0])
+    prices = np.array([100.0, 102.0, 101.0, 98.0, 94.0, 93.0, 95.0])
+    frame = SignalFrame.from_arrays("T000", 20200101 + np.arange(len(codes)), codes, prices, sizes)
+
+    result = apply_to_frame([StopLoss_strategy(0.05)], frame)
+    print(f"신호: {result.code.tolist()} / 크기: {result.position_size.tolist()}")
+    # 100에서 진입, 절반 매도 후 94 (-6%)에서 남은 포지션 전량 매도
+    assert result.code[4] == SELL and result.position_size[4] == 1.0, "일부 매도 후 손절이 나오지 않음"
+    # 손절 후 메인 전략의 포지션이 0이 되기 전의 추가 BUY는 무시
+    assert result.code[5] == HOLD, "손절 직후 재진입"
+    assert result.code[6] == SELL
+
+    codes_run, sizes_run = run_per_bar(lambda: [StopLoss_strategy(0.05)], frame)
+    assert codes_run.tolist() == result.code.tolist(), f"run 결과가 다름: {codes_run.tolist()}"
+    assert sizes_run.tolist() == result.position_size.tolist()
+
+def main():
+    """메인 테스트 실행"""
+    print("서브 전략 테스트")
+    print("="*50)
+
+    checks = [test_apply_matches_run, test_stop_loss_after_partial_sell]
+    failed = 0
+    for check in checks:
+        try:
+            check()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {e}")
+            traceback.print_exc()
+
+    print("\n" + "="*50)
+    if failed:
+        print(f"❌ 실패한 테스트가 있습니다. ({failed}/{len(checks)})")
+        sys.exit(1)
+    print("테스트 완료!")
+
+if __name__ == "__main__":
+    main()
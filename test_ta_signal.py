@@ -176,7 +176,7 @@ def main():
     print("테스트 완료!")
     print("\n로그 확인:")
     print("- 서버 로그: logs/server_YYYYMMDD.log")
-    print("- 신호 로그: data/ta-signal.txt")
+    print("- 신호 로그: data/signals/log (python -m module.signal_journal query)")
 
 if __name__ == "__main__":
     main()